@@ -1,7 +1,7 @@
 import logging
 from collections.abc import Iterator
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Union
 
 import gevent
 
@@ -12,6 +12,7 @@ from rotkehlchen.accounting.pot import AccountingPot
 from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.accounting.types import MissingPrice
 from rotkehlchen.chain.evm.accounting.aggregator import EVMAccountingAggregators
+from rotkehlchen.db.history_events import HistoryEventRow, materialize_history_event_rows
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
@@ -56,6 +57,8 @@ class Accountant:
 
         self.currently_processing_timestamp = Timestamp(-1)
         self.first_processed_timestamp = Timestamp(-1)
+        # the event that _process_event is processing, to report it if it fails
+        self._current_event: Optional[AccountingEventMixin] = None
         self.premium = premium
 
     def activate_premium_status(self, premium: Premium) -> None:
@@ -75,11 +78,11 @@ class Accountant:
     def _process_skipping_exception(
             self,
             exception: Exception,
-            events: list[AccountingEventMixin],
             count: int,
             reason: str,
     ) -> int:
-        event = events[count]
+        event = self._current_event
+        assert event is not None, 'should only be called for an event being processed'
         ts = event.get_timestamp()
         identifier = event.get_identifier()
         self.msg_aggregator.add_error(
@@ -98,7 +101,7 @@ class Accountant:
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
-            events: list[AccountingEventMixin],
+            events: list[Union[AccountingEventMixin, HistoryEventRow]],
     ) -> int:
         """Processes the entire history of cryptoworld actions in order to determine
         the price and time at which every asset was obtained and also
@@ -141,12 +144,17 @@ class Accountant:
             self.currently_processing_timestamp = first_ts
             self.first_processed_timestamp = first_ts
 
-            count = 0
-            actions_length = len(events)
+            count = skipped_rows = 0
             prev_time = last_event_ts = Timestamp(0)
             ignored_ids_mapping = self.db.get_ignored_action_ids(cursor=cursor, action_type=None)
 
-        events_iter = iter(events)
+        def skip_row(row: HistoryEventRow) -> None:
+            nonlocal skipped_rows
+            skipped_rows += 1
+
+        # Rows that can't be deserialized are dropped here so they are neither
+        # processed nor counted towards the processed actions and the events limit
+        events_iter = materialize_history_event_rows(iter(events), on_skip=skip_row)
         while True:
             try:
                 (
@@ -163,7 +171,6 @@ class Accountant:
             except PriceQueryUnsupportedAsset as e:
                 count = self._process_skipping_exception(
                     exception=e,
-                    events=events,
                     count=count,
                     reason='not being able to find price for an unsupported asset',
                 )
@@ -181,7 +188,6 @@ class Accountant:
             except RemoteError as e:
                 count = self._process_skipping_exception(
                     exception=e,
-                    events=events,
                     count=count,
                     reason='inability to reach an external service at that point in time',
                 )
@@ -200,20 +206,22 @@ class Accountant:
             if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
                 log.debug(
                     f'PnL reports event processing has hit the event limit of {events_limit}. '
-                    f'Processing stopped and the results will not '
-                    f'take into account subsequent events. Total events were {len(events)}',
+                    f'Processing stopped and the results will not take into account '
+                    f'subsequent events. Total events were {len(events) - skipped_rows}',
                 )
                 break
 
+        # Only the rows up to where processing stopped are deserialized, so rows after
+        # that which can't be deserialized are still counted in the total actions
         dbpnl.add_report_overview(
             report_id=report_id,
             last_processed_timestamp=last_event_ts,
             processed_actions=count,
-            total_actions=actions_length,
+            total_actions=len(events) - skipped_rows,
             pnls=self.pots[0].pnls,
         )
 
-        for pot in self.pots:  # delete rules stored in memory since they won't be needed and can be queried again from the db  # noqa: E501
+        for pot in self.pots:  # log the rule lookup stats of this report and reset them
             pot.events_accountant.rules_manager.clean_rules()
 
         return report_id
@@ -240,7 +248,7 @@ class Accountant:
         """
         with self.db.conn.read_ctx() as cursor:
             ignored_asset_ids = self.db.get_ignored_asset_ids(cursor)
-        event = next(events_iterator, None)
+        event = self._current_event = next(events_iterator, None)
         if event is None:
             return 0, prev_time
 
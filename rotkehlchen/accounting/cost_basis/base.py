@@ -1,9 +1,11 @@
-import heapq
+import bisect
+import itertools
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
 from collections.abc import Iterator
 from dataclasses import dataclass, field
+from decimal import Decimal
 from typing import TYPE_CHECKING, Any, Callable, Literal, NamedTuple, Optional, overload
 
 from rotkehlchen.accounting.types import MissingAcquisition, MissingPrice
@@ -100,67 +102,255 @@ class AssetSpendEvent:
         )
 
 
-class AssetAcquisitionHeapElement(NamedTuple):
+class AcquisitionsSnapshot(NamedTuple):
+    """A point in time copy of the acquisitions of a cost basis method.
+
+    Only references to the acquisition events are copied. Their remaining amounts are
+    kept separately since they are mutated in place while spends are processed.
     """
-    https://docs.python.org/3/library/heapq.html#basic-examples
+    acquisitions: tuple[AssetAcquisitionEvent, ...]  # in consumption order
+    remaining_amounts: tuple[FVal, ...]
 
-    This represents a heap element for the asset acquisition heap.
-    It is a tuple to also carry a priority which is used by the heap algorithm to
-    preserve the heap invariant.
 
-    Note:`heapq` uses a min heap implementation i.e. the smallest item comes out first.
+class CostBasisSnapshot(NamedTuple):
+    """A point in time copy of the state of a cost basis method.
 
-    For FIFO, a counter is used as the priority so the first acquisition comes out first.
-    For LIFO, a counter is used but negated, so the acquisition added last comes first.
-    For HIFO, the amount of the acquisition is used although negated so the
-    acquisition with the highest amount comes first.
+    The running totals are only kept by the average cost basis method.
     """
-    priority: FVal  # This is only used by heapq algorithm and not accessed from our code
-    acquisition_event: AssetAcquisitionEvent
+    acquisitions: AcquisitionsSnapshot
+    current_amount: FVal = ZERO
+    current_total_acb: FVal = ZERO
 
 
-class BaseCostBasisMethod(metaclass=ABCMeta):
-    """The base class in which every other cost basis method inherits from."""
-    def __init__(self) -> None:
-        self._acquisitions_heap: list[AssetAcquisitionHeapElement] = []
+class BaseAcquisitionsStore(metaclass=ABCMeta):
+    """Keeps the acquisitions of an asset indexed by the order in which they are consumed.
+
+    The acquisition to be consumed next is always accessible in O(1), so partially
+    consuming it does not touch any other acquisition. Fully consumed acquisitions
+    are removed in amortized O(1).
+    """
 
     @abstractmethod
-    def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
+    def add(self, acquisition: AssetAcquisitionEvent) -> None:
+        """Inserts a new acquisition at the position its consumption order dictates"""
+
+    @abstractmethod
+    def peek(self) -> AssetAcquisitionEvent:
+        """Returns the acquisition to be consumed next.
+
+        May raise:
+        - IndexError if there are no acquisitions
+        """
+
+    @abstractmethod
+    def pop(self) -> None:
+        """Removes the acquisition to be consumed next.
+
+        May raise:
+        - IndexError if there are no acquisitions
         """
-        The core method. Should be implemented by subclasses.
-        This method takes a new acquisition and decides where to insert it
-        and thus determines the PnL order.
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[AssetAcquisitionEvent]:
+        """Iterates the acquisitions in consumption order"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def load(self, acquisitions: tuple[AssetAcquisitionEvent, ...]) -> None:
+        """Replaces all acquisitions with the given ones which are in consumption order"""
+
+    def consume(self, amount: FVal) -> tuple[list[tuple[AssetAcquisitionEvent, FVal]], FVal]:
+        """Consumes `amount` from as many acquisitions as needed in a single call.
+
+        Returns a list of the acquisitions used along with the amount used from each of
+        them and the part of `amount` that could not be satisfied by the acquisitions.
+        Fully consumed acquisitions have their remaining amount set to ZERO and are removed.
         """
+        consumed = []
+        remaining = amount
+        while len(self) != 0:
+            acquisition = self.peek()
+            if remaining < acquisition.remaining_amount:
+                acquisition.remaining_amount -= remaining
+                consumed.append((acquisition, remaining))
+                return consumed, ZERO
+
+            used_amount = acquisition.remaining_amount
+            remaining -= used_amount
+            acquisition.remaining_amount = ZERO
+            consumed.append((acquisition, used_amount))
+            self.pop()
+
+        return consumed, remaining
+
+    def snapshot(self) -> AcquisitionsSnapshot:
+        acquisitions = tuple(self)
+        return AcquisitionsSnapshot(
+            acquisitions=acquisitions,
+            remaining_amounts=tuple(x.remaining_amount for x in acquisitions),
+        )
+
+    def restore(self, snapshot: AcquisitionsSnapshot) -> None:
+        for acquisition, remaining_amount in zip(snapshot.acquisitions, snapshot.remaining_amounts):  # noqa: E501
+            acquisition.remaining_amount = remaining_amount
+        self.load(snapshot.acquisitions)
+
+
+class QueueAcquisitionsStore(BaseAcquisitionsStore):
+    """Acquisitions are consumed in the order they were added.
+
+    A head index is advanced instead of removing from the front of the list and the
+    consumed part of the list is dropped once it dominates the list's size.
+    """
+    COMPACT_THRESHOLD = 1024
+
+    def __init__(self) -> None:
+        self._acquisitions: list[AssetAcquisitionEvent] = []
+        self._head = 0
+
+    def add(self, acquisition: AssetAcquisitionEvent) -> None:
+        self._acquisitions.append(acquisition)
+
+    def peek(self) -> AssetAcquisitionEvent:
+        if self._head == len(self._acquisitions):
+            raise IndexError('No acquisitions to consume')
+        return self._acquisitions[self._head]
+
+    def pop(self) -> None:
+        if self._head == len(self._acquisitions):
+            raise IndexError('No acquisitions to consume')
+        self._head += 1
+        if self._head == len(self._acquisitions):
+            self._acquisitions = []
+            self._head = 0
+        elif self._head >= self.COMPACT_THRESHOLD and self._head * 2 >= len(self._acquisitions):
+            del self._acquisitions[:self._head]
+            self._head = 0
+
+    def __iter__(self) -> Iterator[AssetAcquisitionEvent]:
+        return itertools.islice(self._acquisitions, self._head, None)
+
+    def __len__(self) -> int:
+        return len(self._acquisitions) - self._head
+
+    def load(self, acquisitions: tuple[AssetAcquisitionEvent, ...]) -> None:
+        self._acquisitions = list(acquisitions)
+        self._head = 0
+
+
+class StackAcquisitionsStore(BaseAcquisitionsStore):
+    """Acquisitions are consumed starting from the one added last"""
+
+    def __init__(self) -> None:
+        self._acquisitions: list[AssetAcquisitionEvent] = []
+
+    def add(self, acquisition: AssetAcquisitionEvent) -> None:
+        self._acquisitions.append(acquisition)
+
+    def peek(self) -> AssetAcquisitionEvent:
+        return self._acquisitions[-1]
+
+    def pop(self) -> None:
+        self._acquisitions.pop()
+
+    def __iter__(self) -> Iterator[AssetAcquisitionEvent]:
+        return reversed(self._acquisitions)
+
+    def __len__(self) -> int:
+        return len(self._acquisitions)
+
+    def load(self, acquisitions: tuple[AssetAcquisitionEvent, ...]) -> None:
+        self._acquisitions = list(reversed(acquisitions))
+
+
+class HighestRateAcquisitionsStore(BaseAcquisitionsStore):
+    """Acquisitions are consumed starting from the one with the highest rate.
+
+    The acquisitions are kept sorted in ascending consumption priority so that the next
+    one to be consumed is at the end of the list. Ties in rate are broken by consuming
+    the earliest acquisition first. The sort keys are kept in a parallel list so that
+    an insertion only needs O(log n) comparisons of cheap Decimal tuples.
+    """
+
+    def __init__(self) -> None:
+        self._acquisitions: list[AssetAcquisitionEvent] = []
+        self._keys: list[tuple[Decimal, int, int]] = []
+
+    @staticmethod
+    def _key(acquisition: AssetAcquisitionEvent) -> tuple[Decimal, int, int]:
+        return acquisition.rate.num, -acquisition.timestamp, -acquisition.index
+
+    def add(self, acquisition: AssetAcquisitionEvent) -> None:
+        key = self._key(acquisition)
+        idx = bisect.bisect_right(self._keys, key)
+        self._keys.insert(idx, key)
+        self._acquisitions.insert(idx, acquisition)
+
+    def peek(self) -> AssetAcquisitionEvent:
+        return self._acquisitions[-1]
+
+    def pop(self) -> None:
+        self._acquisitions.pop()
+        self._keys.pop()
+
+    def __iter__(self) -> Iterator[AssetAcquisitionEvent]:
+        return reversed(self._acquisitions)
+
+    def __len__(self) -> int:
+        return len(self._acquisitions)
 
-    def processing_iterator(self) -> Iterator[AssetAcquisitionEvent]:
+    def load(self, acquisitions: tuple[AssetAcquisitionEvent, ...]) -> None:
+        self._acquisitions = list(reversed(acquisitions))
+        self._keys = [self._key(x) for x in self._acquisitions]
+
+
+class BaseCostBasisMethod(metaclass=ABCMeta):
+    """The base class in which every other cost basis method inherits from.
+
+    Subclasses define the order in which acquisitions are consumed by choosing
+    the acquisitions store they use.
+    """
+    acquisitions_store_class: type[BaseAcquisitionsStore]
+
+    def __init__(self) -> None:
+        self._acquisitions = self.acquisitions_store_class()
+
+    def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
         """
-        Iteration method over acquisition events.
-        We can't return here Tuple of AssetAcquisitionEvents as we need to return
-        the first event each time but _acquisitions may be not modified between iterations.
+        Takes a new acquisition and inserts it in the acquisitions store which
+        determines the PnL order.
         """
-        while len(self._acquisitions_heap) > 0:
-            yield self._acquisitions_heap[0].acquisition_event
+        self._acquisitions.add(acquisition)
 
     def get_acquisitions(self) -> tuple[AssetAcquisitionEvent, ...]:
-        """Returns read-only _acquisitions"""
-        return tuple(entry.acquisition_event for entry in self._acquisitions_heap)
+        """Returns read-only _acquisitions in the order they are going to be consumed"""
+        return tuple(self._acquisitions)
 
-    def consume_result(self, used_amount: FVal) -> None:
-        """
-        This function should be used to consume results of the
-        currently processed event (received from __next__)
-        The current event's remaining_amount will be decreased by used_amount
-        If event's remaining_amount will become ZERO, the event will be deleted
-        May raise:
-        - IndexError if the method was called when acquisitions were empty
+    def get_remaining_amount(self) -> FVal:
+        """Returns the sum of the remaining amount of all acquisitions"""
+        amount = ZERO
+        for acquisition_event in self._acquisitions:
+            amount += acquisition_event.remaining_amount
+        return amount
+
+    def consume_amount(self, amount: FVal) -> tuple[list[tuple[AssetAcquisitionEvent, FVal]], FVal]:  # noqa: E501
+        """Consumes `amount` across as many acquisitions as needed in one call.
+
+        Returns the acquisitions used with the amount used from each of them and
+        the part of `amount` for which no acquisitions were found.
         """
-        # this is a temporary assertion to test that new accounting tools work properly.
-        # Written on 06.06.2022 and can be removed after a couple of months if everything goes well
-        assert ZERO <= used_amount <= self._acquisitions_heap[0].acquisition_event.remaining_amount, f'Used amount must be in the interval [0, {self._acquisitions_heap[0].acquisition_event.remaining_amount}] but it was {used_amount}'  # noqa: E501
+        return self._acquisitions.consume(amount)
 
-        self._acquisitions_heap[0].acquisition_event.remaining_amount -= used_amount
-        if self._acquisitions_heap[0].acquisition_event.remaining_amount == ZERO:
-            heapq.heappop(self._acquisitions_heap)
+    def snapshot(self) -> 'CostBasisSnapshot':
+        """Returns a checkpoint of the acquisitions that can be given to `restore()`"""
+        return CostBasisSnapshot(acquisitions=self._acquisitions.snapshot())
+
+    def restore(self, snapshot: 'CostBasisSnapshot') -> None:
+        """Reverts the acquisitions to the state of a checkpoint taken with `snapshot()`"""
+        self._acquisitions.restore(snapshot.acquisitions)
 
     def calculate_spend_cost_basis(
             self,
@@ -184,79 +374,54 @@ class BaseCostBasisMethod(metaclass=ABCMeta):
         Returns the information in a CostBasisInfo object if enough acquisitions have
         been found.
         """  # noqa: E501
-        remaining_sold_amount = spending_amount
         taxfree_bought_cost = taxable_bought_cost = taxable_amount = taxfree_amount = ZERO
         matched_acquisitions = []
+        consumed, remaining_sold_amount = self.consume_amount(spending_amount)
 
-        for acquisition_event in self.processing_iterator():
+        for acquisition_event, used_amount in consumed:
             if settings.taxfree_after_period is None:
                 at_taxfree_period = False
             else:
                 at_taxfree_period = acquisition_event.timestamp + settings.taxfree_after_period < timestamp  # noqa: E501
 
-            if remaining_sold_amount < acquisition_event.remaining_amount:
-                acquisition_rate = acquisition_event.rate if average_cost_basis is None else average_cost_basis  # noqa: E501
-                acquisition_cost = acquisition_rate * remaining_sold_amount
-
-                taxable = True
-                if at_taxfree_period:
-                    taxfree_amount += remaining_sold_amount
-                    taxfree_bought_cost += acquisition_cost
-                    taxable = False
-                else:
-                    taxable_amount += remaining_sold_amount
-                    taxable_bought_cost += acquisition_cost
+            acquisition_rate = acquisition_event.rate if average_cost_basis is None else average_cost_basis  # noqa: E501
+            acquisition_cost = acquisition_rate * used_amount
+            taxable = True
+            if at_taxfree_period:
+                taxfree_amount += used_amount
+                taxfree_bought_cost += acquisition_cost
+                taxable = False
+            else:
+                taxable_amount += used_amount
+                taxable_bought_cost += acquisition_cost
 
+            if acquisition_event.remaining_amount == ZERO:
+                log.debug(
+                    'Spend uses up entire historical acquisition',
+                    tax_status='TAX-FREE' if at_taxfree_period else 'TAXABLE',
+                    bought_amount=used_amount,
+                    asset=spending_asset,
+                    acquisition_rate=acquisition_event.rate,
+                    profit_currency=settings.main_currency,
+                    time=timestamp_to_date(acquisition_event.timestamp),
+                )
+                used_acquisitions.append(acquisition_event)
+            else:
                 log.debug(
                     'Spend uses up part of historical acquisition',
                     tax_status='TAX-FREE' if at_taxfree_period else 'TAXABLE',
-                    used_amount=remaining_sold_amount,
+                    used_amount=used_amount,
                     from_amount=acquisition_event.amount,
                     asset=spending_asset,
                     acquisition_rate=acquisition_event.rate,
                     profit_currency=settings.main_currency,
                     time=timestamp_to_date(acquisition_event.timestamp),
                 )
-                matched_acquisitions.append(MatchedAcquisition(
-                    amount=remaining_sold_amount,
-                    event=acquisition_event,
-                    taxable=taxable,
-                ))
-                self.consume_result(remaining_sold_amount)
-                remaining_sold_amount = ZERO
-                # stop iterating since we found all acquisitions to satisfy this spend
-                break
-
-            remaining_sold_amount -= acquisition_event.remaining_amount
-            acquisition_rate = acquisition_event.rate if average_cost_basis is None else average_cost_basis  # noqa: E501
-            acquisition_cost = acquisition_rate * acquisition_event.remaining_amount
-            taxable = True
-            if at_taxfree_period:
-                taxfree_amount += acquisition_event.remaining_amount
-                taxfree_bought_cost += acquisition_cost
-                taxable = False
-            else:
-                taxable_amount += acquisition_event.remaining_amount
-                taxable_bought_cost += acquisition_cost
-
-            log.debug(
-                'Spend uses up entire historical acquisition',
-                tax_status='TAX-FREE' if at_taxfree_period else 'TAXABLE',
-                bought_amount=acquisition_event.remaining_amount,
-                asset=spending_asset,
-                acquisition_rate=acquisition_event.rate,
-                profit_currency=settings.main_currency,
-                time=timestamp_to_date(acquisition_event.timestamp),
-            )
             matched_acquisitions.append(MatchedAcquisition(
-                amount=acquisition_event.remaining_amount,
+                amount=used_amount,
                 event=acquisition_event,
                 taxable=taxable,
             ))
-            used_acquisitions.append(acquisition_event)
-            self.consume_result(acquisition_event.remaining_amount)
-            # and since this event is going to be removed, reduce its remaining to zero
-            acquisition_event.remaining_amount = ZERO
 
         is_complete = True
         if remaining_sold_amount != ZERO:
@@ -283,7 +448,7 @@ class BaseCostBasisMethod(metaclass=ABCMeta):
         )
 
     def __len__(self) -> int:
-        return len(self._acquisitions_heap)
+        return len(self._acquisitions)
 
 
 class FIFOCostBasisMethod(BaseCostBasisMethod):
@@ -291,14 +456,7 @@ class FIFOCostBasisMethod(BaseCostBasisMethod):
     Accounting in FIFO (first-in-first-out) method.
     https://www.investopedia.com/terms/f/fifo.asp
     """
-    def __init__(self) -> None:
-        super().__init__()
-        self._count = ZERO
-
-    def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
-        """Adds an acquisition to the `_acquisitions_heap` using a counter to achieve the FIFO order."""  # noqa: E501
-        heapq.heappush(self._acquisitions_heap, AssetAcquisitionHeapElement(self._count, acquisition))  # noqa: E501
-        self._count += 1
+    acquisitions_store_class = QueueAcquisitionsStore
 
 
 class LIFOCostBasisMethod(BaseCostBasisMethod):
@@ -306,14 +464,7 @@ class LIFOCostBasisMethod(BaseCostBasisMethod):
     Accounting in LIFO (last-in-first-out) method.
     https://www.investopedia.com/terms/l/lifo.asp
     """
-    def __init__(self) -> None:
-        super().__init__()
-        self._count = ZERO
-
-    def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
-        """Adds an acquisition to the `_acquisitions_heap` using a negated counter to achieve the LIFO order."""  # noqa: E501
-        heapq.heappush(self._acquisitions_heap, AssetAcquisitionHeapElement(-self._count, acquisition))  # noqa: E501
-        self._count += 1
+    acquisitions_store_class = StackAcquisitionsStore
 
 
 class HIFOCostBasisMethod(BaseCostBasisMethod):
@@ -321,12 +472,7 @@ class HIFOCostBasisMethod(BaseCostBasisMethod):
     Accounting in HIFO (highest-in-first-out) method.
     https://www.investopedia.com/terms/h/hifo.asp
     """
-    def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
-        """
-        Adds an acquisition to the `_acquisitions_heap` using the negated rate
-        of the acquisition to achieve the HIFO order.
-        """
-        heapq.heappush(self._acquisitions_heap, AssetAcquisitionHeapElement(-acquisition.rate, acquisition))  # noqa: E501
+    acquisitions_store_class = HighestRateAcquisitionsStore
 
 
 class AverageCostBasisMethod(BaseCostBasisMethod):
@@ -343,9 +489,10 @@ class AverageCostBasisMethod(BaseCostBasisMethod):
     For more details and explanations go here:
         https://github.com/rotki/rotki/issues/5561#issuecomment-1423338938
     """  # noqa: E501
+    acquisitions_store_class = QueueAcquisitionsStore
+
     def __init__(self) -> None:
         super().__init__()
-        self._count = ZERO
         # keeps track of the amount of the asset remaining after every acquisition or spend
         self.current_amount = ZERO
         # the current total cost basis of the asset
@@ -353,7 +500,7 @@ class AverageCostBasisMethod(BaseCostBasisMethod):
 
     def add_acquisition(self, acquisition: AssetAcquisitionEvent) -> None:
         """
-        Adds an acquisition to the `_acquisitions_heap` in order of time seen.
+        Adds an acquisition to the acquisitions store in order of time seen.
 
         It also calculates the average cost basis of that acquisition with respect to the
         previous average cost basis.
@@ -361,23 +508,32 @@ class AverageCostBasisMethod(BaseCostBasisMethod):
         The formula used to calculate the average cost basis of an acquisition is:
         [Previous Total ACB] + [Cost of New Shares] + [Transaction Costs]
         """
-        heapq.heappush(
-            self._acquisitions_heap,
-            AssetAcquisitionHeapElement(self._count, acquisition),
-        )
+        super().add_acquisition(acquisition)
         self.current_total_acb += acquisition.amount * acquisition.rate
         self.current_amount += acquisition.amount
-        self._count += 1
 
-    def consume_result(self, used_amount: FVal) -> None:
+    def consume_amount(self, amount: FVal) -> tuple[list[tuple[AssetAcquisitionEvent, FVal]], FVal]:  # noqa: E501
         """
-        Same as its parent function but also deducts `used_amount` from `current_amount`.
-        `current_amount` is guaranteed to be greater than zero since `consume_result` is
-        supposed to be called under `processing_iterator`.
+        Same as its parent function but also deducts the consumed amount from
+        `current_amount` and adjusts `current_total_acb` proportionally, once per call.
         """
-        self.current_total_acb *= (self.current_amount - used_amount) / self.current_amount
-        self.current_amount -= used_amount
-        super().consume_result(used_amount)
+        consumed, remaining = super().consume_amount(amount)
+        if len(consumed) != 0 and self.current_amount != ZERO:
+            used_amount = amount - remaining
+            self.current_total_acb *= (self.current_amount - used_amount) / self.current_amount
+            self.current_amount -= used_amount
+        return consumed, remaining
+
+    def snapshot(self) -> CostBasisSnapshot:
+        return super().snapshot()._replace(
+            current_amount=self.current_amount,
+            current_total_acb=self.current_total_acb,
+        )
+
+    def restore(self, snapshot: CostBasisSnapshot) -> None:
+        super().restore(snapshot)
+        self.current_amount = snapshot.current_amount
+        self.current_total_acb = snapshot.current_total_acb
 
     def calculate_spend_cost_basis(
             self,
@@ -418,7 +574,7 @@ class AverageCostBasisMethod(BaseCostBasisMethod):
             settings=settings,
             timestamp_to_date=timestamp_to_date,
             # Important note: calculation of the average cost basis of the current event has to
-            # happen before calling `consume_result`. For correct results `current_total_acb` and
+            # happen before calling `consume_amount`. For correct results `current_total_acb` and
             # `current_amount` have to be used before applying the effect of the event that is
             # being processed.
             average_cost_basis=self.current_total_acb / self.current_amount,
@@ -589,17 +745,7 @@ class CostBasisCalculator(CustomizableDateMixin):
         if len(asset_events.acquisitions_manager) == 0:
             return False
 
-        remaining_amount = amount
-        for acquisition_event in asset_events.acquisitions_manager.processing_iterator():
-            if remaining_amount < acquisition_event.remaining_amount:
-                asset_events.acquisitions_manager.consume_result(remaining_amount)
-                remaining_amount = ZERO
-                # stop iterating since we found all acquisitions to satisfy reduction
-                break
-
-            remaining_amount -= acquisition_event.remaining_amount
-            asset_events.acquisitions_manager.consume_result(acquisition_event.remaining_amount)
-
+        _, remaining_amount = asset_events.acquisitions_manager.consume_amount(amount)
         if remaining_amount != ZERO:
             if not asset.is_fiat():
                 self.missing_acquisitions.append(
@@ -704,7 +850,5 @@ class CostBasisCalculator(CustomizableDateMixin):
         """
         asset_events = self.get_events(asset)
 
-        amount = ZERO
-        for acquisition_event in asset_events.acquisitions_manager.get_acquisitions():
-            amount += acquisition_event.remaining_amount
+        amount = asset_events.acquisitions_manager.get_remaining_amount()
         return amount if amount != ZERO else None
@@ -1,10 +1,11 @@
 import json
 import logging
-from collections.abc import Collection
+from collections.abc import Collection, Iterable, Iterator
 from csv import DictWriter
+from io import TextIOWrapper
 from pathlib import Path
 from tempfile import mkdtemp
-from typing import TYPE_CHECKING, Any, Literal, Optional
+from typing import IO, TYPE_CHECKING, Any, Literal, Optional
 from zipfile import ZIP_DEFLATED, ZipFile
 
 from rotkehlchen.accounting.pnl import PnlTotals
@@ -51,30 +52,72 @@ class CSVWriteError(Exception):
     pass
 
 
+def _write_csv_rows(
+        f: IO[str],
+        first_row: dict[str, Any],
+        rows: Iterator[dict[str, Any]],
+        headers: Optional[Collection],
+        name: str,
+) -> None:
+    """Writes the header and then all the rows one by one in the given text stream
+
+    May raise:
+    - CSVWriteError if DictWriter.writerow() tried to write a dict contains
+    fields not in fieldnames
+    """
+    w = DictWriter(f, fieldnames=first_row.keys() if headers is None else headers)
+    w.writeheader()
+    try:
+        w.writerow(first_row)
+        for dic in rows:
+            w.writerow(dic)
+    except ValueError as e:
+        raise CSVWriteError(f'Failed to write {name} CSV due to {e!s}') from e
+
+
 def dict_to_csv_file(
         path: Path,
-        dictionary_list: list,
+        dictionary_list: Iterable[dict[str, Any]],
         headers: Optional[Collection] = None,
 ) -> None:
-    """Takes a filepath and a list of dictionaries representing the rows and writes them
-    into the file as a CSV
+    """Takes a filepath and an iterable of dictionaries representing the rows and writes
+    them into the file as a CSV. The rows are written as they are produced so a generator
+    can be given to avoid keeping all of them in memory.
 
     May raise:
     - CSVWriteError if DictWriter.writerow() tried to write a dict contains
     fields not in fieldnames
     """
-    if len(dictionary_list) == 0:
+    rows = iter(dictionary_list)
+    if (first_row := next(rows, None)) is None:
         log.debug(f'Skipping writting empty CSV for {path}')
         return
 
     with open(path, 'w', newline='', encoding='utf-8') as f:
-        w = DictWriter(f, fieldnames=dictionary_list[0].keys() if headers is None else headers)
-        w.writeheader()
-        try:
-            for dic in dictionary_list:
-                w.writerow(dic)
-        except ValueError as e:
-            raise CSVWriteError(f'Failed to write {path} CSV due to {e!s}') from e
+        _write_csv_rows(f=f, first_row=first_row, rows=rows, headers=headers, name=str(path))
+
+
+def dict_to_csv_in_zip(
+        archive: ZipFile,
+        filename: str,
+        dictionary_list: Iterable[dict[str, Any]],
+        headers: Optional[Collection] = None,
+) -> None:
+    """Same as dict_to_csv_file but writes the CSV as the `filename` entry of the given
+    zip archive. The rows are compressed and written to disk as they are produced
+    so neither the CSV data nor an intermediate CSV file are kept around.
+
+    May raise:
+    - CSVWriteError if DictWriter.writerow() tried to write a dict contains
+    fields not in fieldnames
+    """
+    rows = iter(dictionary_list)
+    if (first_row := next(rows, None)) is None:
+        log.debug(f'Skipping writting empty CSV for {filename} in {archive.filename}')
+        return
+
+    with archive.open(filename, mode='w') as zip_entry, TextIOWrapper(zip_entry, encoding='utf-8', newline='') as f:  # noqa: E501
+        _write_csv_rows(f=f, first_row=first_row, rows=rows, headers=headers, name=filename)
 
 
 class CSVExporter(CustomizableDateMixin):
@@ -193,13 +236,13 @@ class CSVExporter(CustomizableDateMixin):
 
         dict_event[f'cost_basis_{name}'] = cost_basis
 
-    def _maybe_add_summary(self, events: list[dict[str, Any]], pnls: PnlTotals) -> None:
-        """Depending on given settings, adds a few summary lines at the end of
-        the all events PnL report"""
+    def _summary_entries(self, length: int, pnls: PnlTotals) -> Iterator[dict[str, Any]]:
+        """Depending on given settings, yields a few summary lines to be written at the
+        end of the all events PnL report. `length` is the number of rows before the
+        summary including the title row"""
         if self.settings.pnl_csv_have_summary is False:
             return
 
-        length = len(events) + 1
         template: dict[str, Any] = {
             'type': '',
             'notes': '',
@@ -214,13 +257,13 @@ class CSVExporter(CustomizableDateMixin):
             'pnl_free': '',
             'cost_basis_free': '',
         }
-        events.append(template)  # separate with 2 new lines
-        events.append(template)
+        yield template  # separate with 2 new lines
+        yield template
 
         entry = template.copy()
         entry['taxable_amount'] = 'TAXABLE'
         entry['price'] = 'FREE'
-        events.append(entry)
+        yield entry
 
         start_sums_index = length + 4
         sums = 0
@@ -242,7 +285,7 @@ class CSVExporter(CustomizableDateMixin):
                 sum_range=f'J2:J{length}',
                 actual_value=value.free,
             )
-            events.append(entry)
+            yield entry
 
         entry = template.copy()
         entry['free_amount'] = 'TOTAL'
@@ -251,22 +294,33 @@ class CSVExporter(CustomizableDateMixin):
             entry['price'] = f'=SUM(H{start_sums_index}:H{start_sums_index + sums - 1})'
         else:
             entry['taxable_amount'] = entry['price'] = 0
-        events.append(entry)
+        yield entry
 
-        events.append(template)  # separate with 2 new lines
-        events.append(template)
+        yield template  # separate with 2 new lines
+        yield template
 
         version_result = get_current_version()
         entry = template.copy()
         entry['free_amount'] = 'rotki version'
         entry['taxable_amount'] = version_result.our_version
-        events.append(entry)
+        yield entry
 
         for setting in ACCOUNTING_SETTINGS:
             entry = template.copy()
             entry['free_amount'] = setting
             entry['taxable_amount'] = str(getattr(self.settings, setting))
-            events.append(entry)
+            yield entry
+
+    def _csv_entries(
+            self,
+            events: list['ProcessedAccountingEvent'],
+            pnls: PnlTotals,
+    ) -> Iterator[dict[str, Any]]:
+        """Lazily yields all the rows of the all events CSV so that they can be
+        written as they are created"""
+        for event in events:
+            yield self.to_csv_entry(event)
+        yield from self._summary_entries(length=len(events) + 1, pnls=pnls)
 
     def create_zip(
             self,
@@ -274,29 +328,18 @@ class CSVExporter(CustomizableDateMixin):
             pnls: PnlTotals,
     ) -> tuple[bool, str]:
         # TODO: Find a way to properly delete the directory after send is complete
-        dirpath = Path(mkdtemp())
-        success, msg = self.export(events=events, pnls=pnls, directory=dirpath)
-        if not success:
-            return False, msg
-
-        files: list[tuple[Path, str]] = [
-            (dirpath / FILENAME_ALL_CSV, FILENAME_ALL_CSV),
-        ]
-        with ZipFile(file=dirpath / 'csv.zip', mode='w', compression=ZIP_DEFLATED) as csv_zip:
-            for path, filename in files:
-                if not path.exists():
-                    continue
-
-                csv_zip.write(path, filename)
-                path.unlink()
-
-        success = False
-        filename = ''
-        if csv_zip.filename is not None:
-            success = True
-            filename = csv_zip.filename
-
-        return success, filename
+        zip_path = Path(mkdtemp()) / 'csv.zip'
+        try:
+            with ZipFile(file=zip_path, mode='w', compression=ZIP_DEFLATED) as csv_zip:
+                dict_to_csv_in_zip(
+                    archive=csv_zip,
+                    filename=FILENAME_ALL_CSV,
+                    dictionary_list=self._csv_entries(events=events, pnls=pnls),
+                )
+        except (CSVWriteError, PermissionError) as e:
+            return False, str(e)
+
+        return True, str(zip_path)
 
     def to_csv_entry(self, event: 'ProcessedAccountingEvent') -> dict[str, Any]:
         """Prepare the provided event to have a common format for the accounting
@@ -328,13 +371,11 @@ class CSVExporter(CustomizableDateMixin):
             pnls: PnlTotals,
             directory: Path,
     ) -> tuple[bool, str]:
-        serialized_events = [self.to_csv_entry(x) for idx, x in enumerate(events)]
-        self._maybe_add_summary(events=serialized_events, pnls=pnls)
         try:
             directory.mkdir(parents=True, exist_ok=True)
             dict_to_csv_file(
                 directory / FILENAME_ALL_CSV,
-                serialized_events,
+                self._csv_entries(events=events, pnls=pnls),
             )
         except (CSVWriteError, PermissionError) as e:
             return False, str(e)
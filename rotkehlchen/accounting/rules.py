@@ -1,3 +1,6 @@
+import dataclasses
+import logging
+from collections import defaultdict
 from typing import TYPE_CHECKING, Optional
 
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry, get_event_type_identifier
@@ -6,11 +9,19 @@ from rotkehlchen.accounting.structures.types import HistoryEventSubType, History
 from rotkehlchen.chain.evm.accounting.structures import BaseEventSettings, TxAccountingTreatment
 from rotkehlchen.chain.evm.decoding.constants import CPT_GAS
 from rotkehlchen.db.constants import NO_ACCOUNTING_COUNTERPARTY
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
     from rotkehlchen.chain.evm.accounting.aggregator import EVMAccountingAggregators
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.settings import DBSettings
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+EVENT_TYPES_NUM = len(HistoryEventType)
+EVENT_SUBTYPES_NUM = len(HistoryEventSubType)
 
 
 def make_default_accounting_settings(pot: 'AccountingPot') -> dict[int, BaseEventSettings]:
@@ -106,7 +117,13 @@ def make_default_accounting_settings(pot: 'AccountingPot') -> dict[int, BaseEven
 
 
 class AccountingRulesManager:
-    """Handle the query of accounting rules for history events"""
+    """Handle the query of accounting rules for history events
+
+    The rules are compiled into a flat lookup table keyed by an integer computed from the
+    event type, subtype and an id assigned to each counterparty. Each combination is
+    resolved against `event_settings` once and then served from the table. The compiled
+    rules are kept across reports until either the pot settings or the rules in the DB change.
+    """
 
     def __init__(
             self,
@@ -118,6 +135,11 @@ class AccountingRulesManager:
         self.aggregators = evm_aggregators
         self.pot = pot
         self.event_settings: dict[int, BaseEventSettings] = {}
+        self._lookup_table: dict[int, Optional[BaseEventSettings]] = {}
+        self._counterparty_ids: dict[Optional[str], int] = {None: 0}
+        self._compiled_for: Optional[tuple['DBSettings', int]] = None
+        # how many times each entry of the lookup table was used. Only for profiling
+        self.lookups_per_rule: defaultdict[int, int] = defaultdict(int)
 
     def _query_db_rules(self) -> None:
         """Query the accounting rules in the db and update event_settings with them"""
@@ -135,25 +157,76 @@ class AccountingRulesManager:
                 )
                 self.event_settings[key] = rule
 
-    def get_event_settings(self, event: HistoryBaseEntry) -> Optional[BaseEventSettings]:
-        """Return a matching rule for the event if it exists"""
+    def _lookup_key(
+            self,
+            event_type: HistoryEventType,
+            event_subtype: HistoryEventSubType,
+            counterparty: Optional[str],
+    ) -> int:
+        """Get the key of the lookup table for the given combination"""
+        if (counterparty_id := self._counterparty_ids.get(counterparty)) is None:
+            counterparty_id = self._counterparty_ids[counterparty] = len(self._counterparty_ids)
+
+        return (counterparty_id * EVENT_TYPES_NUM + event_type.value) * EVENT_SUBTYPES_NUM + event_subtype.value  # noqa: E501
+
+    def _resolve_event_settings(self, event: HistoryBaseEntry) -> Optional[BaseEventSettings]:
+        """Find the rule for the event in event_settings. A rule for the counterparty
+        of an evm event takes precedence over the generic one for its type and subtype"""
         rule = self.event_settings.get(event.get_type_identifier(), None)
         if isinstance(event, EvmEvent) is False or rule is not None:
             return rule
 
         return self.event_settings.get(event.get_type_identifier(include_counterparty=False), None)
 
+    def get_event_settings(self, event: HistoryBaseEntry) -> Optional[BaseEventSettings]:
+        """Return a matching rule for the event if it exists"""
+        key = self._lookup_key(
+            event_type=event.event_type,
+            event_subtype=event.event_subtype,
+            counterparty=event.counterparty if isinstance(event, EvmEvent) else None,
+        )
+        self.lookups_per_rule[key] += 1
+        try:
+            return self._lookup_table[key]
+        except KeyError:
+            rule = self._lookup_table[key] = self._resolve_event_settings(event)
+            return rule
+
+    def get_lookup_stats(self) -> dict[tuple[str, str, Optional[str]], int]:
+        """Return the number of lookups per (type, subtype, counterparty) since the last
+        time the rules were cleaned"""
+        counterparties = {v: k for k, v in self._counterparty_ids.items()}
+        stats = {}
+        for key, count in self.lookups_per_rule.items():
+            rest, subtype_value = divmod(key, EVENT_SUBTYPES_NUM)
+            counterparty_id, type_value = divmod(rest, EVENT_TYPES_NUM)
+            stats[(
+                HistoryEventType(type_value).serialize(),
+                HistoryEventSubType(subtype_value).serialize(),
+                counterparties[counterparty_id],
+            )] = count
+
+        return stats
+
     def reset(self) -> None:
         self.aggregators.reset()
+        compile_key = (self.pot.settings, self.database.accounting_rules_version)
+        if self._compiled_for == compile_key and len(self.event_settings) != 0:
+            return  # nothing changed since the rules were last compiled
+
         self.event_settings = (  # Using | operator is fine since keys are unique
             self.aggregators.get_accounting_settings(self.pot) |
             make_default_accounting_settings(self.pot)
         )
         self._query_db_rules()
+        self._lookup_table = {}
+        self._compiled_for = (dataclasses.replace(self.pot.settings), self.database.accounting_rules_version)  # noqa: E501
 
     def clean_rules(self) -> None:
         """
-        Remove the rules from memory. Should be done after finishing with the accounting process
-        to avoid having many dynamic objects in memory since the rules come from the database
+        Should be done after finishing with the accounting process. Logs how many times
+        each rule was looked up and resets the counters. The compiled rules are kept in
+        memory so that the next report does not need to compile them again.
         """
-        self.event_settings.clear()
+        log.debug(f'Accounting rule lookups per (type, subtype, counterparty): {self.get_lookup_stats()}')  # noqa: E501
+        self.lookups_per_rule.clear()
@@ -4,9 +4,10 @@ import logging
 import os
 import sys
 import tempfile
+import time
 import traceback
 from collections import defaultdict
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from functools import reduce
 from http import HTTPStatus
 from pathlib import Path
@@ -45,6 +46,7 @@ from rotkehlchen.accounting.structures.types import (
     HistoryEventSubType,
     HistoryEventType,
 )
+from rotkehlchen.api.tasks import APITaskRegistry
 from rotkehlchen.api.v1.schemas import TradeSchema
 from rotkehlchen.api.v1.types import (
     EvmPendingTransactionDecodingApiData,
@@ -136,7 +138,7 @@ from rotkehlchen.db.filtering import (
     TradesFilterQuery,
     UserNotesFilterQuery,
 )
-from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.history_events import DBHistoryEvents, materialize_history_event_rows
 from rotkehlchen.db.queried_addresses import QueriedAddresses
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.search_assets import search_assets_levenshtein
@@ -190,7 +192,11 @@ from rotkehlchen.inquirer import CurrentPriceOracle, Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.rotkehlchen import Rotkehlchen
-from rotkehlchen.serialization.serialize import process_result, process_result_list
+from rotkehlchen.serialization.serialize import (
+    jsonify_result,
+    process_result,
+    process_result_list,
+)
 from rotkehlchen.tasks.utils import query_missing_prices_of_base_entries
 from rotkehlchen.types import (
     AVAILABLE_MODULES_MAP,
@@ -239,13 +245,15 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.evm.manager import EvmManager
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.data_structures import KrakenAccountType
 
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 OK_RESULT = {'result': True, 'message': ''}
+# How many entries of a streamed response are serialized and sent together
+STREAMED_ENTRIES_CHUNK_SIZE = 500
 
 
 def _wrap_in_ok_result(result: Any) -> dict[str, Any]:
@@ -269,11 +277,17 @@ def api_response(
         status_code: HTTPStatus = HTTPStatus.OK,
         log_result: bool = True,
 ) -> Response:
+    """Serializes the result once and creates the response
+
+    The serialization time and whether the result should be logged are passed
+    to the after request callback via fake headers that it pops.
+    """
+    start = time.perf_counter()
     if status_code == HTTPStatus.NO_CONTENT:
         assert not result, 'Provided 204 response with non-zero length response'
         data = ''
     else:
-        data = json.dumps(result)
+        data = jsonify_result(result)
 
     response = make_response(
         (
@@ -282,12 +296,54 @@ def api_response(
             {
                 'mimetype': 'application/json',
                 'Content-Type': 'application/json',
-                'rotki-log-result': log_result,  # popped by after request callback
+                # popped by after request callback
+                'rotki-log-result': log_result,
+                'rotki-serialization-ms': f'{(time.perf_counter() - start) * 1000:.3f}',
             }),
     )
     return response
 
 
+def api_response_stream(
+        result: dict[str, Any],
+        entries: Iterator[Any],
+) -> Response:
+    """Creates an ok response whose result contains the given keys and an
+    `entries` list that is serialized lazily from the given iterator, so that the
+    response is streamed in chunks while the entries are being serialized.
+
+    The iterator is consumed after the view returns, so it must not depend on any
+    open DB cursor. If it fails midway the entries sent so far are kept and the
+    error is given in the message, so that the body is always valid json.
+
+    Since the body is sent as it is produced, the result is never logged.
+    """
+    def generate() -> Iterator[str]:
+        head = jsonify_result(result)  # {"key": value, ...} without the closing brace
+        yield f'{{"result": {head[:-1]}{", " if len(result) != 0 else ""}"entries": ['
+        separator, chunk, message = '', [], ''
+        try:
+            for entry in entries:
+                chunk.append(jsonify_result(entry))
+                if len(chunk) == STREAMED_ENTRIES_CHUNK_SIZE:
+                    yield separator + ', '.join(chunk)
+                    separator, chunk = ', ', []
+        except Exception as e:  # pylint: disable=broad-except  # the body has to be closed
+            log.error(f'Failed to stream the entries of a response due to {e!s}')
+            message = f'Not all entries could be returned due to {e!s}'
+
+        if len(chunk) != 0:
+            yield separator + ', '.join(chunk)
+        yield f']}}, "message": {json.dumps(message)}}}'
+
+    return Response(
+        generate(),
+        status=HTTPStatus.OK,
+        mimetype='application/json',
+        headers={'rotki-log-result': False},  # popped by after request callback
+    )
+
+
 def make_response_from_dict(response_data: dict[str, Any]) -> Response:
     result = response_data.get('result')
     message = response_data.get('message', '')
@@ -346,22 +402,16 @@ class RestAPI:
         mainloop_greenlet.link_exception(self._handle_killed_greenlets)
         # Greenlets that will be waited for when we shutdown (just main loop)
         self.waited_greenlets = [mainloop_greenlet]
-        self.task_lock = Semaphore()
         self.login_lock = Semaphore()
-        self.task_id = 0
-        self.task_results: dict[int, Any] = {}
+        self.tasks = APITaskRegistry(
+            greenlets=self.rotkehlchen.api_task_greenlets,
+            msg_aggregator=self.rotkehlchen.msg_aggregator,
+        )
         self.trade_schema = TradeSchema()
 
     # - Private functions not exposed to the API
-    def _new_task_id(self) -> int:
-        with self.task_lock:
-            task_id = self.task_id
-            self.task_id += 1
-        return task_id
-
     def _write_task_result(self, task_id: int, result: Any) -> None:
-        with self.task_lock:
-            self.task_results[task_id] = result
+        self.tasks.complete(task_id, result)
 
     def _handle_killed_greenlets(self, greenlet: gevent.Greenlet) -> None:
         if not greenlet.exception:
@@ -404,7 +454,7 @@ class RestAPI:
         self._write_task_result(task_id, result)
 
     def _query_async(self, command: Callable, **kwargs: Any) -> Response:
-        task_id = self._new_task_id()
+        task_id = self.tasks.new_task_id()
         greenlet = gevent.spawn(
             self._do_query_async,
             command,
@@ -413,7 +463,7 @@ class RestAPI:
         )
         greenlet.task_id = task_id
         greenlet.link_exception(self._handle_killed_greenlets)
-        self.rotkehlchen.api_task_greenlets.append(greenlet)
+        self.tasks.add(task_id=task_id, greenlet=greenlet, command=command.__name__)
         return api_response(_wrap_in_ok_result({'task_id': task_id}), status_code=HTTPStatus.OK)
 
     # - Public functions not exposed via the rest api
@@ -446,49 +496,37 @@ class RestAPI:
     def query_tasks_outcome(self, task_id: Optional[int]) -> Response:
         if task_id is None:
             # If no task id is given return list of all pending and completed tasks
-            completed = []
-            pending = []
-            for greenlet in self.rotkehlchen.api_task_greenlets:
-                task_id = greenlet.task_id
-                if task_id in self.task_results:
-                    completed.append(task_id)
-                else:
-                    pending.append(task_id)
-
+            pending, completed = self.tasks.pending_and_completed()
             result = _wrap_in_ok_result({'pending': pending, 'completed': completed})
             return api_response(result=result, status_code=HTTPStatus.OK)
 
-        with self.task_lock:
-            for idx, greenlet in enumerate(self.rotkehlchen.api_task_greenlets):
-                if greenlet.task_id == task_id:
-                    if task_id in self.task_results:
-                        # Task has completed and we just got the outcome
-                        function_response = self.task_results.pop(int(task_id), None)
-                        # The result of the original request
-                        result = function_response['result']
-                        # The message of the original request
-                        message = function_response['message']
-                        status_code = function_response.get('status_code')
-                        ret = {'result': result, 'message': message}
-                        returned_task_result = {
-                            'status': 'completed',
-                            'outcome': process_result(ret),
-                        }
-                        if status_code:
-                            returned_task_result['status_code'] = status_code
-                        result_dict = {
-                            'result': returned_task_result,
-                            'message': '',
-                        }
-                        # Also remove the greenlet from the api tasks
-                        self.rotkehlchen.api_task_greenlets.pop(idx)
-                        return api_response(result=result_dict, status_code=HTTPStatus.OK)
-                    # else task is still pending and the greenlet is running
-                    result_dict = {
-                        'result': {'status': 'pending', 'outcome': None},
-                        'message': f'The task with id {task_id} is still pending',
-                    }
-                    return api_response(result=result_dict, status_code=HTTPStatus.OK)
+        if (function_response := self.tasks.pop_result(task_id)) is not None:
+            # Task has completed and we just got the outcome
+            # The result of the original request
+            result = function_response['result']
+            # The message of the original request
+            message = function_response['message']
+            status_code = function_response.get('status_code')
+            ret = {'result': result, 'message': message}
+            returned_task_result = {
+                'status': 'completed',
+                'outcome': process_result(ret),
+            }
+            if status_code:
+                returned_task_result['status_code'] = status_code
+            result_dict = {
+                'result': returned_task_result,
+                'message': '',
+            }
+            return api_response(result=result_dict, status_code=HTTPStatus.OK)
+
+        if self.tasks.get(task_id) is not None:
+            # else task is still pending and the greenlet is running
+            result_dict = {
+                'result': {'status': 'pending', 'outcome': None},
+                'message': f'The task with id {task_id} is still pending',
+            }
+            return api_response(result=result_dict, status_code=HTTPStatus.OK)
 
         # The task has not been found
         result_dict = {
@@ -497,17 +535,28 @@ class RestAPI:
         }
         return api_response(result=result_dict, status_code=HTTPStatus.NOT_FOUND)
 
+    def cancel_task(self, task_id: int) -> Response:
+        if self.tasks.cancel(task_id) is False:
+            return api_response(
+                wrap_in_fail_result(f'No task with id {task_id} found'),
+                status_code=HTTPStatus.NOT_FOUND,
+            )
+
+        return api_response(OK_RESULT, status_code=HTTPStatus.OK)
+
     @async_api_call()
     def get_exchange_rates(self, given_currencies: list[AssetWithOracles]) -> dict[str, Any]:
         currencies = given_currencies
         fiat_currencies: list[FiatAsset] = []
+        crypto_currencies: list[AssetWithOracles] = []
         asset_rates = {}
         for asset in currencies:
             if asset.is_fiat():
                 fiat_currencies.append(asset.resolve_to_fiat_asset())
-                continue
+            else:
+                crypto_currencies.append(asset)
 
-            usd_price = Inquirer().find_usd_price(asset)
+        for asset, usd_price in Inquirer().find_usd_prices(crypto_currencies).items():
             if usd_price == ZERO_PRICE:
                 asset_rates[asset] = ZERO_PRICE
             else:
@@ -1166,9 +1215,7 @@ class RestAPI:
         #    All results would be discarded anyway since we are logging out.
         # 2. Have an intricate stop() notification system for each greenlet, but
         #   that is going to get complicated fast.
-        gevent.killall(self.rotkehlchen.api_task_greenlets)
-        with self.task_lock:
-            self.task_results = {}
+        self.tasks.clear()
         self.rotkehlchen.logout()
         result_dict['result'] = True
         return api_response(result_dict, status_code=HTTPStatus.OK)
@@ -1413,7 +1460,7 @@ class RestAPI:
             return api_response(_wrap_in_ok_result(OK_RESULT), status_code=HTTPStatus.OK)
         return api_response(wrap_in_fail_result(msg), status_code=HTTPStatus.CONFLICT)
 
-    def query_netvalue_data(self, include_nfts: bool) -> Response:
+    def query_netvalue_data(self, include_nfts: bool, resolution: Optional[int]) -> Response:
         from_ts = Timestamp(0)
         premium = self.rotkehlchen.premium
 
@@ -1422,10 +1469,13 @@ class RestAPI:
             start_of_day_today = datetime.datetime(today.year, today.month, today.day, tzinfo=datetime.timezone.utc)  # noqa: E501
             from_ts = Timestamp(int((start_of_day_today - datetime.timedelta(days=14)).timestamp()))  # noqa: E501
 
-        data = self.rotkehlchen.data.db.get_netvalue_data(from_ts, include_nfts)
-        result = process_result({'times': data[0], 'data': data[1]})
+        data = self.rotkehlchen.data.db.get_netvalue_data(
+            from_ts=from_ts,
+            include_nfts=include_nfts,
+            resolution=resolution,
+        )
         return api_response(
-            result=_wrap_in_ok_result(result),
+            result=_wrap_in_ok_result({'times': data[0], 'data': data[1]}),
             status_code=HTTPStatus.OK,
             log_result=False,
         )
@@ -1436,6 +1486,7 @@ class RestAPI:
             collection_id: Optional[int],
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            resolution: Optional[int],
     ) -> Response:
 
         with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
@@ -1447,6 +1498,7 @@ class RestAPI:
                     to_ts=to_timestamp,
                     asset=asset,
                     balance_type=BalanceType.ASSET,
+                    resolution=resolution,
                 )
             else:  # marshmallow check guarantees collection_id exists
                 data = self.rotkehlchen.data.db.query_collection_timed_balances(
@@ -1454,11 +1506,11 @@ class RestAPI:
                     collection_id=collection_id,  # type: ignore  # collection_id exists here
                     from_ts=from_timestamp,
                     to_ts=to_timestamp,
+                    resolution=resolution,
                 )
 
-        result = process_result_list(data)
-        return api_response(
-            result=_wrap_in_ok_result(result),
+        return api_response(  # the balances are serialized by the encoder hook
+            result=_wrap_in_ok_result(data),
             status_code=HTTPStatus.OK,
             log_result=False,
         )
@@ -1535,7 +1587,7 @@ class RestAPI:
             settings = self.rotkehlchen.get_settings(cursor)
             ignored_ids = self.rotkehlchen.data.db.get_ignored_action_ids(cursor, None)
         debug_info = {
-            'events': [entry.serialize_for_debug_import() for entry in events],
+            'events': [entry.serialize_for_debug_import() for entry in materialize_history_event_rows(iter(events))],  # noqa: E501
             'settings': settings.serialize(),
             'ignored_events_ids': {k.serialize(): list(v) for k, v in ignored_ids.items()},
             'pnl_settings': {
@@ -3369,23 +3421,21 @@ class RestAPI:
             entries_limit = FREE_PNL_EVENTS_LIMIT
         dbreports = DBAccountingReports(self.rotkehlchen.data.db)
         try:
-            report_data, entries_found = dbreports.get_report_data(
+            report_data, entries_found = dbreports.iterate_report_data(
                 filter_=filter_query,
                 with_limit=with_limit,
             )
         except InputError as e:
             return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.BAD_REQUEST)
 
-        result = {
-            'entries': [x.to_exported_dict(
-                ts_converter=self.rotkehlchen.accountant.pots[0].timestamp_to_date,
+        ts_converter = self.rotkehlchen.accountant.pots[0].timestamp_to_date
+        return api_response_stream(
+            result={'entries_found': entries_found, 'entries_limit': entries_limit},
+            entries=(x.to_exported_dict(
+                ts_converter=ts_converter,
                 export_type=AccountingEventExportType.API,
-            ) for x in report_data],
-            'entries_found': entries_found,
-            'entries_limit': entries_limit,
-        }
-        result_dict = _wrap_in_result(result, '')
-        return api_response(result_dict, status_code=HTTPStatus.OK)
+            ) for x in report_data),
+        )
 
     def get_associated_locations(self) -> Response:
         locations = self.rotkehlchen.data.db.get_associated_locations()
@@ -3441,10 +3491,9 @@ class RestAPI:
             entries_limit = - 1
 
         with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
-            events_result, entries_found, entries_with_limit = dbevents.get_history_events_and_limit_info(  # noqa: E501
+            entries_found, entries_with_limit = dbevents.get_history_events_count(
                 cursor=cursor,
-                filter_query=filter_query,
-                has_premium=has_premium,
+                query_filter=filter_query,
                 group_by_event_ids=group_by_event_ids,
                 entries_limit=entries_limit if entries_limit != -1 else None,
             )
@@ -3465,26 +3514,32 @@ class RestAPI:
                 cursor=cursor,
                 action_type=ActionType.HISTORY_EVENT,
             )
+            # the rows are read now and only deserialized while the response is streamed
+            events = dbevents.iterate_history_events(
+                cursor=cursor,
+                filter_query=filter_query,
+                has_premium=has_premium,
+                group_by_event_ids=group_by_event_ids,
+            )
+
+        def serialize_entries() -> Iterator[dict[str, Any]]:
+            for entry in events:
+                if group_by_event_ids is True:
+                    grouped_events_num, event = entry  # type: ignore  # is a tuple when grouping
+                    yield event.serialize_for_api(  # type: ignore  # mypy doesnt understand significance of boolean check
+                        customized_event_ids=customized_event_ids,
+                        ignored_ids_mapping=ignored_ids_mapping,
+                        hidden_event_ids=hidden_event_ids,
+                        grouped_events_num=grouped_events_num,
+                    )
+                else:
+                    yield entry.serialize_for_api(  # type: ignore  # is an event when not grouping
+                        customized_event_ids=customized_event_ids,
+                        ignored_ids_mapping=ignored_ids_mapping,
+                        hidden_event_ids=hidden_event_ids,
+                    )
 
-        if group_by_event_ids is True:
-            entries = [  # type: ignore  # mypy doesnt understand significance of boolean check
-                x.serialize_for_api(
-                    customized_event_ids=customized_event_ids,
-                    ignored_ids_mapping=ignored_ids_mapping,
-                    hidden_event_ids=hidden_event_ids,
-                    grouped_events_num=grouped_events_num,
-                ) for grouped_events_num, x in events_result
-            ]
-        else:
-            entries = [
-                x.serialize_for_api(  # type: ignore
-                    customized_event_ids=customized_event_ids,
-                    ignored_ids_mapping=ignored_ids_mapping,
-                    hidden_event_ids=hidden_event_ids,
-                ) for x in events_result
-            ]
         result = {
-            'entries': entries,
             'entries_found': entries_with_limit,
             'entries_limit': entries_limit,
             'entries_total': entries_total,
@@ -3492,7 +3547,7 @@ class RestAPI:
         if has_premium is False:
             result['entries_found_total'] = entries_found
 
-        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+        return api_response_stream(result=result, entries=serialize_entries())
 
     @async_api_call()
     def query_kraken_staking_events(
@@ -3812,6 +3867,7 @@ class RestAPI:
             only_cache: bool,
             addresses: Optional[Sequence[ChecksumEvmAddress]],
             blockchain: SUPPORTED_EVM_CHAINS,
+            full_detection: bool,
     ) -> dict[str, Any]:
         manager: EvmManager = self.rotkehlchen.chains_aggregator.get_chain_manager(blockchain)
         if addresses is None:
@@ -3821,6 +3877,7 @@ class RestAPI:
             account_tokens_info = manager.tokens.detect_tokens(
                 only_cache=only_cache,
                 addresses=addresses,
+                full_detection=full_detection,
             )
         except (RemoteError, BadFunctionCallOutput) as e:
             return wrap_in_fail_result(message=str(e), status_code=HTTPStatus.CONFLICT)
@@ -3837,6 +3894,34 @@ class RestAPI:
             'status_code': HTTPStatus.OK,
         }
 
+    @async_api_call()
+    def query_evm_balances_at_block(
+            self,
+            blockchain: SUPPORTED_EVM_CHAINS,
+            addresses: Optional[Sequence[ChecksumEvmAddress]],
+            block_number: int,
+    ) -> dict[str, Any]:
+        manager: EvmManager = self.rotkehlchen.chains_aggregator.get_chain_manager(blockchain)
+        if addresses is None:
+            addresses = self.rotkehlchen.chains_aggregator.accounts.get(blockchain)
+
+        try:
+            balances = manager.tokens.query_balances_at_block(
+                addresses=addresses,
+                block_number=block_number,
+            )
+        except (RemoteError, BadFunctionCallOutput) as e:
+            return wrap_in_fail_result(message=str(e), status_code=HTTPStatus.CONFLICT)
+
+        return {
+            'result': {
+                account: {asset.identifier: str(amount) for asset, amount in account_balances.items()}  # noqa: E501
+                for account, account_balances in balances.items()
+            },
+            'message': '',
+            'status_code': HTTPStatus.OK,
+        }
+
     def get_config_arguments(self) -> Response:
         config = {
             'max_size_in_mb_all_logs': {
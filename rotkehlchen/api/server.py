@@ -72,6 +72,7 @@ from rotkehlchen.api.v1.resources import (
     EventDetailsResource,
     EventsOnlineQueryResource,
     EvmAccountsResource,
+    EvmBalancesAtBlockResource,
     EvmCounterpartiesResource,
     EvmModuleBalancesResource,
     EvmModuleBalancesWithVersionResource,
@@ -268,6 +269,7 @@ URLS_V1: URLS = [
     ('/blockchains/<string:blockchain>/accounts', BlockchainsAccountsResource),
     ('/blockchains/<string:blockchain>/nodes', RpcNodesResource),
     ('/blockchains/<string:blockchain>/tokens/detect', DetectTokensResource),
+    ('/blockchains/<string:blockchain>/balances/block', EvmBalancesAtBlockResource),
     ('/blockchains/<string:blockchain>/xpub', BTCXpubResource),
     ('/blockchains/evm/transactions/add-hash', EvmTransactionsHashResource),
     ('/blockchains/AVAX/transactions', AvalancheTransactionsResource),
@@ -323,6 +325,9 @@ URLS_V1: URLS = [
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Longer logged response bodies are truncated to this many characters
+MAX_LOGGED_RESULT_LENGTH = 2000
+
 
 def setup_urls(
         rest_api: RestAPI,
@@ -435,19 +440,33 @@ class APIServer:
     def after_request_callback(response: Response) -> Response:
         """Function that runs after each completed request
 
-        Logs the response if required. This is determined by the
-        fake header rotki-log-result passed to all responses.
+        Logs the size of the response and the time it took to serialize it, which
+        are passed by api_response via fake headers. The body is logged truncated
+        only if the fake header rotki-log-result allows it. It is never parsed
+        back from json just for logging.
         """
-        if response.headers.pop('rotki-log-result', 'True') == 'True':
-            result = response.json
+        log_result = response.headers.pop('rotki-log-result', 'True') == 'True'
+        serialization_ms = response.headers.pop('rotki-serialization-ms', None)
+        if log.isEnabledFor(logging.DEBUG) is False:
+            return response
+
+        if response.is_json is False:  # files and other non-json responses
+            result = response.mimetype
+        elif log_result is True:
+            result = response.get_data(as_text=True)
+            if len(result) > MAX_LOGGED_RESULT_LENGTH:
+                result = f'{result[:MAX_LOGGED_RESULT_LENGTH]}... (truncated)'
         else:
             result = 'redacted'
 
         log.debug(
             f'end rotki api {request.method} {request.path}',
+            endpoint=request.endpoint,
             view_args=request.view_args,
             query_string=request.query_string,
             status_code=response.status_code,
+            size=response.content_length,
+            serialization_ms=serialization_ms,
             result=result,
         )
         return response
@@ -0,0 +1,156 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import gevent
+from gevent.lock import Semaphore
+
+from rotkehlchen.api.websockets.typedefs import WSMessageType
+from rotkehlchen.constants.timing import HOUR_IN_SECONDS
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.user_messages import MessagesAggregator
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Results of completed tasks that are not queried within this time are dropped
+API_TASK_RESULT_TTL = HOUR_IN_SECONDS
+# Up to how many completed tasks whose results were not yet queried are kept
+MAX_COMPLETED_API_TASKS = 500
+
+
+@dataclass(init=True, repr=True, eq=False, order=False, unsafe_hash=False, frozen=False)
+class APITask:
+    task_id: int
+    greenlet: gevent.Greenlet
+    command: str
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    result: Optional[dict[str, Any]] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def duration(self) -> float:
+        """Seconds the task ran for, or has been running for if still pending"""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+
+class APITaskRegistry:
+    """Keeps track of the async tasks spawned by the API, indexed by their id
+
+    The results of completed tasks are kept until they are queried, until they
+    expire or until there are too many completed tasks, whichever comes first.
+    A websocket message is sent when a task completes so that clients don't
+    need to keep polling for it.
+
+    The greenlets of the tasks are also kept in the given greenlets list which is
+    what the rest of the app uses to see which API tasks are running.
+    """
+
+    def __init__(self, greenlets: list[gevent.Greenlet], msg_aggregator: MessagesAggregator):
+        self.greenlets = greenlets
+        self.msg_aggregator = msg_aggregator
+        self.tasks: dict[int, APITask] = {}
+        self.completed: dict[int, APITask] = {}  # in order of completion
+        self.next_task_id = 0
+        self.lock = Semaphore()
+
+    def new_task_id(self) -> int:
+        with self.lock:
+            task_id = self.next_task_id
+            self.next_task_id += 1
+        return task_id
+
+    def add(self, task_id: int, greenlet: gevent.Greenlet, command: str) -> None:
+        with self.lock:
+            self.tasks[task_id] = APITask(task_id=task_id, greenlet=greenlet, command=command)
+            self.greenlets.append(greenlet)
+
+    def complete(self, task_id: int, result: dict[str, Any]) -> None:
+        """Stores the result of a task and notifies clients that it completed.
+        Tasks that were cancelled in the meantime are ignored."""
+        with self.lock:
+            if (task := self.tasks.get(task_id)) is None or task.completed:
+                return
+
+            task.result = result
+            task.finished_at = time.monotonic()
+            self.completed[task_id] = task
+            while len(self.completed) > MAX_COMPLETED_API_TASKS:
+                self._remove(next(iter(self.completed)))
+
+        log.debug(f'Async task {task_id} for {task.command} completed in {task.duration:.3f} seconds')  # noqa: E501
+        self.msg_aggregator.add_message(
+            message_type=WSMessageType.ASYNC_TASK_COMPLETED,
+            data={'task_id': task_id, 'duration': round(task.duration, 3)},
+        )
+
+    def get(self, task_id: int) -> Optional[APITask]:
+        with self.lock:
+            self._expire()
+            return self.tasks.get(task_id)
+
+    def pop_result(self, task_id: int) -> Optional[dict[str, Any]]:
+        """Removes a completed task and returns its result. Returns None if the task
+        does not exist or is still pending"""
+        with self.lock:
+            self._expire()
+            if task_id not in self.completed:
+                return None
+
+            return self._remove(task_id).result
+
+    def cancel(self, task_id: int) -> bool:
+        """Kills the task if it's still running and forgets it along with any result.
+        Returns False if the task does not exist"""
+        with self.lock:
+            if task_id not in self.tasks:
+                return False
+
+            task = self._remove(task_id)
+
+        if task.greenlet.dead is False:
+            task.greenlet.kill(block=False)
+        log.debug(f'Async task {task_id} for {task.command} was cancelled after {task.duration:.3f} seconds')  # noqa: E501
+        return True
+
+    def pending_and_completed(self) -> tuple[list[int], list[int]]:
+        with self.lock:
+            self._expire()
+            pending = [x for x in self.tasks if x not in self.completed]
+            return pending, list(self.completed)
+
+    def clear(self) -> None:
+        """Kills all running tasks and forgets all tasks along with their results"""
+        gevent.killall(self.greenlets)
+        with self.lock:
+            self.tasks.clear()
+            self.completed.clear()
+            self.greenlets.clear()
+
+    def _remove(self, task_id: int) -> APITask:
+        task = self.tasks.pop(task_id)
+        self.completed.pop(task_id, None)
+        try:
+            self.greenlets.remove(task.greenlet)
+        except ValueError:
+            pass  # greenlets are cleared when shutting down
+        return task
+
+    def _expire(self) -> None:
+        """Drops the completed tasks whose results were not queried in time"""
+        expire_before = time.monotonic() - API_TASK_RESULT_TTL
+        expired = []
+        for task_id, task in self.completed.items():
+            if task.finished_at >= expire_before:  # type: ignore  # completed tasks have it
+                break  # completion order so all next ones are more recent
+            expired.append(task_id)
+
+        for task_id in expired:
+            log.debug(f'Dropping the unqueried result of async task {task_id}')
+            self._remove(task_id)
@@ -44,6 +44,7 @@ from rotkehlchen.api.v1.schemas import (
     AsyncHistoricalQuerySchema,
     AsyncIgnoreCacheQueryArgumentSchema,
     AsyncQueryArgumentSchema,
+    AsyncTaskCancelSchema,
     AsyncTasksQuerySchema,
     AvalancheTransactionQuerySchema,
     BaseXpubSchema,
@@ -78,6 +79,7 @@ from rotkehlchen.api.v1.schemas import (
     EventDetailsQuerySchema,
     EventsOnlineQuerySchema,
     EvmAccountsPutSchema,
+    EvmBalancesAtBlockSchema,
     EvmPendingTransactionDecodingSchema,
     EvmTransactionDecodingSchema,
     EvmTransactionHashAdditionSchema,
@@ -240,7 +242,7 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.hdkey import HDKey
     from rotkehlchen.chain.evm.accounting.structures import BaseEventSettings
     from rotkehlchen.db.filtering import HistoryEventFilterQuery
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.data_structures import KrakenAccountType
 
 
 def _combine_parser_data(
@@ -417,11 +419,16 @@ class SettingsResource(BaseMethodView):
 class AsyncTasksResource(BaseMethodView):
 
     get_schema = AsyncTasksQuerySchema()
+    delete_schema = AsyncTaskCancelSchema()
 
     @use_kwargs(get_schema, location='view_args')
     def get(self, task_id: Optional[int]) -> Response:
         return self.rest_api.query_tasks_outcome(task_id=task_id)
 
+    @use_kwargs(delete_schema, location='view_args')
+    def delete(self, task_id: int) -> Response:
+        return self.rest_api.cancel_task(task_id=task_id)
+
 
 class ExchangeRatesResource(BaseMethodView):
 
@@ -1278,8 +1285,11 @@ class StatisticsNetvalueResource(BaseMethodView):
 
     @require_loggedin_user()
     @use_kwargs(get_schema, location='json_and_query')
-    def get(self, include_nfts: bool) -> Response:
-        return self.rest_api.query_netvalue_data(include_nfts=include_nfts)
+    def get(self, include_nfts: bool, resolution: Optional[int]) -> Response:
+        return self.rest_api.query_netvalue_data(
+            include_nfts=include_nfts,
+            resolution=resolution,
+        )
 
 
 class StatisticsAssetBalanceResource(BaseMethodView):
@@ -1294,12 +1304,14 @@ class StatisticsAssetBalanceResource(BaseMethodView):
             collection_id: Optional[int],
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            resolution: Optional[int],
     ) -> Response:
         return self.rest_api.query_timed_balances_data(
             asset=asset,  # note that from marshmallow asset and collection_id are guaranteed to exist and be mutually exclusive  # noqa: E501
             collection_id=collection_id,
             from_timestamp=from_timestamp,
             to_timestamp=to_timestamp,
+            resolution=resolution,
         )
 
 
@@ -2724,12 +2736,34 @@ class DetectTokensResource(BaseMethodView):
             async_query: bool,
             only_cache: bool,
             addresses: Optional[Sequence[ChecksumEvmAddress]],
+            full_detection: bool,
     ) -> Response:
         return self.rest_api.detect_evm_tokens(
             async_query=async_query,
             only_cache=only_cache,
             addresses=addresses,
             blockchain=blockchain,
+            full_detection=full_detection,
+        )
+
+
+class EvmBalancesAtBlockResource(BaseMethodView):
+    post_schema = EvmBalancesAtBlockSchema()
+
+    @require_loggedin_user()
+    @use_kwargs(post_schema, location='json_and_view_args')
+    def post(
+            self,
+            blockchain: SUPPORTED_EVM_CHAINS,
+            async_query: bool,
+            addresses: Optional[Sequence[ChecksumEvmAddress]],
+            block_number: int,
+    ) -> Response:
+        return self.rest_api.query_evm_balances_at_block(
+            async_query=async_query,
+            blockchain=blockchain,
+            addresses=addresses,
+            block_number=block_number,
         )
 
 
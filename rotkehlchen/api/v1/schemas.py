@@ -34,7 +34,6 @@ from rotkehlchen.chain.constants import NON_BITCOIN_CHAINS
 from rotkehlchen.chain.ethereum.constants import ETHEREUM_ETHERSCAN_NODE_NAME
 from rotkehlchen.chain.ethereum.modules.eth2.constants import CPT_ETH2
 from rotkehlchen.chain.ethereum.modules.nft.structures import NftLpHandling
-from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
 from rotkehlchen.chain.evm.accounting.structures import (
     ACCOUNTING_METHOD_TYPE,
     BaseEventSettings,
@@ -75,7 +74,7 @@ from rotkehlchen.db.utils import DBAssetBalance, LocationData
 from rotkehlchen.errors.misc import InputError, RemoteError, XPUBError
 from rotkehlchen.errors.serialization import DeserializationError, EncodingError
 from rotkehlchen.exchanges.constants import ALL_SUPPORTED_EXCHANGES, SUPPORTED_EXCHANGES
-from rotkehlchen.exchanges.kraken import KrakenAccountType
+from rotkehlchen.exchanges.data_structures import KrakenAccountType
 from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.icons import ALLOWED_ICON_EXTENSIONS
 from rotkehlchen.inquirer import CurrentPriceOracle
@@ -149,6 +148,7 @@ from .types import (
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.aggregator import ChainsAggregator
+    from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
     from rotkehlchen.db.dbhandler import DBHandler
 
 logger = logging.getLogger(__name__)
@@ -193,6 +193,10 @@ class AsyncTasksQuerySchema(Schema):
     task_id = fields.Integer(strict=True, load_default=None)
 
 
+class AsyncTaskCancelSchema(Schema):
+    task_id = fields.Integer(strict=True, required=True)
+
+
 class OnlyCacheQuerySchema(Schema):
     only_cache = fields.Boolean(load_default=False)
 
@@ -1435,7 +1439,17 @@ class BlockchainBalanceQuerySchema(AsyncQueryArgumentSchema):
     ignore_cache = fields.Boolean(load_default=False)
 
 
-class StatisticsAssetBalanceSchema(TimestampRangeSchema):
+class StatisticsResolutionSchema(Schema):
+    resolution = fields.Integer(
+        load_default=None,
+        validate=webargs.validate.Range(
+            min=1,
+            error='Resolution must be a positive number of seconds',
+        ),
+    )
+
+
+class StatisticsAssetBalanceSchema(TimestampRangeSchema, StatisticsResolutionSchema):
     asset = AssetField(expected_type=Asset, load_default=None)
     collection_id = fields.Integer(load_default=None)
 
@@ -1706,7 +1720,7 @@ def _validate_blockchain_account_schemas(
 
 
 def _transform_btc_or_bch_address(
-        ethereum_inquirer: EthereumInquirer,
+        ethereum_inquirer: 'EthereumInquirer',
         given_address: str,
         blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
 ) -> BTCAddress:
@@ -1750,7 +1764,7 @@ def _transform_btc_or_bch_address(
 
 
 def _transform_evm_address(
-        ethereum_inquirer: EthereumInquirer,
+        ethereum_inquirer: 'EthereumInquirer',
         given_address: str,
 ) -> ChecksumEvmAddress:
     try:
@@ -1780,7 +1794,7 @@ def _transform_evm_address(
 
 
 def _transform_substrate_address(
-        ethereum_inquirer: EthereumInquirer,
+        ethereum_inquirer: 'EthereumInquirer',
         given_address: str,
         chain: SUPPORTED_SUBSTRATE_CHAINS,
 ) -> SubstrateAddress:
@@ -1846,7 +1860,7 @@ def _transform_evm_addresses(data: dict[str, Any], ethereum_inquirer: 'EthereumI
 class EvmAccountsPutSchema(AsyncQueryArgumentSchema):
     accounts = fields.List(fields.Nested(BlockchainAccountDataSchema), required=True)
 
-    def __init__(self, ethereum_inquirer: EthereumInquirer):
+    def __init__(self, ethereum_inquirer: 'EthereumInquirer'):
         super().__init__()
         self.ethereum_inquirer = ethereum_inquirer
 
@@ -1874,7 +1888,7 @@ class BlockchainAccountsPatchSchema(Schema):
     blockchain = BlockchainField(required=True, exclude_types=(SupportedBlockchain.ETHEREUM_BEACONCHAIN,))  # noqa: E501
     accounts = fields.List(fields.Nested(BlockchainAccountDataSchema), required=True)
 
-    def __init__(self, ethereum_inquirer: EthereumInquirer):
+    def __init__(self, ethereum_inquirer: 'EthereumInquirer'):
         super().__init__()
         self.ethereum_inquirer = ethereum_inquirer
 
@@ -1920,7 +1934,7 @@ class BlockchainAccountsDeleteSchema(AsyncQueryArgumentSchema):
     blockchain = BlockchainField(required=True, exclude_types=(SupportedBlockchain.ETHEREUM_BEACONCHAIN,))  # noqa: E501
     accounts = fields.List(fields.String(), required=True)
 
-    def __init__(self, ethereum_inquirer: EthereumInquirer):
+    def __init__(self, ethereum_inquirer: 'EthereumInquirer'):
         super().__init__()
         self.ethereum_inquirer = ethereum_inquirer
 
@@ -2440,7 +2454,7 @@ class Eth2DailyStatsSchema(
         }
 
 
-class StatisticsNetValueSchema(Schema):
+class StatisticsNetValueSchema(StatisticsResolutionSchema):
     include_nfts = fields.Boolean(load_default=True)
 
 
@@ -2765,6 +2779,12 @@ class DetectTokensSchema(
     OptionalAddressesListSchema,
 ):
     blockchain = BlockchainField(required=True, exclude_types=list(NON_EVM_CHAINS))
+    full_detection = fields.Boolean(load_default=False)
+
+
+class EvmBalancesAtBlockSchema(AsyncQueryArgumentSchema, OptionalAddressesListSchema):
+    blockchain = BlockchainField(required=True, exclude_types=list(NON_EVM_CHAINS))
+    block_number = fields.Integer(required=True, validate=validate.Range(min=0))
 
 
 class UserNotesPutSchema(Schema):
@@ -1,67 +1,200 @@
 import json
 import logging
-from contextlib import suppress
-from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
 
-from gevent.lock import Semaphore
+import gevent
+from gevent.event import Event
 from geventwebsocket import WebSocketApplication
 from geventwebsocket.exceptions import WebSocketError
 from geventwebsocket.websocket import WebSocket
 
+from rotkehlchen.api.websockets.typedefs import (
+    HistoryEventsStep,
+    TransactionStatusStep,
+    WSMessageType,
+)
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 
-if TYPE_CHECKING:
-    from rotkehlchen.api.websockets.typedefs import WSMessageType
-
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 
-def _ws_send_impl(
-        websocket: WebSocket,
-        lock: Semaphore,
-        to_send_msg: str,
-        success_callback: Optional[Callable] = None,
-        success_callback_args: Optional[dict[str, Any]] = None,
-        failure_callback: Optional[Callable] = None,
-        failure_callback_args: Optional[dict[str, Any]] = None,
-) -> None:
-    try:
-        with lock:
-            websocket.send(to_send_msg)
-    except WebSocketError as e:
-        log.error(f'Websocket send with message {to_send_msg} failed due to {e!s}')
-
-        if failure_callback:
-            failure_callback_args = {} if failure_callback_args is None else failure_callback_args
-            failure_callback(**failure_callback_args)
-        return
+# How long after sending a batch of messages to a subscriber we wait before sending
+# the next one. Progress messages that get superseded in the meantime are dropped.
+WS_COALESCING_WINDOW = 0.1
+# Up to how many messages can be queued for a subscriber. If a subscriber can't keep
+# up, the oldest queued messages are dropped and their failure callback is called.
+MAX_QUEUED_WS_MESSAGES = 1000
+
+
+def _coalescing_key(message_type: WSMessageType, data: Union[dict[str, Any], list[Any]]) -> Optional[tuple]:  # noqa: E501
+    """Returns the key under which a progress message is coalesced with later ones of
+    the same key, so that only the latest of them is sent. None if the message
+    should always be sent, as for DB upgrade and data migration steps which clients
+    expect to receive one by one."""
+    if not isinstance(data, dict):
+        return None
+    if message_type == WSMessageType.EVM_TRANSACTION_STATUS and data.get('status') not in (
+            str(TransactionStatusStep.QUERYING_TRANSACTIONS_STARTED),
+            str(TransactionStatusStep.QUERYING_TRANSACTIONS_FINISHED),
+    ):
+        return message_type, data.get('address'), data.get('evm_chain')
+    if (
+        message_type == WSMessageType.HISTORY_EVENTS_STATUS and
+        data.get('status') == str(HistoryEventsStep.QUERYING_EVENTS_STATUS_UPDATE)
+    ):
+        return message_type, data.get('location'), data.get('name')
+    return None
+
+
+@dataclass(init=True, repr=False, eq=False, order=False, unsafe_hash=False, frozen=False)
+class QueuedMessage:
+    message: str
+    coalescing_key: Optional[tuple]
+    queued_at: float
+    success_callback: Optional[Callable] = None
+    success_callback_args: Optional[dict[str, Any]] = None
+    failure_callback: Optional[Callable] = None
+    failure_callback_args: Optional[dict[str, Any]] = None
+    superseded: bool = False
+
+    def succeeded(self) -> None:
+        if self.success_callback is not None:
+            self.success_callback(**(self.success_callback_args or {}))
+
+    def failed(self) -> None:
+        if self.failure_callback is not None:
+            self.failure_callback(**(self.failure_callback_args or {}))
+
+
+class WSSubscriber:
+    """A websocket subscribed to the notifier along with its outbound queue
+
+    Messages are queued by the producers and sent by a dedicated greenlet so that
+    producers never wait on a slow socket.
+    """
+
+    def __init__(self, websocket: WebSocket, on_closed: Callable[[WebSocket], None]) -> None:
+        self.websocket = websocket
+        self.on_closed = on_closed
+        self.queue: deque[QueuedMessage] = deque()
+        self.queued_num = 0  # not superseded messages in the queue
+        self.latest_by_key: dict[tuple, QueuedMessage] = {}
+        self.has_messages = Event()
+        # metrics
+        self.sent_num = 0
+        self.coalesced_num = 0
+        self.dropped_num = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.greenlet = gevent.spawn(self._send_queued_messages)
+
+    def enqueue(self, queued_message: QueuedMessage) -> None:
+        if queued_message.coalescing_key is not None:
+            if (previous := self.latest_by_key.get(queued_message.coalescing_key)) is not None:
+                previous.superseded = True
+                self.queued_num -= 1
+                self.coalesced_num += 1
+            self.latest_by_key[queued_message.coalescing_key] = queued_message
+
+        while self.queued_num >= MAX_QUEUED_WS_MESSAGES:
+            dropped = self._popleft()
+            if dropped is None:
+                break
+            self.dropped_num += 1
+            log.debug(f'Websocket with hash id {hash(self.websocket)} can not keep up. Dropping a message')  # noqa: E501
+            dropped.failed()
 
-    if success_callback:  # send success
-        success_callback_args = {} if success_callback_args is None else success_callback_args
-        success_callback(**success_callback_args)
+        self.queue.append(queued_message)
+        self.queued_num += 1
+        self.has_messages.set()
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        return {
+            'sent': self.sent_num,
+            'coalesced': self.coalesced_num,
+            'dropped': self.dropped_num,
+            'queued': self.queued_num,
+            'average_latency': self.total_latency / self.sent_num if self.sent_num != 0 else 0.0,  # noqa: E501
+            'max_latency': self.max_latency,
+        }
+
+    def close(self) -> None:
+        """Stops sending messages. The ones still queued are considered failed"""
+        if self.greenlet is not gevent.getcurrent():
+            self.greenlet.kill(block=False)
+        while (queued_message := self._popleft()) is not None:
+            queued_message.failed()
+
+    def _popleft(self) -> Optional[QueuedMessage]:
+        """Pops the next not superseded message from the queue"""
+        while len(self.queue) != 0:
+            queued_message = self.queue.popleft()
+            if queued_message.superseded:
+                continue
+
+            self.queued_num -= 1
+            if self.latest_by_key.get(queued_message.coalescing_key) is queued_message:  # type: ignore  # None key is never in the mapping
+                del self.latest_by_key[queued_message.coalescing_key]  # type: ignore
+            return queued_message
+
+        return None
+
+    def _send_queued_messages(self) -> None:
+        while True:
+            self.has_messages.wait()
+            self.has_messages.clear()
+            while (queued_message := self._popleft()) is not None:
+                if self.websocket.closed is True:
+                    queued_message.failed()
+                    self.on_closed(self.websocket)  # also fails the rest of the queue
+                    return
+
+                try:
+                    self.websocket.send(queued_message.message)
+                except WebSocketError as e:
+                    log.error(f'Websocket send with message {queued_message.message} failed due to {e!s}')  # noqa: E501
+                    queued_message.failed()
+                    continue
+
+                latency = time.monotonic() - queued_message.queued_at
+                self.sent_num += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                queued_message.succeeded()
+
+            gevent.sleep(WS_COALESCING_WINDOW)
 
 
 class RotkiNotifier:
 
     def __init__(self) -> None:
-        self.subscribers: list[WebSocket] = []
-        self.locks: dict[WebSocket, Semaphore] = {}
+        self.subscribers: dict[WebSocket, WSSubscriber] = {}
 
     def subscribe(self, websocket: WebSocket) -> None:
         log.info(f'Websocket with hash id {hash(websocket)} subscribed to rotki notifier')
-        self.subscribers.append(websocket)
-        self.locks[websocket] = Semaphore()
+        self.subscribers[websocket] = WSSubscriber(websocket=websocket, on_closed=self.unsubscribe)
 
     def unsubscribe(self, websocket: WebSocket) -> None:
-        self.locks.pop(websocket, None)
-        with suppress(ValueError):
-            self.subscribers.remove(websocket)
-            log.info(f'Websocket with hash id {hash(websocket)} unsubscribed from rotki notifier')
+        if (subscriber := self.subscribers.pop(websocket, None)) is None:
+            return
+
+        subscriber.close()
+        log.info(
+            f'Websocket with hash id {hash(websocket)} unsubscribed from rotki notifier',
+            stats=subscriber.stats(),
+        )
+
+    def stats(self) -> list[dict[str, Union[int, float]]]:
+        """Returns the send metrics of each subscriber"""
+        return [x.stats() for x in self.subscribers.values()]
 
     def broadcast(
             self,
-            message_type: 'WSMessageType',
+            message_type: WSMessageType,
             to_send_data: Union[dict[str, Any], list[Any]],
             success_callback: Optional[Callable] = None,
             success_callback_args: Optional[dict[str, Any]] = None,
@@ -70,8 +203,13 @@ class RotkiNotifier:
     ) -> None:
         """Broadcasts a websocket message
 
+        The message is queued for each subscriber and sent by their own greenlet.
+        Progress messages are coalesced so that only the latest of the ones queued
+        close to each other is sent.
+
         A callback to run on message success and a callback to run on message
-        failure can be optionally provided.
+        failure can be optionally provided. They run once per subscriber. The
+        failure callback also runs if there is no subscriber.
         """
         message_data = {'type': str(message_type), 'data': to_send_data}
         try:
@@ -84,29 +222,26 @@ class RotkiNotifier:
 
             return  # get out of the broadcast
 
-        to_remove_indices = set()
-        spawned_one_broadcast = False
-        for idx, websocket in enumerate(self.subscribers):
+        coalescing_key = _coalescing_key(message_type, to_send_data)
+        queued_at = time.monotonic()
+        queued_to_one = False
+        for websocket, subscriber in list(self.subscribers.items()):
             if websocket.closed is True:
-                to_remove_indices.add(idx)
+                self.unsubscribe(websocket)
                 continue
 
-            _ws_send_impl(
-                websocket=websocket,
-                lock=self.locks[websocket],
-                to_send_msg=message,
+            subscriber.enqueue(QueuedMessage(
+                message=message,
+                coalescing_key=coalescing_key,
+                queued_at=queued_at,
                 success_callback=success_callback,
                 success_callback_args=success_callback_args,
                 failure_callback=failure_callback,
                 failure_callback_args=failure_callback_args,
-            )
-            spawned_one_broadcast = True
+            ))
+            queued_to_one = True
 
-        if len(to_remove_indices) != 0:  # removed closed websockets from the list
-            self.subscribers = [
-                i for j, i in enumerate(self.subscribers) if j not in to_remove_indices
-            ]
-        if spawned_one_broadcast is False and failure_callback is not None:
+        if queued_to_one is False and failure_callback is not None:
             failure_callback_args = {} if failure_callback_args is None else failure_callback_args
             failure_callback(**failure_callback_args)
 
@@ -23,6 +23,7 @@ class WSMessageType(Enum):
     HISTORY_EVENTS_STATUS = auto()
     REFRESH_BALANCES = auto()
     DATABASE_UPLOAD_RESULT = auto()
+    ASYNC_TASK_COMPLETED = auto()
 
     def __str__(self) -> str:
         return self.name.lower()  # pylint: disable=no-member
@@ -46,13 +46,16 @@ from rotkehlchen.chain.ethereum.modules.convex.balances import ConvexBalances
 from rotkehlchen.chain.ethereum.modules.curve.balances import CurveBalances
 from rotkehlchen.chain.ethereum.modules.eth2.structures import Eth2Validator
 from rotkehlchen.chain.ethereum.modules.thegraph.balances import ThegraphBalances
+from rotkehlchen.chain.evm.structures import AddressBalancesAtBlock
 from rotkehlchen.chain.optimism.modules.velodrome.balances import VelodromeBalances
 from rotkehlchen.chain.substrate.manager import wait_until_a_node_is_available
 from rotkehlchen.chain.substrate.utils import SUBSTRATE_NODE_CONNECTION_TIMEOUT
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_AVAX, A_BCH, A_BTC, A_DAI, A_DOT, A_ETH, A_ETH2, A_KSM
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
+from rotkehlchen.constants.timing import HOUR_IN_SECONDS
 from rotkehlchen.db.eth2 import DBEth2
+from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import Eth2DailyStatsFilterQuery
 from rotkehlchen.db.queried_addresses import QueriedAddresses
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
@@ -142,6 +145,10 @@ def _module_name_to_class(module_name: ModuleName) -> type[EthereumModule]:
 
 
 DEFI_BALANCES_REQUERY_SECONDS = 600
+# Token balances of an address whose native balance did not change and that has no
+# stored transaction after the block its balances were queried at are reused for up to
+# this long. Incoming transfers rotki has not seen yet are picked up after it.
+PINNED_BALANCES_MAX_AGE = HOUR_IN_SECONDS
 
 
 # Mapping to token symbols to ignore. True means all
@@ -228,6 +235,7 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         self.btc_derivation_gap_limit = btc_derivation_gap_limit
         self.defi_balances_last_query_ts = Timestamp(0)
         self.defi_balances: dict[ChecksumEvmAddress, list[DefiProtocolBalances]] = {}
+        self.pinned_balances: defaultdict[SUPPORTED_EVM_CHAINS, dict[ChecksumEvmAddress, AddressBalancesAtBlock]] = defaultdict(dict)  # noqa: E501
 
         # All of these locks are used, but the chain ones with dynamic getattr below
         self.defi_lock = Semaphore()
@@ -496,6 +504,9 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         client and the chain is not synced
         """
         xpub_manager = XpubManager(chains_aggregator=self)
+        if ignore_cache is True:
+            self._forget_pinned_balances(blockchain)
+
         if blockchain is not None:
             query_method = f'query_{blockchain.get_key()}_balances'
             getattr(self, query_method)(ignore_cache=ignore_cache)
@@ -903,9 +914,87 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
             self.defi_balances_last_query_ts = ts_now()
             return self.defi_balances
 
+    def flush_cache(self, name: str, *args: Any, **kwargs: Any) -> None:
+        """Flushes the cached response and, if it is the balances of an evm chain, also
+        the token balances pinned at a block for it"""
+        super().flush_cache(name, *args, **kwargs)
+        for chain in self.pinned_balances:
+            if name == f'query_{chain.get_key()}_balances':
+                self._forget_pinned_balances(chain)
+
+    def _forget_pinned_balances(self, blockchain: Optional[SupportedBlockchain]) -> None:
+        """Forgets the pinned token balances of the given chain or of all chains if None"""
+        for chain, pinned in self.pinned_balances.items():
+            if blockchain is None or chain == blockchain:
+                pinned.clear()
+
+    def _query_pinned_token_balances(
+            self,
+            manager: 'EvmManager',
+            accounts: Sequence[ChecksumEvmAddress],
+            block_number: int,
+            native_balances: dict[ChecksumEvmAddress, FVal],
+    ) -> dict[ChecksumEvmAddress, dict[EvmToken, FVal]]:
+        """Returns the token balances of the accounts at the given block.
+
+        The balances of an account that were queried at an earlier block are reused without
+        querying when they are recent, the account still has the same native balance and
+        detected tokens and there is no stored transaction of it after that block. Any
+        outgoing transaction changes the native balance due to gas so this also covers
+        the nonce without querying it for each account.
+
+        May raise:
+        - RemoteError if there is a problem querying the nodes
+        - BadFunctionCallOutput if the chain of the queried node is not synced
+        """
+        chain = manager.node_inquirer.blockchain
+        pinned = self.pinned_balances[chain]
+        saved_tokens = manager.tokens.get_saved_tokens(accounts)
+        now = ts_now()
+        to_query: dict[ChecksumEvmAddress, list[EvmToken]] = {}
+        dbevmtx = DBEvmTx(self.database)
+        with self.database.conn.read_ctx() as cursor:
+            for account in accounts:
+                tokens = saved_tokens.get(account, [])
+                if (
+                    (cached := pinned.get(account)) is None or
+                    now - cached.queried_ts > PINNED_BALANCES_MAX_AGE or
+                    cached.native_balance != native_balances.get(account, ZERO) or
+                    cached.tokens != frozenset(tokens) or
+                    (dbevmtx.get_last_transaction_block(
+                        cursor=cursor,
+                        chain_id=manager.node_inquirer.chain_id,
+                        address=account,
+                    ) or 0) > cached.block_number
+                ):
+                    to_query[account] = tokens
+
+        log.debug(
+            f'Querying {chain!s} token balances of {len(to_query)} out of {len(accounts)} '
+            f'accounts at block {block_number}',
+        )
+        queried_balances = manager.tokens.query_token_balances(
+            addresses_to_tokens={k: v for k, v in to_query.items() if len(v) != 0},
+            block_identifier=block_number,
+        )
+        for account, tokens in to_query.items():
+            pinned[account] = AddressBalancesAtBlock(
+                block_number=block_number,
+                queried_ts=now,
+                native_balance=native_balances.get(account, ZERO),
+                tokens=frozenset(tokens),
+                token_balances=queried_balances.get(account, {}),
+            )
+
+        return {account: pinned[account].token_balances for account in accounts}
+
     def query_evm_chain_balances(self, chain: SUPPORTED_EVM_CHAINS) -> None:
         """Queries all the balances for an evm chain and populates the state
 
+        When connected to web3 nodes all the balances are queried at the same block and
+        the token balances of the accounts that did not change since then are reused.
+        Etherscan can't be asked for the state at a given block so it queries the latest.
+
         May raise:
         - RemoteError if an external service such as Etherscan or cryptocompare
         is queried and there is a problem with its query.
@@ -920,7 +1009,16 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         manager = cast('EvmManager', self.get_chain_manager(chain))
         native_token_usd_price = Inquirer().find_usd_price(manager.node_inquirer.native_token)
         chain_balances = self.balances.get(chain)
-        queried_balances = manager.node_inquirer.get_multi_balance(accounts)
+        block_number, call_order = None, None
+        if manager.node_inquirer.connected_to_any_web3():
+            call_order = manager.node_inquirer.default_call_order(skip_etherscan=True)
+            block_number = manager.node_inquirer.get_latest_block_number(call_order=call_order)
+
+        queried_balances = manager.node_inquirer.get_multi_balance(
+            accounts=accounts,
+            call_order=call_order,
+            block_identifier=block_number if block_number is not None else 'latest',
+        )
         for account, balance in queried_balances.items():
             if balance == ZERO:
                 continue
@@ -931,7 +1029,36 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
                     manager.node_inquirer.native_token: Balance(balance, usd_value),
                 }),
             )
-        self.query_evm_tokens(manager=manager, balances=chain_balances)
+
+        if block_number is None:
+            self.query_evm_tokens(manager=manager, balances=chain_balances)
+            return
+
+        try:
+            balance_result = self._query_pinned_token_balances(
+                manager=manager,
+                accounts=accounts,
+                block_number=block_number,
+                native_balances=queried_balances,
+            )
+        except BadFunctionCallOutput as e:
+            log.error(
+                f'Assuming unsynced chain. Got web3 BadFunctionCallOutput '
+                f'exception: {e!s}',
+            )
+            raise EthSyncError(
+                f'Tried to use the {chain!s} chain of the provided '
+                'client to query token balances but the chain is not synced.',
+            ) from e
+
+        self._update_balances_after_token_query(
+            dsr_proxy_append=False,
+            balance_result=balance_result,
+            token_usd_price=Inquirer.find_usd_prices(  # type: ignore[arg-type]  # the keys are the given tokens
+                assets={token for balances in balance_result.values() for token in balances},
+            ),
+            balances=chain_balances,
+        )
 
     @protect_with_lock()
     @cache_response_timewise()
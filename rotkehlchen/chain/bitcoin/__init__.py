@@ -1,6 +1,8 @@
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 
+import gevent
 import requests
+from gevent.lock import Semaphore
 
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.errors.serialization import DeserializationError
@@ -10,26 +12,49 @@ from rotkehlchen.types import BTCAddress
 from rotkehlchen.utils.misc import satoshis_to_btc
 from rotkehlchen.utils.network import request_get_dict
 
+# How many addresses are queried at the same time from APIs that only take one address.
+# Shared by all the queries so that concurrent balance and xpub queries stay within it.
+BLOCKSTREAM_CONCURRENT_QUERIES = 4
+BLOCKSTREAM_QUERIES_SEMAPHORE = Semaphore(BLOCKSTREAM_CONCURRENT_QUERIES)
 
-def _have_bc1_accounts(accounts: Sequence[BTCAddress]) -> bool:
-    return any(account.lower()[0:3] == 'bc1' for account in accounts)
 
+def _split_bc1_accounts(
+        accounts: Sequence[BTCAddress],
+) -> tuple[list[BTCAddress], list[BTCAddress]]:
+    """Splits the accounts into bc1 accounts and the rest. The rest can be queried
+    in batches from blockchain.info while bc1 accounts need blockstream/mempool"""
+    bc1_accounts, other_accounts = [], []
+    for account in accounts:
+        if account.lower()[0:3] == 'bc1':
+            bc1_accounts.append(account)
+        else:
+            other_accounts.append(account)
+    return bc1_accounts, other_accounts
 
-def _query_blockstream_or_mempool(
+
+def _query_blockstream_or_mempool_stats(
         accounts: Sequence[BTCAddress],
         base_url: str,
-) -> dict[BTCAddress, FVal]:
-    """Queries balances from blockstream.info
+) -> dict[BTCAddress, tuple[int, FVal]]:
+    """Queries the number of transactions and the balance of each account from
+    blockstream.info or mempool.space. They have no multi-address endpoint so the
+    accounts are queried concurrently with up to BLOCKSTREAM_CONCURRENT_QUERIES
+    requests in flight across all callers to stay within their rate limits.
+
     May raise:
     - RemoteError if got problems with querying the API
     - KeyError if got unexpected json structure
     - DeserializationError if got unexpected json values
     """
-    balances = {}
-    for account in accounts:
-        url = base_url + account
-        response_data = request_get_dict(url=url, handle_429=True, backoff_in_seconds=4)
+    def query_account(account: BTCAddress) -> tuple[BTCAddress, tuple[int, FVal]]:
+        with BLOCKSTREAM_QUERIES_SEMAPHORE:
+            response_data = request_get_dict(url=base_url + account, handle_429=True, backoff_in_seconds=4)  # noqa: E501
         stats = response_data['chain_stats']
+        tx_count = ensure_type(
+            symbol=stats['tx_count'],
+            expected_type=int,
+            location='blockstream tx_count',
+        )
         funded_txo_sum = satoshis_to_btc(
             ensure_type(
                 symbol=stats['funded_txo_sum'],
@@ -44,9 +69,29 @@ def _query_blockstream_or_mempool(
                 location='blockstream spent_txo_sum',
             ),
         )
-        balance = funded_txo_sum - spent_txo_sum
-        balances[account] = balance
-    return balances
+        return account, (tx_count, funded_txo_sum - spent_txo_sum)
+
+    greenlets = [gevent.spawn(query_account, account) for account in accounts]
+    try:
+        gevent.joinall(greenlets, raise_error=True)
+    finally:
+        gevent.killall(greenlets)
+
+    return dict(greenlet.value for greenlet in greenlets)
+
+
+def _query_blockstream_or_mempool(
+        accounts: Sequence[BTCAddress],
+        base_url: str,
+) -> dict[BTCAddress, FVal]:
+    """Queries balances from blockstream.info
+    May raise:
+    - RemoteError if got problems with querying the API
+    - KeyError if got unexpected json structure
+    - DeserializationError if got unexpected json values
+    """
+    stats = _query_blockstream_or_mempool_stats(accounts=accounts, base_url=base_url)
+    return {account: balance for account, (_, balance) in stats.items()}
 
 
 def _query_blockstream_info(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, FVal]:
@@ -92,25 +137,15 @@ def _query_blockchain_info(accounts: Sequence[BTCAddress]) -> dict[BTCAddress, F
     return balances
 
 
-def get_bitcoin_addresses_balances(
+def _query_bitcoin_balances_with_fallback(
         accounts: Sequence[BTCAddress],
+        api_callbacks: dict[str, Callable[[Sequence[BTCAddress]], dict[BTCAddress, FVal]]],
 ) -> dict[BTCAddress, FVal]:
-    """Queries bitcoin balance APIs for the balances of accounts
+    """Queries the balances of accounts from each API in order until one succeeds
 
     May raise:
-    - RemoteError couldn't query any of the bitcoin balance APIs
+    - RemoteError couldn't query any of the given APIs
     """
-    if _have_bc1_accounts(accounts) is True:
-        api_callbacks = {
-            'blockstream.info': _query_blockstream_info,
-            'mempool.space': _query_mempool_space,
-        }
-    else:
-        api_callbacks = {
-            'blockchain.info': _query_blockchain_info,
-            'blockstream.info': _query_blockstream_info,
-            'mempool.space': _query_mempool_space,
-        }
     errors: dict[str, str] = {}
     for api_name, callback in api_callbacks.items():
         try:
@@ -133,56 +168,73 @@ def get_bitcoin_addresses_balances(
     raise RemoteError(f'Bitcoin external API request for balances failed. {serialized_errors}')
 
 
+def get_bitcoin_addresses_balances(
+        accounts: Sequence[BTCAddress],
+) -> dict[BTCAddress, FVal]:
+    """Queries bitcoin balance APIs for the balances of accounts
+
+    Accounts that are not bc1 are queried in batches from blockchain.info first,
+    so that having some bc1 accounts does not mean querying all accounts one by one.
+
+    May raise:
+    - RemoteError couldn't query any of the bitcoin balance APIs
+    """
+    bc1_accounts, other_accounts = _split_bc1_accounts(accounts)
+    balances: dict[BTCAddress, FVal] = {}
+    if len(other_accounts) != 0:
+        balances |= _query_bitcoin_balances_with_fallback(
+            accounts=other_accounts,
+            api_callbacks={
+                'blockchain.info': _query_blockchain_info,
+                'blockstream.info': _query_blockstream_info,
+                'mempool.space': _query_mempool_space,
+            },
+        )
+    if len(bc1_accounts) != 0:
+        balances |= _query_bitcoin_balances_with_fallback(
+            accounts=bc1_accounts,
+            api_callbacks={
+                'blockstream.info': _query_blockstream_info,
+                'mempool.space': _query_mempool_space,
+            },
+        )
+
+    return balances
+
+
 def _check_blockstream_for_transactions(
-        accounts: list[BTCAddress],
+        accounts: Sequence[BTCAddress],
 ) -> dict[BTCAddress, tuple[bool, FVal]]:
     """May raise:
     - RemoteError if couldn't query
     - KeyError if response structure differs from the expected one
     - DeserializationError if response values differ from the expected
     """
-    have_transactions = {}
-    for account in accounts:
-        url = f'https://blockstream.info/api/address/{account}'
-        response_data = request_get_dict(url=url, handle_429=True, backoff_in_seconds=4)
-        stats = response_data['chain_stats']
-        funded_txo_sum = satoshis_to_btc(
-            ensure_type(
-                symbol=stats['funded_txo_sum'],
-                expected_type=int,
-                location='blockstream funded_txo_sum',
-            ),
-        )
-        spent_txo_sum = satoshis_to_btc(
-            ensure_type(
-                symbol=stats['spent_txo_sum'],
-                expected_type=int,
-                location='blockstream spent_txo_sum',
-            ),
-        )
-        balance = funded_txo_sum - spent_txo_sum
-        have_txs = stats['tx_count'] != 0
-        have_transactions[account] = (have_txs, balance)
-
-    return have_transactions
+    stats = _query_blockstream_or_mempool_stats(
+        accounts=accounts,
+        base_url='https://blockstream.info/api/address/',
+    )
+    return {account: (tx_count != 0, balance) for account, (tx_count, balance) in stats.items()}
 
 
 def _check_blockchaininfo_for_transactions(
-        accounts: list[BTCAddress],
+        accounts: Sequence[BTCAddress],
 ) -> dict[BTCAddress, tuple[bool, FVal]]:
     """May raise RemoteError or KeyError"""
     have_transactions = {}
-    params = '|'.join(accounts)
-    btc_resp = request_get_dict(
-        url=f'https://blockchain.info/multiaddr?active={params}',
-        handle_429=True,
-        # If we get a 429 then their docs suggest 10 seconds
-        # https://blockchain.infoq/
-        backoff_in_seconds=15,
-    )
-    for entry in btc_resp['addresses']:
-        balance = satoshis_to_btc(entry['final_balance'])
-        have_transactions[entry['address']] = (entry['n_tx'] != 0, balance)
+    accounts_chunks = [accounts[x:x + 80] for x in range(0, len(accounts), 80)]
+    for accounts_chunk in accounts_chunks:
+        params = '|'.join(accounts_chunk)
+        btc_resp = request_get_dict(
+            url=f'https://blockchain.info/multiaddr?active={params}',
+            handle_429=True,
+            # If we get a 429 then their docs suggest 10 seconds
+            # https://blockchain.infoq/
+            backoff_in_seconds=15,
+        )
+        for entry in btc_resp['addresses']:
+            balance = satoshis_to_btc(entry['final_balance'])
+            have_transactions[entry['address']] = (entry['n_tx'] != 0, balance)
 
     return have_transactions
 
@@ -195,13 +247,15 @@ def have_bitcoin_transactions(accounts: list[BTCAddress]) -> dict[BTCAddress, tu
     May raise:
     - RemoteError if any of the queried websites fail to be queried
     """
+    bc1_accounts, other_accounts = _split_bc1_accounts(accounts)
+    have_transactions: dict[BTCAddress, tuple[bool, FVal]] = {}
     try:
-        if _have_bc1_accounts(accounts):
-            source = 'blockstream'
-            have_transactions = _check_blockstream_for_transactions(accounts)
-        else:
+        if len(other_accounts) != 0:
             source = 'blockchain.info'
-            have_transactions = _check_blockchaininfo_for_transactions(accounts)
+            have_transactions |= _check_blockchaininfo_for_transactions(other_accounts)
+        if len(bc1_accounts) != 0:
+            source = 'blockstream'
+            have_transactions |= _check_blockstream_for_transactions(bc1_accounts)
     except (
             requests.exceptions.RequestException,
             UnableToDecryptRemoteData,
@@ -1,13 +1,14 @@
 import logging
 from typing import TYPE_CHECKING, Any, Literal, NamedTuple, Optional
 
+import gevent
 from gevent.lock import Semaphore
 
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.chain.accounts import BlockchainAccountData
 from rotkehlchen.chain.bitcoin import have_bitcoin_transactions
 from rotkehlchen.chain.bitcoin.bch import have_bch_transactions
-from rotkehlchen.chain.bitcoin.hdkey import HDKey
+from rotkehlchen.chain.bitcoin.hdkey import HDKey, XpubType
 from rotkehlchen.constants.assets import A_BCH, A_BTC
 from rotkehlchen.db.utils import replace_tag_mappings
 from rotkehlchen.errors.misc import RemoteError
@@ -15,6 +16,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import BTCAddress, SupportedBlockchain
+from rotkehlchen.utils.data_structures import LRUCache
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.aggregator import ChainsAggregator
@@ -24,6 +26,10 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Derived addresses by (parent xpub, xpub type, child index). Rescans re-derive at least
+# a gap limit worth of unused addresses each time so this saves their EC math.
+DERIVED_ADDRESSES_CACHE: LRUCache[tuple[Optional[str], Optional[XpubType], int], BTCAddress] = LRUCache(maxsize=10000)  # noqa: E501
+
 
 class XpubData(NamedTuple):
     xpub: HDKey
@@ -72,6 +78,23 @@ class XpubDerivedAddressData(NamedTuple):
     balance: FVal
 
 
+def _derive_addresses_batch(
+        root: HDKey,
+        start_index: int,
+        count: int,
+) -> list[tuple[int, BTCAddress]]:
+    """Derives count child addresses of root starting from start_index"""
+    batch_addresses = []
+    for idx in range(start_index, start_index + count):
+        key = (root.xpub, root.xpub_type, idx)
+        if (address := DERIVED_ADDRESSES_CACHE.get(key)) is None:
+            address = root.derive_child(idx).address()
+            DERIVED_ADDRESSES_CACHE.add(key, address)
+        batch_addresses.append((idx, address))
+
+    return batch_addresses
+
+
 def _derive_addresses_loop(
         account_index: int,
         start_index: int,
@@ -79,22 +102,33 @@ def _derive_addresses_loop(
         gap_limit: int,
         blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
 ) -> list[XpubDerivedAddressData]:
-    """May raise:
+    """The next batch of addresses is derived while the current one is being checked
+    for transactions.
+
+    May raise:
     - RemoteError: if blockstream/blockchain.info can't be reached
     """
+    if blockchain == SupportedBlockchain.BITCOIN:
+        have_transactions = have_bitcoin_transactions
+    else:
+        have_transactions = have_bch_transactions
     step_index = start_index
     addresses: list[XpubDerivedAddressData] = []
     should_continue = True
+    batch_addresses = _derive_addresses_batch(root=root, start_index=step_index, count=gap_limit)
     while should_continue:
-        batch_addresses: list[tuple[int, BTCAddress]] = []
-        for idx in range(step_index, step_index + gap_limit):
-            child = root.derive_child(idx)
-            batch_addresses.append((idx, child.address()))
-
-        if blockchain == SupportedBlockchain.BITCOIN:
-            have_tx_mapping = have_bitcoin_transactions([x[1] for x in batch_addresses])
-        else:
-            have_tx_mapping = have_bch_transactions([x[1] for x in batch_addresses])
+        query = gevent.spawn(have_transactions, [x[1] for x in batch_addresses])
+        try:
+            gevent.sleep(0)  # let the query get sent before deriving
+            next_batch_addresses = _derive_addresses_batch(
+                root=root,
+                start_index=step_index + gap_limit,
+                count=gap_limit,
+            )
+            have_tx_mapping = query.get()
+        finally:
+            query.kill()
+
         should_continue = False
         for idx, address in batch_addresses:
             have_tx, balance = have_tx_mapping[address]
@@ -122,6 +156,7 @@ def _derive_addresses_loop(
                     ))
 
         step_index += gap_limit
+        batch_addresses = next_batch_addresses
 
     return addresses
 
@@ -144,28 +179,21 @@ def _derive_addresses_from_xpub_data(
     else:
         account_xpub = xpub_data.xpub
 
-    addresses = []
-    receiving_xpub = account_xpub.derive_child(0)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=0,
-            start_index=start_receiving_index,
-            root=receiving_xpub,
-            gap_limit=gap_limit,
-            blockchain=xpub_data.blockchain,
-        ),
-    )
-    change_xpub = account_xpub.derive_child(1)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=1,
-            start_index=start_change_index,
-            root=change_xpub,
-            gap_limit=gap_limit,
-            blockchain=xpub_data.blockchain,
-        ),
-    )
-    return addresses
+    # the receiving (0) and change (1) chains are scanned concurrently
+    greenlets = [gevent.spawn(
+        _derive_addresses_loop,
+        account_index=account_index,
+        start_index=start_index,
+        root=account_xpub.derive_child(account_index),
+        gap_limit=gap_limit,
+        blockchain=xpub_data.blockchain,
+    ) for account_index, start_index in ((0, start_receiving_index), (1, start_change_index))]
+    try:
+        gevent.joinall(greenlets, raise_error=True)
+    finally:
+        gevent.killall(greenlets)
+
+    return greenlets[0].value + greenlets[1].value
 
 
 class XpubManager:
@@ -185,17 +213,42 @@ class XpubManager:
 
         Should be called with the lock acquired
 
+        May raise:
+        - RemoteError: if blockstream/blockchain.info/haskoin and others can't be reached
+        """
+        self._save_xpub_addresses(
+            xpub_data=xpub_data,
+            derived_addresses_data=self._query_xpub_addresses(xpub_data),
+            new_xpub=new_xpub,
+        )
+
+    def _query_xpub_addresses(self, xpub_data: XpubData) -> list[XpubDerivedAddressData]:
+        """Derives the xpub addresses after the ones already known and checks which were used
+
         May raise:
         - RemoteError: if blockstream/blockchain.info/haskoin and others can't be reached
         """
         with self.db.conn.read_ctx() as cursor:
             last_receiving_idx, last_change_idx = self.db.get_last_consecutive_xpub_derived_indices(cursor, xpub_data)  # noqa: E501
-            derived_addresses_data = _derive_addresses_from_xpub_data(
-                xpub_data=xpub_data,
-                start_receiving_index=last_receiving_idx,
-                start_change_index=last_change_idx,
-                gap_limit=self.chains_aggregator.btc_derivation_gap_limit,
-            )
+
+        return _derive_addresses_from_xpub_data(
+            xpub_data=xpub_data,
+            start_receiving_index=last_receiving_idx,
+            start_change_index=last_change_idx,
+            gap_limit=self.chains_aggregator.btc_derivation_gap_limit,
+        )
+
+    def _save_xpub_addresses(
+            self,
+            xpub_data: XpubData,
+            derived_addresses_data: list[XpubDerivedAddressData],
+            new_xpub: bool,
+    ) -> None:
+        """Adds the derived addresses to the tracked accounts and their balances
+
+        Should be called with the lock acquired
+        """
+        with self.db.conn.read_ctx() as cursor:
             known_addresses = getattr(self.db.get_blockchain_accounts(cursor), xpub_data.blockchain.get_key())  # noqa: E501
 
         new_addresses = []
@@ -312,14 +365,26 @@ class XpubManager:
     ) -> None:
         """Checks all xpub addresses and sees if new addresses got used.
         If they did it adds them for tracking.
+
+        All xpubs are queried concurrently and the results are saved one by one.
         """
         log.debug(f'Starting task for derivation of new {blockchain!s} xpub addresses')
         with self.db.conn.read_ctx() as cursor:
             xpubs = self.db.get_bitcoin_xpub_data(cursor, blockchain)
         with self.lock:
-            for xpub_data in xpubs:
+            greenlets = [gevent.spawn(self._query_xpub_addresses, x) for x in xpubs]
+            try:
+                gevent.joinall(greenlets)
+            finally:
+                gevent.killall(greenlets)
+
+            for xpub_data, greenlet in zip(xpubs, greenlets, strict=True):
                 try:
-                    self._derive_xpub_addresses(xpub_data, new_xpub=False)
+                    self._save_xpub_addresses(
+                        xpub_data=xpub_data,
+                        derived_addresses_data=greenlet.get(),
+                        new_xpub=False,
+                    )
                 except RemoteError as e:
                     log.warning(
                         f'Failed to derive new xpub addresses from xpub: {xpub_data.xpub.xpub} '
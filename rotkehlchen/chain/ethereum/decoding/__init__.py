@@ -1 +0,0 @@
-from .decoder import EthereumTransactionDecoder  # noqa: F401
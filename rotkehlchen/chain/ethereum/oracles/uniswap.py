@@ -2,7 +2,7 @@ import abc
 import logging
 from functools import reduce
 from operator import mul
-from typing import TYPE_CHECKING, NamedTuple, Optional
+from typing import TYPE_CHECKING, Literal, NamedTuple, Optional
 
 from eth_utils import to_checksum_address
 from web3.types import BlockIdentifier
@@ -16,26 +16,46 @@ from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_DAI, A_ETH, A_USD, A_USDC, A_USDT, A_WETH
 from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
+from rotkehlchen.constants.timing import WEEK_IN_SECONDS
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.defi import DefiPoolError
 from rotkehlchen.errors.price import PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.cache import (
+    compute_cache_key,
+    globaldb_get_unique_cache_values_and_ts,
+    globaldb_set_unique_cache_values,
+)
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.interfaces import CurrentPriceOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.types import ChecksumEvmAddress, EvmTokenKind, Price
-from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
+from rotkehlchen.types import CacheType, ChecksumEvmAddress, EvmTokenKind, Price
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
 
 UNISWAP_FACTORY_DEPLOYED_BLOCK = 12369621
 SINGLE_SIDE_USD_POOL_LIMIT = 5000
+UNISWAP_V3_FEE_TIERS = (3000, 500, 10000)
+UNISWAP_POOLS_CACHE_TTL = WEEK_IN_SECONDS
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 
+def _pair_key(
+        token_0: EvmToken,
+        token_1: EvmToken,
+) -> tuple[ChecksumEvmAddress, ChecksumEvmAddress]:
+    """Key of a pair of tokens in the pools graph. Pools don't depend on the order of the
+    tokens, so the addresses are sorted"""
+    if token_0.evm_address.lower() <= token_1.evm_address.lower():
+        return token_0.evm_address, token_1.evm_address
+    return token_1.evm_address, token_0.evm_address
+
+
 class PoolPrice(NamedTuple):
     price: FVal
     token_0: EvmToken
@@ -49,12 +69,13 @@ class PoolPrice(NamedTuple):
         )
 
 
-class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
+class UniswapOracle(CurrentPriceOracleInterface):
     """
     Provides shared logic between Uniswap V2 and Uniswap V3 to use them as price oracles.
     """
+    pools_cache_type: Literal[CacheType.UNISWAP_V2_POOL, CacheType.UNISWAP_V3_POOL]
+
     def __init__(self, ethereum_inquirer: 'EthereumInquirer', version: int):
-        CacheableMixIn.__init__(self)
         CurrentPriceOracleInterface.__init__(self, oracle_name=f'Uniswap V{version} oracle')
         self.ethereum = ethereum_inquirer
         self.weth = A_WETH.resolve_to_evm_token()
@@ -71,113 +92,181 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         return False
 
     @abc.abstractmethod
-    def get_pool(
+    def query_pools(
             self,
-            token_0: EvmToken,
-            token_1: EvmToken,
-    ) -> list[str]:
-        """Given two tokens returns a list of pools where they can be swapped"""
+            pairs: list[tuple[EvmToken, EvmToken]],
+    ) -> list[Optional[ChecksumEvmAddress]]:
+        """Queries the chain for the pool to use for each of the given pairs of tokens,
+        batching the calls. Returns None for the pairs with no usable pool.
+
+        May raise:
+        - RemoteError
+        """
 
     @abc.abstractmethod
-    def get_pool_price(
+    def _pool_price_calls(
             self,
             pool_addr: ChecksumEvmAddress,
-            block_identifier: BlockIdentifier = 'latest',
-    ) -> PoolPrice:
-        """Returns the price for the tokens in the given pool and the token0 and
-        token1 of the pool.
+    ) -> tuple[EvmContract, list[tuple[ChecksumEvmAddress, str]]]:
+        """Returns the pool contract and the calls needed to get the price of the pool.
+        The calls are always slot0/getReserves, token0 and token1"""
+
+    @abc.abstractmethod
+    def _decode_pool_price(self, pool_contract: EvmContract, output: list[bytes]) -> PoolPrice:
+        """Decodes the output of the `_pool_price_calls` calls of a pool
+
         May raise:
         - DefiPoolError
         """
 
-    def _find_pool_for(
+    def get_pools(
             self,
-            asset: EvmToken,
-            link_asset: EvmToken,
-            path: list[str],
-    ) -> bool:
-        pools = self.get_pool(asset, link_asset)
-        for pool in pools:
-            if pool != ZERO_ADDRESS:
-                path.append(pool)
-                return True
+            pairs: list[tuple[EvmToken, EvmToken]],
+    ) -> dict[tuple[ChecksumEvmAddress, ChecksumEvmAddress], Optional[ChecksumEvmAddress]]:
+        """Returns the pool to use for each of the given pairs of tokens or None if there
+        is no usable pool, keyed by the sorted addresses of the pair.
 
-        return False
+        The pools graph is kept in the global DB cache. Only the pairs missing from it or
+        queried more than UNISWAP_POOLS_CACHE_TTL ago are queried from the chain, together.
+
+        May raise:
+        - RemoteError
+        """
+        pairs_by_key: dict[tuple[ChecksumEvmAddress, ChecksumEvmAddress], tuple[EvmToken, EvmToken]] = {}  # noqa: E501
+        for token_0, token_1 in pairs:
+            pairs_by_key[_pair_key(token_0, token_1)] = (token_0, token_1)
+
+        pools: dict[tuple[ChecksumEvmAddress, ChecksumEvmAddress], Optional[ChecksumEvmAddress]] = {}  # noqa: E501
+        now = ts_now()
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            cached_pools = globaldb_get_unique_cache_values_and_ts(
+                cursor=cursor,
+                keys_parts=[(self.pools_cache_type, *key) for key in pairs_by_key],
+            )
+        for key in pairs_by_key:
+            cached_entry = cached_pools.get(compute_cache_key((self.pools_cache_type, *key)))
+            if cached_entry is not None and now - cached_entry[1] <= UNISWAP_POOLS_CACHE_TTL:
+                pools[key] = None if cached_entry[0] == ZERO_ADDRESS else string_to_evm_address(cached_entry[0])  # noqa: E501
+
+        if len(missing_keys := [key for key in pairs_by_key if key not in pools]) == 0:
+            return pools
+
+        log.debug(f'Querying {len(missing_keys)} pools from {self.name} factory')
+        queried_pools = self.query_pools([pairs_by_key[key] for key in missing_keys])
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            globaldb_set_unique_cache_values(
+                write_cursor=write_cursor,
+                entries=[
+                    ((self.pools_cache_type, *key), ZERO_ADDRESS if pool is None else pool)
+                    for key, pool in zip(missing_keys, queried_pools)
+                ],
+            )
+        pools.update(zip(missing_keys, queried_pools))
+        return pools
+
+    def get_pool(
+            self,
+            token_0: EvmToken,
+            token_1: EvmToken,
+    ) -> list[str]:
+        """Given two tokens returns a list of pools where they can be swapped"""
+        pool = self.get_pools([(token_0, token_1)])[_pair_key(token_0, token_1)]
+        return [] if pool is None else [pool]
 
     def find_route(self, from_asset: EvmToken, to_asset: EvmToken) -> list[str]:
         """
         Calculate the path needed to go from from_asset to to_asset and return a
         list of the pools needed to jump through to do that.
-        """
-        output: list[str] = []
-        # If any of the assets is in the glue assets let's see if we find any path
-        # (avoids iterating the list of glue assets)
-        if any(x in self.routing_assets for x in (to_asset, from_asset)):
-            output = []
-            found_path = self._find_pool_for(
-                asset=from_asset,
-                link_asset=to_asset,
-                path=output,
-            )
-            if found_path:
-                return output
 
+        The pools between the two assets and the routing assets are all read from the
+        pools graph in one go and the shortest path is picked. Paths through routing
+        assets that come first in `routing_assets` are preferred.
+        A direct pool is only used if one of the assets is a routing asset.
+        """
         if from_asset == to_asset:
             return []
 
-        # Try to find one asset that can be used between from_asset and to_asset
-        # from_asset < first link > glue asset < second link > to_asset
-        link_asset = None
-        found_first_link, found_second_link = False, False
-        for asset in self.routing_assets:
-            if asset != from_asset:
-                found_first_link = self._find_pool_for(
-                    asset=from_asset,
-                    link_asset=asset,
-                    path=output,
-                )
-                if found_first_link:
-                    link_asset = asset
-                    found_second_link = self._find_pool_for(
-                        asset=to_asset,
-                        link_asset=link_asset,
-                        path=output,
-                    )
-                    if found_second_link:
-                        return output
-
-        if not found_first_link:
-            return []
+        links = [x for x in self.routing_assets if x not in (from_asset, to_asset)]
+        is_direct_allowed = any(x in self.routing_assets for x in (to_asset, from_asset))
+        pairs = [(from_asset, to_asset)] if is_direct_allowed else []
+        pairs += [(asset, link) for asset in (from_asset, to_asset) for link in links]
+        pairs += [
+            (links[i], links[j])
+            for i in range(len(links))
+            for j in range(i + 1, len(links))
+        ]
+        pools = self.get_pools(pairs)
 
-        # if we reach this point it means that we need 2 more jumps
-        # from asset <1st link> glue asset A <2nd link> glue asset B <3rd link> to asset
-        # find now the part for glue asset B <3rd link> to asset
-        second_link_asset = None
-        for asset in self.routing_assets:
-            if asset != to_asset:
-                found_second_link = self._find_pool_for(
-                    asset=to_asset,
-                    link_asset=asset,
-                    path=output,
-                )
-                if found_second_link:
-                    second_link_asset = asset
-                    break
-
-        if not found_second_link:
-            return []
+        def pool_for(token_0: EvmToken, token_1: EvmToken) -> Optional[ChecksumEvmAddress]:
+            return pools.get(_pair_key(token_0, token_1))
+
+        # from asset <> to asset
+        if is_direct_allowed and (pool := pool_for(from_asset, to_asset)) is not None:
+            return [pool]
 
-        # finally find the step of glue asset A <2nd link> glue asset B
-        assert second_link_asset is not None
-        assert link_asset is not None
-        pools = self.get_pool(link_asset, second_link_asset)
-        for pool in pools:
-            if pool != ZERO_ADDRESS:
-                output.insert(1, pool)
-                return output
+        # from asset <1st link> glue asset <2nd link> to asset
+        for link in links:
+            if (
+                (first_pool := pool_for(from_asset, link)) is not None and
+                (second_pool := pool_for(link, to_asset)) is not None
+            ):
+                return [first_pool, second_pool]
+
+        # from asset <1st link> glue asset A <2nd link> glue asset B <3rd link> to asset
+        for link_a in links:
+            if (first_pool := pool_for(from_asset, link_a)) is None:
+                continue
+            for link_b in links:
+                if (
+                    link_b != link_a and
+                    (second_pool := pool_for(link_a, link_b)) is not None and
+                    (third_pool := pool_for(link_b, to_asset)) is not None
+                ):
+                    return [first_pool, second_pool, third_pool]
 
         return []
 
+    def get_pools_prices(
+            self,
+            pool_addrs: list[ChecksumEvmAddress],
+            block_identifier: BlockIdentifier = 'latest',
+    ) -> list[PoolPrice]:
+        """Returns the prices of the given pools, reading the state of all of them
+        in a single multicall.
+
+        May raise:
+        - DefiPoolError
+        - RemoteError
+        """
+        contracts_and_calls = [self._pool_price_calls(pool_addr) for pool_addr in pool_addrs]
+        output = self.ethereum.multicall(
+            calls=[call for _, calls in contracts_and_calls for call in calls],
+            require_success=True,
+            block_identifier=block_identifier,
+        )
+        prices, start = [], 0
+        for pool_contract, calls in contracts_and_calls:
+            prices.append(self._decode_pool_price(
+                pool_contract=pool_contract,
+                output=output[start:start + len(calls)],
+            ))
+            start += len(calls)
+
+        return prices
+
+    def get_pool_price(
+            self,
+            pool_addr: ChecksumEvmAddress,
+            block_identifier: BlockIdentifier = 'latest',
+    ) -> PoolPrice:
+        """Returns the price for the tokens in the given pool and the token0 and
+        token1 of the pool.
+        May raise:
+        - DefiPoolError
+        - RemoteError
+        """
+        return self.get_pools_prices(pool_addrs=[pool_addr], block_identifier=block_identifier)[0]
+
     def get_price(
             self,
             from_asset: AssetWithOracles,
@@ -221,15 +310,11 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
             return ZERO_PRICE
         log.debug(f'Found price route {route} for {from_token} to {to_token} using {self.name}')
 
-        prices_and_tokens = []
-        for step in route:
-            log.debug(f'Getting pool price for {step}')
-            prices_and_tokens.append(
-                self.get_pool_price(
-                    pool_addr=to_checksum_address(step),
-                    block_identifier=block_identifier,
-                ),
-            )
+        log.debug(f'Getting pool prices for {route}')
+        prices_and_tokens = self.get_pools_prices(
+            pool_addrs=[to_checksum_address(step) for step in route],
+            block_identifier=block_identifier,
+        )
 
         # Looking at which one is token0 and token1 we need to see if we need price or 1/price
         if prices_and_tokens[0].token_0 != from_token:
@@ -277,18 +362,18 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
 
 
 class UniswapV3Oracle(UniswapOracle):
+    pools_cache_type = CacheType.UNISWAP_V3_POOL
 
     def __init__(self, ethereum_inquirer: 'EthereumInquirer'):
         super().__init__(ethereum_inquirer=ethereum_inquirer, version=3)
         self.uniswap_v3_pool_abi = self.ethereum.contracts.abi('UNISWAP_V3_POOL')
         self.uniswap_v3_factory = self.ethereum.contracts.contract(string_to_evm_address('0x1F98431c8aD98523631AE4a59f267346ea31F984'))  # noqa: E501
 
-    @cache_response_timewise()
-    def get_pool(
+    def query_pools(
             self,
-            token_0: EvmToken,
-            token_1: EvmToken,
-    ) -> list[str]:
+            pairs: list[tuple[EvmToken, EvmToken]],
+    ) -> list[Optional[ChecksumEvmAddress]]:
+        """For each pair returns the pool with the highest liquidity among the fee tiers"""
         result = self.ethereum.multicall_specific(
             contract=self.uniswap_v3_factory,
             method_name='getPool',
@@ -296,52 +381,51 @@ class UniswapV3Oracle(UniswapOracle):
                 token_0.evm_address,
                 token_1.evm_address,
                 fee,
-            ] for fee in (3000, 500, 10000)],
+            ] for token_0, token_1 in pairs for fee in UNISWAP_V3_FEE_TIERS],
         )
+        pools_addresses = [
+            None if query[0] == ZERO_ADDRESS else to_checksum_address(query[0])
+            for query in result
+        ]
 
         # get liquidity for each pool and choose the pool with the highest liquidity
-        best_pool, max_liquidity = to_checksum_address(result[0][0]), 0
-        for query in result:
-            if query[0] == ZERO_ADDRESS:
-                continue
-            pool_address = to_checksum_address(query[0])
-            pool_contract = EvmContract(
-                address=pool_address,
-                abi=self.uniswap_v3_pool_abi,
-                deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
-            )
-            pool_liquidity = pool_contract.call(
-                node_inquirer=self.ethereum,
-                method_name='liquidity',
-                arguments=[],
-                call_order=None,
-            )
-            if pool_liquidity > max_liquidity:
-                best_pool = pool_address
-                max_liquidity = pool_liquidity
-
-        if max_liquidity == 0:
+        pool_contract = EvmContract(
+            address=ZERO_ADDRESS,  # only used to encode and decode calls
+            abi=self.uniswap_v3_pool_abi,
+            deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
+        )
+        existing_pools = [x for x in pools_addresses if x is not None]
+        liquidity_output = self.ethereum.multicall(
+            calls=[(x, pool_contract.encode(method_name='liquidity')) for x in existing_pools],
+            require_success=True,
+        ) if len(existing_pools) != 0 else []
+        liquidities = {
+            pool_address: pool_contract.decode(output, 'liquidity')[0]
+            for pool_address, output in zip(existing_pools, liquidity_output)
+        }
+
+        pools: list[Optional[ChecksumEvmAddress]] = []
+        for idx in range(0, len(pools_addresses), len(UNISWAP_V3_FEE_TIERS)):
+            best_pool, max_liquidity = None, 0
+            for pool_address in pools_addresses[idx:idx + len(UNISWAP_V3_FEE_TIERS)]:
+                if pool_address is not None and liquidities[pool_address] > max_liquidity:
+                    best_pool = pool_address
+                    max_liquidity = liquidities[pool_address]
             # if there is no pool with assets don't return any pool
-            return []
-        return [best_pool]
+            pools.append(best_pool)
 
-    def get_pool_price(
+        return pools
+
+    def _pool_price_calls(
             self,
             pool_addr: ChecksumEvmAddress,
-            block_identifier: BlockIdentifier = 'latest',
-    ) -> PoolPrice:
-        """
-        Returns the units of token1 that one token0 can buy
-
-        May raise:
-        - DefiPoolError
-        """
+    ) -> tuple[EvmContract, list[tuple[ChecksumEvmAddress, str]]]:
         pool_contract = EvmContract(
             address=pool_addr,
             abi=self.uniswap_v3_pool_abi,
             deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
         )
-        calls = [
+        return pool_contract, [
             (
                 pool_contract.address,
                 pool_contract.encode(method_name='slot0'),
@@ -353,11 +437,14 @@ class UniswapV3Oracle(UniswapOracle):
                 pool_contract.encode(method_name='token1'),
             ),
         ]
-        output = self.ethereum.multicall(
-            calls=calls,
-            require_success=True,
-            block_identifier=block_identifier,
-        )
+
+    def _decode_pool_price(self, pool_contract: EvmContract, output: list[bytes]) -> PoolPrice:
+        """
+        Returns the units of token1 that one token0 can buy
+
+        May raise:
+        - DefiPoolError
+        """
         token_0 = EvmToken(
             ethaddress_to_identifier(to_checksum_address(pool_contract.decode(output[1], 'token0')[0])),  # noqa: E501 pylint:disable=unsubscriptable-object
         )
@@ -381,45 +468,40 @@ class UniswapV3Oracle(UniswapOracle):
 
 
 class UniswapV2Oracle(UniswapOracle):
+    pools_cache_type = CacheType.UNISWAP_V2_POOL
 
     def __init__(self, ethereum_inquirer: 'EthereumInquirer'):
         super().__init__(ethereum_inquirer=ethereum_inquirer, version=3)
         self.uniswap_v2_lp_abi = self.ethereum.contracts.abi('UNISWAP_V2_LP')
         self.uniswap_v2_factory = self.ethereum.contracts.contract(string_to_evm_address('0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f'))  # noqa: E501
 
-    @cache_response_timewise()
-    def get_pool(
+    def query_pools(
             self,
-            token_0: EvmToken,
-            token_1: EvmToken,
-    ) -> list[str]:
-        result = self.uniswap_v2_factory.call(
-            node_inquirer=self.ethereum,
+            pairs: list[tuple[EvmToken, EvmToken]],
+    ) -> list[Optional[ChecksumEvmAddress]]:
+        result = self.ethereum.multicall_specific(
+            contract=self.uniswap_v2_factory,
             method_name='getPair',
-            arguments=[
+            arguments=[[
                 token_0.evm_address,
                 token_1.evm_address,
-            ],
+            ] for token_0, token_1 in pairs],
         )
-        return [result]
+        return [
+            None if query[0] == ZERO_ADDRESS else to_checksum_address(query[0])
+            for query in result
+        ]
 
-    def get_pool_price(
+    def _pool_price_calls(
             self,
             pool_addr: ChecksumEvmAddress,
-            block_identifier: BlockIdentifier = 'latest',
-    ) -> PoolPrice:
-        """
-        Returns the units of token1 that one token0 can buy
-
-        May raise:
-        - DefiPoolError
-        """
+    ) -> tuple[EvmContract, list[tuple[ChecksumEvmAddress, str]]]:
         pool_contract = EvmContract(
             address=pool_addr,
             abi=self.uniswap_v2_lp_abi,
             deployed_block=10000835,  # Factory deployment block
         )
-        calls = [
+        return pool_contract, [
             (
                 pool_contract.address,
                 pool_contract.encode(method_name='getReserves'),
@@ -431,12 +513,14 @@ class UniswapV2Oracle(UniswapOracle):
                 pool_contract.encode(method_name='token1'),
             ),
         ]
-        output = self.ethereum.multicall(
-            calls=calls,
-            require_success=True,
-            block_identifier=block_identifier,
-        )
 
+    def _decode_pool_price(self, pool_contract: EvmContract, output: list[bytes]) -> PoolPrice:
+        """
+        Returns the units of token1 that one token0 can buy
+
+        May raise:
+        - DefiPoolError
+        """
         token_0_address = pool_contract.decode(output[1], 'token0')[0]  # pylint:disable=unsubscriptable-object
         token_1_address = pool_contract.decode(output[2], 'token1')[0]  # pylint:disable=unsubscriptable-object
 
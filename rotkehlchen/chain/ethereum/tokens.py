@@ -75,7 +75,4 @@ class EthereumTokens(EvmTokensWithDSProxy):
         tokens_for_proxies: list[EvmToken] = list(self.tokens_for_proxies_set | ilk_collaterals)  # type: ignore[operator]
         proxies_mapping = self.evm_inquirer.proxies_inquirer.get_accounts_having_proxy()
         proxies_to_use = {k: v for k, v in proxies_mapping.items() if k in addresses}
-        self._detect_tokens(
-            addresses=list(proxies_to_use.values()),
-            tokens_to_check=tokens_for_proxies,
-        )
+        self._detect_tokens({proxy: tokens_for_proxies for proxy in proxies_to_use.values()})
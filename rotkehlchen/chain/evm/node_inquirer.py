@@ -299,10 +299,19 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             ordered_list = [WeightedNode(node_info=node, weight=ONE, active=True) for node in owned_nodes] + ordered_list  # noqa: E501
         return ordered_list
 
+    def archive_call_order(self) -> list[WeightedNode]:
+        """The default call order limited to the connected archive nodes, which are the ones
+        that can be queried for the state of the chain at any past block"""
+        return [
+            x for x in self.default_call_order(skip_etherscan=True)
+            if (web3node := self.web3_mapping.get(x.node_info)) is not None and web3node.is_archive
+        ]
+
     def get_multi_balance(
             self,
             accounts: Sequence[ChecksumEvmAddress],
             call_order: Optional[Sequence[WeightedNode]] = None,
+            block_identifier: BlockIdentifier = 'latest',
     ) -> dict[ChecksumEvmAddress, FVal]:
         """Returns a dict with keys being accounts and balances in the chain native token.
 
@@ -320,6 +329,7 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             method_name='etherBalances',
             arguments=[accounts],
             call_order=call_order if call_order is not None else self.default_call_order(),
+            block_identifier=block_identifier,
         )
         balances = {}
         for idx, account in enumerate(accounts):
@@ -1,10 +1,10 @@
 import dataclasses
 from typing import NamedTuple, Optional
 
-from rotkehlchen.assets.asset import Asset
+from rotkehlchen.assets.asset import Asset, EvmToken
 from rotkehlchen.constants import ZERO
 from rotkehlchen.fval import FVal
-from rotkehlchen.types import ChainID, ChecksumEvmAddress, EVMTxHash
+from rotkehlchen.types import ChainID, ChecksumEvmAddress, EVMTxHash, Timestamp
 
 
 @dataclasses.dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
@@ -33,3 +33,12 @@ class SwapData(NamedTuple):
     to_asset: Asset
     to_amount: FVal
     fee_amount: FVal = ZERO
+
+
+class AddressBalancesAtBlock(NamedTuple):
+    """The balances of an evm address with all the calls pinned to the same block"""
+    block_number: int
+    queried_ts: Timestamp
+    native_balance: FVal
+    tokens: frozenset[EvmToken]  # the tokens whose balances were queried
+    token_balances: dict[EvmToken, FVal]
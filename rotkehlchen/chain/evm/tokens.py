@@ -1,22 +1,47 @@
+import json
 import logging
+import time
 from abc import ABCMeta, abstractmethod
-from collections import defaultdict
-from collections.abc import Sequence
+from collections import defaultdict, deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Optional
 
-from rotkehlchen.assets.asset import EvmToken
+import gevent
+from web3.types import BlockIdentifier
+
+from rotkehlchen.assets.asset import Asset, EvmToken
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
-from rotkehlchen.chain.evm.types import WeightedNode, asset_id_is_evm_token
+from rotkehlchen.chain.evm.types import NodeName, WeightedNode, asset_id_is_evm_token
+from rotkehlchen.constants import ZERO
+from rotkehlchen.constants.resolver import evm_address_to_identifier
+from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.cache import (
+    compute_cache_key,
+    globaldb_get_unique_cache_values_and_ts,
+    globaldb_set_unique_cache_values,
+)
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.types import ChecksumEvmAddress, Price, Timestamp
+from rotkehlchen.types import (
+    SPAM_PROTOCOL,
+    CacheType,
+    ChecksumEvmAddress,
+    EvmTokenKind,
+    Price,
+    SupportedBlockchain,
+    Timestamp,
+)
 from rotkehlchen.utils.misc import combine_dicts, get_chunks
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.evm.node_inquirer import EvmNodeInquirerWithDSProxy
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
 
     from .node_inquirer import EvmNodeInquirer
 
@@ -98,6 +123,92 @@ def generate_multicall_chunks(
     return multicall_chunks
 
 
+# The chunk length of the token balance queries sent to each web3 node starts from
+# OTHER_MAX_TOKEN_CHUNK_LENGTH and is then adapted to what the node can handle. A node that
+# fails a chunk, which happens when it is over the node's gas or response size limit,
+# gets its chunk length halved. A node that answers a full chunk quickly gets it increased.
+TOKEN_CHUNK_MIN_LENGTH = 20
+TOKEN_CHUNK_MAX_LENGTH = OTHER_MAX_TOKEN_CHUNK_LENGTH * 4
+TOKEN_CHUNK_TARGET_SECS = 4.0  # calls slower than this shrink the chunk length
+
+TokenChunk = list[tuple[ChecksumEvmAddress, list[EvmToken]]]
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class NodeChunkStats:
+    """How many arguments a token balances call to a node can have and how it fared so far"""
+    chunk_length: int = OTHER_MAX_TOKEN_CHUNK_LENGTH
+    avg_secs: float = 0.0  # moving average of the duration of successful calls
+    successes: int = 0
+    failures: int = 0
+    # The chunk length as set by the last successful call, which is the one that is saved.
+    # Failures may be due to the node being down so what they teach is only kept in memory.
+    learned_length: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.learned_length is None:
+            self.learned_length = self.chunk_length
+
+    def record_success(self, length: int, secs: float) -> None:
+        self.successes += 1
+        self.avg_secs = secs if self.successes == 1 else 0.8 * self.avg_secs + 0.2 * secs
+        if secs > TOKEN_CHUNK_TARGET_SECS:
+            self.chunk_length = max(TOKEN_CHUNK_MIN_LENGTH, self.chunk_length * 3 // 4)
+        # only a full chunk shows that more would fit. Since the arguments of an address
+        # are not split, a full multicall chunk can be that many arguments short
+        elif length + PURE_TOKENS_BALANCE_ARGUMENTS >= self.chunk_length:
+            self.chunk_length = min(TOKEN_CHUNK_MAX_LENGTH, self.chunk_length * 5 // 4)
+        self.learned_length = self.chunk_length
+
+    def record_failure(self, length: int) -> None:
+        self.failures += 1
+        self.chunk_length = max(TOKEN_CHUNK_MIN_LENGTH, min(self.chunk_length, length) // 2)
+
+    def serialize(self) -> str:
+        return json.dumps([self.learned_length, self.avg_secs, self.successes, self.failures])
+
+    @classmethod
+    def deserialize(cls: type['NodeChunkStats'], value: str) -> 'NodeChunkStats':
+        """May raise:
+        - ValueError, TypeError if the value is not a stats entry
+        """
+        chunk_length, avg_secs, successes, failures = json.loads(value)
+        return cls(
+            chunk_length=min(TOKEN_CHUNK_MAX_LENGTH, max(TOKEN_CHUNK_MIN_LENGTH, int(chunk_length))),  # noqa: E501
+            avg_secs=float(avg_secs),
+            successes=int(successes),
+            failures=int(failures),
+        )
+
+
+def _node_chunk_stats_key_parts(
+        blockchain: SupportedBlockchain,
+        node: NodeName,
+) -> tuple[CacheType, str]:
+    return CacheType.EVM_NODE_CHUNK_STATS, json.dumps([blockchain.value, node.name, node.endpoint])  # noqa: E501
+
+
+def take_token_chunk(
+        pending: deque[tuple[ChecksumEvmAddress, list[EvmToken]]],
+        chunk_length: int,
+        address_arguments: int,
+) -> TokenChunk:
+    """Takes from the start of pending the address -> tokens entries that fit in a call
+    of chunk_length arguments, splitting the tokens of the last address if needed.
+    Each address of the chunk also takes address_arguments arguments."""
+    chunk: TokenChunk = []
+    free_space = chunk_length
+    while len(pending) != 0 and free_space > address_arguments:
+        address, tokens = pending.popleft()
+        free_space -= address_arguments
+        if len(tokens) > free_space:
+            pending.appendleft((address, tokens[free_space:]))
+            tokens = tokens[:free_space]
+        chunk.append((address, tokens))
+        free_space -= len(tokens)
+    return chunk
+
+
 def get_chunk_size_call_order(evm_inquirer: 'EvmNodeInquirer') -> tuple[int, list[WeightedNode]]:
     """
     Return the max number of tokens that can be queried in a single call depending on whether we
@@ -123,6 +234,7 @@ class EvmTokens(metaclass=ABCMeta):
     ):
         self.db = database
         self.evm_inquirer = evm_inquirer
+        self.nodes_chunk_stats: dict[NodeName, NodeChunkStats] = {}
 
     def get_token_balances(
             self,
@@ -166,6 +278,7 @@ class EvmTokens(metaclass=ABCMeta):
             self,
             chunk: list[tuple[ChecksumEvmAddress, list[EvmToken]]],
             call_order: Optional[Sequence['WeightedNode']] = None,
+            block_identifier: BlockIdentifier = 'latest',
     ) -> dict[ChecksumEvmAddress, dict[EvmToken, FVal]]:
         """Gets token balances from a chunk of address -> token address
 
@@ -187,6 +300,7 @@ class EvmTokens(metaclass=ABCMeta):
         results = self.evm_inquirer.multicall(
             calls=calls,
             call_order=call_order,
+            block_identifier=block_identifier,
         )
         balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]] = defaultdict(lambda: defaultdict(FVal))  # noqa: E501
         for (address, tokens), result in zip(chunk, results):
@@ -209,21 +323,140 @@ class EvmTokens(metaclass=ABCMeta):
 
     def _query_chunks(
             self,
-            address: ChecksumEvmAddress,
-            tokens: list[EvmToken],
+            addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]],
             chunk_size: int,
             call_order: list[WeightedNode],
-    ) -> dict[EvmToken, FVal]:
-        total_token_balances: dict[EvmToken, FVal] = defaultdict(FVal)
-        chunks = get_chunks(tokens, n=chunk_size)
-        for chunk in chunks:
-            new_token_balances = self.get_token_balances(
-                address=address,
-                tokens=chunk,
+    ) -> dict[ChecksumEvmAddress, dict[EvmToken, FVal]]:
+        if self.evm_inquirer.connected_to_any_web3():
+            return self._query_adaptive_chunks(
+                addresses_to_tokens=addresses_to_tokens,
+                address_arguments=0,
+                query_chunk=lambda chunk, order: {
+                    chunk_address: self.get_token_balances(
+                        address=chunk_address,
+                        tokens=chunk_tokens,
+                        call_order=order,
+                    ) for chunk_address, chunk_tokens in chunk
+                },
                 call_order=call_order,
             )
-            total_token_balances = combine_dicts(total_token_balances, new_token_balances)
-        return total_token_balances
+
+        balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]] = {}
+        for address, tokens in addresses_to_tokens.items():
+            total_token_balances: dict[EvmToken, FVal] = defaultdict(FVal)
+            for chunk in get_chunks(tokens, n=chunk_size):
+                new_token_balances = self.get_token_balances(
+                    address=address,
+                    tokens=chunk,
+                    call_order=call_order,
+                )
+                total_token_balances = combine_dicts(total_token_balances, new_token_balances)
+            balances[address] = total_token_balances
+        return balances
+
+    def _get_nodes_chunk_stats(self, nodes: Sequence[NodeName]) -> list[NodeChunkStats]:
+        """Returns the chunk stats of the given nodes, reading the ones tuned during
+        previous runs from the global DB the first time a node is seen"""
+        blockchain = self.evm_inquirer.blockchain
+        if len(missing := [x for x in nodes if x not in self.nodes_chunk_stats]) != 0:
+            with GlobalDBHandler().conn.read_ctx() as cursor:
+                saved = globaldb_get_unique_cache_values_and_ts(
+                    cursor=cursor,
+                    keys_parts=[_node_chunk_stats_key_parts(blockchain, x) for x in missing],
+                )
+            for node in missing:
+                stats = NodeChunkStats()
+                if (entry := saved.get(compute_cache_key(_node_chunk_stats_key_parts(blockchain, node)))) is not None:  # noqa: E501
+                    try:
+                        stats = NodeChunkStats.deserialize(entry[0])
+                    except (ValueError, TypeError) as e:
+                        log.error(f'Ignoring invalid saved chunk stats {entry[0]} of {node}: {e!s}')  # noqa: E501
+                self.nodes_chunk_stats[node] = stats
+
+        return [self.nodes_chunk_stats[x] for x in nodes]
+
+    def _save_nodes_chunk_stats(self, nodes: Sequence[NodeName]) -> None:
+        """Stores the chunk stats of the given nodes so the next run starts from them"""
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            globaldb_set_unique_cache_values(
+                write_cursor=write_cursor,
+                entries=[(
+                    _node_chunk_stats_key_parts(self.evm_inquirer.blockchain, node),
+                    self.nodes_chunk_stats[node].serialize(),
+                ) for node in nodes],
+            )
+
+    def _query_adaptive_chunks(
+            self,
+            addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]],
+            address_arguments: int,
+            query_chunk: Callable[[TokenChunk, Sequence[WeightedNode]], dict[ChecksumEvmAddress, dict[EvmToken, FVal]]],  # noqa: E501
+            call_order: Sequence[WeightedNode],
+    ) -> dict[ChecksumEvmAddress, dict[EvmToken, FVal]]:
+        """Queries the token balances of the addresses with one greenlet per connected
+        web3 node of the call order. Each one repeatedly takes a chunk sized for its node
+        from the pending tokens and queries it only at that node. If an own node is
+        connected only own nodes are used, so that the addresses and their tokens are
+        not sent to public nodes unless the own nodes fail.
+
+        A chunk that fails is put back to be taken again and the node's chunk length
+        is halved. A node that fails a chunk of the minimum length is not used further
+        and if no node is left the rest is queried with the whole call order.
+
+        May raise:
+        - RemoteError if the chunks left after all nodes failed can't be queried
+        - BadFunctionCallOutput if a local node is used and the contract for the
+          token has no code. That means the chain is not synced
+        """
+        pending = deque((address, tokens) for address, tokens in addresses_to_tokens.items() if len(tokens) != 0)  # noqa: E501
+        nodes = [x for x in call_order if x.node_info in self.evm_inquirer.web3_mapping]
+        if any(x.node_info.owned for x in nodes):
+            nodes = [x for x in nodes if x.node_info.owned]
+        nodes_stats = self._get_nodes_chunk_stats([x.node_info for x in nodes])
+        balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]] = defaultdict(lambda: defaultdict(FVal))  # noqa: E501
+
+        def add_balances(new_balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]]) -> None:
+            for address, token_balances in new_balances.items():
+                for token, balance in token_balances.items():
+                    balances[address][token] += balance
+
+        def query_at_node(node: WeightedNode, stats: NodeChunkStats) -> None:
+            while len(chunk := take_token_chunk(pending, stats.chunk_length, address_arguments)) != 0:  # noqa: E501
+                length = sum(len(tokens) + address_arguments for _, tokens in chunk)
+                start = time.monotonic()
+                try:
+                    new_balances = query_chunk(chunk, [node])
+                except RemoteError as e:
+                    pending.extendleft(reversed(chunk))
+                    at_minimum = stats.chunk_length == TOKEN_CHUNK_MIN_LENGTH
+                    stats.record_failure(length)
+                    log.warning(
+                        f'Failed to query {self.evm_inquirer.chain_name} token balances chunk '
+                        f'of length {length} at {node.node_info.name}. {e!s}. Chunk length '
+                        f'of the node is now {stats.chunk_length}',
+                    )
+                    if at_minimum:
+                        return  # the node can't be used for this query
+                    continue
+
+                stats.record_success(length, time.monotonic() - start)
+                add_balances(new_balances)
+
+        greenlets = [
+            gevent.spawn(query_at_node, node, stats)
+            for node, stats in zip(nodes, nodes_stats)
+        ]
+        try:
+            gevent.joinall(greenlets, raise_error=True)
+        finally:
+            gevent.killall(greenlets)
+            if len(nodes) != 0:
+                self._save_nodes_chunk_stats([x.node_info for x in nodes])
+
+        while len(chunk := take_token_chunk(pending, OTHER_MAX_TOKEN_CHUNK_LENGTH, address_arguments)) != 0:  # noqa: E501
+            add_balances(query_chunk(chunk, call_order))  # all nodes failed. Try them in order
+
+        return balances
 
     def _compute_detected_tokens_info(self, addresses: Sequence[ChecksumEvmAddress]) -> DetectedTokensType:  # noqa: E501
         """
@@ -243,26 +476,117 @@ class EvmTokens(metaclass=ABCMeta):
 
         return addresses_info
 
-    def _query_new_tokens(self, addresses: Sequence[ChecksumEvmAddress]) -> None:
-        all_tokens = GlobalDBHandler().get_evm_tokens(
+    def _get_transfer_candidate_tokens(
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            after_block: int,
+            exceptions: set[ChecksumEvmAddress],
+    ) -> list[EvmToken]:
+        """Returns the known ERC20 tokens of the chain that were transferred from or to the
+        address in the stored transactions after the given block"""
+        tokens = []
+        for contract_address in DBEvmTx(self.db).get_erc20_transfer_contracts(
+            cursor=cursor,
             chain_id=self.evm_inquirer.chain_id,
-            exceptions=self._get_token_exceptions(),
-        )
-        self._detect_tokens(
-            addresses=addresses,
-            tokens_to_check=all_tokens,
-        )
+            address=address,
+            after_block=after_block,
+        ) - exceptions:
+            try:
+                token = EvmToken(evm_address_to_identifier(
+                    address=contract_address,
+                    chain_id=self.evm_inquirer.chain_id,
+                    token_type=EvmTokenKind.ERC20,
+                ))
+            except (UnknownAsset, WrongAssetType):
+                continue  # not a token rotki knows of
+
+            if token.protocol != SPAM_PROTOCOL:  # same as the full detection
+                tokens.append(token)
+
+        return tokens
+
+    def _query_new_tokens(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            full_detection: bool,
+    ) -> None:
+        """Detects the tokens of the addresses. Addresses that were never detected before
+        or all addresses if full_detection is True check every known token of the chain.
+
+        The rest only check their already detected tokens and the tokens transferred from
+        or to them in the transactions stored since their last detection.
+        """
+        exceptions = self._get_token_exceptions()
+        dbevmtx = DBEvmTx(self.db)
+        addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]] = {}
+        all_tokens: Optional[list[EvmToken]] = None
+        last_blocks: dict[ChecksumEvmAddress, int] = {}
+        with self.db.conn.read_ctx() as cursor:
+            for address in addresses:
+                # Transfer logs are stored along with the receipts, so detection can only
+                # move past the transactions whose receipts are stored
+                last_blocks[address] = dbevmtx.get_last_block_with_receipts(
+                    cursor=cursor,
+                    chain_id=self.evm_inquirer.chain_id,
+                    address=address,
+                ) or 0
+                last_detection_block = self.db.get_token_detection_block(
+                    cursor=cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                )
+                if full_detection is True or last_detection_block is None:
+                    if all_tokens is None:
+                        all_tokens = GlobalDBHandler().get_evm_tokens(
+                            chain_id=self.evm_inquirer.chain_id,
+                            exceptions=exceptions,
+                        )
+                    addresses_to_tokens[address] = all_tokens
+                    continue
+
+                saved_tokens, _ = self.db.get_tokens_for_address(
+                    cursor=cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                )
+                candidate_tokens = self._get_transfer_candidate_tokens(
+                    cursor=cursor,
+                    address=address,
+                    after_block=last_detection_block,
+                    exceptions=exceptions,
+                )
+                addresses_to_tokens[address] = list(set(saved_tokens or []) | set(candidate_tokens))  # noqa: E501
+                log.debug(
+                    f'Incrementally detecting {len(addresses_to_tokens[address])} '
+                    f'{self.evm_inquirer.chain_name} tokens of {address}',
+                )
+                last_blocks[address] = max(last_blocks[address], last_detection_block)
+
+        self._detect_tokens(addresses_to_tokens)
+
+        with self.db.user_write() as write_cursor:
+            for address, last_block in last_blocks.items():
+                self.db.save_token_detection_block(
+                    write_cursor=write_cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                    block_number=last_block,
+                )
 
     def detect_tokens(
             self,
             only_cache: bool,
             addresses: Sequence[ChecksumEvmAddress],
+            full_detection: bool = False,
     ) -> DetectedTokensType:
         """
         Detect tokens for the given addresses.
 
         If only_cache is True, only tokens saved in the database are returned.
-        Otherwise, tokens are re-detected.
+        Otherwise, tokens are re-detected. Addresses detected before only check the tokens
+        they had and the ones seen in their token transfers since then, unless
+        full_detection is True in which case every known token of the chain is checked.
 
         May raise:
         - RemoteError if an external service such as Etherscan is queried and
@@ -271,17 +595,17 @@ class EvmTokens(metaclass=ABCMeta):
           token has no code. That means the chain is not synced
         """
         if only_cache is False:
-            self._query_new_tokens(addresses)
+            self._query_new_tokens(addresses, full_detection=full_detection)
 
         return self._compute_detected_tokens_info(addresses)
 
     def _detect_tokens(
             self,
-            addresses: Sequence[ChecksumEvmAddress],
-            tokens_to_check: list[EvmToken],
+            addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]],
     ) -> None:
         """
-        Detect tokens for the given addresses.
+        Detect which of the given tokens each address has. The balances of all
+        addresses are queried together.
 
         May raise:
         - RemoteError if an external service such as Etherscan is queried and
@@ -289,41 +613,31 @@ class EvmTokens(metaclass=ABCMeta):
         - BadFunctionCallOutput if a local node is used and the contract for the
           token has no code. That means the chain is not synced
         """
+        if len(addresses_to_tokens) == 0:
+            return
+
         chunk_size, call_order = get_chunk_size_call_order(self.evm_inquirer)
-        for address in addresses:
-            token_balances = self._query_chunks(
-                address=address,
-                tokens=tokens_to_check,
-                chunk_size=chunk_size,
-                call_order=call_order,
-            )
-            detected_tokens = list(token_balances.keys())
-            with self.db.user_write() as write_cursor:
+        balances = self._query_chunks(
+            addresses_to_tokens=addresses_to_tokens,
+            chunk_size=chunk_size,
+            call_order=call_order,
+        )
+        with self.db.user_write() as write_cursor:
+            for address in addresses_to_tokens:
                 self.db.save_tokens_for_address(
                     write_cursor=write_cursor,
                     address=address,
                     blockchain=self.evm_inquirer.blockchain,
-                    tokens=detected_tokens,
+                    tokens=list(balances.get(address, {}).keys()),
                 )
 
-    def query_tokens_for_addresses(
+    def get_saved_tokens(
             self,
             addresses: Sequence[ChecksumEvmAddress],
-    ) -> TokenBalancesType:
-        """Queries token balances for a list of addresses
-        Returns the token balances of each address and the usd prices of the tokens.
-
-        May raise:
-        - RemoteError if an external service such as Etherscan is queried and
-          there is a problem with its query.
-        - BadFunctionCallOutput if a local node is used and the contract for the
-          token has no code. That means the chain is not synced
-        """
-        addresses_to_balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]] = defaultdict(dict)
-        all_tokens = set()
+    ) -> dict[ChecksumEvmAddress, list[EvmToken]]:
+        """Returns the detected tokens of the addresses. Addresses known to have no tokens
+        are not included."""
         addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]] = {}
-        chunk_size, call_order = get_chunk_size_call_order(self.evm_inquirer)
-
         with self.db.conn.read_ctx() as cursor:
             for address in addresses:
                 saved_list, _ = self.db.get_tokens_for_address(
@@ -333,26 +647,123 @@ class EvmTokens(metaclass=ABCMeta):
                 )
                 if saved_list is None:
                     continue  # Do not query if we know the address has no tokens
-                all_tokens.update(saved_list)
                 addresses_to_tokens[address] = saved_list
 
-        multicall_chunks = generate_multicall_chunks(
-            addresses_to_tokens=addresses_to_tokens,
-            chunk_length=chunk_size,
-        )
-        for chunk in multicall_chunks:
-            new_balances = self._get_multicall_token_balances(
-                chunk=chunk,
+        return addresses_to_tokens
+
+    def query_token_balances(
+            self,
+            addresses_to_tokens: dict[ChecksumEvmAddress, list[EvmToken]],
+            block_identifier: BlockIdentifier = 'latest',
+            call_order: Optional[Sequence[WeightedNode]] = None,
+    ) -> dict[ChecksumEvmAddress, dict[EvmToken, FVal]]:
+        """Queries the balances of the given tokens of each address at the given block
+
+        May raise:
+        - RemoteError if an external service such as Etherscan is queried and
+          there is a problem with its query.
+        - BadFunctionCallOutput if a local node is used and the contract for the
+          token has no code. That means the chain is not synced
+        """
+        addresses_to_balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]] = defaultdict(dict)
+        chunk_size, default_call_order = get_chunk_size_call_order(self.evm_inquirer)
+        call_order = call_order if call_order is not None else default_call_order
+        if self.evm_inquirer.connected_to_any_web3():
+            new_balances = self._query_adaptive_chunks(
+                addresses_to_tokens=addresses_to_tokens,
+                address_arguments=PURE_TOKENS_BALANCE_ARGUMENTS,
+                query_chunk=lambda chunk, order: self._get_multicall_token_balances(
+                    chunk=chunk,
+                    call_order=order,
+                    block_identifier=block_identifier,
+                ),
                 call_order=call_order,
             )
             for address, balances in new_balances.items():
                 addresses_to_balances[address].update(balances)
+        else:
+            multicall_chunks = generate_multicall_chunks(
+                addresses_to_tokens=addresses_to_tokens,
+                chunk_length=chunk_size,
+            )
+            for chunk in multicall_chunks:
+                new_balances = self._get_multicall_token_balances(
+                    chunk=chunk,
+                    call_order=call_order,
+                    block_identifier=block_identifier,
+                )
+                for address, balances in new_balances.items():
+                    addresses_to_balances[address].update(balances)
 
-        token_usd_price: dict[EvmToken, Price] = {}
-        for token in all_tokens:
-            token_usd_price[token] = Inquirer.find_usd_price(asset=token)
+        return dict(addresses_to_balances)
+
+    def query_tokens_for_addresses(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            block_identifier: BlockIdentifier = 'latest',
+    ) -> TokenBalancesType:
+        """Queries token balances for a list of addresses
+        Returns the token balances of each address and the usd prices of the tokens.
 
-        return dict(addresses_to_balances), token_usd_price
+        If a block number is given all the balances are queried at that block, so that
+        they are consistent with each other even if the chain moves during the query.
+
+        May raise:
+        - RemoteError if an external service such as Etherscan is queried and
+          there is a problem with its query.
+        - BadFunctionCallOutput if a local node is used and the contract for the
+          token has no code. That means the chain is not synced
+        """
+        addresses_to_tokens = self.get_saved_tokens(addresses)
+        addresses_to_balances = self.query_token_balances(
+            addresses_to_tokens=addresses_to_tokens,
+            block_identifier=block_identifier,
+        )
+        all_tokens = {token for tokens in addresses_to_tokens.values() for token in tokens}
+        token_usd_price: dict[EvmToken, Price] = Inquirer.find_usd_prices(assets=all_tokens)  # type: ignore[assignment]  # the keys are the given tokens
+
+        return addresses_to_balances, token_usd_price
+
+    def query_balances_at_block(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            block_number: int,
+    ) -> dict[ChecksumEvmAddress, dict[Asset, FVal]]:
+        """Queries the native token and the detected token balances of the addresses as they
+        were at the given past block. Only archive nodes keep the state of old blocks so
+        only the connected archive nodes are queried.
+
+        Tokens the addresses held at that block but no longer have are not detected
+        and so not included.
+
+        May raise:
+        - RemoteError if no archive node is connected or there is a problem querying them
+        - BadFunctionCallOutput if the contracts have no code at the given block
+        """
+        if len(call_order := self.evm_inquirer.archive_call_order()) == 0:
+            raise RemoteError(
+                f'Querying {self.evm_inquirer.chain_name} balances at a past block requires '
+                f'a connected archive node',
+            )
+
+        balances: dict[ChecksumEvmAddress, dict[Asset, FVal]] = defaultdict(dict)
+        native_balances = self.evm_inquirer.get_multi_balance(
+            accounts=addresses,
+            call_order=call_order,
+            block_identifier=block_number,
+        )
+        for address, balance in native_balances.items():
+            if balance != ZERO:
+                balances[address][self.evm_inquirer.native_token] = balance
+
+        for address, token_balances in self.query_token_balances(
+            addresses_to_tokens=self.get_saved_tokens(addresses),
+            block_identifier=block_number,
+            call_order=call_order,
+        ).items():
+            balances[address].update(token_balances)
+
+        return dict(balances)
 
     def _get_token_exceptions(self) -> set[ChecksumEvmAddress]:
         """Returns a list of token addresses for which balances will not be queried"""
@@ -387,8 +798,12 @@ class EvmTokensWithDSProxy(EvmTokens, metaclass=ABCMeta):
         super().__init__(database=database, evm_inquirer=evm_inquirer)
         self.evm_inquirer: EvmNodeInquirerWithDSProxy  # set explicit type
 
-    def _query_new_tokens(self, addresses: Sequence[ChecksumEvmAddress]) -> None:
-        super()._query_new_tokens(addresses)
+    def _query_new_tokens(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            full_detection: bool,
+    ) -> None:
+        super()._query_new_tokens(addresses, full_detection=full_detection)
         self.maybe_detect_proxies_tokens(addresses)
 
     def maybe_detect_proxies_tokens(self, addresses: Sequence[ChecksumEvmAddress]) -> None:  # pylint: disable=unused-argument
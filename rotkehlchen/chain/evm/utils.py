@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Any, Callable, Final, Optional
 
 from web3.types import BlockIdentifier
@@ -10,6 +11,7 @@ from rotkehlchen.constants.resolver import evm_address_to_identifier
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import BlockchainQueryError, RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_fval
 from rotkehlchen.types import UNISWAP_PROTOCOL, VELODROME_POOL_PROTOCOL, EvmTokenKind, Price
@@ -27,29 +29,17 @@ LP_TOKEN_AS_POOL_PROTOCOL_TO_ABI_NAME: Final[dict[str, 'LP_TOKEN_AS_POOL_CONTRAC
     VELODROME_POOL_PROTOCOL: 'VELO_V2_LP',
     UNISWAP_PROTOCOL: 'UNISWAP_V2_LP',
 }
+UNISWAPLIKE_LP_METHODS: Final = ('token0', 'token1', 'totalSupply', 'getReserves', 'decimals')
 FVAL_ERROR_NAME: Final = 'token supply'
 FVAL_ERROR_LOCATION: Final = 'uniswap-like pool price query'
 
 
-def lp_price_from_uniswaplike_pool_contract(
+def get_uniswaplike_lp_contract(
         evm_inquirer: 'EvmNodeInquirer',
         token: EvmToken,
-        token_price_func: Callable,
-        token_price_func_args: list[Any],
-        block_identifier: BlockIdentifier,
-) -> Optional[Price]:
-    """
-    This works for any uniswap like LP token. It calculates the price for an LP token the contract
-    of which is also the contract of the pool it represents. For example velodrome or uniswap lp
-    tokens. The price is calculated like this:
-    price = (Total value of liquidity pool) / (Current supply of LP tokens)
-    We need:
-    - Price of token 0
-    - Price of token 1
-    - Pooled amount of token 0
-    - Pooled amount of token 1
-    - Total supply of pool token
-    """
+) -> Optional[EvmContract]:
+    """Returns the contract of a uniswap like LP token, which is also the contract of the pool
+    it represents, or None if there is no contract abi for the token's protocol"""
     try:
         abi_name = LP_TOKEN_AS_POOL_PROTOCOL_TO_ABI_NAME[token.protocol]  # the lp token's contract abi that will be used to query the info needed for lp token price calculation  # noqa: E501
     except KeyError:
@@ -59,60 +49,48 @@ def lp_price_from_uniswaplike_pool_contract(
         )
         return None
 
-    contract = EvmContract(
+    return EvmContract(
         address=token.evm_address,
         abi=evm_inquirer.contracts.abi(abi_name),
         deployed_block=0,
     )
-    methods = ('token0', 'token1', 'totalSupply', 'getReserves', 'decimals')
-    if (
-        isinstance(block_identifier, int) and
-        block_identifier <= evm_inquirer.contract_multicall.deployed_block
-    ):
-        log.error(
-            f'No multicall contract at {evm_inquirer.chain_name} block {block_identifier}. '
-            f'{abi_name} query failed. Should implement direct queries',
-        )
-        return None
 
-    try:
-        output = evm_inquirer.multicall(
-            require_success=True,
-            calls=[(token.evm_address, contract.encode(method_name=method)) for method in methods],
-            block_identifier=block_identifier,
-        )
-    except (RemoteError, BlockchainQueryError) as e:
-        log.error(
-            f'Remote error calling {evm_inquirer.chain_name} multicall contract for {abi_name} '
-            f'token {token.evm_address} properties: {e!s}',
-        )
-        return None
 
-    # decode output
+def decode_uniswaplike_lp_outputs(
+        evm_inquirer: 'EvmNodeInquirer',
+        token: EvmToken,
+        contract: EvmContract,
+        outputs: Sequence[bytes],
+) -> Optional[tuple[EvmToken, FVal, EvmToken, FVal, FVal]]:
+    """Decodes the outputs of the UNISWAPLIKE_LP_METHODS calls of a uniswap like LP token.
+    An empty output means that the call failed.
+
+    Returns the two pool tokens with their pooled amounts and the total supply of the
+    LP token or None if the outputs can't be decoded.
+    """
     decoded = []
-    for (method_output, method_name) in zip(output, methods):
-        call_success = True
-        if call_success and len(method_output) != 0:
+    for (method_output, method_name) in zip(outputs, UNISWAPLIKE_LP_METHODS):
+        if len(method_output) != 0:
             decoded_method = contract.decode(method_output, method_name)
             # decoded_method is a tuple of decoded values. If it's only one then we just append that value. If it's more than one then we append the tuple. getReserves call returns a tuple of token reserves  # noqa: E501
             decoded.append(decoded_method[0] if len(decoded_method) == 1 else decoded_method)
         else:
             log.debug(
-                f'{evm_inquirer.chain_name} multicall to {abi_name} failed to fetch field '
-                f'{method_name} for token {token.evm_address}',
+                f'{evm_inquirer.chain_name} multicall to {token.protocol} pool failed to fetch '
+                f'field {method_name} for token {token.evm_address}',
             )
             return None
 
     if len(decoded) < 4:
         log.debug(
             f'Unexpected number of decoded values ({len(decoded)}) while querying price from '
-            f'{evm_inquirer.chain_name} {abi_name} for token {token.evm_address}',
+            f'{evm_inquirer.chain_name} {token.protocol} pool for token {token.evm_address}',
         )
         return None
     elif len(decoded[3]) < 2:
         log.debug(
             f'Unexpected number of decoded pool reserves ({len(decoded[3])}) while querying '
-            f'price from {evm_inquirer.chain_name} {abi_name} for token {token.evm_address}',
+            f'price from {evm_inquirer.chain_name} {token.protocol} pool for token {token.evm_address}',  # noqa: E501
         )
         return None
 
@@ -130,7 +108,7 @@ def lp_price_from_uniswaplike_pool_contract(
     except (UnknownAsset, WrongAssetType):
         log.debug(
             f'Unknown assets {decoded[0]} {decoded[1]} while querying price from '
-            f'{evm_inquirer.chain_name} {abi_name} for token {token.evm_address}',
+            f'{evm_inquirer.chain_name} {token.protocol} pool for token {token.evm_address}',
         )
         return None
 
@@ -156,9 +134,19 @@ def lp_price_from_uniswaplike_pool_contract(
             f'{token.evm_address} with values {decoded!s}. f{e}',
         )
         return None
-    token0_price = token_price_func(token0, *token_price_func_args)
-    token1_price = token_price_func(token1, *token_price_func_args)
 
+    return token0, token0_supply, token1, token1_supply, total_supply
+
+
+def uniswaplike_lp_share_price(
+        evm_inquirer: 'EvmNodeInquirer',
+        pool_data: tuple[EvmToken, FVal, EvmToken, FVal, FVal],
+        token0_price: Price,
+        token1_price: Price,
+) -> Price:
+    """Calculates the price of a uniswap like LP token from the decoded pool data and
+    the prices of the two pool tokens"""
+    token0, token0_supply, token1, token1_supply, total_supply = pool_data
     if ZERO in (token0_price, token1_price):
         log.debug(
             f"Couldn't retrieve non zero price information for {evm_inquirer.chain_name} tokens "
@@ -167,3 +155,65 @@ def lp_price_from_uniswaplike_pool_contract(
     numerator = token0_supply * token0_price + token1_supply * token1_price
     share_value = numerator / total_supply
     return Price(share_value)
+
+
+def lp_price_from_uniswaplike_pool_contract(
+        evm_inquirer: 'EvmNodeInquirer',
+        token: EvmToken,
+        token_price_func: Callable,
+        token_price_func_args: list[Any],
+        block_identifier: BlockIdentifier,
+) -> Optional[Price]:
+    """
+    This works for any uniswap like LP token. It calculates the price for an LP token the contract
+    of which is also the contract of the pool it represents. For example velodrome or uniswap lp
+    tokens. The price is calculated like this:
+    price = (Total value of liquidity pool) / (Current supply of LP tokens)
+    We need:
+    - Price of token 0
+    - Price of token 1
+    - Pooled amount of token 0
+    - Pooled amount of token 1
+    - Total supply of pool token
+    """
+    if (contract := get_uniswaplike_lp_contract(evm_inquirer=evm_inquirer, token=token)) is None:
+        return None
+
+    if (
+        isinstance(block_identifier, int) and
+        block_identifier <= evm_inquirer.contract_multicall.deployed_block
+    ):
+        log.error(
+            f'No multicall contract at {evm_inquirer.chain_name} block {block_identifier}. '
+            f'{token.protocol} pool query failed. Should implement direct queries',
+        )
+        return None
+
+    try:
+        output = evm_inquirer.multicall(
+            require_success=True,
+            calls=[(token.evm_address, contract.encode(method_name=method)) for method in UNISWAPLIKE_LP_METHODS],  # noqa: E501
+            block_identifier=block_identifier,
+        )
+    except (RemoteError, BlockchainQueryError) as e:
+        log.error(
+            f'Remote error calling {evm_inquirer.chain_name} multicall contract for '
+            f'{token.protocol} pool token {token.evm_address} properties: {e!s}',
+        )
+        return None
+
+    pool_data = decode_uniswaplike_lp_outputs(
+        evm_inquirer=evm_inquirer,
+        token=token,
+        contract=contract,
+        outputs=output,
+    )
+    if pool_data is None:
+        return None
+
+    return uniswaplike_lp_share_price(
+        evm_inquirer=evm_inquirer,
+        pool_data=pool_data,
+        token0_price=token_price_func(pool_data[0], *token_price_func_args),
+        token1_price=token_price_func(pool_data[2], *token_price_func_args),
+    )
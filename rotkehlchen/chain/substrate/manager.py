@@ -1,4 +1,5 @@
 import logging
+import time
 from collections.abc import Iterable, Sequence
 from functools import wraps
 from http import HTTPStatus
@@ -44,6 +45,8 @@ log = RotkehlchenLogsAdapter(logger)
 
 # Number of blocks after which to consider not synced
 SUBSTRATE_BLOCKS_THRESHOLD = 10
+# Weight of the latest response time in the moving average of a node's latency
+SUBSTRATE_LATENCY_WEIGHT = 0.3
 
 
 class SubstrateChainProperties(NamedTuple):
@@ -156,6 +159,9 @@ class SubstrateManager:
         self.available_node_attributes_map: DictNodeNameNodeAttributes = {}
         self.available_nodes_call_order: NodesCallOrder = []
         self.chain_properties: SubstrateChainProperties
+        # balances queried at the block with this hash. Reset when a new block is seen
+        self.balances_block_hash: Optional[str] = None
+        self.balances_cache: dict[SubstrateAddress, FVal] = {}
         if connect_on_startup and len(connect_at_start) != 0:
             self.attempt_connections()
         else:
@@ -249,7 +255,9 @@ class SubstrateManager:
 
         try:
             node_interface = self._get_node_interface(endpoint)
+            start = time.monotonic()
             self._check_chain(node_interface)
+            latency = time.monotonic() - start
             last_block = self._check_node_synchronization(node_interface)
             self._set_chain_properties(node_interface)
         except RemoteError as e:
@@ -263,6 +271,7 @@ class SubstrateManager:
         node_attributes = NodeNameAttributes(
             node_interface=node_interface,
             weight_block=last_block,
+            latency=latency,
         )
         self.available_node_attributes_map[node] = node_attributes
         self._set_available_nodes_call_order()
@@ -321,7 +330,10 @@ class SubstrateManager:
             account=account,
             result=result,
         )
+        return self._deserialize_account_balance(result)
 
+    def _deserialize_account_balance(self, result: Any) -> FVal:
+        """Sums the free and reserved amounts of a System.Account query result"""
         balance = ZERO
         if result is not None:
             account_data = result.value['data']
@@ -332,6 +344,74 @@ class SubstrateManager:
 
         return balance
 
+    def _get_accounts_balance(
+            self,
+            accounts: Sequence[SubstrateAddress],
+            node_interface: SubstrateInterface,
+    ) -> dict[SubstrateAddress, FVal]:
+        """Given a list of accounts get their amount of chain native token.
+
+        All accounts are queried at the chain head with a single request. Balances
+        are cached per block so querying again within the same block needs only
+        the request for the chain head.
+        """
+        log.debug(
+            f'{self.chain} querying {self.chain_properties.token.identifier} balances',
+            url=node_interface.url,
+            accounts=accounts,
+        )
+        start = time.monotonic()
+        try:
+            with gevent.Timeout(SUBSTRATE_NODE_CONNECTION_TIMEOUT):
+                block_hash = node_interface.get_chain_head()
+                if block_hash != self.balances_block_hash:
+                    self.balances_block_hash, self.balances_cache = block_hash, {}
+
+                if len(missing_accounts := [x for x in accounts if x not in self.balances_cache]) != 0:  # noqa: E501
+                    storage_keys = [node_interface.create_storage_key(
+                        pallet='System',
+                        storage_function='Account',
+                        params=[account],
+                    ) for account in missing_accounts]
+                    result = node_interface.query_multi(
+                        storage_keys=storage_keys,
+                        block_hash=block_hash,
+                    )
+        except (
+                requests.exceptions.RequestException,
+                SubstrateRequestException,
+                ValueError,
+                WebSocketException,
+                gevent.Timeout,
+                BlockNotFound,
+                AttributeError,  # happens in substrate library when timeout occurs some times
+        ) as e:
+            msg = str(e)
+            if isinstance(e, gevent.Timeout):
+                msg = f'a timeout of {msg}'
+            message = (
+                f'{self.chain} failed to request {self.chain_properties.token.identifier} '
+                f'accounts balance at endpoint {node_interface.url} due to: {msg}'
+            )
+            log.error(message, accounts=accounts)
+            raise RemoteError(message) from e
+
+        if len(missing_accounts) != 0:
+            # the results are not necessarily in the order of the storage keys
+            accounts_by_key = {x.to_hex(): y for x, y in zip(storage_keys, missing_accounts, strict=True)}  # noqa: E501
+            for storage_key, account_info in result:
+                account = accounts_by_key[storage_key.to_hex()]
+                self.balances_cache[account] = self._deserialize_account_balance(account_info)
+            self._update_node_latency(node_interface, time.monotonic() - start)
+
+        log.debug(
+            f'{self.chain} accounts balance',
+            block_hash=block_hash,
+            queried_accounts=len(missing_accounts),
+            cached_accounts=len(accounts) - len(missing_accounts),
+        )
+        return {account: self.balances_cache.get(account, ZERO) for account in accounts}
+
     def _get_chain_id(self, node_interface: SubstrateInterface) -> SubstrateChainId:
         """Return the chain identifier (name for substrate chains)"""
         log.debug(f'{self.chain} querying chain ID', url=node_interface.url)
@@ -491,11 +571,25 @@ class SubstrateManager:
         log.debug(f'{self.chain} subscan API metadata', result=result)
         return result
 
+    def _update_node_latency(self, node_interface: SubstrateInterface, seconds: float) -> None:
+        """Updates the moving average of the latency of the node with the given interface
+        and re-sorts the nodes call order"""
+        for node, node_attributes in self.available_node_attributes_map.items():
+            if node_attributes.node_interface is node_interface:
+                latency = (
+                    SUBSTRATE_LATENCY_WEIGHT * seconds +
+                    (1 - SUBSTRATE_LATENCY_WEIGHT) * node_attributes.latency
+                )
+                self.available_node_attributes_map[node] = node_attributes._replace(latency=latency)  # noqa: E501
+                self._set_available_nodes_call_order()
+                return
+
     def _set_available_nodes_call_order(self) -> None:
         """Set `available_nodes_call_order` with a list of items (tuple of node
         and its attributes) sorted by this criteria: own node always has
-        preference, then are ordered depending on how close they are to the
-        chain height; the higher 'weight_block' the better.
+        preference, then the nodes that are synced, i.e. not more than
+        SUBSTRATE_BLOCKS_THRESHOLD behind the highest 'weight_block', ordered
+        by their latency and then the rest ordered by 'weight_block'.
         """
         own_node: Union[KusamaNodeName, PolkadotNodeName]
         if self.chain == SupportedBlockchain.KUSAMA:
@@ -504,9 +598,14 @@ class SubstrateManager:
             own_node = PolkadotNodeName.OWN
         node_attributes_map = self.available_node_attributes_map.copy()
         own_node_attributes = node_attributes_map.pop(own_node, None)
+        highest_block = max((x.weight_block for x in node_attributes_map.values()), default=0)
         available_nodes_call_order = sorted(
             cast(Iterable, node_attributes_map.items()),
-            key=lambda item: -item[1].weight_block,
+            key=lambda item: (
+                highest_block - item[1].weight_block > SUBSTRATE_BLOCKS_THRESHOLD,
+                item[1].latency,
+                -item[1].weight_block,
+            ),
         )
         if own_node_attributes is not None:
             available_nodes_call_order.insert(0, (own_node, own_node_attributes))
@@ -556,24 +655,21 @@ class SubstrateManager:
         """
         return self._get_account_balance(account=account, node_interface=node_interface)
 
+    @request_available_nodes
     def get_accounts_balance(
             self,
             accounts: Sequence[SubstrateAddress],
+            node_interface: Optional[SubstrateInterface] = None,
     ) -> dict[SubstrateAddress, FVal]:
         """Given a list of accounts get their amount of chain native token.
 
-        This method is not decorated with `request_available_nodes` on purpose,
-        so each request can use all available nodes.
+        All accounts are queried with a single request per node.
 
         May raise:
         - RemoteError: `request_available_nodes()` fails to request after
         trying with all the available nodes.
         """
-        balances: dict[SubstrateAddress, FVal] = {}
-        for account in accounts:
-            balances[account] = self.get_account_balance(account)
-
-        return balances
+        return self._get_accounts_balance(accounts=accounts, node_interface=node_interface)
 
     @request_available_nodes
     def get_chain_id(
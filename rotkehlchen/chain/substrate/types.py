@@ -92,6 +92,8 @@ NodeName = Union[KusamaNodeName, PolkadotNodeName]
 class NodeNameAttributes(NamedTuple):
     node_interface: SubstrateInterface
     weight_block: BlockNumber
+    # moving average of the node's response time in seconds
+    latency: float = 0.0
 
 
 DictNodeNameNodeAttributes = dict[NodeName, NodeNameAttributes]
@@ -14,20 +14,41 @@ AES_BLOCK_SIZE = 16
 # cryptography library seem to suggest it's the safest options. Problem is the
 # already encrypted and saved database files and how to handle the previous encryption
 # We need to keep a versioning of encryption used for each file.
+class StreamEncryptor:
+    """Encrypts data given in chunks, producing the same output as `encrypt` would
+    for all of the data at once. That is the iv followed by the padded ciphertext."""
+
+    def __init__(self, key: bytes) -> None:
+        assert isinstance(key, bytes), 'key should be given in bytes'
+        digest = hashes.Hash(hashes.SHA256())
+        digest.update(key)
+        key = digest.finalize()  # use SHA-256 over our key to get a proper-sized AES key
+        self.iv = os.urandom(AES_BLOCK_SIZE)
+        self.encryptor = Cipher(algorithms.AES(key), modes.CBC(self.iv)).encryptor()
+        self.length = 0
+        self.iv_returned = False
+
+    def _prefix(self) -> bytes:
+        """The iv is stored at the beginning so return it along with the first output"""
+        if self.iv_returned is True:
+            return b''
+
+        self.iv_returned = True
+        return self.iv
+
+    def update(self, source: bytes) -> bytes:
+        self.length += len(source)
+        return self._prefix() + self.encryptor.update(source)
+
+    def finalize(self) -> bytes:
+        padding = AES_BLOCK_SIZE - self.length % AES_BLOCK_SIZE  # calculate needed padding
+        return self._prefix() + self.encryptor.update(bytes([padding]) * padding) + self.encryptor.finalize()  # noqa: E501
+
+
 def encrypt(key: bytes, source: bytes) -> bytes:
-    assert isinstance(key, bytes), 'key should be given in bytes'
     assert isinstance(source, bytes), 'source should be given in bytes'
-    digest = hashes.Hash(hashes.SHA256())
-    digest.update(key)
-    key = digest.finalize()  # use SHA-256 over our key to get a proper-sized AES key
-    iv = os.urandom(AES_BLOCK_SIZE)
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
-    encryptor = cipher.encryptor()
-    padding = AES_BLOCK_SIZE - len(source) % AES_BLOCK_SIZE  # calculate needed padding
-    source += bytes([padding]) * padding  # Python 2.x: source += chr(padding) * padding
-    # store the iv at the beginning and encrypt
-    data = iv + (encryptor.update(source) + encryptor.finalize())
-    return data
+    encryptor = StreamEncryptor(key)
+    return encryptor.update(source) + encryptor.finalize()
 
 
 def decrypt(key: bytes, source: bytes) -> bytes:
@@ -3,12 +3,17 @@ import hashlib
 import logging
 import shutil
 import tempfile
+import time
 import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional
 
+import gevent
+
 from rotkehlchen.assets.asset import Asset
-from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.crypto import StreamEncryptor, decrypt
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors.api import AuthenticationError
@@ -21,6 +26,52 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 BUFFERSIZE = 64 * 1024
+# The compression level of the DB uploaded for premium sync. 1 is fastest, 9 is smallest
+DEFAULT_DB_COMPRESSION_LEVEL = 9
+
+
+def _compress_and_encrypt_file(
+        path: Path,
+        password: bytes,
+        compression_level: int,
+) -> tuple[bytes, str, dict[str, float]]:
+    """Reads the file at path in chunks and hashes, compresses and encrypts each one.
+
+    Runs in a thread so it must not touch gevent or the DB. Returns the encrypted
+    data, the b64 encoded sha256 of the file and the seconds spent in each stage.
+    """
+    timings = dict.fromkeys(('read', 'hash', 'compress', 'encrypt'), 0.0)
+    hasher = hashlib.sha256()
+    compressor = zlib.compressobj(level=compression_level)
+    encryptor = StreamEncryptor(password)
+    encrypted_data = bytearray()
+    with open(path, 'rb') as src_f:
+        while True:
+            read_start = time.perf_counter()
+            block = src_f.read(BUFFERSIZE)
+            hash_start = time.perf_counter()
+            if not block:
+                timings['read'] += hash_start - read_start
+                break
+
+            hasher.update(block)
+            compress_start = time.perf_counter()
+            compressed = compressor.compress(block)
+            encrypt_start = time.perf_counter()
+            encrypted_data += encryptor.update(compressed)
+            timings['read'] += hash_start - read_start
+            timings['hash'] += compress_start - hash_start
+            timings['compress'] += encrypt_start - compress_start
+            timings['encrypt'] += time.perf_counter() - encrypt_start
+
+    compress_start = time.perf_counter()
+    compressed = compressor.flush()
+    encrypt_start = time.perf_counter()
+    encrypted_data += encryptor.update(compressed)
+    encrypted_data += encryptor.finalize()
+    timings['compress'] += encrypt_start - compress_start
+    timings['encrypt'] += time.perf_counter() - encrypt_start
+    return bytes(encrypted_data), base64.b64encode(hasher.digest()).decode(), timings
 
 
 class DataHandler:
@@ -180,35 +231,50 @@ class DataHandler:
 
         return users
 
-    def compress_and_encrypt_db(self) -> tuple[bytes, str]:
+    def compress_and_encrypt_db(
+            self,
+            compression_level: int = DEFAULT_DB_COMPRESSION_LEVEL,
+    ) -> tuple[bytes, str]:
         """Decrypt the DB, dump in temporary plaintextdb, compress it,
         and then re-encrypt it
 
+        The plaintext DB is read, hashed, compressed and encrypted in chunks in a
+        thread so that other greenlets can run meanwhile and only the encrypted
+        output is kept in memory. A lower zlib compression level is much faster
+        at the cost of a bigger output.
+
         Returns a b64 encoded binary blob"""
-        compressor = zlib.compressobj(level=9)
+        start = time.perf_counter()
+        with self.export_plaintext_db() as tempdbpath:
+            export_time = time.perf_counter() - start
+            encrypted_data, original_data_hash, timings = gevent.get_hub().threadpool.apply(
+                _compress_and_encrypt_file,
+                (tempdbpath, self.db.password.encode(), compression_level),
+            )
+
+        log.debug(
+            f'Compressed and encrypted the DB to {len(encrypted_data)} bytes',
+            export_seconds=round(export_time, 3),
+            **{f'{stage}_seconds': round(seconds, 3) for stage, seconds in timings.items()},
+        )
+        return encrypted_data, original_data_hash
+
+    @contextmanager
+    def export_plaintext_db(self) -> Iterator[Path]:
+        """Dumps the DB in a temporary plaintext DB and yields its path.
+        The temporary DB is deleted on exit."""
         with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tempdbfile:
             tempdbpath = Path(tempdbfile.name)
-            log.info(f'Compress and encrypt DB at temporary path: {tempdbpath}')
+            log.info(f'Exporting plaintext DB at temporary path: {tempdbpath}')
             tempdbfile.close()  # close the file to allow re-opening by export_unencrypted in windows https://github.com/rotki/rotki/issues/5051  # noqa: E501
+
+        try:
             self.db.export_unencrypted(tempdbpath)
-            source_data = bytearray()
-            compressed_data = bytearray()
-            with open(tempdbpath, 'rb') as src_f:
-                block = src_f.read(BUFFERSIZE)
-                while block:
-                    source_data += block
-                    compressed_data += compressor.compress(block)
-                    block = src_f.read(BUFFERSIZE)
-
-                compressed_data += compressor.flush()
-
-        original_data_hash = base64.b64encode(
-            hashlib.sha256(source_data).digest(),
-        ).decode()
-        encrypted_data = encrypt(self.db.password.encode(), bytes(compressed_data))
-        # cleanup temp file to avoid windows problem (https://github.com/rotki/rotki/issues/5051)
-        tempdbpath.unlink()
-        return encrypted_data, original_data_hash
+            yield tempdbpath
+        finally:
+            # cleanup temp file to avoid windows problem
+            # (https://github.com/rotki/rotki/issues/5051)
+            tempdbpath.unlink(missing_ok=True)
 
     def decompress_and_decrypt_db(self, encrypted_data: bytes) -> None:
         """Decrypt and decompress the encrypted data we receive from the server
@@ -223,13 +289,23 @@ class DataHandler:
         - SystemPermissionError if the DB file permissions are not correct
         """
         log.info('Decompress and decrypt DB')
+        decrypted_data = decrypt(self.db.password.encode(), encrypted_data)
+        decompressed_data = zlib.decompress(decrypted_data)
+        self.import_plaintext_db(decompressed_data)
+
+    def import_plaintext_db(self, data: bytes) -> None:
+        """Replaces our local DB with the given plaintext DB after backing it up
+
+        May Raise:
+        - DBUpgradeError if the rotki DB version is newer than the software or
+        there is a DB upgrade and there is an error or if the version is older
+        than the one supported.
+        - SystemPermissionError if the DB file permissions are not correct
+        """
         # First make a backup of the DB we are about to replace
         date = timestamp_to_date(ts=ts_now(), formatstr='%Y_%m_%d_%H_%M_%S', treat_as_local=True)
         shutil.copyfile(
             self.data_directory / self.username / 'rotkehlchen.db',
             self.data_directory / self.username / f'rotkehlchen_db_{date}.backup',
         )
-
-        decrypted_data = decrypt(self.db.password.encode(), encrypted_data)
-        decompressed_data = zlib.decompress(decrypted_data)
-        self.db.import_unencrypted(decompressed_data)
+        self.db.import_unencrypted(data)
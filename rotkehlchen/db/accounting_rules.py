@@ -57,6 +57,8 @@ class DBAccountingRules:
                     f'{self._rule_for_string(event_type=event_type, event_subtype=event_subtype, counterparty=counterparty)} already exists',  # noqa: E501
                 ) from e
 
+        self.db.accounting_rules_version += 1
+
     def remove_accounting_rule(
             self,
             event_type: HistoryEventType,
@@ -84,6 +86,8 @@ class DBAccountingRules:
                     ' does not exist',
                 )
 
+        self.db.accounting_rules_version += 1
+
     def update_accounting_rule(
             self,
             event_type: HistoryEventType,
@@ -117,6 +121,8 @@ class DBAccountingRules:
                     ' but it was not found',
                 )
 
+        self.db.accounting_rules_version += 1
+
     def query_rules(
             self,
             filter_query: AccountingRulesFilterQuery,
@@ -15,11 +15,15 @@ HISTORY_MAPPING_STATE_CUSTOMIZED = 1
 
 EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS = 'last_queried_timestamp'
 EVM_ACCOUNTS_DETAILS_TOKENS = 'tokens'
+EVM_ACCOUNTS_DETAILS_LAST_DETECTION_BLOCK = 'last_detection_block'
 
 LAST_DATA_UPDATES_KEY: Final = 'last_data_updates_ts'
 
 NO_ACCOUNTING_COUNTERPARTY = 'NONE'
 
+# every how many balance snapshots a full one is saved instead of only the changed balances
+BALANCE_SNAPSHOTS_KEYFRAME_INTERVAL: Final = 30
+
 
 class UpdateType(Enum):
     SPAM_ASSETS = 'spam_assets'
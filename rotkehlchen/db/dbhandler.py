@@ -45,7 +45,9 @@ from rotkehlchen.constants.limits import (
 from rotkehlchen.constants.misc import NFT_DIRECTIVE
 from rotkehlchen.constants.timing import HOUR_IN_SECONDS
 from rotkehlchen.db.constants import (
+    BALANCE_SNAPSHOTS_KEYFRAME_INTERVAL,
     BINANCE_MARKETS_KEY,
+    EVM_ACCOUNTS_DETAILS_LAST_DETECTION_BLOCK,
     EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS,
     EVM_ACCOUNTS_DETAILS_TOKENS,
     KRAKEN_ACCOUNT_TYPE_KEY,
@@ -103,8 +105,12 @@ from rotkehlchen.errors.misc import (
 )
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.exchanges.constants import SUPPORTED_EXCHANGES
-from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
-from rotkehlchen.exchanges.kraken import KrakenAccountType
+from rotkehlchen.exchanges.data_structures import (
+    AssetMovement,
+    KrakenAccountType,
+    MarginPosition,
+    Trade,
+)
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.logging import RotkehlchenLogsAdapter
@@ -199,6 +205,8 @@ class DBHandler:
         self.conn_transient: DBConnection = None  # type: ignore
         # Lock to make sure that 2 callers of get_or_create_evm_token do not go in at the same time
         self.get_or_create_evm_token_lock = Semaphore()
+        # Incremented whenever the accounting rules change so that compiled rules are invalidated
+        self.accounting_rules_version = 0
         self.password = password
         self._connect()
         self._check_unfinished_upgrades(resume_from_backup=resume_from_backup)
@@ -509,6 +517,7 @@ class DBHandler:
         - AuthenticationError if the wrong password is given
         """
         self.disconnect()
+        self.accounting_rules_version += 1
         rdbpath = self.user_data_dir / MAIN_DB_NAME
         # Make copy of existing encrypted DB before removing it
         shutil.copy2(
@@ -735,13 +744,75 @@ class DBHandler:
         return mapping
 
     def add_multiple_balances(self, write_cursor: 'DBCursor', balances: list[DBAssetBalance]) -> None:  # noqa: E501
-        """Execute addition of multiple balances in the DB"""
-        serialized_balances = [balance.serialize_for_db() for balance in balances]
+        """Execute addition of multiple balances in the DB
+
+        They are saved as full snapshots. A delta snapshot right after any of them is turned
+        into a full one first since the snapshots it was built on are changing.
+        """
+        for timestamp in {balance.time for balance in balances}:
+            self._materialize_next_delta_snapshot(write_cursor, timestamp)
+        self._insert_timed_balances(
+            write_cursor=write_cursor,
+            rows=[balance.serialize_for_db() for balance in balances],
+        )
+
+    def add_snapshot_balances(
+            self,
+            write_cursor: 'DBCursor',
+            timestamp: Timestamp,
+            balances: list[DBAssetBalance],
+    ) -> None:
+        """Save the balances of a new snapshot at the given timestamp
+
+        If it is the latest snapshot and not due for a full one, only the balances that
+        changed since the previous snapshot are saved along with a NULL entry for each
+        balance that is gone. Every BALANCE_SNAPSHOTS_KEYFRAME_INTERVAL snapshots a full
+        one is saved so that reconstructing any snapshot stays cheap.
+
+        May raise:
+        - InputError if there is already a snapshot at the timestamp or an asset is unknown
+        """
+        rows = [balance.serialize_for_db() for balance in balances]
+        latest_timestamp = self.get_latest_balance_snapshot_timestamp(write_cursor)
+        keyframe_timestamp = self._get_balance_keyframe_timestamp(write_cursor, timestamp)
+        if (
+            latest_timestamp is None or latest_timestamp >= timestamp or
+            keyframe_timestamp is None or write_cursor.execute(
+                'SELECT COUNT(*) FROM delta_balance_snapshots WHERE timestamp > ?',
+                (keyframe_timestamp,),
+            ).fetchone()[0] + 1 >= BALANCE_SNAPSHOTS_KEYFRAME_INTERVAL
+        ):
+            self.add_multiple_balances(write_cursor, balances)
+            return
+
+        previous_balances = {
+            (row[2], row[0]): (row[3], row[4])
+            for row in self.get_snapshot_balance_rows(write_cursor, latest_timestamp)
+        }
+        changed_rows = []
+        for row in rows:
+            if previous_balances.pop((row[2], row[0]), None) != (row[3], row[4]):
+                changed_rows.append(row)
+        changed_rows.extend(
+            (category, timestamp, currency, None, None)
+            for currency, category in previous_balances
+        )
+        try:
+            write_cursor.execute(
+                'INSERT INTO delta_balance_snapshots(timestamp) VALUES (?)',
+                (timestamp,),
+            )
+        except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+            raise InputError(f'A balances snapshot at {timestamp} already exists') from e
+        self._insert_timed_balances(write_cursor=write_cursor, rows=changed_rows)
+
+    @staticmethod
+    def _insert_timed_balances(write_cursor: 'DBCursor', rows: list[tuple]) -> None:
         try:
             write_cursor.executemany(
                 'INSERT INTO timed_balances(category, timestamp, currency, amount, usd_value) '
                 'VALUES(?, ?, ?, ?, ?)',
-                serialized_balances,
+                rows,
             )
         except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
             raise InputError(
@@ -749,6 +820,159 @@ class DBHandler:
                 'or an entry for the given timestamp already exists',
             ) from e
 
+    @staticmethod
+    def get_balance_snapshots(
+            cursor: 'DBCursor',
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+    ) -> list[tuple[Timestamp, bool]]:
+        """Returns the timestamps of the balance snapshots in the given range in ascending
+        order along with whether each of them is a delta snapshot"""
+        return cursor.execute(
+            'SELECT T.timestamp, D.timestamp IS NOT NULL FROM (SELECT DISTINCT timestamp '
+            'FROM timed_balances WHERE timestamp BETWEEN ? AND ? UNION SELECT timestamp '
+            'FROM delta_balance_snapshots WHERE timestamp BETWEEN ? AND ?) AS T LEFT JOIN '
+            'delta_balance_snapshots AS D ON T.timestamp=D.timestamp ORDER BY T.timestamp ASC',
+            (from_ts, to_ts, from_ts, to_ts),
+        ).fetchall()  # the delta flag comes as 0 or 1
+
+    @staticmethod
+    def get_latest_balance_snapshot_timestamp(cursor: 'DBCursor') -> Optional[Timestamp]:
+        return cursor.execute(
+            'SELECT MAX(timestamp) FROM (SELECT MAX(timestamp) AS timestamp FROM timed_balances '
+            'UNION SELECT MAX(timestamp) FROM delta_balance_snapshots)',
+        ).fetchone()[0]
+
+    @staticmethod
+    def _get_balance_keyframe_timestamp(
+            cursor: 'DBCursor',
+            timestamp: Timestamp,
+    ) -> Optional[Timestamp]:
+        """Returns the timestamp of the latest full balance snapshot up to the given one"""
+        return cursor.execute(
+            'SELECT MAX(timestamp) FROM timed_balances WHERE timestamp <= ? AND '
+            'timestamp NOT IN (SELECT timestamp FROM delta_balance_snapshots)',
+            (timestamp,),
+        ).fetchone()[0]
+
+    def get_snapshot_balance_rows(
+            self,
+            cursor: 'DBCursor',
+            timestamp: Timestamp,
+    ) -> list[tuple[str, Timestamp, str, str, str]]:
+        """Returns the timed_balances rows of the snapshot at the given timestamp as they
+        would be stored in a full snapshot. For a delta snapshot each balance is the latest
+        one saved since the full snapshot it builds on."""
+        if cursor.execute(
+                'SELECT COUNT(*) FROM delta_balance_snapshots WHERE timestamp=?',
+                (timestamp,),
+        ).fetchone()[0] == 0:
+            return cursor.execute(
+                'SELECT category, timestamp, currency, amount, usd_value FROM timed_balances '
+                'WHERE timestamp=?',
+                (timestamp,),
+            ).fetchall()
+
+        keyframe_timestamp = self._get_balance_keyframe_timestamp(cursor, timestamp)
+        return [
+            (row[0], timestamp, row[2], row[3], row[4]) for row in cursor.execute(
+                # the bare columns come from the row of MAX(timestamp) in sqlite
+                'SELECT category, MAX(timestamp), currency, amount, usd_value FROM timed_balances '
+                'WHERE timestamp BETWEEN ? AND ? GROUP BY currency, category',
+                (keyframe_timestamp if keyframe_timestamp is not None else 0, timestamp),
+            ) if row[3] is not None
+        ]
+
+    def _iterate_snapshot_balances(
+            self,
+            cursor: 'DBCursor',
+            from_ts: Timestamp,
+            to_ts: Timestamp,
+            condition: str,
+            bindings: Sequence[Union[str, int]],
+            resolution: Optional[int] = None,
+    ) -> Iterator[tuple[Timestamp, dict[tuple[str, str], tuple[str, str]]]]:
+        """Yields the timestamp of each balance snapshot in the range along with its
+        balances that match the given condition, keyed by currency and category.
+
+        The balances of delta snapshots are carried over from the snapshots before them.
+        If a resolution in seconds is given only the last snapshot of each period of that
+        length is yielded. The yielded dict is updated in place as the iteration goes on.
+        """
+        if (start_ts := self._get_balance_keyframe_timestamp(cursor, from_ts)) is None:
+            start_ts = from_ts
+        rows = cursor.execute(
+            'SELECT timestamp, currency, category, amount, usd_value FROM timed_balances '
+            f'WHERE timestamp BETWEEN ? AND ? AND {condition} ORDER BY timestamp ASC',
+            (start_ts, to_ts, *bindings),
+        ).fetchall()
+        snapshots = self.get_balance_snapshots(cursor, start_ts, to_ts)
+        kept_timestamps = None
+        if resolution is not None:
+            kept_timestamps = set({
+                timestamp // resolution: timestamp for timestamp, _ in snapshots
+                if timestamp >= from_ts
+            }.values())
+
+        balances: dict[tuple[str, str], tuple[str, str]] = {}
+        row_idx = 0
+        for timestamp, is_delta in snapshots:
+            if not is_delta:
+                balances = {}
+            while row_idx < len(rows) and rows[row_idx][0] == timestamp:
+                _, currency, category, amount, usd_value = rows[row_idx]
+                if amount is None:
+                    balances.pop((currency, category), None)
+                else:
+                    balances[(currency, category)] = (amount, usd_value)
+                row_idx += 1
+
+            if timestamp >= from_ts and (kept_timestamps is None or timestamp in kept_timestamps):  # noqa: E501
+                yield timestamp, balances
+
+    def _materialize_next_delta_snapshot(self, write_cursor: 'DBCursor', timestamp: Timestamp) -> None:  # noqa: E501
+        """If the balance snapshot after the given timestamp is a delta snapshot, turn it
+        into a full one since the snapshots it builds on are about to change.
+
+        A delta snapshot without any balances can't be stored as a full one and is dropped,
+        just like an empty full snapshot, so the snapshot after it is materialized too."""
+        materialized: list[tuple[Timestamp, list]] = []
+        while True:
+            next_timestamp = write_cursor.execute(
+                'SELECT MIN(timestamp) FROM (SELECT MIN(timestamp) AS timestamp FROM '
+                'timed_balances WHERE timestamp > ? UNION SELECT MIN(timestamp) FROM '
+                'delta_balance_snapshots WHERE timestamp > ?)',
+                (timestamp, timestamp),
+            ).fetchone()[0]
+            if next_timestamp is None or write_cursor.execute(
+                    'SELECT COUNT(*) FROM delta_balance_snapshots WHERE timestamp=?',
+                    (next_timestamp,),
+            ).fetchone()[0] == 0:
+                break
+
+            # reconstruct before changing anything as the deltas depend on each other
+            materialized.append((next_timestamp, rows := self.get_snapshot_balance_rows(write_cursor, next_timestamp)))  # noqa: E501
+            if len(rows) != 0:
+                break
+            timestamp = next_timestamp
+
+        for next_timestamp, rows in materialized:
+            write_cursor.execute('DELETE FROM timed_balances WHERE timestamp=?', (next_timestamp,))  # noqa: E501
+            write_cursor.execute(
+                'DELETE FROM delta_balance_snapshots WHERE timestamp=?',
+                (next_timestamp,),
+            )
+            self._insert_timed_balances(write_cursor=write_cursor, rows=rows)
+
+    def delete_balance_snapshot(self, write_cursor: 'DBCursor', timestamp: Timestamp) -> bool:
+        """Deletes the balances of the snapshot at the given timestamp. Returns False if
+        there is no such snapshot"""
+        self._materialize_next_delta_snapshot(write_cursor, timestamp)
+        write_cursor.execute('DELETE FROM timed_balances WHERE timestamp=?', (timestamp,))
+        deleted = write_cursor.rowcount != 0
+        write_cursor.execute('DELETE FROM delta_balance_snapshots WHERE timestamp=?', (timestamp,))
+        return deleted or write_cursor.rowcount != 0
+
     def delete_balancer_events_data(self, write_cursor: 'DBCursor') -> None:
         """Delete all historical Balancer events data"""
         write_cursor.execute('DELETE FROM balancer_events;')
@@ -1069,6 +1293,38 @@ class DBHandler:
             insert_rows,
         )
 
+    def get_token_detection_block(
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            blockchain: SupportedBlockchain,
+    ) -> Optional[int]:
+        """Returns the block up to which the stored token transfers of the address were
+        checked by token detection or None if the address was never fully detected"""
+        result = cursor.execute(
+            'SELECT value FROM evm_accounts_details WHERE account=? AND chain_id=? AND key=?',
+            (address, blockchain.to_chain_id().serialize_for_db(), EVM_ACCOUNTS_DETAILS_LAST_DETECTION_BLOCK),  # noqa: E501
+        ).fetchone()
+        return None if result is None else int(result[0])
+
+    def save_token_detection_block(
+            self,
+            write_cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            blockchain: SupportedBlockchain,
+            block_number: int,
+    ) -> None:
+        """Saves the block up to which the token transfers of the address were checked"""
+        chain_id = blockchain.to_chain_id().serialize_for_db()
+        write_cursor.execute(
+            'DELETE FROM evm_accounts_details WHERE account=? AND chain_id=? AND key=?',
+            (address, chain_id, EVM_ACCOUNTS_DETAILS_LAST_DETECTION_BLOCK),
+        )
+        write_cursor.execute(
+            'INSERT INTO evm_accounts_details (account, chain_id, key, value) VALUES (?, ?, ?, ?)',  # noqa: E501
+            (address, chain_id, EVM_ACCOUNTS_DETAILS_LAST_DETECTION_BLOCK, str(block_number)),
+        )
+
     def get_blockchain_accounts(self, cursor: 'DBCursor') -> BlockchainAccounts:
         """Returns a Blockchain accounts instance containing all blockchain account addresses"""
         cursor.execute(
@@ -1283,7 +1539,7 @@ class DBHandler:
             usd_value=str(data['net_usd']),
         ))
         try:
-            self.add_multiple_balances(write_cursor, balances)
+            self.add_snapshot_balances(write_cursor, timestamp=timestamp, balances=balances)
             self.add_multiple_location_data(write_cursor, locations)
         except InputError as err:
             self.msg_aggregator.add_warning(str(err))
@@ -1994,33 +2250,42 @@ class DBHandler:
             self,
             from_ts: Timestamp,
             include_nfts: bool = True,
-    ) -> tuple[list[str], list[str]]:
-        """Get all entries of net value data from the DB"""
+            resolution: Optional[int] = None,
+    ) -> tuple[list[int], list[str]]:
+        """Get all entries of net value data from the DB
+
+        If a resolution in seconds is given then only the last snapshot of each
+        period of that length is returned.
+        """
+        querystr = 'SELECT timestamp, usd_value FROM timed_location_data WHERE location="H" AND timestamp >= ?'  # noqa: E501
+        bindings: list[int] = [from_ts]
+        if resolution is not None:
+            querystr += (
+                ' AND timestamp IN (SELECT MAX(timestamp) FROM timed_location_data '
+                'WHERE location="H" AND timestamp >= ? GROUP BY timestamp / ?)'
+            )
+            bindings.extend((from_ts, resolution))
+
+        times_int, data = [], []
         with self.conn.read_ctx() as cursor:
+            nft_values: dict[Timestamp, FVal] = {}
+            if include_nfts is False:
+                for timestamp, nft_balances in self._iterate_snapshot_balances(
+                        cursor=cursor,
+                        from_ts=from_ts,
+                        to_ts=ts_now(),
+                        condition='currency LIKE ?',
+                        bindings=(f'{NFT_DIRECTIVE}%',),
+                ):
+                    if len(nft_balances) != 0:
+                        nft_values[timestamp] = sum((FVal(x[1]) for x in nft_balances.values()), start=ZERO)  # noqa: E501
+
             # Get the total location ("H") entries in ascending time
-            cursor.execute(
-                'SELECT timestamp, usd_value FROM timed_location_data '
-                'WHERE location="H" AND timestamp >= ? ORDER BY timestamp ASC;',
-                (from_ts,),
-            )
-            if not include_nfts:
-                with self.conn.read_ctx() as nft_cursor:
-                    nft_cursor.execute(
-                        'SELECT timestamp, SUM(usd_value) FROM timed_balances WHERE '
-                        'timestamp >= ? AND currency LIKE ? GROUP BY timestamp',
-                        (from_ts, f'{NFT_DIRECTIVE}%'),
-                    )
-                    nft_values = dict(nft_cursor)
+            for timestamp, usd_value in cursor.execute(querystr + ' ORDER BY timestamp ASC;', bindings):  # noqa: E501
+                times_int.append(timestamp)
+                # only the snapshots that had NFTs need to be touched
+                data.append(usd_value if (nft_value := nft_values.get(timestamp)) is None else str(FVal(usd_value) - nft_value))  # noqa: E501
 
-            data = []
-            times_int = []
-            for entry in cursor:
-                times_int.append(entry[0])
-                if include_nfts:
-                    total = entry[1]
-                else:
-                    total = str(FVal(entry[1]) - FVal(nft_values.get(entry[0], 0)))
-                data.append(total)
         return times_int, data
 
     @staticmethod
@@ -2029,6 +2294,7 @@ class DBHandler:
             balances: list[SingleDBAssetBalance],
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
+            resolution: Optional[int] = None,
     ) -> list[SingleDBAssetBalance]:
         """
         Given a list of asset specific timed balances, infers the missing zero timed balances
@@ -2045,6 +2311,9 @@ class DBHandler:
 
         Keep in mind that in a case like this (1, 1), (1, 2), (5, 4) we will infer (0, 3)
         despite the fact that it is not strictly needed by the front end.
+
+        Only the snapshot timestamps are read from the DB and if a resolution is
+        given only the ones that were kept when downsampling the balances.
         """
         if len(balances) == 0:
             return []
@@ -2054,33 +2323,23 @@ class DBHandler:
         if to_ts is None:
             to_ts = ts_now()
 
-        cursor.execute(
-            'SELECT COUNT(DISTINCT timestamp) FROM timed_balances WHERE timestamp BETWEEN ? AND ?',
-            (from_ts, to_ts),
-        )
-        num_distinct_timestamps = cursor.fetchone()[0]
+        all_timestamps = [x[0] for x in DBHandler.get_balance_snapshots(cursor, from_ts, to_ts)]
+        if resolution is not None:  # keep the last snapshot of each period
+            all_timestamps = list({x // resolution: x for x in all_timestamps}.values())
 
-        asset_timestamps = [b.time for b in balances if b.amount != ZERO]  # ignore timestamps from 0 balances added by the ssf_graph_multiplier setting  # noqa: E501
-        if len(asset_timestamps) == num_distinct_timestamps:
+        # ignore timestamps from 0 balances added by the ssf_graph_multiplier setting
+        asset_categories = {b.time: b.category for b in balances if b.amount != ZERO}
+        if len(asset_categories) == len(all_timestamps):
             return []
 
-        cursor.execute(
-            'SELECT timestamp, category FROM timed_balances WHERE timestamp BETWEEN ? AND ? '
-            'ORDER BY timestamp ASC',
-            (from_ts, to_ts),
-        )
-        all_timestamps, all_categories = zip(*cursor)
-        # dicts maintain insertion order in python 3.7+
-        timestamps_have_asset_balance = dict.fromkeys(all_timestamps, False)
-        timestamps_with_asset_balance = dict.fromkeys(asset_timestamps, True)
-        timestamps_have_asset_balance.update(timestamps_with_asset_balance)
-        prev_has_asset_balance = timestamps_have_asset_balance[all_timestamps[0]]  # the value of the first timestamp  # noqa: E501
-        prev_timestamp = all_timestamps[0]
         inferred_balances: list[SingleDBAssetBalance] = []
+        prev_timestamp = all_timestamps[0]
+        prev_has_asset_balance = prev_timestamp in asset_categories
+        last_asset_category = balances[0].category
         is_zero_period_open = False
-        last_asset_category = all_categories[-1]  # just a placeholder value, no need to calculate the actual value here  # noqa: E501
-        for idx, (timestamp, has_asset_balance) in enumerate(timestamps_have_asset_balance.items()):  # noqa: E501
-            if idx == len(timestamps_have_asset_balance) - 1 and has_asset_balance is False:
+        for timestamp in all_timestamps:
+            has_asset_balance = timestamp in asset_categories
+            if timestamp == all_timestamps[-1] and has_asset_balance is False:
                 # If there is no balance for the last timestamp add a zero balance.
                 inferred_balances.append(
                     SingleDBAssetBalance(
@@ -2097,24 +2356,24 @@ class DBHandler:
                         time=timestamp,
                         amount=ZERO,
                         usd_value=ZERO,
-                        category=BalanceType.deserialize_from_db(all_categories[idx - 1]),  # the category of the previous timed_balance of the asset  # noqa: E501
+                        category=last_asset_category,  # the category of the previous timed_balance of the asset  # noqa: E501
                     ),
                 )
                 is_zero_period_open = True
             elif has_asset_balance is True and prev_has_asset_balance is False and is_zero_period_open is True:  # noqa: E501
-                # add the end of a zero balance period
-                inferred_balances.append(
-                    SingleDBAssetBalance(
-                        time=prev_timestamp,
-                        amount=ZERO,
-                        usd_value=ZERO,
-                        category=inferred_balances[-1].category,  # the category of the asset at the start of the zero balance period  # noqa: E501
-                    ),
-                )
+                if inferred_balances[-1].time != prev_timestamp:  # add the end of a zero balance period unless it's also its start  # noqa: E501
+                    inferred_balances.append(
+                        SingleDBAssetBalance(
+                            time=prev_timestamp,
+                            amount=ZERO,
+                            usd_value=ZERO,
+                            category=last_asset_category,  # the category of the asset at the start of the zero balance period  # noqa: E501
+                        ),
+                    )
                 is_zero_period_open = False
-                last_asset_category = inferred_balances[-1].category
+                last_asset_category = asset_categories[timestamp]
             elif has_asset_balance is True:
-                last_asset_category = BalanceType.deserialize_from_db(all_categories[idx])
+                last_asset_category = asset_categories[timestamp]
             prev_has_asset_balance, prev_timestamp = has_asset_balance, timestamp
         return inferred_balances
 
@@ -2125,8 +2384,13 @@ class DBHandler:
             balance_type: BalanceType,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
+            resolution: Optional[int] = None,
     ) -> list[SingleDBAssetBalance]:
         """Query all balance entries for an asset and balance type within a range of timestamps
+
+        If a resolution in seconds is given then the balances are downsampled to the last
+        snapshot of each period of that length. The periods are the same for all assets
+        so that the graphs of different assets line up.
         """
         if from_ts is None:
             from_ts = Timestamp(0)
@@ -2134,56 +2398,63 @@ class DBHandler:
             to_ts = ts_now()
 
         settings = self.get_settings(cursor)
-        querystr = (
-            'SELECT timestamp, amount, usd_value, category FROM timed_balances '
-            'WHERE timestamp BETWEEN ? AND ? AND currency=?'
-        )
-        bindings = [from_ts, to_ts, asset.identifier]
-
+        currencies = [asset.identifier]
         if settings.treat_eth2_as_eth and asset == A_ETH:
-            querystr = querystr.replace('currency=?', 'currency IN (?,?)')
-            bindings.append('ETH2')
+            currencies.append('ETH2')
 
-        querystr += ' AND category=?'
-        bindings.append(balance_type.serialize_for_db())
-        querystr += ' ORDER BY timestamp ASC;'
-
-        cursor.execute(querystr, bindings)
-        results = cursor.fetchall()
+        category = balance_type.serialize_for_db()
         balances = []
-        results_length = len(results)
-        for idx, result in enumerate(results):
-            entry_time = result[0]
-            category = BalanceType.deserialize_from_db(result[3])
-            balances.append(
-                SingleDBAssetBalance(
-                    time=entry_time,
-                    amount=FVal(result[1]),
-                    usd_value=FVal(result[2]),
-                    category=category,
-                ),
-            )
-            if settings.ssf_graph_multiplier == 0 or idx == results_length - 1:
-                continue
-
-            next_result_time = results[idx + 1][0]
-            max_diff = settings.balance_save_frequency * HOUR_IN_SECONDS * settings.ssf_graph_multiplier  # noqa: E501
-            while next_result_time - entry_time > max_diff:
-                entry_time = entry_time + settings.balance_save_frequency * HOUR_IN_SECONDS
-                if entry_time >= next_result_time:
-                    break
+        for timestamp, snapshot_balances in self._iterate_snapshot_balances(
+                cursor=cursor,
+                from_ts=from_ts,
+                to_ts=to_ts,
+                condition=f'currency IN ({",".join(["?"] * len(currencies))}) AND category=?',
+                bindings=(*currencies, category),
+                resolution=resolution,
+        ):
+            for currency in currencies:
+                if (entry := snapshot_balances.get((currency, category))) is not None:
+                    balances.append(SingleDBAssetBalance(
+                        time=timestamp,
+                        amount=FVal(entry[0]),
+                        usd_value=FVal(entry[1]),
+                        category=balance_type,
+                    ))
+
+        if settings.ssf_graph_multiplier != 0 and len(balances) > 1:
+            step = settings.balance_save_frequency * HOUR_IN_SECONDS
+            max_diff = step * settings.ssf_graph_multiplier
+            if resolution is not None:
+                # downsampling can stretch a gap between snapshots by up to the resolution
+                step, max_diff = max(step, resolution), max_diff + resolution
+            filled_balances = []
+            for balance, next_balance in zip(balances, balances[1:]):
+                filled_balances.append(balance)
+                entry_time = balance.time
+                while next_balance.time - entry_time > max_diff:
+                    entry_time = Timestamp(entry_time + step)
+                    if entry_time >= next_balance.time:
+                        break
 
-                balances.append(
-                    SingleDBAssetBalance(
-                        time=entry_time,
-                        amount=ZERO,
-                        usd_value=ZERO,
-                        category=category,
-                    ),
-                )
+                    filled_balances.append(
+                        SingleDBAssetBalance(
+                            time=entry_time,
+                            amount=ZERO,
+                            usd_value=ZERO,
+                            category=balance_type,
+                        ),
+                    )
+            filled_balances.append(balances[-1])
+            balances = filled_balances
 
         if settings.infer_zero_timed_balances is True:
-            inferred_balances = self._infer_zero_timed_balances(cursor, balances, from_ts, to_ts)
+            inferred_balances = self._infer_zero_timed_balances(
+                cursor=cursor,
+                balances=balances,
+                from_ts=from_ts,
+                to_ts=to_ts,
+                resolution=resolution,
+            )
             if len(inferred_balances) != 0:
                 balances.extend(inferred_balances)
                 balances.sort(key=lambda x: x.time)
@@ -2199,6 +2470,7 @@ class DBHandler:
             collection_id: int,
             from_ts: Optional[Timestamp] = None,
             to_ts: Optional[Timestamp] = None,
+            resolution: Optional[int] = None,
     ) -> list[SingleDBAssetBalance]:
         """Query all balance entries for all assets of a collection within a range of timestamps
         """
@@ -2215,6 +2487,7 @@ class DBHandler:
                     balance_type=BalanceType.ASSET,
                     from_ts=from_ts,
                     to_ts=to_ts,
+                    resolution=resolution,
                 ))
 
         asset_balances.sort(key=lambda x: x.time)
@@ -2399,11 +2672,13 @@ class DBHandler:
         with self.conn.read_ctx() as cursor:
             ignored_asset_ids = self.get_ignored_asset_ids(cursor)
             treat_eth2_as_eth = self.get_settings(cursor).treat_eth2_as_eth
-            cursor.execute(
-                'SELECT timestamp, currency, amount, usd_value, category FROM timed_balances '
-                'WHERE timestamp=(SELECT MAX(timestamp) from timed_balances) AND category = ? '
-                'ORDER BY CAST(usd_value AS REAL) DESC;',
-                (BalanceType.ASSET.serialize_for_db(),),  # pylint: disable=no-member
+            latest_timestamp = self.get_latest_balance_snapshot_timestamp(cursor)
+            latest_rows = sorted(
+                (row for row in self.get_snapshot_balance_rows(cursor, latest_timestamp)
+                 if row[0] == BalanceType.ASSET.serialize_for_db())
+                if latest_timestamp is not None else (),
+                key=lambda row: float(row[4]),
+                reverse=True,
             )
             asset_balances = []
             eth_balance = DBAssetBalance(
@@ -2413,11 +2688,11 @@ class DBHandler:
                 amount=ZERO,
                 usd_value=ZERO,
             )
-            for result in cursor:
-                asset = Asset(result[1]).check_existence()
-                time = Timestamp(result[0])
-                amount = FVal(result[2])
-                usd_value = FVal(result[3])
+            for result in latest_rows:
+                asset = Asset(result[2]).check_existence()
+                time = Timestamp(result[1])
+                amount = FVal(result[3])
+                usd_value = FVal(result[4])
                 if asset.identifier in ignored_asset_ids:
                     continue
                 # show eth & eth2 as eth in value distribution by asset
@@ -2432,7 +2707,7 @@ class DBHandler:
                             asset=asset,
                             amount=amount,
                             usd_value=usd_value,
-                            category=BalanceType.deserialize_from_db(result[4]),
+                            category=BalanceType.deserialize_from_db(result[0]),
                         ),
                     )
             # only add the eth_balance if it contains a balance > 0
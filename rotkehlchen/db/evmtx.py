@@ -5,6 +5,7 @@ from rotkehlchen.chain.arbitrum_one.constants import ARBITRUM_ONE_GENESIS
 from rotkehlchen.chain.base.constants import BASE_GENESIS
 from rotkehlchen.chain.ethereum.constants import ETHEREUM_GENESIS
 from rotkehlchen.chain.evm.constants import GENESIS_HASH, ZERO_ADDRESS
+from rotkehlchen.chain.evm.decoding.constants import ERC20_OR_ERC721_TRANSFER
 from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
 from rotkehlchen.chain.evm.types import EvmAccount
 from rotkehlchen.chain.gnosis.constants import GNOSIS_GENESIS
@@ -29,7 +30,7 @@ from rotkehlchen.types import (
     deserialize_evm_tx_hash,
 )
 from rotkehlchen.utils.hexbytes import hexstring_to_bytes
-from rotkehlchen.utils.misc import hexstr_to_int
+from rotkehlchen.utils.misc import address_to_bytes32, hexstr_to_int
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -302,6 +303,79 @@ class DBEvmTx:
             cursor.execute(querystr, bindings)
             return cursor.fetchone()[0]
 
+    def get_erc20_transfer_contracts(
+            self,
+            cursor: 'DBCursor',
+            chain_id: ChainID,
+            address: ChecksumEvmAddress,
+            after_block: int,
+    ) -> set[ChecksumEvmAddress]:
+        """Returns the addresses of the contracts that emitted an ERC20 Transfer log
+        from or to the given address in the stored transactions of the chain that are in
+        blocks after `after_block`. ERC721 Transfer logs, which share the signature but
+        also index the token id as a fourth topic, are not included."""
+        cursor.execute(
+            'SELECT DISTINCT L.address FROM evmtx_receipt_logs AS L '
+            'INNER JOIN evm_transactions AS E ON L.tx_id=E.identifier '
+            'INNER JOIN evmtx_receipt_log_topics AS T0 ON T0.log=L.identifier AND T0.topic_index=0 '  # noqa: E501
+            'INNER JOIN evmtx_receipt_log_topics AS T ON T.log=L.identifier AND T.topic_index IN (1, 2) '  # noqa: E501
+            'WHERE E.chain_id=? AND E.block_number>? AND T0.topic=? AND T.topic=? AND NOT EXISTS '
+            '(SELECT 1 FROM evmtx_receipt_log_topics AS T3 WHERE T3.log=L.identifier AND T3.topic_index=3)',  # noqa: E501
+            (
+                chain_id.serialize_for_db(),
+                after_block,
+                ERC20_OR_ERC721_TRANSFER,
+                hexstring_to_bytes(address_to_bytes32(address)),
+            ),
+        )
+        contracts = set()
+        for (contract_address,) in cursor:
+            try:
+                contracts.add(deserialize_evm_address(contract_address))
+            except DeserializationError as e:
+                log.error(f'Found invalid log address {contract_address} in the DB. {e!s}')
+
+        return contracts
+
+    def get_last_transaction_block(
+            self,
+            cursor: 'DBCursor',
+            chain_id: ChainID,
+            address: ChecksumEvmAddress,
+    ) -> Optional[int]:
+        """Returns the highest block of the stored transactions of the address in the chain
+        or None if there is no transaction stored"""
+        return cursor.execute(
+            'SELECT MAX(E.block_number) FROM evm_transactions AS E INNER JOIN '
+            'evmtx_address_mappings AS M ON E.identifier=M.tx_id WHERE M.address=? AND E.chain_id=?',  # noqa: E501
+            (address, chain_id.serialize_for_db()),
+        ).fetchone()[0]
+
+    def get_last_block_with_receipts(
+            self,
+            cursor: 'DBCursor',
+            chain_id: ChainID,
+            address: ChecksumEvmAddress,
+    ) -> Optional[int]:
+        """Returns the highest block up to which all stored transactions of the address
+        in the chain have their receipt, and so their logs, stored. None if there is no
+        such transaction.
+
+        Receipts are only stored later, when transactions are decoded, so this can be
+        lower than the block of the last stored transaction.
+        """
+        return cursor.execute(
+            'SELECT MAX(E.block_number) FROM evm_transactions AS E '
+            'INNER JOIN evmtx_address_mappings AS M ON E.identifier=M.tx_id '
+            'INNER JOIN evmtx_receipts AS R ON E.identifier=R.tx_id '
+            'WHERE M.address=? AND E.chain_id=? AND E.block_number < COALESCE(('
+            'SELECT MIN(E2.block_number) FROM evm_transactions AS E2 '
+            'INNER JOIN evmtx_address_mappings AS M2 ON E2.identifier=M2.tx_id '
+            'LEFT JOIN evmtx_receipts AS R2 ON E2.identifier=R2.tx_id '
+            'WHERE M2.address=? AND E2.chain_id=? AND R2.tx_id IS NULL), E.block_number + 1)',
+            (address, chain_id.serialize_for_db(), address, chain_id.serialize_for_db()),
+        ).fetchone()[0]
+
     def add_receipt_data(
             self,
             write_cursor: 'DBCursor',
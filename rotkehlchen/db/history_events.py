@@ -1,10 +1,12 @@
 import copy
 import logging
-from collections.abc import Sequence
+from collections.abc import Callable, Iterator, Sequence
 from typing import TYPE_CHECKING, Any, Literal, Optional, Union, overload
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 
+from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.accounting.structures.base import (
     HistoryBaseEntry,
     HistoryBaseEntryType,
@@ -17,6 +19,7 @@ from rotkehlchen.accounting.structures.eth2 import (
     EthWithdrawalEvent,
 )
 from rotkehlchen.accounting.structures.evm_event import EvmEvent
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
@@ -64,6 +67,148 @@ ETH_STAKING_EVENT_FIELDS = 'validator_index, is_exit_or_blocknumber'
 ETH_STAKING_FIELD_LENGTH = 2
 
 
+class HistoryEventRow:
+    """A lightweight read only view over a row of the history events query.
+
+    The cheap fields needed to order events are read straight from the row. Asset
+    and balance objects are only built when accessed and the full event object is
+    created by `to_event()`. The full event is not kept so that the view stays small
+    when many rows are held in memory, as in accounting. Everything else is done
+    on the full event, see `materialize_history_event_rows()`.
+    """
+    __slots__ = ('_balance', '_entry', '_start', 'entry_type')
+
+    def __init__(self, entry: tuple, type_idx: int) -> None:
+        self._entry = entry
+        self._start = type_idx + 1
+        self.entry_type = HistoryBaseEntryType(entry[type_idx])
+        self._balance: Optional[Balance] = None
+
+    def __repr__(self) -> str:
+        return f'HistoryEventRow({self.entry_type!s}, identifier={self.identifier})'
+
+    @property
+    def identifier(self) -> int:
+        return self._entry[self._start]
+
+    @property
+    def event_identifier(self) -> str:
+        return self._entry[self._start + 1]
+
+    @property
+    def sequence_index(self) -> int:
+        return self._entry[self._start + 2]
+
+    @property
+    def timestamp(self) -> TimestampMS:
+        return TimestampMS(self._entry[self._start + 3])
+
+    @property
+    def location(self) -> Location:
+        return Location.deserialize_from_db(self._entry[self._start + 4])
+
+    @property
+    def location_label(self) -> Optional[str]:
+        return self._entry[self._start + 5]
+
+    @property
+    def asset(self) -> Asset:
+        """The asset of the event. Its existence is only checked by `to_event()`"""
+        return Asset(self._entry[self._start + 6])
+
+    @property
+    def balance(self) -> Balance:
+        """May raise DeserializationError"""
+        if self._balance is None:
+            self._balance = Balance(
+                amount=deserialize_fval(self._entry[self._start + 7], 'amount', 'history event row'),  # noqa: E501
+                usd_value=deserialize_fval(self._entry[self._start + 8], 'usd_value', 'history event row'),  # noqa: E501
+            )
+        return self._balance
+
+    @property
+    def notes(self) -> Optional[str]:
+        """The notes as stored in the DB. Some event types generate them when created"""
+        return self._entry[self._start + 9]
+
+    @property
+    def event_type(self) -> HistoryEventType:
+        return HistoryEventType.deserialize(self._entry[self._start + 10])
+
+    @property
+    def event_subtype(self) -> HistoryEventSubType:
+        return HistoryEventSubType.deserialize(self._entry[self._start + 11])
+
+    def to_event(self) -> HistoryBaseEntry:
+        """Deserialize the row to the history event class of its entry type
+
+        May raise:
+        - DeserializationError
+        - UnknownAsset
+        """
+        entry, start = self._entry, self._start
+        if self.entry_type == HistoryBaseEntryType.EVM_EVENT:
+            data = (
+                entry[start:start + HISTORY_BASE_ENTRY_LENGTH + 1] +
+                entry[start + HISTORY_BASE_ENTRY_LENGTH + 1:start + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1]    # noqa: E501
+            )
+            return EvmEvent.deserialize_from_db(data)
+
+        if self.entry_type in (
+                HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT,
+                HistoryBaseEntryType.ETH_BLOCK_EVENT,
+        ):
+            data = (
+                entry[start:start + 1] +
+                entry[start + 3:start + 4] +
+                entry[start + 5:start + 6] +
+                entry[start + 7:start + 9] +
+                entry[start + 11:start + 12] +
+                entry[start + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH:start + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + ETH_STAKING_FIELD_LENGTH + 1]  # noqa: E501
+            )
+            if self.entry_type == HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT:
+                return EthWithdrawalEvent.deserialize_from_db(data)
+            return EthBlockEvent.deserialize_from_db(data)
+
+        if self.entry_type == HistoryBaseEntryType.ETH_DEPOSIT_EVENT:
+            data = (
+                entry[start:start + 4] +
+                entry[start + 5:start + 6] +
+                entry[start + 7:start + 9] +
+                entry[start + HISTORY_BASE_ENTRY_LENGTH:start + HISTORY_BASE_ENTRY_LENGTH + 1] +  # noqa: E501
+                entry[start + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH:start + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1]  # noqa: E501
+            )
+            return EthDepositEvent.deserialize_from_db(data)
+
+        return HistoryEvent.deserialize_from_db(entry[start:])
+
+    def get_timestamp(self) -> Timestamp:
+        return ts_ms_to_sec(self.timestamp)
+
+    def get_identifier(self) -> str:
+        return str(self.identifier)
+
+
+def materialize_history_event_rows(
+        events_iterator: Iterator[Union[AccountingEventMixin, HistoryEventRow]],
+        on_skip: Optional[Callable[[HistoryEventRow], None]] = None,
+) -> Iterator[AccountingEventMixin]:
+    """Turn any history event rows coming from the iterator into full events, one at a time.
+
+    Rows that can't be deserialized are skipped and given to `on_skip` if provided.
+    """
+    for event in events_iterator:
+        if isinstance(event, HistoryEventRow):
+            try:
+                yield event.to_event()
+            except (DeserializationError, UnknownAsset) as e:
+                log.debug(f'Failed to deserialize history event row {event} due to {e!s}')
+                if on_skip is not None:
+                    on_skip(event)
+        else:
+            yield event
+
+
 class DBHistoryEvents:
 
     def __init__(self, database: 'DBHandler') -> None:
@@ -384,7 +529,80 @@ class DBHistoryEvents:
         list[tuple[int, EvmEvent]], list[EvmEvent],
         list[tuple[int, EthDepositEvent]], list[EthDepositEvent],
     ]:
-        """Get all events from the DB, deserialized depending on the event type
+        """Get all events from the DB, deserialized depending on the event type"""
+        return list(self.iterate_history_events(  # type: ignore # This is due to needing a generic HistoryBaseEntry return in this function, but the overloads would not work since HistoryEvent` is the same. Essentially the non-abstract version of HistoryBaseEntry
+            cursor=cursor,
+            filter_query=filter_query,
+            has_premium=has_premium,
+            group_by_event_ids=group_by_event_ids,
+        ))
+
+    def iterate_history_events(
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryBaseEntryFilterQuery,
+            has_premium: bool,
+            group_by_event_ids: bool = False,
+    ) -> Iterator[Union[HistoryBaseEntry, tuple[int, HistoryBaseEntry]]]:
+        """Like get_history_events but the events are only deserialized while the
+        returned iterator is consumed. All rows are read here so the cursor is free
+        to be used or closed as soon as this returns.
+        """
+        query, bindings, type_idx = self._prepare_history_events_query(
+            filter_query=filter_query,
+            has_premium=has_premium,
+            group_by_event_ids=group_by_event_ids,
+        )
+        return self._deserialize_history_events(
+            entries=cursor.execute(query, bindings).fetchall(),
+            type_idx=type_idx,
+            group_by_event_ids=group_by_event_ids,
+        )
+
+    @staticmethod
+    def _deserialize_history_events(
+            entries: list[tuple],
+            type_idx: int,
+            group_by_event_ids: bool,
+    ) -> Iterator[Union[HistoryBaseEntry, tuple[int, HistoryBaseEntry]]]:
+        for entry in entries:
+            try:
+                deserialized_event = HistoryEventRow(entry=entry, type_idx=type_idx).to_event()
+            except (DeserializationError, UnknownAsset) as e:
+                log.debug(f'Failed to deserialize history event {entry} due to {e!s}')
+                continue
+
+            if group_by_event_ids is True:
+                yield entry[0], deserialized_event
+            else:
+                yield deserialized_event
+
+    def get_history_event_rows(
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryBaseEntryFilterQuery,
+    ) -> list['HistoryEventRow']:
+        """Get all events matching the filter as lightweight row views, without any limits.
+
+        Nothing is deserialized here. Rows that can't be deserialized only fail
+        once they are turned into events via `HistoryEventRow.to_event()`.
+        """
+        query, bindings, type_idx = self._prepare_history_events_query(
+            filter_query=filter_query,
+            has_premium=True,
+            group_by_event_ids=False,
+        )
+        cursor.execute(query, bindings)
+        return [HistoryEventRow(entry=entry, type_idx=type_idx) for entry in cursor]
+
+    def _prepare_history_events_query(
+            self,
+            filter_query: HistoryBaseEntryFilterQuery,
+            has_premium: bool,
+            group_by_event_ids: bool,
+    ) -> tuple[str, list[Any], int]:
+        """Create the query for history events with the given filter. Returns the query,
+        its bindings and the index of the entry type column in each returned row.
 
         TODO: To not query all columns with all joins for all cases, we perhaps can
         peek on the entry type of the filter and adjust the SELECT fields accordingly?
@@ -420,60 +638,7 @@ class DBHistoryEvents:
             base_query = f'{base_prefix} * FROM (SELECT {free_query_count} {HISTORY_BASE_ENTRY_FIELDS}, {EVM_EVENT_FIELDS}, {ETH_STAKING_EVENT_FIELDS} {ALL_EVENTS_DATA_JOIN} {free_query_group_by} ORDER BY timestamp DESC, sequence_index ASC LIMIT ?) '  # noqa: E501
             bindings.insert(0, FREE_HISTORY_EVENTS_LIMIT)
 
-        cursor.execute(base_query + prepared_query, bindings)
-        output: Union[list[HistoryBaseEntry], list[tuple[int, HistoryBaseEntry]]] = []  # type: ignore
-        data_start_idx = type_idx + 1
-        for entry in cursor:
-            entry_type = HistoryBaseEntryType(entry[type_idx])
-            try:
-                deserialized_event: Union[HistoryEvent, EvmEvent, EthWithdrawalEvent, EthBlockEvent]  # noqa: E501
-                # Deserialize event depending on its type
-                if entry_type == HistoryBaseEntryType.EVM_EVENT:
-                    data = (
-                        entry[data_start_idx:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + 1] +
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH + 1:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1]    # noqa: E501
-                    )
-                    deserialized_event = EvmEvent.deserialize_from_db(data)
-                elif entry_type in (
-                        HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT,
-                        HistoryBaseEntryType.ETH_BLOCK_EVENT,
-                ):
-                    data = (
-                        entry[data_start_idx:data_start_idx + 1] +
-                        entry[data_start_idx + 3:data_start_idx + 4] +
-                        entry[data_start_idx + 5:data_start_idx + 6] +
-                        entry[data_start_idx + 7:data_start_idx + 9] +
-                        entry[data_start_idx + 11:data_start_idx + 12] +
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + ETH_STAKING_FIELD_LENGTH + 1]  # noqa: E501
-                    )
-                    if entry_type == HistoryBaseEntryType.ETH_WITHDRAWAL_EVENT:
-                        deserialized_event = EthWithdrawalEvent.deserialize_from_db(data)
-                    else:
-                        deserialized_event = EthBlockEvent.deserialize_from_db(data)
-
-                elif entry_type == HistoryBaseEntryType.ETH_DEPOSIT_EVENT:
-                    data = (
-                        entry[data_start_idx:data_start_idx + 4] +
-                        entry[data_start_idx + 5:data_start_idx + 6] +
-                        entry[data_start_idx + 7:data_start_idx + 9] +
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + 1] +  # noqa: E501
-                        entry[data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH:data_start_idx + HISTORY_BASE_ENTRY_LENGTH + EVM_FIELD_LENGTH + 1]  # noqa: E501
-                    )
-                    deserialized_event = EthDepositEvent.deserialize_from_db(data)
-
-                else:
-                    data = entry[data_start_idx:HISTORY_BASE_ENTRY_LENGTH + 1]
-                    deserialized_event = HistoryEvent.deserialize_from_db(entry[data_start_idx:])
-            except (DeserializationError, UnknownAsset) as e:
-                log.debug(f'Failed to deserialize history event {entry} due to {e!s}')
-                continue
-
-            if group_by_event_ids is True:
-                output.append((entry[0], deserialized_event))  # type: ignore
-            else:
-                output.append(deserialized_event)  # type: ignore
-
-        return output  # type: ignore # This is due to needing a generic HistoryBaseEntry return in this function, but the overloads would not work since HistoryEvent` is the same. Essentially the non-abstract version of HistoryBaseEntry
+        return base_query + prepared_query, bindings, type_idx
 
     @overload
     def get_history_events_and_limit_info(
@@ -7,6 +7,7 @@ MINIMIZED_USER_DB_SCHEMA = {
     "balance_category": "categorychar(1)primarykeynotnull,seqintegerunique",
     "assets": "identifiertextnotnullprimarykey",
     "timed_balances": "categorychar(1)notnulldefault('a')referencesbalance_category(category),timestampinteger,currencytext,amounttext,usd_valuetext,foreignkey(currency)referencesassets(identifier)onupdatecascade,primarykey(timestamp,currency,category)",
+    "delta_balance_snapshots": "timestampintegernotnullprimarykey",
     "timed_location_data": "timestampinteger,locationchar(1)notnulldefault('a')referenceslocation(location),usd_valuetext,primarykey(timestamp,location)",
     "user_credentials": "nametextnotnull,locationchar(1)notnulldefault('a')referenceslocation(location),api_keytext,api_secrettext,passphrasetext,primarykey(name,location)",
     "user_credentials_mappings": "credential_nametextnotnull,credential_locationchar(1)notnulldefault('a')referenceslocation(location),setting_nametextnotnull,setting_valuetextnotnull,foreignkey(credential_name,credential_location)referencesuser_credentials(name,location)ondeletecascadeonupdatecascade,primarykey(credential_name,credential_location,setting_name)",
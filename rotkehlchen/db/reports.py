@@ -1,5 +1,7 @@
 import logging
+from collections.abc import Iterator
 from copy import deepcopy
+from itertools import islice
 from typing import TYPE_CHECKING, Any, Callable, Literal, Optional, Union, overload
 
 from pysqlcipher3 import dbapi2 as sqlcipher
@@ -19,6 +21,7 @@ log = RotkehlchenLogsAdapter(logger)
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
     from rotkehlchen.db.filtering import ReportDataFilterQuery
 
 
@@ -251,7 +254,51 @@ class DBAccountingReports:
         - InputError if the report ID does not exist in the DB
         """
         cursor = self.db.conn_transient.cursor()
-        report_id = filter_.report_id
+        self._check_report_exists(cursor, filter_.report_id)
+        rows = self._query_report_events(cursor, filter_)
+        records = list(self._deserialize_report_events(rows))
+        if filter_.pagination is not None:
+            total_filter_count = self._count_report_events(cursor, filter_)
+        else:
+            total_filter_count = len(records)
+
+        return _get_reports_or_events_maybe_limit(
+            entry_type='events',
+            entries_found=total_filter_count,
+            entries=records,
+            with_limit=with_limit,
+        )
+
+    def iterate_report_data(
+            self,
+            filter_: 'ReportDataFilterQuery',
+            with_limit: bool,
+    ) -> tuple[Iterator[ProcessedAccountingEvent], int]:
+        """Like get_report_data but the events are only deserialized while the returned
+        iterator is consumed so that they can be streamed. All rows are read here so
+        no cursor is kept open while the iterator is consumed.
+
+        May raise:
+        - InputError if the report ID does not exist in the DB
+        """
+        cursor = self.db.conn_transient.cursor()
+        try:
+            self._check_report_exists(cursor, filter_.report_id)
+            entries_found = self._count_report_events(cursor, filter_)
+            rows = self._query_report_events(cursor, filter_)
+        finally:
+            cursor.close()
+
+        events = self._deserialize_report_events(rows)
+        if with_limit is True:
+            events = islice(events, FREE_PNL_EVENTS_LIMIT)
+        return events, entries_found
+
+    @staticmethod
+    def _check_report_exists(cursor: 'DBCursor', report_id: int) -> None:
+        """May raise:
+        - InputError if the report ID does not exist in the DB
+        """
         query_result = cursor.execute(
             'SELECT COUNT(*) FROM pnl_reports WHERE identifier=?',
             (report_id,),
@@ -261,36 +308,34 @@ class DBAccountingReports:
                 f'Tried to get PnL events from non existing report with id {report_id}',
             )
 
+    @staticmethod
+    def _count_report_events(cursor: 'DBCursor', filter_: 'ReportDataFilterQuery') -> int:
+        """Counts the events of a report matching the filter, ignoring pagination"""
+        no_pagination_filter = deepcopy(filter_)
+        no_pagination_filter.pagination = None
+        query, bindings = no_pagination_filter.prepare()
+        query = 'SELECT COUNT(*) FROM pnl_events ' + query
+        return cursor.execute(query, bindings).fetchone()[0]
+
+    @staticmethod
+    def _query_report_events(
+            cursor: 'DBCursor',
+            filter_: 'ReportDataFilterQuery',
+    ) -> list[tuple[int, str]]:
+        """Reads the events of a report matching the filter without deserializing them"""
         query, bindings = filter_.prepare()
         query = 'SELECT timestamp, data FROM pnl_events ' + query
-        cursor.execute(query, bindings)
+        return cursor.execute(query, bindings).fetchall()
 
-        records = []
-        for result in cursor:
+    def _deserialize_report_events(
+            self,
+            rows: list[tuple[int, str]],
+    ) -> Iterator[ProcessedAccountingEvent]:
+        for result in rows:
             try:
-                record = ProcessedAccountingEvent.deserialize_from_db(result[0], result[1])
+                yield ProcessedAccountingEvent.deserialize_from_db(result[0], result[1])
             except DeserializationError as e:
                 self.db.msg_aggregator.add_error(
                     f'Error deserializing AccountingEvent from the DB. Skipping it.'
                     f'Error was: {e!s}',
                 )
-                continue
-
-            records.append(record)
-
-        if filter_.pagination is not None:
-            no_pagination_filter = deepcopy(filter_)
-            no_pagination_filter.pagination = None
-            query, bindings = no_pagination_filter.prepare()
-            query = 'SELECT COUNT(*) FROM pnl_events ' + query
-            results = cursor.execute(query, bindings).fetchone()
-            total_filter_count = results[0]
-        else:
-            total_filter_count = len(records)
-
-        return _get_reports_or_events_maybe_limit(
-            entry_type='events',
-            entries_found=total_filter_count,
-            entries=records,
-            with_limit=with_limit,
-        )
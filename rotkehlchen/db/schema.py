@@ -172,6 +172,15 @@ CREATE TABLE IF NOT EXISTS timed_balances (
 );
 """
 
+# Snapshots whose timed_balances only contain the balances that changed since the previous
+# snapshot. Balances that are gone are stored with a NULL amount and usd_value. Snapshots
+# not in here are full snapshots (keyframes) that the deltas after them build on.
+DB_CREATE_DELTA_BALANCE_SNAPSHOTS = """
+CREATE TABLE IF NOT EXISTS delta_balance_snapshots (
+    timestamp INTEGER NOT NULL PRIMARY KEY
+);
+"""
+
 DB_CREATE_TIMED_LOCATION_DATA = """
 CREATE TABLE IF NOT EXISTS timed_location_data (
     timestamp INTEGER,
@@ -685,6 +694,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_BALANCE_CATEGORY}
 {DB_CREATE_ASSETS}
 {DB_CREATE_TIMED_BALANCES}
+{DB_CREATE_DELTA_BALANCE_SNAPSHOTS}
 {DB_CREATE_TIMED_LOCATION_DATA}
 {DB_CREATE_USER_CREDENTIALS}
 {DB_CREATE_USER_CREDENTIALS_MAPPINGS}
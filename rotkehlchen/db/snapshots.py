@@ -1,10 +1,15 @@
 import logging
+from collections.abc import Iterator
 from pathlib import Path
 from tempfile import mkdtemp
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 from zipfile import ZIP_DEFLATED, ZipFile
 
-from rotkehlchen.accounting.export.csv import CSVWriteError, dict_to_csv_file
+from rotkehlchen.accounting.export.csv import (
+    CSVWriteError,
+    dict_to_csv_file,
+    dict_to_csv_in_zip,
+)
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.constants.misc import NFT_DIRECTIVE
 from rotkehlchen.db.dbhandler import DBHandler
@@ -40,14 +45,11 @@ class DBSnapshot:
             cursor: 'DBCursor',
             timestamp: Timestamp,
     ) -> list[DBAssetBalance]:
-        """Retrieves the timed_balances from the db for a given timestamp."""
-        balances_data = []
-        cursor.execute(
-            'SELECT category, timestamp, currency, amount, usd_value FROM timed_balances '
-            'WHERE timestamp=?', (timestamp,),
-        )
+        """Retrieves the timed_balances from the db for a given timestamp.
 
-        for data in cursor:
+        If it's a delta snapshot its full balances are reconstructed."""
+        balances_data = []
+        for data in self.db.get_snapshot_balance_rows(cursor, timestamp):
             try:
                 balances_data.append(DBAssetBalance.deserialize_from_db(data))
             except UnknownAsset as e:
@@ -86,39 +88,23 @@ class DBSnapshot:
             main_currency: AssetWithOracles,
             main_currency_price: Price,
     ) -> tuple[bool, str]:
-        """Creates a zip file of csv files containing timed_balances and timed_location_data."""
-        dirpath = Path(mkdtemp())
-        success, msg = self._export(
-            timed_balances=timed_balances,
-            timed_location_data=timed_location_data,
-            directory=dirpath,
-            main_currency=main_currency,
-            main_currency_price=main_currency_price,
-        )
-        if not success:
-            return False, msg
-
-        files: list[tuple[Path, str]] = [
-            (dirpath / BALANCES_FILENAME, BALANCES_FILENAME),
-            (dirpath / BALANCES_FOR_IMPORT_FILENAME, BALANCES_FOR_IMPORT_FILENAME),
-            (dirpath / LOCATION_DATA_FILENAME, LOCATION_DATA_FILENAME),
-            (dirpath / LOCATION_DATA_IMPORT_FILENAME, LOCATION_DATA_IMPORT_FILENAME),
-        ]
-        with ZipFile(file=dirpath / 'snapshot.zip', mode='w', compression=ZIP_DEFLATED) as archive:
-            for path, filename in files:
-                if not path.exists():
-                    continue
-
-                archive.write(path, filename)
-                path.unlink()
+        """Creates a zip file of csv files containing timed_balances and timed_location_data.
 
-        success = False
-        filename = ''
-        if archive.filename is not None:
-            success = True
-            filename = archive.filename
+        Each csv is written directly in the zip as its rows are serialized."""
+        zip_path = Path(mkdtemp()) / 'snapshot.zip'
+        try:
+            with ZipFile(file=zip_path, mode='w', compression=ZIP_DEFLATED) as archive:
+                for filename, rows in self._csv_files(
+                    timed_balances=timed_balances,
+                    timed_location_data=timed_location_data,
+                    main_currency=main_currency,
+                    main_currency_price=main_currency_price,
+                ):
+                    dict_to_csv_in_zip(archive=archive, filename=filename, dictionary_list=rows)
+        except (CSVWriteError, PermissionError) as e:
+            return False, str(e)
 
-        return success, filename
+        return True, str(zip_path)
 
     def export(
             self,
@@ -160,56 +146,55 @@ class DBSnapshot:
             main_currency_price=main_currency_price,
         )
 
-    def _export(
+    def _csv_files(
             self,
             timed_balances: list[DBAssetBalance],
             timed_location_data: list[LocationData],
-            directory: Path,
             main_currency: AssetWithOracles,
             main_currency_price: Price,
-    ) -> tuple[bool, str]:
-        """Serializes the balances and location_data snapshots into a dictionary.
-        It then writes the serialized data to a csv file.
-        """
+    ) -> list[tuple[str, Iterator[dict[str, Any]]]]:
+        """Returns the name of each snapshot csv file along with an iterator that lazily
+        serializes its rows"""
         with self.db.conn.read_ctx() as cursor:
             display_date_in_localtime = self.db.get_settings(cursor).display_date_in_localtime
 
-        serialized_timed_balances = []
-        for balance in timed_balances:
-            serialized_timed_balance = balance.serialize(
-                currency_and_price=(main_currency, main_currency_price),
-                display_date_in_localtime=display_date_in_localtime,
-            )
-            serialized_timed_balances.append(serialized_timed_balance)
-
-        serialized_timed_balances_for_import = [balance.serialize() for balance in timed_balances]
-        serialized_timed_location_data = [
-            loc_data.serialize(
-                currency_and_price=(main_currency, main_currency_price),
-                display_date_in_localtime=display_date_in_localtime,
-            )
-            for loc_data in timed_location_data
+        return [
+            (BALANCES_FILENAME, (
+                balance.serialize(
+                    currency_and_price=(main_currency, main_currency_price),
+                    display_date_in_localtime=display_date_in_localtime,
+                ) for balance in timed_balances
+            )),
+            (BALANCES_FOR_IMPORT_FILENAME, (balance.serialize() for balance in timed_balances)),
+            (LOCATION_DATA_FILENAME, (
+                loc_data.serialize(
+                    currency_and_price=(main_currency, main_currency_price),
+                    display_date_in_localtime=display_date_in_localtime,
+                ) for loc_data in timed_location_data
+            )),
+            (LOCATION_DATA_IMPORT_FILENAME, (loc_data.serialize() for loc_data in timed_location_data)),  # noqa: E501
         ]
-        serialized_timed_location_data_for_import = [loc_data.serialize() for loc_data in timed_location_data]  # noqa: E501
 
+    def _export(
+            self,
+            timed_balances: list[DBAssetBalance],
+            timed_location_data: list[LocationData],
+            directory: Path,
+            main_currency: AssetWithOracles,
+            main_currency_price: Price,
+    ) -> tuple[bool, str]:
+        """Serializes the balances and location_data snapshots and writes each
+        of them to a csv file as they are serialized.
+        """
         try:
             directory.mkdir(parents=True, exist_ok=True)
-            dict_to_csv_file(
-                directory / BALANCES_FILENAME,
-                serialized_timed_balances,
-            )
-            dict_to_csv_file(
-                directory / BALANCES_FOR_IMPORT_FILENAME,
-                serialized_timed_balances_for_import,
-            )
-            dict_to_csv_file(
-                directory / LOCATION_DATA_FILENAME,
-                serialized_timed_location_data,
-            )
-            dict_to_csv_file(
-                directory / LOCATION_DATA_IMPORT_FILENAME,
-                serialized_timed_location_data_for_import,
-            )
+            for filename, rows in self._csv_files(
+                timed_balances=timed_balances,
+                timed_location_data=timed_location_data,
+                main_currency=main_currency,
+                main_currency_price=main_currency_price,
+            ):
+                dict_to_csv_file(directory / filename, rows)
         except (CSVWriteError, PermissionError) as e:
             return False, str(e)
 
@@ -262,8 +247,7 @@ class DBSnapshot:
         May raise:
         - InputError
         """
-        write_cursor.execute('DELETE FROM timed_balances WHERE timestamp=?', (timestamp,))
-        if write_cursor.rowcount == 0:
+        if self.db.delete_balance_snapshot(write_cursor, timestamp) is False:
             raise InputError('No snapshot found for the specified timestamp')
         write_cursor.execute('DELETE FROM timed_location_data WHERE timestamp=?', (timestamp,))
         if write_cursor.rowcount == 0:
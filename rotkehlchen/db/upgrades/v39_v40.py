@@ -24,6 +24,7 @@ from rotkehlchen.accounting.structures.types import HistoryEventSubType, History
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+KEYFRAME_INTERVAL_AT_V40 = 30  # every how many balance snapshots a full one is kept
 PREFIX = 'RE_%'  # hard-coded since this is a migration and prefix may change in the future
 MIGRATION_PREFIX = 'MLA_'  # prefix to add to ledger actions migrated to history events id
 CHANGES = [  # TO TYPE, TO SUBTYPE, FROM TYPE, FROM SUBTYPE
@@ -313,18 +314,68 @@ def _add_new_tables(write_cursor: 'DBCursor') -> None:
         UNIQUE(type, subtype, counterparty)
     );
     """)
+    write_cursor.execute("""
+    CREATE TABLE IF NOT EXISTS delta_balance_snapshots (
+        timestamp INTEGER NOT NULL PRIMARY KEY
+    );
+    """)
     log.debug('Exit _add_new_tables')
 
 
+def _compact_balance_snapshots(write_cursor: 'DBCursor') -> None:
+    """Keep every KEYFRAME_INTERVAL_AT_V40th balance snapshot as a full snapshot and turn
+    the rest into delta snapshots that only keep the balances that changed since the
+    previous snapshot plus a NULL amount entry for each balance that is gone."""
+    log.debug('Enter _compact_balance_snapshots')
+    timestamps = [x[0] for x in write_cursor.execute(
+        'SELECT DISTINCT timestamp FROM timed_balances ORDER BY timestamp ASC',
+    )]
+    previous_balances: dict[tuple[str, str], tuple[str, str]] = {}
+    for idx, timestamp in enumerate(timestamps):
+        balances = {
+            (currency, category): (amount, usd_value)
+            for category, currency, amount, usd_value in write_cursor.execute(
+                'SELECT category, currency, amount, usd_value FROM timed_balances '
+                'WHERE timestamp=?',
+                (timestamp,),
+            )
+        }
+        if idx % KEYFRAME_INTERVAL_AT_V40 != 0:
+            write_cursor.execute(
+                'INSERT INTO delta_balance_snapshots(timestamp) VALUES (?)',
+                (timestamp,),
+            )
+            write_cursor.executemany(
+                'DELETE FROM timed_balances WHERE timestamp=? AND currency=? AND category=?',
+                [
+                    (timestamp, currency, category)
+                    for (currency, category), value in balances.items()
+                    if previous_balances.get((currency, category)) == value
+                ],
+            )
+            write_cursor.executemany(
+                'INSERT INTO timed_balances(category, timestamp, currency, amount, usd_value) '
+                'VALUES (?, ?, ?, NULL, NULL)',
+                [
+                    (category, timestamp, currency)
+                    for currency, category in previous_balances.keys() - balances.keys()
+                ],
+            )
+        previous_balances = balances
+
+    log.debug(f'Exit _compact_balance_snapshots after compacting {len(timestamps)} snapshots')
+
+
 def upgrade_v39_to_v40(db: 'DBHandler', progress_handler: 'DBUpgradeProgressHandler') -> None:
     """Upgrades the DB from v39 to v40. This was in v1.31.0 release.
 
         - Migrate rotki events that were broken due to https://github.com/rotki/rotki/issues/6550
         - Purge kraken events
         - Create new tables
+        - Compact the balance snapshots into delta snapshots
     """
     log.debug('Entered userdb v39->v40 upgrade')
-    progress_handler.set_total_steps(8)
+    progress_handler.set_total_steps(9)
     with db.user_write() as write_cursor:
         _add_new_tables(write_cursor)
         progress_handler.new_step()
@@ -340,6 +391,8 @@ def upgrade_v39_to_v40(db: 'DBHandler', progress_handler: 'DBUpgradeProgressHand
         progress_handler.new_step()
         _migrate_ledger_actions(write_cursor, db.conn)
         progress_handler.new_step()
+        _compact_balance_snapshots(write_cursor)
+        progress_handler.new_step()
 
     db.conn.execute('VACUUM;')
     progress_handler.new_step()
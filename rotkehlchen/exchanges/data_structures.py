@@ -33,6 +33,7 @@ from rotkehlchen.types import (
     TradeType,
 )
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.mixins.enums import SerializableEnumNameMixin
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
@@ -806,3 +807,9 @@ class BinancePair(NamedTuple):
             quote_asset=asset_from_binance(entry[2]),
             location=Location.deserialize_from_db(entry[3]),
         )
+
+
+class KrakenAccountType(SerializableEnumNameMixin):
+    STARTER = 0
+    INTERMEDIATE = 1
+    PRO = 2
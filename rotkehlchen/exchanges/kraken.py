@@ -42,7 +42,12 @@ from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
-from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
+from rotkehlchen.exchanges.data_structures import (
+    AssetMovement,
+    KrakenAccountType,
+    MarginPosition,
+    Trade,
+)
 from rotkehlchen.exchanges.exchange import (
     ExchangeInterface,
     ExchangeQueryBalances,
@@ -71,7 +76,6 @@ from rotkehlchen.types import (
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import pairwise, ts_ms_to_sec, ts_now
 from rotkehlchen.utils.mixins.cacheable import cache_response_timewise
-from rotkehlchen.utils.mixins.enums import SerializableEnumNameMixin
 from rotkehlchen.utils.mixins.lockable import protect_with_lock
 from rotkehlchen.utils.serialization import jsonloads_dict
 
@@ -162,12 +166,6 @@ def _check_and_get_response(response: Response, method: str) -> Union[str, dict]
     return result
 
 
-class KrakenAccountType(SerializableEnumNameMixin):
-    STARTER = 0
-    INTERMEDIATE = 1
-    PRO = 2
-
-
 DEFAULT_KRAKEN_ACCOUNT_TYPE = KrakenAccountType.STARTER
 
 
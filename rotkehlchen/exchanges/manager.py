@@ -7,7 +7,6 @@ from typing import TYPE_CHECKING, Any, Optional
 
 from rotkehlchen.db.constants import BINANCE_MARKETS_KEY, KRAKEN_ACCOUNT_TYPE_KEY
 from rotkehlchen.errors.misc import InputError
-from rotkehlchen.exchanges.binance import BINANCE_BASE_URL, BINANCEUS_BASE_URL
 from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeWithExtras
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import (
@@ -24,7 +23,7 @@ from .constants import SUPPORTED_EXCHANGES
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.data_structures import KrakenAccountType
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -260,9 +259,9 @@ class ExchangeManager:
         if credentials.passphrase is not None:
             kwargs['passphrase'] = credentials.passphrase
         elif credentials.location == Location.BINANCE:
-            kwargs['uri'] = BINANCE_BASE_URL
-        elif credentials.location == Location.BINANCEUS:
-            kwargs['uri'] = BINANCEUS_BASE_URL
+            kwargs['uri'] = module.BINANCE_BASE_URL
+        elif credentials.location == Location.BINANCEUS:  # uses the binance module
+            kwargs['uri'] = module.BINANCEUS_BASE_URL
 
         exchange_obj = exchange_ctor(
             name=credentials.name,
@@ -1,5 +1,6 @@
 import json
 import logging
+from collections import defaultdict
 from http import HTTPStatus
 from typing import Any, Literal, NamedTuple, Optional, Union, overload
 from urllib.parse import urlencode
@@ -496,6 +497,10 @@ COINGECKO_SIMPLE_VS_CURRENCIES = [
     'xag',
     'xau',
 ]
+# Number of coingecko ids to ask for in a single simple/price query to keep the url short
+COINGECKO_SIMPLE_PRICE_CHUNK_SIZE = 100
+# market_chart/range returns hourly prices only for ranges of up to 90 days
+COINGECKO_MARKET_CHART_RANGE_SECS = DAY_IN_SECONDS * 90
 
 
 class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
@@ -705,6 +710,56 @@ class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
             )
             return ZERO_PRICE, False
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: list[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Returns the simple prices in to_asset of all the given assets supported by
+        coingecko, asking for many coingecko ids with each simple/price query.
+
+        If a query fails the prices found until then are returned.
+        """
+        if len(from_assets) == 0 or not (vs_currency := Coingecko.check_vs_currencies(
+            from_asset=from_assets[0],
+            to_asset=to_asset,
+            location='simple price',
+        )):
+            return {}
+
+        ids_to_assets: defaultdict[str, list[AssetWithOracles]] = defaultdict(list)
+        for from_asset in from_assets:
+            try:
+                ids_to_assets[from_asset.to_coingecko()].append(from_asset)
+            except UnsupportedAsset:
+                log.debug(f'Skipping {from_asset.identifier} in coingecko simple prices since it is not supported')  # noqa: E501
+
+        prices = {}
+        coingecko_ids = list(ids_to_assets)
+        for idx in range(0, len(coingecko_ids), COINGECKO_SIMPLE_PRICE_CHUNK_SIZE):
+            chunk = coingecko_ids[idx:idx + COINGECKO_SIMPLE_PRICE_CHUNK_SIZE]
+            try:
+                result = self._query(
+                    module='simple/price',
+                    options={
+                        'ids': ','.join(chunk),
+                        'vs_currencies': vs_currency,
+                    })
+            except RemoteError as e:
+                log.warning(f'Failed to query coingecko simple prices for {len(chunk)} assets. {e!s}')  # noqa: E501
+                break
+
+            for coingecko_id in chunk:
+                try:
+                    price = Price(FVal(result[coingecko_id][vs_currency]))
+                except KeyError:
+                    continue  # coingecko omits the ids it has no price for
+
+                for from_asset in ids_to_assets[coingecko_id]:
+                    prices[from_asset] = price
+
+        return prices
+
     def can_query_history(
             self,
             from_asset: Asset,  # pylint: disable=unused-argument
@@ -774,6 +829,19 @@ class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
         if price_cache_entry:
             return price_cache_entry.price
 
+        if GlobalDBHandler().is_historical_price_covered(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.COINGECKO,
+            timestamp=timestamp,
+        ):  # all prices around it were already fetched in bulk and coingecko has none
+            raise NoPriceForGivenTimestamp(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                time=timestamp,
+                rate_limited=False,
+            )
+
         # no cache, query coingecko for daily price
         date = timestamp_to_date(timestamp, formatstr='%d-%m-%Y')
         result = self._query(
@@ -811,3 +879,95 @@ class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
             price=price,
         )])
         return price
+
+    def query_historical_price_range(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> bool:
+        """Get the coingecko prices of the pair between the two timestamps with the
+        market_chart/range endpoint and store them in the global DB. Parts of the range
+        that were already fetched, per the coverage map of the pair, are not queried again.
+        Each query covers up to COINGECKO_MARKET_CHART_RANGE_SECS so that prices are hourly.
+
+        Returns whether there are coingecko prices stored for the range.
+
+        May raise:
+        - PriceQueryUnsupportedAsset if either from_asset or to_asset are not supported
+        - RemoteError if there is a problem querying coingecko
+        """
+        try:
+            from_asset = from_asset.resolve_to_asset_with_oracles()
+            to_asset = to_asset.resolve_to_asset_with_oracles()
+        except UnknownAsset as e:
+            raise PriceQueryUnsupportedAsset(e.identifier) from e
+        vs_currency = Coingecko.check_vs_currencies(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            location='historical price range',
+        )
+        if not vs_currency:
+            return False
+
+        try:
+            from_coingecko_id = from_asset.to_coingecko()
+        except UnsupportedAsset as e:
+            raise PriceQueryUnsupportedAsset(from_asset.identifier) from e
+
+        if (to_timestamp := Timestamp(min(to_timestamp, ts_now()))) < from_timestamp:
+            return False
+
+        globaldb = GlobalDBHandler()
+        for gap_start, gap_end in globaldb.get_historical_price_gaps(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.COINGECKO,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+        ):
+            for chunk_start in range(gap_start, gap_end + 1, COINGECKO_MARKET_CHART_RANGE_SECS):
+                chunk_end = Timestamp(min(chunk_start + COINGECKO_MARKET_CHART_RANGE_SECS - 1, gap_end))  # noqa: E501
+                result = self._query(
+                    module='coins',
+                    subpath=f'{from_coingecko_id}/market_chart/range',
+                    options={
+                        'vs_currency': vs_currency,
+                        'from': str(chunk_start),
+                        'to': str(chunk_end),
+                    },
+                )
+                prices = []
+                for entry in result.get('prices', []):
+                    try:
+                        prices.append(HistoricalPrice(
+                            from_asset=from_asset,
+                            to_asset=to_asset,
+                            source=HistoricalPriceOracle.COINGECKO,
+                            timestamp=Timestamp(int(entry[0]) // 1000),
+                            price=Price(FVal(entry[1])),
+                        ))
+                    except (ValueError, TypeError, IndexError) as e:
+                        log.warning(f'Skipping invalid coingecko market chart entry {entry}: {e!s}')  # noqa: E501
+
+                globaldb.add_historical_prices(entries=prices)
+                globaldb.add_historical_price_coverage(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    source=HistoricalPriceOracle.COINGECKO,
+                    from_timestamp=Timestamp(chunk_start),
+                    to_timestamp=chunk_end,
+                )
+                log.debug(
+                    f'Stored {len(prices)} coingecko prices of {from_asset.identifier} in '
+                    f'{to_asset.identifier} between {chunk_start} and {chunk_end}',
+                )
+
+        return globaldb.get_historical_price(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=Timestamp((from_timestamp + to_timestamp) // 2),
+            max_seconds_distance=(to_timestamp - from_timestamp) // 2 + 1,
+            source=HistoricalPriceOracle.COINGECKO,
+        ) is not None
@@ -1,6 +1,6 @@
 import logging
 import os
-from collections import deque
+from collections import defaultdict, deque
 from json.decoder import JSONDecodeError
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Optional
@@ -160,6 +160,8 @@ CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
 }
 CRYPTOCOMPARE_SPECIAL_CASES = CRYPTOCOMPARE_SPECIAL_CASES_MAPPING.keys()
 CRYPTOCOMPARE_HOURQUERYLIMIT = 2000
+# Maximum length of the comma separated from symbols of a pricemulti query
+CRYPTOCOMPARE_PRICEMULTI_FSYMS_LIMIT = 300
 
 
 def _multiply_str_nums(a: str, b: str) -> str:
@@ -484,6 +486,71 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
 
         return Price(FVal(result[cc_to_asset_symbol])), False
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: list[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Returns the current prices in to_asset of all the given assets supported by
+        cryptocompare, asking for as many symbols as fit in each pricemulti query.
+        Special case assets still need intermediate queries so they are queried one by one.
+
+        If a query fails the prices found until then are returned.
+        """
+        if to_asset.identifier in CRYPTOCOMPARE_SPECIAL_CASES:
+            return super().query_multiple_current_prices(from_assets=from_assets, to_asset=to_asset)  # noqa: E501
+
+        try:
+            cc_to_asset_symbol = to_asset.to_cryptocompare()
+        except UnsupportedAsset:
+            return {}
+
+        special_assets = []
+        symbols_to_assets: defaultdict[str, list[AssetWithOracles]] = defaultdict(list)
+        for from_asset in from_assets:
+            if from_asset.identifier in CRYPTOCOMPARE_SPECIAL_CASES:
+                special_assets.append(from_asset)
+                continue
+
+            try:
+                symbols_to_assets[from_asset.to_cryptocompare()].append(from_asset)
+            except UnsupportedAsset:
+                log.debug(f'Skipping {from_asset.identifier} in cryptocompare multi prices since it is not supported')  # noqa: E501
+
+        chunks: list[list[str]] = []
+        chunk_length = CRYPTOCOMPARE_PRICEMULTI_FSYMS_LIMIT
+        for symbol in symbols_to_assets:
+            if chunk_length + len(symbol) + 1 > CRYPTOCOMPARE_PRICEMULTI_FSYMS_LIMIT:
+                chunks.append([])
+                chunk_length = -1  # the first symbol has no comma before it
+            chunks[-1].append(symbol)
+            chunk_length += len(symbol) + 1
+
+        prices = {}
+        for chunk in chunks:
+            try:
+                result = self._api_query(path=f'pricemulti?fsyms={",".join(chunk)}&tsyms={cc_to_asset_symbol}')  # noqa: E501
+            except RemoteError as e:
+                log.warning(f'Failed to query cryptocompare multi prices for {len(chunk)} assets. {e!s}')  # noqa: E501
+                break
+
+            for symbol in chunk:
+                try:
+                    price = Price(FVal(result[symbol][cc_to_asset_symbol]))
+                except KeyError:
+                    continue  # cryptocompare omits the symbols it has no price for
+
+                if price == ZERO_PRICE:
+                    continue
+
+                for from_asset in symbols_to_assets[symbol]:
+                    prices[from_asset] = price
+
+        if len(special_assets) != 0:
+            prices.update(super().query_multiple_current_prices(from_assets=special_assets, to_asset=to_asset))  # noqa: E501
+
+        return prices
+
     def query_endpoint_pricehistorical(
             self,
             from_asset: AssetWithOracles,
@@ -722,9 +789,27 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
         if len(calculated_history) == 0:
             return
 
+        prices = self._histohour_data_to_prices(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            calculated_history=calculated_history,
+        )
+        GlobalDBHandler().add_historical_prices(prices)
+        self.last_histohour_query_ts = ts_now()  # also save when last query finished
+
+    def _histohour_data_to_prices(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            calculated_history: list[dict[str, Any]],
+    ) -> list[HistoricalPrice]:
+        """Turns histohour entries into the historical prices we will enter in the DB
+
+        May raise:
+        - RemoteError if the hourly data is not sane
+        """
         # Let's always check for data sanity for the hourly prices.
         _check_hourly_data_sanity(calculated_history, from_asset, to_asset)
-        # Turn them into the format we will enter in the DB
         prices = []
         for entry in calculated_history:
             try:
@@ -748,8 +833,55 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
                 )
                 continue
 
+        return prices
+
+    def query_historical_price_range(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> bool:
+        """Get the histohour price data of the given range from cryptocompare and
+        store it in the global DB. A range of up to CRYPTOCOMPARE_HOURQUERYLIMIT hours
+        is fetched with a single query.
+
+        May raise:
+        - PriceQueryUnsupportedAsset if from/to asset is known to miss from cryptocompare
+        - RemoteError if there is a problem reaching the cryptocompare server
+        or with reading the response returned by the server
+        """
+        try:
+            from_asset = from_asset.resolve_to_asset_with_oracles()
+            to_asset = to_asset.resolve_to_asset_with_oracles()
+        except (UnknownAsset, WrongAssetType) as e:
+            raise PriceQueryUnsupportedAsset(e.identifier) from e
+
+        log.debug(
+            'Retrieving historical hour price data range from cryptocompare',
+            from_asset=from_asset,
+            to_asset=to_asset,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+        )
+        self.last_histohour_query_ts = ts_now()
+        # query one hour around the range so that the edges are within an hour of a price
+        calculated_history = list(self._get_histohour_data_for_range(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            from_timestamp=Timestamp(min(to_timestamp + 3600, self.last_histohour_query_ts)),
+            to_timestamp=Timestamp(max(from_timestamp - 3600, 0)),
+        ))
+        if len(calculated_history) == 0:
+            return False
+
+        prices = self._histohour_data_to_prices(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            calculated_history=calculated_history,
+        )
         GlobalDBHandler().add_historical_prices(prices)
-        self.last_histohour_query_ts = ts_now()  # also save when last query finished
+        return len(prices) != 0
 
     def query_historical_price(
             self,
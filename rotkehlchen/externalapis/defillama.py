@@ -10,7 +10,7 @@ from rotkehlchen.assets.asset import Asset, AssetWithOracles
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.constants.prices import ZERO_PRICE
-from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS
 from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import RemoteError
@@ -31,6 +31,8 @@ from rotkehlchen.utils.mixins.penalizable_oracle import PenalizablePriceOracleMi
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 MIN_DEFILLAMA_CONFIDENCE = FVal('0.20')
+DEFILLAMA_CHART_PERIOD = HOUR_IN_SECONDS * 4
+DEFILLAMA_CHART_MAX_POINTS = 500  # prices per chart query
 
 
 class Defillama(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
@@ -232,6 +234,19 @@ class Defillama(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
         if price_cache_entry:
             return price_cache_entry.price
 
+        if GlobalDBHandler().is_historical_price_covered(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.DEFILLAMA,
+            timestamp=timestamp,
+        ):  # all prices around it were already fetched in bulk and defillama has none
+            raise NoPriceForGivenTimestamp(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                time=timestamp,
+                rate_limited=False,
+            )
+
         try:
             coin_id = self._get_asset_id(from_asset)
         except UnsupportedAsset as e:
@@ -286,6 +301,96 @@ class Defillama(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
         )])
         return price
 
+    def query_historical_price_range(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> bool:
+        """Get the defillama usd prices of from_asset between the two timestamps with the
+        chart endpoint and store them in the global DB. Parts of the range that were already
+        fetched, per the coverage map of the pair, are not queried again. Each query returns
+        up to DEFILLAMA_CHART_MAX_POINTS prices, one per DEFILLAMA_CHART_PERIOD.
+
+        Returns whether there are defillama prices stored for the range.
+
+        May raise:
+        - PriceQueryUnsupportedAsset if from_asset is not supported
+        - RemoteError if there is a problem querying defillama
+        """
+        if to_asset != A_USD:
+            return False  # prices in other assets need an extra query per timestamp
+
+        try:
+            from_asset = from_asset.resolve_to_asset_with_oracles()
+            to_asset = to_asset.resolve_to_asset_with_oracles()
+            coin_id = self._get_asset_id(from_asset)
+        except (UnknownAsset, UnsupportedAsset) as e:
+            raise PriceQueryUnsupportedAsset(from_asset.identifier) from e
+
+        if (to_timestamp := Timestamp(min(to_timestamp, ts_now()))) < from_timestamp:
+            return False
+
+        globaldb = GlobalDBHandler()
+        chunk_secs = DEFILLAMA_CHART_PERIOD * DEFILLAMA_CHART_MAX_POINTS
+        for gap_start, gap_end in globaldb.get_historical_price_gaps(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.DEFILLAMA,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+        ):
+            for chunk_start in range(gap_start, gap_end + 1, chunk_secs):
+                chunk_end = Timestamp(min(chunk_start + chunk_secs - 1, gap_end))
+                result = self._query(
+                    module='chart',
+                    subpath=coin_id,
+                    options={
+                        'start': str(chunk_start),
+                        'span': str((chunk_end - chunk_start) // DEFILLAMA_CHART_PERIOD + 1),
+                        'period': f'{DEFILLAMA_CHART_PERIOD // HOUR_IN_SECONDS}h',
+                    },
+                )
+                prices = []
+                coin_result = result.get('coins', {}).get(coin_id, {})
+                if (
+                    'confidence' not in coin_result or
+                    FVal(coin_result['confidence']) >= MIN_DEFILLAMA_CONFIDENCE
+                ):  # same as for single prices, ignore low confidence ones. Probably spam
+                    for entry in coin_result.get('prices', []):
+                        try:
+                            prices.append(HistoricalPrice(
+                                from_asset=from_asset,
+                                to_asset=to_asset,
+                                source=HistoricalPriceOracle.DEFILLAMA,
+                                timestamp=Timestamp(int(entry['timestamp'])),
+                                price=deserialize_price(entry['price']),
+                            ))
+                        except (KeyError, ValueError, TypeError, DeserializationError) as e:
+                            log.warning(f'Skipping invalid defillama chart entry {entry}: {e!s}')  # noqa: E501
+
+                globaldb.add_historical_prices(entries=prices)
+                globaldb.add_historical_price_coverage(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    source=HistoricalPriceOracle.DEFILLAMA,
+                    from_timestamp=Timestamp(chunk_start),
+                    to_timestamp=chunk_end,
+                )
+                log.debug(
+                    f'Stored {len(prices)} defillama prices of {from_asset.identifier} '
+                    f'between {chunk_start} and {chunk_end}',
+                )
+
+        return globaldb.get_historical_price(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=Timestamp((from_timestamp + to_timestamp) // 2),
+            max_seconds_distance=(to_timestamp - from_timestamp) // 2 + 1,
+            source=HistoricalPriceOracle.DEFILLAMA,
+        ) is not None
+
     def all_coins(self) -> dict[str, dict[str, Any]]:
         """no op for defillama. Required for the interface"""
         return {}
@@ -122,6 +122,67 @@ def globaldb_get_unique_cache_value(
     return result[0]
 
 
+def globaldb_set_unique_cache_values(
+        write_cursor: DBCursor,
+        entries: Iterable[tuple[Iterable[Union[str, UniqueCacheType]], str]],
+) -> None:
+    """Function that updates many entries of the unique cache in globaldb at once. Each entry
+    is the key parts and the value paired with them. Existing entries are overwritten.
+    The timestamp is always the current time."""
+    timestamp = ts_now()
+    write_cursor.executemany(
+        'INSERT OR REPLACE INTO unique_cache '
+        '(key, value, last_queried_ts) VALUES (?, ?, ?)',
+        [(compute_cache_key(key_parts), value, timestamp) for key_parts, value in entries],
+    )
+
+
+def globaldb_get_unique_cache_values_and_ts(
+        cursor: DBCursor,
+        keys_parts: Iterable[Iterable[Union[str, UniqueCacheType]]],
+) -> dict[str, tuple[str, Timestamp]]:
+    """Function that reads many entries of the unique cache table at once.
+    It returns the value and last_queried_ts of each of the given keys that exist
+    mapped by their cache key."""
+    cache_keys = [compute_cache_key(key_parts) for key_parts in keys_parts]
+    if len(cache_keys) == 0:
+        return {}
+
+    cursor.execute(
+        f'SELECT key, value, last_queried_ts FROM unique_cache '
+        f'WHERE key IN ({",".join(["?"] * len(cache_keys))})',
+        cache_keys,
+    )
+    return {key: (value, Timestamp(last_queried_ts)) for key, value, last_queried_ts in cursor}
+
+
+def globaldb_get_unique_cache_like(
+        cursor: DBCursor,
+        key_parts: Iterable[Union[str, UniqueCacheType]],
+) -> list[tuple[str, str, Timestamp]]:
+    """
+    Function that reads the unique cache table.
+    Returns the key, value and last_queried_ts of all entries where key starts with
+    the provided `key_parts`.
+
+    key_parts should contain neither the "%" nor the "." symbol.
+    """
+    cache_key = compute_cache_key(key_parts)
+    cursor.execute(
+        'SELECT key, value, last_queried_ts FROM unique_cache WHERE key LIKE ?',
+        (f'{cache_key}%',),
+    )
+    return [(key, value, Timestamp(last_queried_ts)) for key, value, last_queried_ts in cursor]
+
+
+def globaldb_delete_unique_cache_keys(write_cursor: DBCursor, cache_keys: Iterable[str]) -> None:
+    """Function that deletes the entries of the given cache keys from the unique cache"""
+    write_cursor.executemany(
+        'DELETE FROM unique_cache WHERE key=?',
+        [(cache_key,) for cache_key in cache_keys],
+    )
+
+
 def globaldb_get_general_cache_like(
         cursor: DBCursor,
         key_parts: Iterable[Union[str, GeneralCacheType]],
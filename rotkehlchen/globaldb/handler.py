@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 import shutil
@@ -26,11 +27,18 @@ from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType, DBCurs
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import DBUpgradeError, InputError
 from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.globaldb.cache import (
+    compute_cache_key,
+    globaldb_delete_unique_cache_keys,
+    globaldb_get_unique_cache_value,
+    globaldb_set_unique_cache_value,
+)
 from rotkehlchen.history.deserialization import deserialize_price
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import (
     SPAM_PROTOCOL,
+    CacheType,
     ChainID,
     ChecksumEvmAddress,
     EvmTokenKind,
@@ -189,6 +197,15 @@ def _initialize_global_db_directory(
     )
 
 
+def _price_coverage_key_parts(
+        from_asset: 'Asset',
+        to_asset: 'Asset',
+        source: HistoricalPriceOracle,
+) -> tuple[CacheType, str]:
+    """Key parts of the cache entry with the historical price coverage of a pair and source"""
+    return CacheType.PRICE_HISTORY_COVERAGE, json.dumps([source.serialize_for_db(), from_asset.identifier, to_asset.identifier])  # noqa: E501
+
+
 class GlobalDBHandler:
     """A singleton class controlling the global DB"""
     __instance: Optional['GlobalDBHandler'] = None
@@ -1547,6 +1564,13 @@ class GlobalDBHandler:
         try:
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
                 write_cursor.execute(querystr, tuple(query_list))
+                globaldb_delete_unique_cache_keys(
+                    write_cursor=write_cursor,
+                    cache_keys=[
+                        compute_cache_key(_price_coverage_key_parts(from_asset, to_asset, x))
+                        for x in ((source,) if source is not None else HistoricalPriceOracle)
+                    ],
+                )
         except sqlite3.IntegrityError as e:
             log.error(
                 f'Failed to delete historical prices from {from_asset} to {to_asset} '
@@ -1572,6 +1596,96 @@ class GlobalDBHandler:
                 return None
             return result[0], result[1]
 
+    @staticmethod
+    def _get_historical_price_coverage(
+            cursor: DBCursor,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+    ) -> list[tuple[Timestamp, Timestamp]]:
+        """Returns the sorted and non overlapping ranges for which the prices of the pair
+        were fetched from the given source in bulk"""
+        value = globaldb_get_unique_cache_value(
+            cursor=cursor,
+            key_parts=_price_coverage_key_parts(from_asset, to_asset, source),
+        )
+        if value is None:
+            return []
+
+        return [(Timestamp(start), Timestamp(end)) for start, end in json.loads(value)]
+
+    @staticmethod
+    def add_historical_price_coverage(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> None:
+        """Records that all the prices of the pair between the two timestamps were fetched
+        from the given source and stored, merging the range with the existing ones"""
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            ranges = sorted([
+                *GlobalDBHandler._get_historical_price_coverage(write_cursor, from_asset, to_asset, source),  # noqa: E501
+                (from_timestamp, to_timestamp),
+            ])
+            merged: list[list[int]] = []
+            for start, end in ranges:
+                if len(merged) != 0 and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+
+            globaldb_set_unique_cache_value(
+                write_cursor=write_cursor,
+                key_parts=_price_coverage_key_parts(from_asset, to_asset, source),
+                value=json.dumps(merged),
+            )
+
+    @staticmethod
+    def get_historical_price_gaps(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> list[tuple[Timestamp, Timestamp]]:
+        """Returns the parts of the given range for which the prices of the pair have not
+        been fetched from the given source in bulk yet"""
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            coverage = GlobalDBHandler._get_historical_price_coverage(cursor, from_asset, to_asset, source)  # noqa: E501
+
+        gaps, start = [], from_timestamp
+        for covered_start, covered_end in coverage:
+            if covered_end < start:
+                continue
+            if covered_start > to_timestamp:
+                break
+            if covered_start > start:
+                gaps.append((start, Timestamp(covered_start - 1)))
+            start = Timestamp(covered_end + 1)
+
+        if start <= to_timestamp:
+            gaps.append((start, to_timestamp))
+        return gaps
+
+    @staticmethod
+    def is_historical_price_covered(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            timestamp: Timestamp,
+    ) -> bool:
+        """Whether the prices of the pair around the timestamp were already fetched from the
+        given source in bulk. If so all the prices the source has are in the DB."""
+        return len(GlobalDBHandler.get_historical_price_gaps(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=source,
+            from_timestamp=timestamp,
+            to_timestamp=timestamp,
+        )) == 0
+
     @staticmethod
     def get_historical_price_data(source: HistoricalPriceOracle) -> list[dict[str, Any]]:
         """Return a list of assets and first/last ts
@@ -54,6 +54,16 @@ class ManualPriceOracle:
             time=timestamp,
         )
 
+    @staticmethod
+    def query_historical_price_range(
+            from_asset: Asset,  # pylint: disable=unused-argument
+            to_asset: Asset,  # pylint: disable=unused-argument
+            from_timestamp: Timestamp,  # pylint: disable=unused-argument
+            to_timestamp: Timestamp,  # pylint: disable=unused-argument
+    ) -> bool:
+        """Manual prices are already in the global DB so there is nothing to fetch"""
+        return False
+
 
 class ManualCurrentOracle(CurrentPriceOracleInterface):
 
@@ -1,6 +1,6 @@
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, Literal, Optional
+from typing import TYPE_CHECKING, Literal, Optional, Union
 
 from rotkehlchen.accounting.structures.base import HistoryBaseEntry, HistoryEvent
 from rotkehlchen.constants import ZERO
@@ -10,7 +10,7 @@ from rotkehlchen.db.filtering import (
     HistoryEventFilterQuery,
     TradesFilterQuery,
 )
-from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.history_events import DBHistoryEvents, HistoryEventRow
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES, ExchangeManager
@@ -282,7 +282,7 @@ class EventsHistorian:
             start_ts: Timestamp,
             end_ts: Timestamp,
             has_premium: bool,
-    ) -> tuple[str, list['AccountingEventMixin']]:
+    ) -> tuple[str, list[Union['AccountingEventMixin', HistoryEventRow]]]:
         """
         Creates all events history from start_ts to end_ts. Returns it
         sorted by ascending timestamp.
@@ -299,7 +299,7 @@ class EventsHistorian:
             end_ts=end_ts,
         )
         # start creating the all trades history list
-        history: list[AccountingEventMixin] = []
+        history: list[Union[AccountingEventMixin, HistoryEventRow]] = []
         empty_or_error = ''
 
         def fail_history_cb(error_msg: str) -> None:
@@ -404,15 +404,14 @@ class EventsHistorian:
         # Include all base history entries
         history_events_db = DBHistoryEvents(self.db)
         with self.db.conn.read_ctx() as cursor:
-            base_entries = history_events_db.get_history_events(
+            # Rows are only deserialized to events when the accountant processes them
+            base_entries = history_events_db.get_history_event_rows(
                 cursor=cursor,
                 filter_query=HistoryEventFilterQuery.make(
                     # We need to have history since before the range
                     from_ts=Timestamp(0),
                     to_ts=end_ts,
                 ),
-                has_premium=True,  # ignore limits here. Limit applied at processing
-                group_by_event_ids=False,
             )
         history.extend(base_entries)
         self._increase_progress(step, total_steps)
@@ -420,7 +419,7 @@ class EventsHistorian:
         history.sort(  # sort events first by timestamp and if history base by sequence index
             key=lambda x: (
                 x.get_timestamp(),
-                x.sequence_index if isinstance(x, HistoryBaseEntry) else 1,
+                x.sequence_index if isinstance(x, (HistoryBaseEntry, HistoryEventRow)) else 1,
             ),
         )
         return empty_or_error, history
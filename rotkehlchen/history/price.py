@@ -257,3 +257,69 @@ class PriceHistorian:
             time=timestamp,
             rate_limited=rate_limited,
         )
+
+    @staticmethod
+    def query_historical_price_range(
+            from_asset: Asset,
+            to_asset: Asset,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> bool:
+        """
+        Ask the historical price oracles, in the order set by the user, to store in the
+        global DB all the prices of `from_asset` in `to_asset` between the two timestamps
+        with a single range query. Stops at the first oracle that stored any price.
+        Subsequent `query_historical_price` calls in the range are then served from the cache.
+
+        Returns whether any oracle stored prices. Errors are only logged since the
+        individual price queries will follow and handle them.
+        """
+        if from_asset == to_asset or from_asset == A_KFEE:
+            return False
+
+        with suppress(UnknownAsset, WrongAssetType):
+            from_asset.resolve_to_fiat_asset()
+            to_asset.resolve_to_fiat_asset()
+            return False  # forex prices are not queried via the oracles' history
+
+        instance = PriceHistorian()
+        oracles = instance._oracles
+        oracle_instances = instance._oracle_instances
+        assert oracles is not None and oracle_instances is not None, (
+            'PriceHistorian should never be called before setting the oracles'
+        )
+        for oracle, oracle_instance in zip(oracles, oracle_instances):
+            if oracle_instance.can_query_history(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                timestamp=from_timestamp,
+            ) is False:
+                continue
+
+            try:
+                stored_prices = oracle_instance.query_historical_price_range(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    from_timestamp=from_timestamp,
+                    to_timestamp=to_timestamp,
+                )
+            except (PriceQueryUnsupportedAsset, UnknownAsset, WrongAssetType):
+                continue
+            except RemoteError as e:
+                log.warning(
+                    f'Failed to query {oracle} for the historical prices of {from_asset} '
+                    f'in {to_asset} between {from_timestamp} and {to_timestamp}. {e!s}',
+                )
+                continue
+
+            if stored_prices is True:
+                log.debug(
+                    f'Historical price oracle {oracle} stored prices for range',
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    from_timestamp=from_timestamp,
+                    to_timestamp=to_timestamp,
+                )
+                return True
+
+        return False
@@ -1,17 +1,31 @@
+import json
 import logging
 import operator
+from collections import defaultdict
 from collections.abc import Iterable, Sequence
 from contextlib import suppress
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Union
 
-from rotkehlchen.assets.asset import Asset, EvmToken, FiatAsset, UnderlyingToken
+from rotkehlchen.assets.asset import (
+    Asset,
+    AssetWithOracles,
+    EvmToken,
+    FiatAsset,
+    UnderlyingToken,
+)
 from rotkehlchen.assets.utils import TokenSeenAt, get_or_create_evm_token
 from rotkehlchen.chain.ethereum.defi.price import handle_defi_price_query
-from rotkehlchen.chain.ethereum.utils import token_normalized_value_decimals
+from rotkehlchen.chain.ethereum.utils import MULTICALL_CHUNKS, token_normalized_value_decimals
 from rotkehlchen.chain.evm.contracts import EvmContract
 from rotkehlchen.chain.evm.types import string_to_evm_address
-from rotkehlchen.chain.evm.utils import lp_price_from_uniswaplike_pool_contract
+from rotkehlchen.chain.evm.utils import (
+    UNISWAPLIKE_LP_METHODS,
+    decode_uniswaplike_lp_outputs,
+    get_uniswaplike_lp_contract,
+    lp_price_from_uniswaplike_pool_contract,
+    uniswaplike_lp_share_price,
+)
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import (
     A_3CRV,
@@ -60,7 +74,7 @@ from rotkehlchen.constants.assets import (
 from rotkehlchen.constants.misc import CURRENCYCONVERTER_API_KEY
 from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
-from rotkehlchen.constants.timing import DAY_IN_SECONDS, MONTH_IN_SECONDS
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS, MONTH_IN_SECONDS
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.defi import DefiPoolError
 from rotkehlchen.errors.misc import (
@@ -77,19 +91,27 @@ from rotkehlchen.externalapis.xratescom import (
     get_historical_xratescom_exchange_rates,
 )
 from rotkehlchen.fval import FVal
-from rotkehlchen.globaldb.cache import globaldb_get_unique_cache_value, read_curve_pool_tokens
+from rotkehlchen.globaldb.cache import (
+    compute_cache_key,
+    globaldb_delete_unique_cache_keys,
+    globaldb_get_unique_cache_like,
+    globaldb_get_unique_cache_value,
+    globaldb_set_unique_cache_values,
+    read_curve_pool_tokens,
+)
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.interfaces import CurrentPriceOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.oracles.structures import CurrentPriceOracle
-from rotkehlchen.serialization.deserialize import deserialize_evm_address
+from rotkehlchen.serialization.deserialize import deserialize_evm_address, deserialize_fval
 from rotkehlchen.types import (
     CURVE_POOL_PROTOCOL,
     LP_TOKEN_AS_POOL_PROTOCOLS,
     YEARN_VAULTS_V2_PROTOCOL,
     CacheType,
     ChainID,
+    ChecksumEvmAddress,
     EvmTokenKind,
     Price,
     ProtocolsWithPriceLogic,
@@ -102,6 +124,7 @@ from rotkehlchen.utils.network import request_get_dict
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.oracles.uniswap import UniswapV2Oracle, UniswapV3Oracle
     from rotkehlchen.chain.evm.manager import EvmManager
+    from rotkehlchen.chain.evm.node_inquirer import EvmNodeInquirer
     from rotkehlchen.externalapis.coingecko import Coingecko
     from rotkehlchen.externalapis.cryptocompare import Cryptocompare
     from rotkehlchen.externalapis.defillama import Defillama
@@ -113,6 +136,13 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 CURRENT_PRICE_CACHE_SECS = 300  # 5 mins
+# oracles whose prices can stay longer in the cache than CURRENT_PRICE_CACHE_SECS
+CURRENT_PRICE_ORACLE_CACHE_SECS: dict[CurrentPriceOracle, int] = {
+    CurrentPriceOracle.MANUALCURRENT: HOUR_IN_SECONDS,  # invalidated when manual prices are edited  # noqa: E501
+    CurrentPriceOracle.FIAT: HOUR_IN_SECONDS,
+}
+CURRENT_PRICE_REFRESH_AHEAD_SECS = 60
+CURRENT_PRICE_REFRESH_USED_SECS = 900  # 15 mins
 DEFAULT_RATE_LIMIT_WAITING_TIME = 60  # seconds
 BTC_PER_BSQ = FVal('0.00000100')
 
@@ -150,6 +180,16 @@ def _check_curve_contract_call(decoded: tuple[Any, ...]) -> bool:
     )
 
 
+def _current_price_cache_secs(oracle: CurrentPriceOracle) -> int:
+    """Seconds for which a cached current price found by the given oracle is valid"""
+    return CURRENT_PRICE_ORACLE_CACHE_SECS.get(oracle, CURRENT_PRICE_CACHE_SECS)
+
+
+def _current_price_cache_key_parts(cache_key: tuple[Asset, Asset]) -> tuple[CacheType, str]:
+    """Key parts of the global DB cache entry of the current price of a pair of assets"""
+    return CacheType.CURRENT_PRICE, json.dumps([cache_key[0].identifier, cache_key[1].identifier])  # noqa: E501
+
+
 def get_underlying_asset_price(token: EvmToken) -> tuple[Optional[Price], CurrentPriceOracle]:
     """Gets the underlying asset price for the given ethereum token
 
@@ -243,6 +283,9 @@ class Inquirer:
     __instance: Optional['Inquirer'] = None
     _cached_forex_data: dict
     _cached_current_price: dict[tuple[Asset, Asset], CachedPriceEntry]
+    # last time each cached current price was used, to refresh only the prices in use
+    _cached_current_price_used: dict[tuple[Asset, Asset], Timestamp]
+    _current_price_cache_saved_ts: Timestamp
     _data_directory: Path
     _cryptocompare: 'Cryptocompare'
     _coingecko: 'Coingecko'
@@ -289,6 +332,8 @@ class Inquirer:
         Inquirer._defillama = defillama
         Inquirer._manualcurrent = manualcurrent
         Inquirer._cached_current_price = {}
+        Inquirer._cached_current_price_used = {}
+        Inquirer._current_price_cache_saved_ts = Timestamp(0)
         Inquirer._evm_managers = {}
         Inquirer._msg_aggregator = msg_aggregator
         Inquirer.special_tokens = {
@@ -358,9 +403,11 @@ class Inquirer:
             match_main_currency: bool,
     ) -> Optional[CachedPriceEntry]:
         cache = Inquirer()._cached_current_price.get(cache_key, None)
-        if cache is None or ts_now() - cache.time > CURRENT_PRICE_CACHE_SECS or cache.used_main_currency != match_main_currency:  # noqa: E501
+        now = ts_now()
+        if cache is None or now - cache.time > _current_price_cache_secs(cache.oracle) or cache.used_main_currency != match_main_currency:  # noqa: E501
             return None
 
+        Inquirer._cached_current_price_used[cache_key] = now
         return cache
 
     @staticmethod
@@ -375,9 +422,131 @@ class Inquirer:
             if asset_pair[0] in assets_to_invalidate or asset_pair[1] in assets_to_invalidate:
                 Inquirer()._cached_current_price.pop(asset_pair, None)
 
+        identifiers_to_invalidate = {asset.identifier for asset in assets_to_invalidate}
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            keys_to_delete = []
+            for key, value, _ in globaldb_get_unique_cache_like(
+                    cursor=write_cursor,
+                    key_parts=(CacheType.CURRENT_PRICE,),
+            ):
+                try:
+                    if identifiers_to_invalidate.isdisjoint(json.loads(value)[:2]):
+                        continue
+                except (json.JSONDecodeError, TypeError) as e:
+                    log.error(f'Deleting invalid current price cache entry {value} from the global DB: {e!s}')  # noqa: E501
+
+                keys_to_delete.append(key)
+
+            globaldb_delete_unique_cache_keys(write_cursor=write_cursor, cache_keys=keys_to_delete)
+
     @staticmethod
     def remove_cached_current_price_entry(cache_key: tuple[Asset, Asset]) -> None:
         Inquirer()._cached_current_price.pop(cache_key, None)
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            globaldb_delete_unique_cache_keys(
+                write_cursor=write_cursor,
+                cache_keys=[compute_cache_key(_current_price_cache_key_parts(cache_key))],
+            )
+
+    @staticmethod
+    def load_current_price_cache() -> None:
+        """Warms up the current price cache with the prices saved in the global DB that have
+        not expired yet, so that a restart or a login doesn't need to query all prices again.
+        The expired entries are deleted from the DB."""
+        now = ts_now()
+        loaded, expired_keys = 0, []
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            entries = globaldb_get_unique_cache_like(
+                cursor=cursor,
+                key_parts=(CacheType.CURRENT_PRICE,),
+            )
+        for key, value, _ in entries:
+            try:
+                from_identifier, to_identifier, price, time, oracle, used_main_currency = json.loads(value)  # noqa: E501
+                entry = CachedPriceEntry(
+                    price=Price(deserialize_fval(price, name='price', location='current price cache')),  # noqa: E501
+                    time=Timestamp(time),
+                    oracle=CurrentPriceOracle.deserialize(oracle),
+                    used_main_currency=used_main_currency,
+                )
+            except (json.JSONDecodeError, ValueError, DeserializationError) as e:
+                log.error(f'Failed to read current price cache entry {value} from the global DB: {e!s}')  # noqa: E501
+                expired_keys.append(key)
+                continue
+
+            if now - entry.time > _current_price_cache_secs(entry.oracle):
+                expired_keys.append(key)
+                continue
+
+            cache_key = (Asset(from_identifier), Asset(to_identifier))
+            if (cached := Inquirer._cached_current_price.get(cache_key)) is None or cached.time < entry.time:  # noqa: E501
+                Inquirer._cached_current_price[cache_key] = entry
+                loaded += 1
+
+        if len(expired_keys) != 0:
+            with GlobalDBHandler().conn.write_ctx() as write_cursor:
+                globaldb_delete_unique_cache_keys(write_cursor=write_cursor, cache_keys=expired_keys)  # noqa: E501
+
+        Inquirer._current_price_cache_saved_ts = now
+        log.debug(f'Loaded {loaded} current prices from the global DB cache. Deleted {len(expired_keys)} expired ones')  # noqa: E501
+
+    @staticmethod
+    def save_current_price_cache() -> None:
+        """Saves in the global DB the current price cache entries that were added since
+        the last time the cache was saved or loaded"""
+        instance = Inquirer()
+        saved_ts = instance._current_price_cache_saved_ts
+        now = ts_now()
+        entries = [
+            (
+                _current_price_cache_key_parts(cache_key),
+                json.dumps([
+                    cache_key[0].identifier,
+                    cache_key[1].identifier,
+                    str(entry.price),
+                    entry.time,
+                    entry.oracle.serialize(),
+                    entry.used_main_currency,
+                ]),
+            ) for cache_key, entry in list(instance._cached_current_price.items())
+            if entry.time >= saved_ts and now - entry.time <= _current_price_cache_secs(entry.oracle)  # noqa: E501
+        ]
+        if len(entries) != 0:
+            with GlobalDBHandler().conn.write_ctx() as write_cursor:
+                globaldb_set_unique_cache_values(write_cursor=write_cursor, entries=entries)
+
+        Inquirer._current_price_cache_saved_ts = now
+        log.debug(f'Saved {len(entries)} current prices in the global DB cache')
+
+    @staticmethod
+    def get_current_prices_to_refresh() -> list[Asset]:
+        """Returns the assets whose cached usd price was used in the last
+        CURRENT_PRICE_REFRESH_USED_SECS and expires in the next CURRENT_PRICE_REFRESH_AHEAD_SECS"""
+        instance = Inquirer()
+        now = ts_now()
+        assets = []
+        for cache_key, used_ts in list(instance._cached_current_price_used.items()):
+            if now - used_ts > CURRENT_PRICE_REFRESH_USED_SECS:
+                instance._cached_current_price_used.pop(cache_key, None)
+                continue
+
+            if (
+                cache_key[1] == A_USD and
+                (entry := instance._cached_current_price.get(cache_key)) is not None and
+                entry.used_main_currency is False and
+                entry.time + _current_price_cache_secs(entry.oracle) - now <= CURRENT_PRICE_REFRESH_AHEAD_SECS  # noqa: E501
+            ):
+                assets.append(cache_key[0])
+
+        return assets
+
+    @staticmethod
+    def refresh_current_prices(assets: list[Asset]) -> None:
+        """Queries again the usd price of the given assets, so that their cache entries
+        are refreshed before they expire, and saves the cache in the global DB"""
+        log.debug(f'Refreshing the cached current price of {len(assets)} assets')
+        Inquirer.find_usd_prices(assets=assets, ignore_cache=True)
+        Inquirer.save_current_price_cache()
 
     @staticmethod
     def set_oracles_order(oracles: Sequence[CurrentPriceOracle]) -> None:
@@ -487,6 +656,198 @@ class Inquirer:
         )
         return price, oracle_queried, used_main_currency
 
+    @staticmethod
+    def _query_oracle_instances_multiple(
+            from_assets: list[AssetWithOracles],
+            skip_onchain: bool = False,
+    ) -> dict[Asset, Price]:
+        """Query the usd price of many assets that only need the oracles.
+
+        Each oracle is asked, in the order set by the user, for the prices of all the assets
+        that are still missing one, so that oracles able to batch requests do so.
+        Prices that can't be found are ZERO_PRICE. All results are cached.
+        """
+        instance = Inquirer()
+        assert (
+            instance._oracles is not None and
+            instance._oracle_instances is not None and
+            instance._oracles_not_onchain is not None and
+            instance._oracle_instances_not_onchain is not None
+        ), (
+            'Inquirer should never be called before setting the oracles'
+        )
+        if skip_onchain:
+            oracles = instance._oracles_not_onchain
+            oracle_instances = instance._oracle_instances_not_onchain
+        else:
+            oracles = instance._oracles
+            oracle_instances = instance._oracle_instances
+
+        usd = A_USD.resolve_to_asset_with_oracles()
+        prices: dict[Asset, Price] = {}
+        remaining = from_assets
+        for oracle, oracle_instance in zip(oracles, oracle_instances):
+            if len(remaining) == 0:
+                break
+
+            if (
+                oracle_instance.rate_limited_in_last(DEFAULT_RATE_LIMIT_WAITING_TIME) is True or
+                isinstance(oracle_instance, PenalizablePriceOracleMixin) and oracle_instance.is_penalized() is True  # noqa: E501
+            ):
+                continue
+
+            try:
+                oracle_prices = oracle_instance.query_multiple_current_prices(
+                    from_assets=remaining,
+                    to_asset=usd,
+                )
+            except RecursionError:
+                instance._msg_aggregator.add_warning(
+                    'Was not able to find the price of some assets since your manual latest '
+                    'prices form a loop. For now, other oracles will be used.',
+                )
+                continue
+
+            now = ts_now()
+            for asset, price in oracle_prices.items():
+                if price == ZERO_PRICE:
+                    continue
+
+                prices[asset] = price
+                Inquirer._cached_current_price[(asset, A_USD)] = CachedPriceEntry(
+                    price=price,
+                    time=now,
+                    oracle=oracle,
+                    used_main_currency=False,
+                )
+
+            log.debug(f'Current price oracle {oracle} got prices for {len(oracle_prices)}/{len(remaining)} assets')  # noqa: E501
+            remaining = [x for x in remaining if x not in prices]
+
+        now = ts_now()
+        for asset in remaining:
+            prices[asset] = ZERO_PRICE
+            Inquirer._cached_current_price[(asset, A_USD)] = CachedPriceEntry(
+                price=ZERO_PRICE,
+                time=now,
+                oracle=CurrentPriceOracle.BLOCKCHAIN,
+                used_main_currency=False,
+            )
+
+        return prices
+
+    @staticmethod
+    def _maybe_resolve_to_oracle_asset(asset: Asset) -> Optional[AssetWithOracles]:
+        """Returns the asset resolved to an asset with oracles if its usd price is found only
+        via the price oracles and None if it needs any of the special handling of
+        `_find_usd_price`, such as fiat, special or protocol tokens."""
+        if asset in (A_USD, A_KFEE, A_BSQ) or asset.identifier in Inquirer().special_tokens:
+            return None
+
+        try:
+            if asset.is_fiat() or asset.is_asset_with_oracles() is False:
+                return None
+            resolved_asset = asset.resolve_to_asset_with_oracles()
+        except (UnknownAsset, WrongAssetType):
+            return None
+
+        if isinstance(resolved_asset, EvmToken) and (
+            resolved_asset.protocol in ProtocolsWithPriceLogic or
+            resolved_asset.underlying_tokens is not None
+        ):
+            return None
+
+        return resolved_asset
+
+    @staticmethod
+    def _maybe_resolve_to_protocol_token(asset: Asset) -> Optional[EvmToken]:
+        """Returns the asset resolved to an evm token if its usd price is calculated on-chain
+        by `find_lp_and_vault_prices` and None otherwise"""
+        if asset.identifier in Inquirer().special_tokens:
+            return None
+
+        try:
+            token = asset.resolve_to_evm_token()
+        except (UnknownAsset, WrongAssetType):
+            return None
+
+        if token.protocol in (*LP_TOKEN_AS_POOL_PROTOCOLS, CURVE_POOL_PROTOCOL, YEARN_VAULTS_V2_PROTOCOL):  # noqa: E501
+            return token
+
+        return None
+
+    @staticmethod
+    def find_usd_prices(
+            assets: Iterable[Asset],
+            ignore_cache: bool = False,
+            skip_onchain: bool = False,
+    ) -> dict[Asset, Price]:
+        """Returns the current usd price of each of the given assets.
+
+        Assets whose price only comes from the price oracles are queried together so that
+        oracles which accept many assets at once, like coingecko and cryptocompare, need
+        only a few requests. Only the assets an oracle missed are passed on to the next
+        oracle. LP and vault tokens whose price is calculated on-chain are priced together
+        via `find_lp_and_vault_prices`. The rest of the assets are queried one by one
+        via `find_usd_price`.
+
+        Returns ZERO_PRICE for the assets whose price could not be found.
+        """
+        instance = Inquirer()
+        prices: dict[Asset, Price] = {}
+        oracle_assets: dict[Asset, AssetWithOracles] = {}
+        protocol_tokens: dict[Asset, EvmToken] = {}
+        for asset in assets:
+            if asset in prices or asset in oracle_assets or asset in protocol_tokens:
+                continue
+
+            if ignore_cache is False and (cache := instance.get_cached_current_price_entry(
+                cache_key=(asset, A_USD),
+                match_main_currency=False,
+            )) is not None:
+                prices[asset] = cache.price
+            elif (resolved_asset := instance._maybe_resolve_to_oracle_asset(asset)) is not None:
+                oracle_assets[asset] = resolved_asset
+            elif (protocol_token := instance._maybe_resolve_to_protocol_token(asset)) is not None:
+                protocol_tokens[asset] = protocol_token
+            else:
+                prices[asset] = instance.find_usd_price(
+                    asset=asset,
+                    ignore_cache=ignore_cache,
+                    skip_onchain=skip_onchain,
+                )
+
+        if len(protocol_tokens) != 0:
+            onchain_prices = instance.find_lp_and_vault_prices(protocol_tokens.values())
+            now = ts_now()
+            for asset, protocol_token in protocol_tokens.items():
+                if (onchain_price := onchain_prices[protocol_token]) is None:
+                    # on-chain calculation failed. Let the single asset path try the rest
+                    prices[asset] = instance.find_usd_price(
+                        asset=asset,
+                        ignore_cache=ignore_cache,
+                        skip_onchain=skip_onchain,
+                    )
+                    continue
+
+                prices[asset] = onchain_price
+                Inquirer._cached_current_price[(asset, A_USD)] = CachedPriceEntry(
+                    price=onchain_price,
+                    time=now,
+                    oracle=CurrentPriceOracle.BLOCKCHAIN,
+                    used_main_currency=False,
+                )
+
+        if len(oracle_assets) != 0:
+            oracle_prices = instance._query_oracle_instances_multiple(
+                from_assets=list(oracle_assets.values()),
+                skip_onchain=skip_onchain,
+            )
+            for asset, resolved_asset in oracle_assets.items():
+                prices[asset] = oracle_prices[resolved_asset]
+
+        return prices
+
     @staticmethod
     def _find_price(
             from_asset: Asset,
@@ -732,22 +1093,12 @@ class Inquirer:
             block_identifier='latest',
         )
 
-    def find_curve_pool_price(
+    def _get_curve_pool_tokens(
             self,
             lp_token: EvmToken,
-    ) -> Optional[Price]:
-        """
-        1. Obtain the pool for this token
-        2. Obtain prices for assets in pool
-        3. Obtain the virtual price for share and the balances of each
-        token in the pool
-        4. Calc the price for a share
-
-        Returns the price of 1 LP token from the pool
-        """
-        ethereum = self.get_evm_manager(chain_id=ChainID.ETHEREUM)
-        ethereum.assure_curve_cache_is_queried_and_decoder_updated()  # type:ignore  # ethereum is an EthereumManager here
-
+    ) -> Optional[tuple[ChecksumEvmAddress, list[EvmToken]]]:
+        """Returns the address of the curve pool of the given LP token and the tokens
+        of that pool or None if the pool or any of its tokens is not known"""
         with GlobalDBHandler().conn.read_ctx() as cursor:
             pool_address_in_cache = globaldb_get_unique_cache_value(
                 cursor=cursor,
@@ -772,34 +1123,30 @@ class Inquirer:
         except UnknownAsset:
             return None
 
-        # Get price for each token in the pool
-        prices = []
-        for token in tokens:
-            price = self.find_usd_price(token)
-            if price == ZERO_PRICE:
-                log.error(
-                    f'Could not calculate price for {lp_token} due to inability to '
-                    f'fetch price for {token}.',
-                )
-                return None
-            prices.append(price)
+        return pool_address, tokens
 
-        # Query virtual price of LP share and balances in the pool for each token
-        contract = EvmContract(
-            address=pool_address,
-            abi=ethereum.node_inquirer.contracts.abi('CURVE_POOL'),
-            deployed_block=0,
-        )
-        calls = [(pool_address, contract.encode(method_name='get_virtual_price'))]
+    @staticmethod
+    def _get_curve_pool_calls(
+            contract: EvmContract,
+            tokens_num: int,
+    ) -> list[tuple[ChecksumEvmAddress, str]]:
+        """Calls to query the virtual price of a curve LP share and the balance of each
+        token in the pool"""
+        calls = [(contract.address, contract.encode(method_name='get_virtual_price'))]
         calls += [
-            (pool_address, contract.encode(method_name='balances', arguments=[i]))
-            for i in range(len(tokens))
+            (contract.address, contract.encode(method_name='balances', arguments=[i]))
+            for i in range(tokens_num)
         ]
-        output = ethereum.node_inquirer.multicall_2(
-            require_success=False,
-            calls=calls,
-        )
+        return calls
 
+    @staticmethod
+    def _decode_curve_pool_outputs(
+            contract: EvmContract,
+            tokens: list[EvmToken],
+            output: Sequence[tuple[bool, bytes]],
+    ) -> Optional[list[FVal]]:
+        """Decodes the output of the `_get_curve_pool_calls` calls. Returns the virtual
+        price followed by the normalized balance of each pool token or None on failure"""
         # Check that the output has the correct structure
         if not all(len(call_result) == 2 for call_result in output):
             log.debug(
@@ -829,6 +1176,16 @@ class Inquirer:
             normalized_amount = token_normalized_value_decimals(amount, token.decimals)
             data.append(normalized_amount)
 
+        return data
+
+    @staticmethod
+    def _curve_share_price(
+            lp_token: EvmToken,
+            prices: list[Price],
+            data: list[FVal],
+    ) -> Optional[Price]:
+        """Calculates the price of a curve LP share from the prices of the pool tokens
+        and the data returned by `_decode_curve_pool_outputs`"""
         # Prices and data should verify this relation for the following operations
         if len(prices) != len(data) - 1:
             log.debug(
@@ -845,72 +1202,132 @@ class Inquirer:
             return None
 
         # Calculate weight of each asset as the proportion of tokens value
-        weights = (data[x + 1] * prices[x] / total_assets_price for x in range(len(tokens)))
+        weights = (data[x + 1] * prices[x] / total_assets_price for x in range(len(prices)))
         assets_price = FVal(sum(map(operator.mul, weights, prices)))
         return (assets_price * FVal(data[0])) / (10 ** lp_token.decimals)
 
-    def find_yearn_price(
+    def find_curve_pool_price(
             self,
-            token: EvmToken,
+            lp_token: EvmToken,
     ) -> Optional[Price]:
         """
-        Query price for a yearn vault v2 token using the pricePerShare method
-        and the price of the underlying token.
+        1. Obtain the pool for this token
+        2. Obtain prices for assets in pool
+        3. Obtain the virtual price for share and the balances of each
+        token in the pool
+        4. Calc the price for a share
+
+        Returns the price of 1 LP token from the pool
+        """
+        ethereum = self.get_evm_manager(chain_id=ChainID.ETHEREUM)
+        ethereum.assure_curve_cache_is_queried_and_decoder_updated()  # type:ignore  # ethereum is an EthereumManager here
+
+        if (pool_info := self._get_curve_pool_tokens(lp_token)) is None:
+            return None
+        pool_address, tokens = pool_info
+
+        # Get price for each token in the pool
+        prices = []
+        for token in tokens:
+            price = self.find_usd_price(token)
+            if price == ZERO_PRICE:
+                log.error(
+                    f'Could not calculate price for {lp_token} due to inability to '
+                    f'fetch price for {token}.',
+                )
+                return None
+            prices.append(price)
+
+        # Query virtual price of LP share and balances in the pool for each token
+        contract = EvmContract(
+            address=pool_address,
+            abi=ethereum.node_inquirer.contracts.abi('CURVE_POOL'),
+            deployed_block=0,
+        )
+        output = ethereum.node_inquirer.multicall_2(
+            require_success=False,
+            calls=self._get_curve_pool_calls(contract=contract, tokens_num=len(tokens)),
+        )
+        if (data := self._decode_curve_pool_outputs(contract, tokens, output)) is None:
+            return None
+
+        return self._curve_share_price(lp_token=lp_token, prices=prices, data=data)
+
+    def _get_yearn_underlying_token(self, token: EvmToken) -> Optional[EvmToken]:
+        """Returns the underlying token of a yearn vault v2 token. If it's not in the
+        global DB it's queried from the chain and stored, so next time no need to query it.
+
+        Returns None if the underlying token could not be found.
         """
         ethereum = self.get_evm_manager(chain_id=ChainID.ETHEREUM)
         globaldb = GlobalDBHandler()
         with globaldb.conn.read_ctx() as cursor:
             maybe_underlying_tokens = globaldb.fetch_underlying_tokens(cursor, ethaddress_to_identifier(token.evm_address))  # noqa: E501
 
+        if maybe_underlying_tokens is not None and len(maybe_underlying_tokens) == 1:
+            return EvmToken(ethaddress_to_identifier(maybe_underlying_tokens[0].address))
+
+        # underlying token not recorded in the DB. Ask the chain
         contract = EvmContract(
             address=token.evm_address,
             abi=ethereum.node_inquirer.contracts.abi('YEARN_VAULT_V2'),
             deployed_block=0,
         )
-        if maybe_underlying_tokens is None or len(maybe_underlying_tokens) != 1:
-            # underlying token not recorded in the DB. Ask the chain
-            try:
-                remote_underlying_token = contract.call(ethereum.node_inquirer, 'token')
-            except (RemoteError, BlockchainQueryError) as e:
-                log.error(f'Failed to query underlying token method in Yearn v2 Vault. {e!s}')
-                return None
+        try:
+            remote_underlying_token = contract.call(ethereum.node_inquirer, 'token')
+        except (RemoteError, BlockchainQueryError) as e:
+            log.error(f'Failed to query underlying token method in Yearn v2 Vault. {e!s}')
+            return None
 
-            try:
-                underlying_token_address = deserialize_evm_address(remote_underlying_token)
-            except DeserializationError:
-                log.error(f'underlying token call of {token.evm_address} returned invalid address {remote_underlying_token}')  # noqa: E501
-                return None
+        try:
+            underlying_token_address = deserialize_evm_address(remote_underlying_token)
+        except DeserializationError:
+            log.error(f'underlying token call of {token.evm_address} returned invalid address {remote_underlying_token}')  # noqa: E501
+            return None
 
-            try:  # make sure it's in the global DB
-                underlying_token = get_or_create_evm_token(
-                    userdb=ethereum.node_inquirer.database,
-                    evm_address=underlying_token_address,
-                    chain_id=ChainID.ETHEREUM,
-                    seen=TokenSeenAt(description='Detecting Yearn vault underlying tokens'),
-                )
-            except NotERC20Conformant as e:
-                log.error(
-                    f'Error fetching ethereum token {underlying_token_address} while '
-                    f'detecting underlying tokens of {token.evm_address!s}: {e!s}',
-                )
-            # store it in the DB, so next time no need to query chain
-            with globaldb.conn.write_ctx() as write_cursor:
-                globaldb._add_underlying_tokens(
-                    write_cursor=write_cursor,
-                    parent_token_identifier=token.identifier,
-                    underlying_tokens=[
-                        UnderlyingToken(
-                            address=underlying_token_address,
-                            token_kind=EvmTokenKind.ERC20,  # this may be a guess here
-                            weight=ONE,  # all yearn vaults have single underlying
-                        )],
-                    chain_id=ChainID.ETHEREUM,
-                )
-        else:
-            underlying_token = EvmToken(ethaddress_to_identifier(maybe_underlying_tokens[0].address))  # noqa: E501
+        try:  # make sure it's in the global DB
+            underlying_token = get_or_create_evm_token(
+                userdb=ethereum.node_inquirer.database,
+                evm_address=underlying_token_address,
+                chain_id=ChainID.ETHEREUM,
+                seen=TokenSeenAt(description='Detecting Yearn vault underlying tokens'),
+            )
+        except NotERC20Conformant as e:
+            log.error(
+                f'Error fetching ethereum token {underlying_token_address} while '
+                f'detecting underlying tokens of {token.evm_address!s}: {e!s}',
+            )
+            return None
+
+        # store it in the DB, so next time no need to query chain
+        with globaldb.conn.write_ctx() as write_cursor:
+            globaldb._add_underlying_tokens(
+                write_cursor=write_cursor,
+                parent_token_identifier=token.identifier,
+                underlying_tokens=[
+                    UnderlyingToken(
+                        address=underlying_token_address,
+                        token_kind=EvmTokenKind.ERC20,  # this may be a guess here
+                        weight=ONE,  # all yearn vaults have single underlying
+                    )],
+                chain_id=ChainID.ETHEREUM,
+            )
+        return underlying_token
+
+    def find_yearn_price(
+            self,
+            token: EvmToken,
+    ) -> Optional[Price]:
+        """
+        Query price for a yearn vault v2 token using the pricePerShare method
+        and the price of the underlying token.
+        """
+        if (underlying_token := self._get_yearn_underlying_token(token)) is None:
+            return None
 
         underlying_token_price = self.find_usd_price(underlying_token)
         # Get the price per share from the yearn contract
+        ethereum = self.get_evm_manager(chain_id=ChainID.ETHEREUM)
         contract = EvmContract(
             address=token.evm_address,
             abi=ethereum.node_inquirer.contracts.abi('YEARN_VAULT_V2'),
@@ -925,6 +1342,157 @@ class Inquirer:
 
         return None
 
+    @staticmethod
+    def _multicall_in_chunks(
+            evm_inquirer: 'EvmNodeInquirer',
+            calls: list[tuple[ChecksumEvmAddress, str]],
+    ) -> list[tuple[bool, bytes]]:
+        """Sends the calls in multicalls of up to MULTICALL_CHUNKS calls each, allowing
+        any of them to fail. The calls of a multicall that errors are returned as failed."""
+        output: list[tuple[bool, bytes]] = []
+        for idx in range(0, len(calls), MULTICALL_CHUNKS):
+            chunk = calls[idx:idx + MULTICALL_CHUNKS]
+            try:
+                output.extend(evm_inquirer.multicall_2(require_success=False, calls=chunk))
+            except (RemoteError, BlockchainQueryError) as e:
+                log.error(
+                    f'Failed to query {len(chunk)} calls via {evm_inquirer.chain_name} '
+                    f'multicall while finding LP and vault token prices. {e!s}',
+                )
+                output.extend((False, b'') for _ in chunk)
+
+        return output
+
+    def find_lp_and_vault_prices(
+            self,
+            tokens: Iterable[EvmToken],
+    ) -> dict[EvmToken, Optional[Price]]:
+        """Calculates the price of many uniswap like LP, curve LP and yearn v2 vault tokens
+        in one pass.
+
+        The contract reads that `find_lp_price_from_uniswaplike_pool`, `find_curve_pool_price`
+        and `find_yearn_price` would do one token at a time are gathered per chain and sent
+        as a few aggregated multicalls. Then the prices of all the underlying tokens are
+        found with a single `find_usd_prices` call.
+
+        Returns None as the price of the tokens it could not calculate a price for.
+        """
+        prices: dict[EvmToken, Optional[Price]] = {}
+        # token, contract, chain, index of its first call, its pool or underlying tokens
+        requests: list[tuple[EvmToken, EvmContract, ChainID, int, list[EvmToken]]] = []
+        calls: defaultdict[ChainID, list[tuple[ChecksumEvmAddress, str]]] = defaultdict(list)
+        curve_cache_checked = False
+        pool_tokens: list[EvmToken]
+        for token in tokens:
+            if token in prices:
+                continue
+
+            prices[token] = None
+            node_inquirer = self.get_evm_manager(token.chain_id).node_inquirer
+            if token.protocol in LP_TOKEN_AS_POOL_PROTOCOLS:
+                contract = get_uniswaplike_lp_contract(evm_inquirer=node_inquirer, token=token)
+                if contract is None:
+                    continue
+                token_calls = [
+                    (token.evm_address, contract.encode(method_name=method))
+                    for method in UNISWAPLIKE_LP_METHODS
+                ]
+                pool_tokens = []  # known only after decoding the calls
+            elif token.protocol == CURVE_POOL_PROTOCOL:
+                if curve_cache_checked is False:
+                    self.get_evm_manager(chain_id=ChainID.ETHEREUM).assure_curve_cache_is_queried_and_decoder_updated()  # type:ignore  # ethereum is an EthereumManager here  # noqa: E501
+                    curve_cache_checked = True
+                if (pool_info := self._get_curve_pool_tokens(token)) is None:
+                    continue
+                contract = EvmContract(
+                    address=pool_info[0],
+                    abi=node_inquirer.contracts.abi('CURVE_POOL'),
+                    deployed_block=0,
+                )
+                pool_tokens = pool_info[1]
+                token_calls = self._get_curve_pool_calls(contract=contract, tokens_num=len(pool_tokens))  # noqa: E501
+            elif token.protocol == YEARN_VAULTS_V2_PROTOCOL:
+                if (underlying_token := self._get_yearn_underlying_token(token)) is None:
+                    continue
+                contract = EvmContract(
+                    address=token.evm_address,
+                    abi=node_inquirer.contracts.abi('YEARN_VAULT_V2'),
+                    deployed_block=0,
+                )
+                pool_tokens = [underlying_token]
+                token_calls = [(token.evm_address, contract.encode(method_name='pricePerShare'))]
+            else:
+                continue
+
+            requests.append((token, contract, token.chain_id, len(calls[token.chain_id]), pool_tokens))  # noqa: E501
+            calls[token.chain_id].extend(token_calls)
+
+        outputs = {
+            chain_id: self._multicall_in_chunks(
+                evm_inquirer=self.get_evm_manager(chain_id).node_inquirer,
+                calls=chain_calls,
+            ) for chain_id, chain_calls in calls.items()
+        }
+
+        # decode all outputs first so that all underlying prices are found in one go
+        decoded: list[tuple[EvmToken, list[EvmToken], Any]] = []
+        for token, contract, chain_id, start, pool_tokens in requests:
+            if token.protocol in LP_TOKEN_AS_POOL_PROTOCOLS:
+                pool_data = decode_uniswaplike_lp_outputs(
+                    evm_inquirer=self.get_evm_manager(chain_id).node_inquirer,
+                    token=token,
+                    contract=contract,
+                    outputs=[
+                        data if success else b''
+                        for success, data in outputs[chain_id][start:start + len(UNISWAPLIKE_LP_METHODS)]  # noqa: E501
+                    ],
+                )
+                if pool_data is not None:
+                    decoded.append((token, [pool_data[0], pool_data[2]], pool_data))
+            elif token.protocol == CURVE_POOL_PROTOCOL:
+                data = self._decode_curve_pool_outputs(
+                    contract=contract,
+                    tokens=pool_tokens,
+                    output=outputs[chain_id][start:start + len(pool_tokens) + 1],
+                )
+                if data is not None:
+                    decoded.append((token, pool_tokens, data))
+            else:  # yearn vault
+                success, result = outputs[chain_id][start]
+                if success is False or len(result) == 0:
+                    log.error(f'Failed to query pricePerShare method in Yearn v2 Vault {token.evm_address}')  # noqa: E501
+                    continue
+                decoded.append((token, pool_tokens, contract.decode(result, 'pricePerShare')[0]))
+
+        underlying_prices = self.find_usd_prices(
+            assets=[pool_token for _, pool_tokens, _ in decoded for pool_token in pool_tokens],
+        )
+        for token, pool_tokens, token_data in decoded:
+            token_prices = [underlying_prices[x] for x in pool_tokens]
+            if token.protocol in LP_TOKEN_AS_POOL_PROTOCOLS:
+                prices[token] = uniswaplike_lp_share_price(
+                    evm_inquirer=self.get_evm_manager(token.chain_id).node_inquirer,
+                    pool_data=token_data,
+                    token0_price=token_prices[0],
+                    token1_price=token_prices[1],
+                )
+            elif token.protocol == CURVE_POOL_PROTOCOL:
+                if ZERO_PRICE in token_prices:
+                    log.error(
+                        f'Could not calculate price for {token} due to inability to '
+                        f'fetch price for {pool_tokens[token_prices.index(ZERO_PRICE)]}.',
+                    )
+                    continue
+                prices[token] = self._curve_share_price(
+                    lp_token=token,
+                    prices=token_prices,
+                    data=token_data,
+                )
+            else:  # yearn vault
+                prices[token] = Price(token_data * token_prices[0] / 10 ** token.decimals)
+
+        return prices
+
     @staticmethod
     def get_fiat_usd_exchange_rates(currencies: Iterable[FiatAsset]) -> dict[FiatAsset, Price]:
         """Gets the USD exchange rate of any of the given assets
@@ -1,9 +1,18 @@
 import abc
+import logging
 from typing import Any, Optional
 
 from rotkehlchen.assets.asset import Asset, AssetWithOracles
+from rotkehlchen.constants.prices import ZERO_PRICE
+from rotkehlchen.errors.defi import DefiPoolError
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.errors.price import PriceQueryUnsupportedAsset
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Price, Timestamp
 
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
 
 class CurrentPriceOracleInterface(metaclass=abc.ABCMeta):
     """
@@ -37,6 +46,38 @@ class CurrentPriceOracleInterface(metaclass=abc.ABCMeta):
         2. Whether returned price is in main currency
         """
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: list[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Returns the current price in `to_asset` of each of the `from_assets` that the
+        oracle found a price for. Assets without a price are omitted.
+
+        Oracles whose API accepts many assets in a single request override this to
+        batch the queries. By default each asset is queried on its own and errors
+        are logged and skipped so that the other assets can still get a price.
+        """
+        prices = {}
+        for from_asset in from_assets:
+            try:
+                price, _ = self.query_current_price(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    match_main_currency=False,
+                )
+            except (DefiPoolError, PriceQueryUnsupportedAsset, RemoteError) as e:
+                log.warning(
+                    f'Current price oracle {self.name} failed to request {to_asset.identifier} '
+                    f'price for {from_asset.identifier} due to: {e!s}.',
+                )
+                continue
+
+            if price != ZERO_PRICE:
+                prices[from_asset] = price
+
+        return prices
+
 
 class HistoricalPriceOracleInterface(CurrentPriceOracleInterface):
     """Query prices for certain timestamps. Oracle could be rate limited"""
@@ -66,6 +107,25 @@ class HistoricalPriceOracleInterface(CurrentPriceOracleInterface):
         - RemoteError
         """
 
+    def query_historical_price_range(
+            self,
+            from_asset: Asset,  # pylint: disable=unused-argument
+            to_asset: Asset,  # pylint: disable=unused-argument
+            from_timestamp: Timestamp,  # pylint: disable=unused-argument
+            to_timestamp: Timestamp,  # pylint: disable=unused-argument
+    ) -> bool:
+        """Oracles that can return many historical prices with a single query implement this
+        to store in the global DB all the prices of the pair between the two timestamps.
+        Subsequent `query_historical_price` calls for that range can then use the cache.
+
+        Returns True if any price was stored and False if the oracle does not support it.
+
+        May raise:
+        - PriceQueryUnsupportedAsset
+        - RemoteError
+        """
+        return False
+
     @abc.abstractmethod
     def all_coins(self) -> dict[str, dict[str, Any]]:
         """Historical price oracles (coingecko, cryptocompare) implement this
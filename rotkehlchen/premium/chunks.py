@@ -0,0 +1,225 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.premium.premium import RemoteMetadata
+from rotkehlchen.types import Timestamp
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# The exported DB is written table after table so rows added to a table shift the pages
+# of all the tables after it. So chunks are not cut at fixed offsets but after the pages
+# whose hash matches, and a shift by whole pages only changes the chunks around the change.
+DB_CHUNK_MIN_PAGES = 16
+DB_CHUNK_AVG_PAGES = 64  # with 4096 bytes pages chunks are 256KB on average
+DB_CHUNK_MAX_PAGES = 256
+SQLITE_HEADER = b'SQLite format 3\x00'
+SQLITE_DEFAULT_PAGE_SIZE = 4096
+
+
+class ChunksManifest(NamedTuple):
+    """Lists in order the chunks a synced DB consists of"""
+    upload_ts: Timestamp
+    last_modify_ts: Timestamp
+    # b64 encoded sha256 of the plaintext DB. Same as the hash of a full DB upload
+    data_hash: str
+    # size in bytes of the plaintext DB
+    data_size: int
+    chunk_ids: list[str]
+
+    def serialize(self) -> bytes:
+        return json.dumps(self._asdict()).encode()
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> 'ChunksManifest':
+        """May raise:
+        - RemoteError if the manifest is not valid
+        """
+        try:
+            manifest = json.loads(data)
+            return cls(
+                upload_ts=Timestamp(manifest['upload_ts']),
+                last_modify_ts=Timestamp(manifest['last_modify_ts']),
+                data_hash=manifest['data_hash'],
+                data_size=manifest['data_size'],
+                chunk_ids=manifest['chunk_ids'],
+            )
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise RemoteError(f'Got invalid DB chunks manifest: {e!s}') from e
+
+    def to_metadata(self) -> RemoteMetadata:
+        return RemoteMetadata(
+            upload_ts=self.upload_ts,
+            last_modify_ts=self.last_modify_ts,
+            data_hash=self.data_hash,
+            data_size=self.data_size,
+        )
+
+
+class ChunkStore(ABC):
+    """Stores the encrypted chunks of a synced DB, addressed by their id, along
+    with the manifest of the latest upload.
+
+    All methods may raise RemoteError if the store can't be reached.
+    """
+
+    @abstractmethod
+    def missing_chunks(self, chunk_ids: list[str]) -> set[str]:
+        """Returns which of the given chunks are not in the store"""
+
+    @abstractmethod
+    def put_chunk(self, chunk_id: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def get_chunk(self, chunk_id: str) -> bytes:
+        """May also raise RemoteError if the chunk does not exist"""
+
+    @abstractmethod
+    def put_manifest(self, manifest: bytes) -> None:
+        """Replaces the manifest. Chunks it does not list can be pruned after this"""
+
+    @abstractmethod
+    def get_manifest(self) -> Optional[bytes]:
+        """Returns the manifest of the latest upload or None if nothing was uploaded"""
+
+    @abstractmethod
+    def prune(self, keep: set[str]) -> None:
+        """Removes all chunks apart from the ones to keep"""
+
+
+class LocalChunkStore(ChunkStore):
+    """A chunk store in a local directory. Stands in for the server in tests"""
+
+    def __init__(self, directory: Path) -> None:
+        self.chunks_directory = directory / 'chunks'
+        self.chunks_directory.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = directory / 'manifest.json'
+
+    def missing_chunks(self, chunk_ids: list[str]) -> set[str]:
+        return {x for x in chunk_ids if not (self.chunks_directory / x).exists()}
+
+    def put_chunk(self, chunk_id: str, data: bytes) -> None:
+        (self.chunks_directory / chunk_id).write_bytes(data)
+
+    def get_chunk(self, chunk_id: str) -> bytes:
+        try:
+            return (self.chunks_directory / chunk_id).read_bytes()
+        except OSError as e:
+            raise RemoteError(f'Could not read DB chunk {chunk_id} due to {e!s}') from e
+
+    def put_manifest(self, manifest: bytes) -> None:
+        self.manifest_path.write_bytes(manifest)
+
+    def get_manifest(self) -> Optional[bytes]:
+        if not self.manifest_path.exists():
+            return None
+        return self.manifest_path.read_bytes()
+
+    def prune(self, keep: set[str]) -> None:
+        for path in self.chunks_directory.iterdir():
+            if path.name not in keep:
+                path.unlink()
+
+
+def _chunk_id(key: bytes, chunk: bytes) -> str:
+    """Chunks are addressed by a keyed hash so that the store can't tell what they contain"""
+    return hmac.new(key, chunk, hashlib.sha256).hexdigest()
+
+
+def _read_page_size(header: bytes) -> int:
+    """Reads the page size from the header of a sqlite DB"""
+    if not header.startswith(SQLITE_HEADER) or len(header) < 18:
+        return SQLITE_DEFAULT_PAGE_SIZE
+
+    page_size = int.from_bytes(header[16:18], byteorder='big')
+    return 65536 if page_size == 1 else page_size  # 1 stands for 65536 in the header
+
+
+def _is_chunk_boundary(page: bytes) -> bool:
+    return int.from_bytes(hashlib.sha256(page).digest()[:4], byteorder='big') % DB_CHUNK_AVG_PAGES == 0  # noqa: E501
+
+
+def _iterate_chunks(path: Path) -> Iterator[bytes]:
+    """Splits the DB at path into chunks of whole pages. A chunk ends after a page
+    whose content marks a boundary, so boundaries move along with the pages."""
+    with open(path, 'rb') as f:
+        page_size = _read_page_size(f.read(100))
+        f.seek(0)
+        chunk, pages = bytearray(), 0
+        while page := f.read(page_size):
+            chunk += page
+            pages += 1
+            if pages >= DB_CHUNK_MAX_PAGES or (pages >= DB_CHUNK_MIN_PAGES and _is_chunk_boundary(page)):  # noqa: E501
+                yield bytes(chunk)
+                chunk, pages = bytearray(), 0
+
+        if len(chunk) != 0:
+            yield bytes(chunk)
+
+
+def read_db_chunks(path: Path, key: bytes) -> tuple[list[str], str, int]:
+    """Splits the plaintext DB at path into chunks without keeping them in memory.
+
+    Returns the ids of the chunks in order, the b64 encoded sha256 of the DB and its size.
+    """
+    chunk_ids, hasher, size = [], hashlib.sha256(), 0
+    for chunk in _iterate_chunks(path):
+        chunk_ids.append(_chunk_id(key, chunk))
+        hasher.update(chunk)
+        size += len(chunk)
+
+    return chunk_ids, base64.b64encode(hasher.digest()).decode(), size
+
+
+def upload_db_chunks(store: ChunkStore, path: Path, key: bytes, chunk_ids: list[str]) -> int:
+    """Compresses, encrypts and uploads only the chunks of the plaintext DB at path
+    that are not already in the store. Returns how many chunks were uploaded.
+
+    May raise:
+    - RemoteError if the store can't be reached
+    """
+    missing, uploaded = store.missing_chunks(chunk_ids), 0
+    for chunk_id, chunk in zip(chunk_ids, _iterate_chunks(path), strict=True):
+        if chunk_id in missing:
+            store.put_chunk(chunk_id, encrypt(key, zlib.compress(chunk)))
+            missing.discard(chunk_id)  # the same chunk can appear more than once
+            uploaded += 1
+
+    log.debug(f'Uploaded {uploaded} out of {len(chunk_ids)} DB chunks')
+    return uploaded
+
+
+def download_db_chunks(store: ChunkStore, key: bytes, manifest: ChunksManifest) -> bytes:
+    """Downloads, decrypts and decompresses the chunks of the manifest and returns
+    the plaintext DB they consist of.
+
+    May raise:
+    - RemoteError if the store can't be reached or a chunk is missing
+    - UnableToDecryptRemoteData if a chunk can't be decrypted with the key or
+    does not match its id or the assembled DB does not match the manifest's hash
+    """
+    data = bytearray()
+    for chunk_id in manifest.chunk_ids:
+        try:
+            chunk = zlib.decompress(decrypt(key, store.get_chunk(chunk_id)))
+        except zlib.error as e:
+            raise UnableToDecryptRemoteData(f'Could not decompress DB chunk {chunk_id}') from e
+        if not hmac.compare_digest(_chunk_id(key, chunk), chunk_id):
+            raise UnableToDecryptRemoteData(f'DB chunk {chunk_id} does not match its id')
+        data += chunk
+
+    if base64.b64encode(hashlib.sha256(data).digest()).decode() != manifest.data_hash:
+        raise UnableToDecryptRemoteData('The DB assembled from the chunks does not match its hash')  # noqa: E501
+    return bytes(data)
@@ -9,17 +9,30 @@ from rotkehlchen.data_migrations.manager import DataMigrationManager
 from rotkehlchen.errors.api import PremiumAuthenticationError, RotkehlchenPermissionError
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.premium.chunks import (
+    ChunksManifest,
+    ChunkStore,
+    download_db_chunks,
+    read_db_chunks,
+    upload_db_chunks,
+)
 from rotkehlchen.premium.premium import (
     Premium,
     PremiumCredentials,
     RemoteMetadata,
     premium_create_and_verify,
 )
+from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.misc import ts_now
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+DB_PASSWORD_MISMATCH_MESSAGE = (
+    'The given password can not unlock the database that was retrieved  from '
+    'the server. Make sure to use the same password as when the account was created.'
+)
+
 
 class CanSync(Enum):
     YES = 0
@@ -48,14 +61,52 @@ class PremiumSyncManager:
         self.data = data
         self.migration_manager = migration_manager
         self.premium: Optional[Premium] = None
+        # If set the DB is synced as content addressed chunks so that only the
+        # chunks that changed since the last upload need to be uploaded. Nothing
+        # sets it until the server can store chunks, so the whole DB is uploaded.
+        self.chunk_store: Optional[ChunkStore] = None
 
     def _query_last_data_metadata(self) -> RemoteMetadata:
         """Query remote metadata and keep up to date the last remote data upload ts"""
         assert self.premium is not None, 'caller should make sure premium exists'
-        metadata = self.premium.query_last_data_metadata()
+        if self.chunk_store is not None:
+            manifest = self._query_chunks_manifest()
+            metadata = RemoteMetadata(
+                upload_ts=Timestamp(0),
+                last_modify_ts=Timestamp(0),
+                data_hash='',
+                data_size=0,
+            ) if manifest is None else manifest.to_metadata()
+        else:
+            metadata = self.premium.query_last_data_metadata()
         self.last_remote_data_upload_ts = metadata.upload_ts
         return metadata
 
+    def _query_chunks_manifest(self) -> Optional[ChunksManifest]:
+        """May raise:
+        - RemoteError if the chunk store can't be reached or the manifest is invalid
+        """
+        assert self.chunk_store is not None, 'caller should make sure the chunk store exists'
+        if (manifest := self.chunk_store.get_manifest()) is None:
+            return None
+        return ChunksManifest.deserialize(manifest)
+
+    def _pull_db_chunks(self) -> Optional[bytes]:
+        """Downloads the chunks of the latest upload and returns the plaintext DB
+
+        May raise:
+        - RemoteError if the chunk store can't be reached
+        - UnableToDecryptRemoteData if the password does not match the one of the remote DB
+        """
+        assert self.chunk_store is not None, 'caller should make sure the chunk store exists'
+        if (manifest := self._query_chunks_manifest()) is None:
+            return None
+        return download_db_chunks(
+            store=self.chunk_store,
+            key=self.data.db.password.encode(),
+            manifest=manifest,
+        )
+
     def _can_sync_data_from_server(self, new_account: bool) -> SyncCheckResult:
         """
         Checks if the remote data can be pulled from the server.
@@ -116,21 +167,26 @@ class PremiumSyncManager:
             return False, 'Pulling failed. User does not have active premium.'
 
         try:
-            result = self.premium.pull_data()
+            if self.chunk_store is not None:
+                result = self._pull_db_chunks()
+            else:
+                result = self.premium.pull_data()
         except (RemoteError, PremiumAuthenticationError) as e:
             log.debug('sync from server -- pulling failed.', error=str(e))
             return False, f'Pulling failed: {e!s}'
+        except UnableToDecryptRemoteData as e:
+            raise PremiumAuthenticationError(DB_PASSWORD_MISMATCH_MESSAGE) from e
 
         if result is None:
             return False, 'No data found'
 
         try:
-            self.data.decompress_and_decrypt_db(result)
+            if self.chunk_store is not None:
+                self.data.import_plaintext_db(result)
+            else:
+                self.data.decompress_and_decrypt_db(result)
         except UnableToDecryptRemoteData as e:
-            raise PremiumAuthenticationError(
-                'The given password can not unlock the database that was retrieved  from '
-                'the server. Make sure to use the same password as when the account was created.',
-            ) from e
+            raise PremiumAuthenticationError(DB_PASSWORD_MISMATCH_MESSAGE) from e
 
         # Need to run migrations in case the app was updated since last sync and in
         # case this is a request to sync from the API, where all modules are initialized
@@ -157,6 +213,72 @@ class PremiumSyncManager:
 
         return True
 
+    def _stop_upload(self, message: str, actionable: bool) -> tuple[bool, str]:
+        self.data.msg_aggregator.add_message(
+            message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
+            data={'uploaded': False, 'actionable': actionable, 'message': message},
+        )
+        self.last_upload_attempt_ts = ts_now()
+        return False, message
+
+    def _finish_upload(self) -> tuple[bool, None]:
+        # update the last data upload value
+        self.last_data_upload_ts = ts_now()
+        self.last_upload_attempt_ts = self.last_data_upload_ts
+        self.last_remote_data_upload_ts = self.last_data_upload_ts
+        with self.data.db.user_write() as cursor:
+            self.data.db.set_setting(cursor, name='last_data_upload_ts', value=self.last_data_upload_ts)  # noqa: E501
+
+        self.data.msg_aggregator.add_message(
+            message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
+            data={'uploaded': True, 'actionable': False, 'message': None},
+        )
+        log.debug('upload to server -- success')
+        return True, None
+
+    def _maybe_upload_db_chunks(
+            self,
+            metadata: RemoteMetadata,
+            our_last_write_ts: Timestamp,
+            force_upload: bool,
+    ) -> tuple[bool, Optional[str]]:
+        """Uploads only the chunks of the DB that are not in the chunk store and
+        then the manifest of the DB. The DB is exported once and read in chunks
+        twice, first to hash them and then to upload the missing ones, so that the
+        whole DB is never compressed or held in memory."""
+        assert self.chunk_store is not None, 'caller should make sure the chunk store exists'
+        key = self.data.db.password.encode()
+        with self.data.export_plaintext_db() as path:
+            chunk_ids, our_hash, data_size = read_db_chunks(path=path, key=key)
+            log.debug('CAN_PUSH', ours=our_hash, theirs=metadata.data_hash)
+            if our_hash == metadata.data_hash and not force_upload:
+                log.debug('upload to server stopped -- same hash')
+                return self._stop_upload('Remote database is up to date', actionable=True)
+
+            if data_size < metadata.data_size and not force_upload:
+                log.debug(
+                    f'upload to server stopped -- remote db({metadata.data_size}) '
+                    f'bigger than local({data_size})',
+                )
+                return self._stop_upload('Remote database bigger than the local one', actionable=True)  # noqa: E501
+
+            manifest = ChunksManifest(
+                upload_ts=ts_now(),
+                last_modify_ts=our_last_write_ts,
+                data_hash=our_hash,
+                data_size=data_size,
+                chunk_ids=chunk_ids,
+            )
+            try:
+                upload_db_chunks(store=self.chunk_store, path=path, key=key, chunk_ids=chunk_ids)
+                self.chunk_store.put_manifest(manifest.serialize())
+                self.chunk_store.prune(keep=set(chunk_ids))
+            except RemoteError as e:
+                log.debug('upload to server -- upload error', error=str(e))
+                return self._stop_upload(str(e), actionable=False)
+
+        return self._finish_upload()
+
     def maybe_upload_data_to_server(
             self,
             force_upload: bool = False,
@@ -172,27 +294,23 @@ class PremiumSyncManager:
         except (RemoteError, PremiumAuthenticationError) as e:
             message = 'Fetching metadata error'
             log.debug(f'upload to server -- {message}', error=str(e))
-            self.data.msg_aggregator.add_message(
-                message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-                data={'uploaded': False, 'actionable': False, 'message': message},
-            )
-            self.last_upload_attempt_ts = ts_now()
-            return False, message
+            return self._stop_upload(message, actionable=False)
 
         with self.data.db.conn.read_ctx() as cursor:
             our_last_write_ts = self.data.db.get_setting(cursor=cursor, name='last_write_ts')
         if our_last_write_ts <= metadata.last_modify_ts and not force_upload:
-            message = 'Remote database is more recent than local'
             log.debug(
                 f'upload to server stopped -- remote db({metadata.last_modify_ts}) '
                 f'more recent than local({our_last_write_ts})',
             )
-            self.data.msg_aggregator.add_message(
-                message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-                data={'uploaded': False, 'actionable': True, 'message': message},
+            return self._stop_upload('Remote database is more recent than local', actionable=True)  # noqa: E501
+
+        if self.chunk_store is not None:
+            return self._maybe_upload_db_chunks(
+                metadata=metadata,
+                our_last_write_ts=our_last_write_ts,
+                force_upload=force_upload,
             )
-            self.last_upload_attempt_ts = ts_now()
-            return False, message
 
         data, our_hash = self.data.compress_and_encrypt_db()
         log.debug(
@@ -202,27 +320,15 @@ class PremiumSyncManager:
         )
         if our_hash == metadata.data_hash and not force_upload:
             log.debug('upload to server stopped -- same hash')
-            message = 'Remote database is up to date'
-            self.data.msg_aggregator.add_message(
-                message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-                data={'uploaded': False, 'actionable': True, 'message': message},
-            )
-            self.last_upload_attempt_ts = ts_now()
-            return False, message
+            return self._stop_upload('Remote database is up to date', actionable=True)
 
         data_bytes_size = len(data)
         if data_bytes_size < metadata.data_size and not force_upload:
-            message = 'Remote database bigger than the local one'
             log.debug(
                 f'upload to server stopped -- remote db({metadata.data_size}) '
                 f'bigger than local({data_bytes_size})',
             )
-            self.data.msg_aggregator.add_message(
-                message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-                data={'uploaded': False, 'actionable': True, 'message': message},
-            )
-            self.last_upload_attempt_ts = ts_now()
-            return False, message
+            return self._stop_upload('Remote database bigger than the local one', actionable=True)  # noqa: E501
 
         try:
             self.premium.upload_data(
@@ -232,28 +338,10 @@ class PremiumSyncManager:
                 compression_type='zlib',
             )
         except (RemoteError, PremiumAuthenticationError) as e:
-            message = str(e)
-            log.debug('upload to server -- upload error', error=message)
-            self.data.msg_aggregator.add_message(
-                message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-                data={'uploaded': False, 'actionable': False, 'message': message},
-            )
-            self.last_upload_attempt_ts = ts_now()
-            return False, message
+            log.debug('upload to server -- upload error', error=str(e))
+            return self._stop_upload(str(e), actionable=False)
 
-        # update the last data upload value
-        self.last_data_upload_ts = ts_now()
-        self.last_upload_attempt_ts = self.last_data_upload_ts
-        self.last_remote_data_upload_ts = self.last_data_upload_ts
-        with self.data.db.user_write() as cursor:
-            self.data.db.set_setting(cursor, name='last_data_upload_ts', value=self.last_data_upload_ts)  # noqa: E501
-
-        self.data.msg_aggregator.add_message(
-            message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-            data={'uploaded': True, 'actionable': False, 'message': None},
-        )
-        log.debug('upload to server -- success')
-        return True, None
+        return self._finish_upload()
 
     def sync_data(
             self,
@@ -22,27 +22,7 @@ from rotkehlchen.balances.manual import (
     get_manually_tracked_balances,
 )
 from rotkehlchen.chain.accounts import SingleBlockchainAccountData
-from rotkehlchen.chain.aggregator import ChainsAggregator
-from rotkehlchen.chain.arbitrum_one.manager import ArbitrumOneManager
-from rotkehlchen.chain.arbitrum_one.node_inquirer import ArbitrumOneInquirer
-from rotkehlchen.chain.avalanche.manager import AvalancheManager
-from rotkehlchen.chain.base.manager import BaseManager
-from rotkehlchen.chain.base.node_inquirer import BaseInquirer
-from rotkehlchen.chain.ethereum.manager import EthereumManager
-from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
-from rotkehlchen.chain.ethereum.oracles.uniswap import UniswapV2Oracle, UniswapV3Oracle
 from rotkehlchen.chain.evm.nodes import populate_rpc_nodes_in_database
-from rotkehlchen.chain.gnosis.manager import GnosisManager
-from rotkehlchen.chain.gnosis.node_inquirer import GnosisInquirer
-from rotkehlchen.chain.optimism.manager import OptimismManager
-from rotkehlchen.chain.optimism.node_inquirer import OptimismInquirer
-from rotkehlchen.chain.polygon_pos.manager import PolygonPOSManager
-from rotkehlchen.chain.polygon_pos.node_inquirer import PolygonPOSInquirer
-from rotkehlchen.chain.substrate.manager import SubstrateManager
-from rotkehlchen.chain.substrate.utils import (
-    KUSAMA_NODES_TO_CONNECT_AT_START,
-    POLKADOT_NODES_TO_CONNECT_AT_START,
-)
 from rotkehlchen.config import default_data_directory
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.data_handler import DataHandler
@@ -61,9 +41,7 @@ from rotkehlchen.errors.misc import (
     SystemPermissionError,
 )
 from rotkehlchen.exchanges.manager import ExchangeManager
-from rotkehlchen.externalapis.beaconchain import BeaconChain
 from rotkehlchen.externalapis.coingecko import Coingecko
-from rotkehlchen.externalapis.covalent import Covalent, chains_id
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
 from rotkehlchen.externalapis.defillama import Defillama
 from rotkehlchen.fval import FVal
@@ -104,7 +82,7 @@ from rotkehlchen.utils.misc import combine_dicts
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.xpub import XpubData
     from rotkehlchen.db.drivers.gevent import DBCursor
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.data_structures import KrakenAccountType
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -264,6 +242,31 @@ class Rotkehlchen:
         For example unexpected schema.
         - DBSchemaError if database schema is malformed.
         """
+        # The chain modules pull in most of the decoders, contracts and protocol
+        # modules, so they are imported only once a user logs in
+        from rotkehlchen.chain.aggregator import ChainsAggregator
+        from rotkehlchen.chain.arbitrum_one.manager import ArbitrumOneManager
+        from rotkehlchen.chain.arbitrum_one.node_inquirer import ArbitrumOneInquirer
+        from rotkehlchen.chain.avalanche.manager import AvalancheManager
+        from rotkehlchen.chain.base.manager import BaseManager
+        from rotkehlchen.chain.base.node_inquirer import BaseInquirer
+        from rotkehlchen.chain.ethereum.manager import EthereumManager
+        from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
+        from rotkehlchen.chain.ethereum.oracles.uniswap import UniswapV2Oracle, UniswapV3Oracle
+        from rotkehlchen.chain.gnosis.manager import GnosisManager
+        from rotkehlchen.chain.gnosis.node_inquirer import GnosisInquirer
+        from rotkehlchen.chain.optimism.manager import OptimismManager
+        from rotkehlchen.chain.optimism.node_inquirer import OptimismInquirer
+        from rotkehlchen.chain.polygon_pos.manager import PolygonPOSManager
+        from rotkehlchen.chain.polygon_pos.node_inquirer import PolygonPOSInquirer
+        from rotkehlchen.chain.substrate.manager import SubstrateManager
+        from rotkehlchen.chain.substrate.utils import (
+            KUSAMA_NODES_TO_CONNECT_AT_START,
+            POLKADOT_NODES_TO_CONNECT_AT_START,
+        )
+        from rotkehlchen.externalapis.beaconchain import BeaconChain
+        from rotkehlchen.externalapis.covalent import Covalent, chains_id
+
         log.info(
             'Unlocking user',
             user=user,
@@ -301,6 +304,7 @@ class Rotkehlchen:
         # set the DB in the external services instances that need it
         self.cryptocompare.set_database(self.data.db)
         Inquirer()._manualcurrent.set_database(database=self.data.db)
+        Inquirer().load_current_price_cache()
 
         # Initialize the cached settings singleton
         CachedSettings()
@@ -518,6 +522,7 @@ class Rotkehlchen:
         del self.events_historian
         del self.data_importer
 
+        Inquirer().save_current_price_cache()
         self.data.logout()
         self.cryptocompare.unset_database()
         CachedSettings().reset()
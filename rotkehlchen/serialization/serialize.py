@@ -1,3 +1,4 @@
+import json
 from typing import Any, Union
 
 from hexbytes import HexBytes
@@ -61,8 +62,7 @@ from rotkehlchen.chain.evm.types import NodeName, WeightedNode
 from rotkehlchen.chain.optimism.types import OptimismTransaction
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.db.utils import DBAssetBalance, LocationData, SingleDBAssetBalance
-from rotkehlchen.exchanges.data_structures import Trade
-from rotkehlchen.exchanges.kraken import KrakenAccountType
+from rotkehlchen.exchanges.data_structures import KrakenAccountType, Trade
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.inquirer import CurrentPriceOracle
@@ -229,3 +229,30 @@ def process_result_list(result: list[Any]) -> list[Any]:
     processed_result = _process_entry(result)
     assert isinstance(processed_result, list)  # pylint: disable=isinstance-second-argument-not-valid-type
     return processed_result
+
+
+class APIEncoder(json.JSONEncoder):
+    """Encodes the types process_result knows about as the encoder meets them"""
+    def default(self, obj: Any) -> Any:
+        if (processed := _process_entry(obj)) is not obj:
+            return processed
+
+        return json.JSONEncoder.default(self, obj)
+
+
+def jsonify_result(result: Any) -> str:
+    """Serializes a result to json in a single pass, converting FVals, assets,
+    enums and the other types process_result knows about as the encoder meets them.
+
+    NamedTuples are encoded natively as lists by the json encoder, so results
+    that contain NamedTuples meant to be dicts still need to go via process_result.
+    Dictionaries keyed by non-primitive types such as assets can't be handled by
+    the encoder hook so for them we fall back to processing the whole result first.
+
+    May raise:
+    - TypeError if the result contains an object that can't be serialized
+    """
+    try:
+        return json.dumps(result, cls=APIEncoder)
+    except TypeError:
+        return json.dumps(_process_entry(result), cls=APIEncoder)
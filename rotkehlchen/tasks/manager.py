@@ -33,6 +33,7 @@ from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPriceOracle
+from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium, premium_create_and_verify
 from rotkehlchen.tasks.utils import query_missing_prices_of_base_entries, should_run_periodic_task
@@ -149,6 +150,7 @@ class TaskManager:
             self._maybe_query_produced_blocks,
             self._maybe_query_withdrawals,
             self._maybe_run_events_processing,
+            self._maybe_refresh_current_prices,
         ]
         if self.premium_sync_manager is not None:
             self.potential_tasks.append(self._maybe_schedule_db_upload)
@@ -652,6 +654,20 @@ class TaskManager:
 
         return None
 
+    def _maybe_refresh_current_prices(self) -> Optional[list[gevent.Greenlet]]:
+        """Schedules refreshing the cached current prices that are in use and about
+        to expire, so that price queries keep hitting the cache"""
+        if len(assets := Inquirer().get_current_prices_to_refresh()) == 0:
+            return None
+
+        return [self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name='Refresh cached current prices',
+            exception_is_error=True,
+            method=Inquirer().refresh_current_prices,
+            assets=assets,
+        )]
+
     def _schedule(self) -> None:
         """Schedules background tasks"""
         self.greenlet_manager.clear_finished()
@@ -1,7 +1,11 @@
 import logging
+import operator
+import time
+from collections import defaultdict
 from typing import TYPE_CHECKING, Literal, Optional
 
 from rotkehlchen.constants.assets import A_USD
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp
 from rotkehlchen.history.price import PriceHistorian
@@ -18,6 +22,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Maximum time span of the events whose missing prices are fetched with a single range query
+MISSING_PRICES_RANGE_WINDOW = DAY_IN_SECONDS * 30
+
 
 def should_run_periodic_task(
         database: 'DBHandler',
@@ -39,6 +46,34 @@ def should_run_periodic_task(
     return ts_now() - last_update_ts >= refresh_period
 
 
+def group_entries_missing_prices(
+        entries_missing_prices: list[tuple[str, 'FVal', 'Asset', 'Timestamp']],
+        window: int = MISSING_PRICES_RANGE_WINDOW,
+) -> list[tuple['Asset', 'Timestamp', 'Timestamp', list[tuple[str, 'FVal', 'Timestamp']]]]:
+    """Groups the entries missing prices by asset and by windows of at most `window` seconds
+    so that the prices of each group can be queried with a single range query.
+
+    Returns a list of (asset, from_timestamp, to_timestamp, entries) with the entries
+    of each group sorted by timestamp.
+    """
+    by_asset: defaultdict['Asset', list[tuple[str, 'FVal', 'Timestamp']]] = defaultdict(list)
+    for identifier, amount, asset, timestamp in entries_missing_prices:
+        by_asset[asset].append((identifier, amount, timestamp))
+
+    groups = []
+    for asset, asset_entries in by_asset.items():
+        asset_entries.sort(key=operator.itemgetter(2))
+        group = [asset_entries[0]]
+        for entry in asset_entries[1:]:
+            if entry[2] - group[0][2] > window:
+                groups.append((asset, group[0][2], group[-1][2], group))
+                group = []
+            group.append(entry)
+        groups.append((asset, group[0][2], group[-1][2], group))
+
+    return groups
+
+
 def query_missing_prices_of_base_entries(
         database: 'DBHandler',
         entries_missing_prices: list[tuple[str, 'FVal', 'Asset', 'Timestamp']],
@@ -47,30 +82,55 @@ def query_missing_prices_of_base_entries(
     """
     Queries missing prices for HistoryBaseEntry in database updating
     the price if it is found.
+
+    The entries are grouped by asset and time window and the prices of each group
+    with more than one entry are first fetched and cached with a single range query,
+    so that the per entry price queries that follow are served from the cache.
+    All the found usd values are written to the DB in one go.
+
     If provided we keep a set of events that have been already queried in this session
     and we couldn't find a price for it now.
     """
     inquirer = PriceHistorian()
     updates = []
-    for identifier, amount, asset, timestamp in entries_missing_prices:
-        try:
-            price = inquirer.query_historical_price(
+    start_time = time.monotonic()
+    range_queries = 0
+    for asset, from_timestamp, to_timestamp, entries in group_entries_missing_prices(entries_missing_prices):  # noqa: E501
+        if len(entries) > 1:
+            inquirer.query_historical_price_range(
                 from_asset=asset,
                 to_asset=A_USD,
-                timestamp=timestamp,
+                from_timestamp=from_timestamp,
+                to_timestamp=to_timestamp,
             )
-        except (NoPriceForGivenTimestamp, RemoteError) as e:
-            log.error(
-                f'Failed to find price for {asset} at {timestamp} in history '
-                f'event with {identifier=}. {e!s}.',
-            )
-            if base_entries_ignore_set is not None:
-                base_entries_ignore_set.add(identifier)
-            continue
+            range_queries += 1
+
+        for identifier, amount, timestamp in entries:
+            try:
+                price = inquirer.query_historical_price(
+                    from_asset=asset,
+                    to_asset=A_USD,
+                    timestamp=timestamp,
+                )
+            except (NoPriceForGivenTimestamp, RemoteError) as e:
+                log.error(
+                    f'Failed to find price for {asset} at {timestamp} in history '
+                    f'event with {identifier=}. {e!s}.',
+                )
+                if base_entries_ignore_set is not None:
+                    base_entries_ignore_set.add(identifier)
+                continue
 
-        usd_value = amount * price
-        updates.append((str(usd_value), identifier))
+            usd_value = amount * price
+            updates.append((str(usd_value), identifier))
 
     query = 'UPDATE history_events SET usd_value=? WHERE rowid=?'
     with database.user_write() as write_cursor:
         write_cursor.executemany(query, updates)
+
+    elapsed = time.monotonic() - start_time
+    log.debug(
+        f'Found prices for {len(updates)}/{len(entries_missing_prices)} history events '
+        f'with {range_queries} range queries in {elapsed:.2f} seconds '
+        f'({len(entries_missing_prices) / max(elapsed, 0.001):.2f} events/sec)',
+    )
@@ -144,3 +144,49 @@ def test_query_async_task_that_died(rotkehlchen_api_server_with_exchanges):
     assert result['outcome']['result'] is None
     msg = 'The backend query task died unexpectedly: BOOM!'
     assert result['outcome']['message'] == msg
+
+
+@pytest.mark.parametrize('added_exchanges', [(Location.BINANCE,)])
+def test_cancel_async_task(rotkehlchen_api_server_with_exchanges):
+    """Test that a pending async task can be cancelled and is then forgotten"""
+    server = rotkehlchen_api_server_with_exchanges
+    binance = try_get_first_exchange(server.rest_api.rotkehlchen.exchange_manager, Location.BINANCE)  # noqa: E501
+
+    def mock_binance_slow_response(url, timeout):  # pylint: disable=unused-argument
+        gevent.sleep(100)
+
+    binance_patch = patch.object(binance.session, 'get', side_effect=mock_binance_slow_response)
+    with binance_patch:
+        response = requests.get(api_url_for(
+            server,
+            'named_exchanges_balances_resource',
+            location='binance',
+        ), json={'async_query': True})
+        task_id = assert_ok_async_response(response)
+        gevent.sleep(0.1)  # let the task start
+
+        response = requests.delete(
+            api_url_for(server, 'specific_async_tasks_resource', task_id=task_id),
+        )
+        assert assert_proper_response_with_result(response) is True
+
+    assert server.rest_api.rotkehlchen.api_task_greenlets == []
+    response = requests.get(api_url_for(server, 'asynctasksresource'))
+    assert assert_proper_response_with_result(response) == {'completed': [], 'pending': []}
+    response = requests.get(
+        api_url_for(server, 'specific_async_tasks_resource', task_id=task_id),
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg=f'No task with id {task_id} found',
+        status_code=HTTPStatus.NOT_FOUND,
+        result_exists=True,
+    )
+    response = requests.delete(
+        api_url_for(server, 'specific_async_tasks_resource', task_id=task_id),
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg=f'No task with id {task_id} found',
+        status_code=HTTPStatus.NOT_FOUND,
+    )
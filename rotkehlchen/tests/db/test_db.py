@@ -60,6 +60,7 @@ from rotkehlchen.db.settings import (
     DBSettings,
     ModifiableDBSettings,
 )
+from rotkehlchen.db.snapshots import DBSnapshot
 from rotkehlchen.db.utils import DBAssetBalance, LocationData, SingleDBAssetBalance
 from rotkehlchen.errors.api import AuthenticationError
 from rotkehlchen.errors.misc import DBSchemaError, InputError
@@ -264,7 +265,13 @@ def test_add_remove_exchange(user_data_dir, sql_vm_instructions_cb):
     assert binance.api_secret == binance_api_secret
 
 
-def test_export_import_db(data_dir: Path, username: str, sql_vm_instructions_cb: int) -> None:
+@pytest.mark.parametrize('compression_level', [1, 9])
+def test_export_import_db(
+        data_dir: Path,
+        username: str,
+        sql_vm_instructions_cb: int,
+        compression_level: int,
+) -> None:
     """Create a DB, write some data and then after export/import confirm it's there"""
     msg_aggregator = MessagesAggregator()
     data = DataHandler(data_dir, msg_aggregator, sql_vm_instructions_cb)
@@ -281,7 +288,7 @@ def test_export_import_db(data_dir: Path, username: str, sql_vm_instructions_cb:
     with data.db.user_write() as cursor:
         data.db.add_manually_tracked_balances(cursor, [starting_balance])
 
-    encoded_data, _ = data.compress_and_encrypt_db()
+    encoded_data, _ = data.compress_and_encrypt_db(compression_level=compression_level)
     # The server would return them decoded
     data.decompress_and_decrypt_db(encoded_data)
     with data.db.user_write() as cursor:
@@ -1061,6 +1068,103 @@ def test_get_netvalue_without_nfts(data_dir, username, sql_vm_instructions_cb):
     assert values[3] == '4500'
 
 
+def test_statistics_resolution(data_dir, username, sql_vm_instructions_cb):
+    """Test that net value and timed balances are downsampled to the last snapshot of each
+    period when a resolution is given and that zero balances are inferred on the kept ones"""
+    data = DataHandler(data_dir, MessagesAggregator(), sql_vm_instructions_cb)
+    data.unlock(username, '123', create_new=True, resume_from_backup=False)
+    asset = BalanceType.ASSET.serialize_for_db()
+    timed_balance_entries = [
+        (1000, 'ETH', '1', '10', asset),
+        (1100, 'ETH', '2', '20', asset),
+        (1100, 'BTC', '1', '5', asset),
+        (2100, 'BTC', '1', '5', asset),
+        (2500, 'BTC', '1', '5', asset),
+        (3000, 'ETH', '3', '30', asset),
+    ]
+    with data.db.user_write() as write_cursor:
+        data.db.set_settings(write_cursor, settings=ModifiableDBSettings(infer_zero_timed_balances=True))  # noqa: E501
+        write_cursor.executemany(
+            'INSERT INTO timed_balances(timestamp, currency, amount, usd_value, category) '
+            'VALUES (?,?,?,?,?)',
+            timed_balance_entries,
+        )
+        write_cursor.executemany(
+            'INSERT INTO timed_location_data(timestamp, location, usd_value) VALUES (?,?,?)',
+            [(x, 'H', str(x)) for x in (1000, 1100, 2100, 2500, 3000)],
+        )
+
+    assert data.db.get_netvalue_data(Timestamp(0), resolution=1000) == (
+        [1100, 2500, 3000],
+        ['1100', '2500', '3000'],
+    )
+    with data.db.conn.read_ctx() as cursor:
+        balances = data.db.query_timed_balances(
+            cursor=cursor,
+            asset=A_ETH,
+            balance_type=BalanceType.ASSET,
+            resolution=1000,
+        )
+        assert [(x.time, x.amount) for x in balances] == [(1100, FVal(2)), (2500, ZERO), (3000, FVal(3))]  # noqa: E501
+        assert all(x.category == BalanceType.ASSET for x in balances)
+        # without a resolution all the snapshots are returned
+        assert len(data.db.query_timed_balances(cursor, A_ETH, BalanceType.ASSET)) == 5
+
+
+def test_delta_balance_snapshots(data_dir, username, sql_vm_instructions_cb):
+    """Test that only the changed balances of a snapshot are saved and that full snapshots
+    are reconstructed from them, also after deleting a snapshot that others build on"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator, sql_vm_instructions_cb)
+    data.unlock(username, '123', create_new=True, resume_from_backup=False)
+    dbsnapshot = DBSnapshot(data.db, msg_aggregator)
+
+    def make_balances(timestamp, eth_amount):
+        balances = [DBAssetBalance(
+            category=BalanceType.ASSET,
+            time=timestamp,
+            asset=A_BTC,
+            amount=ONE,
+            usd_value=FVal(30000),
+        )]
+        if eth_amount is not None:
+            balances.append(DBAssetBalance(
+                category=BalanceType.ASSET,
+                time=timestamp,
+                asset=A_ETH,
+                amount=FVal(eth_amount),
+                usd_value=FVal(eth_amount) * 2000,
+            ))
+        return balances
+
+    with data.db.user_write() as write_cursor:
+        for timestamp, eth_amount in ((100, 2), (200, 3), (300, None), (400, 5)):
+            data.db.add_snapshot_balances(
+                write_cursor=write_cursor,
+                timestamp=Timestamp(timestamp),
+                balances=make_balances(timestamp, eth_amount),
+            )
+
+        # only the first snapshot is full, the rest only keep ETH changing and disappearing
+        assert write_cursor.execute('SELECT COUNT(*) FROM timed_balances').fetchone()[0] == 5
+        assert write_cursor.execute(
+            'SELECT timestamp FROM delta_balance_snapshots ORDER BY timestamp',
+        ).fetchall() == [(200,), (300,), (400,)]
+        assert dbsnapshot.get_timed_balances(write_cursor, Timestamp(300)) == make_balances(300, None)  # noqa: E501
+        assert [(x.time, x.amount) for x in data.db.query_timed_balances(write_cursor, A_BTC, BalanceType.ASSET)] == [  # noqa: E501
+            (100, ONE), (200, ONE), (300, ONE), (400, ONE),
+        ]
+
+        dbsnapshot.delete(write_cursor, Timestamp(200))
+        assert dbsnapshot.get_timed_balances(write_cursor, Timestamp(200)) == []
+        assert dbsnapshot.get_timed_balances(write_cursor, Timestamp(300)) == make_balances(300, None)  # noqa: E501
+        assert dbsnapshot.get_timed_balances(write_cursor, Timestamp(400)) == make_balances(400, 5)  # noqa: E501
+
+    assert {(x.asset, x.amount) for x in data.db.get_latest_asset_value_distribution()} == {
+        (A_BTC, ONE), (A_ETH, FVal(5)),
+    }
+
+
 def test_add_trades(data_dir, username, caplog, sql_vm_instructions_cb):
     """Test that adding and retrieving trades from the DB works fine.
 
@@ -1835,6 +1835,7 @@ def test_upgrade_db_39_to_40(user_data_dir):  # pylint: disable=unused-argument
     # check the tables we create don't exist and ones we remove exist before the upgrade
     assert table_exists(cursor, 'skipped_external_events') is False
     assert table_exists(cursor, 'accounting_rules') is False
+    assert table_exists(cursor, 'delta_balance_snapshots') is False
     assert table_exists(cursor, 'ledger_action_type') is True
     assert table_exists(cursor, 'ledger_actions') is True
 
@@ -1889,6 +1890,7 @@ def test_upgrade_db_39_to_40(user_data_dir):  # pylint: disable=unused-argument
     # check new tables are created and old are removed
     assert table_exists(cursor, 'skipped_external_events') is True
     assert table_exists(cursor, 'accounting_rules') is True
+    assert table_exists(cursor, 'delta_balance_snapshots') is True
     assert table_exists(cursor, 'ledger_action_type') is False
     assert table_exists(cursor, 'ledger_actions') is False
 
@@ -1936,6 +1938,64 @@ def test_upgrade_db_39_to_40(user_data_dir):  # pylint: disable=unused-argument
     ).serialize() == TxEventSettings.deserialize_from_db(accounting_row[4:]).serialize()
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_upgrade_db_39_to_40_balance_snapshots(user_data_dir):  # pylint: disable=unused-argument
+    """Test that upgrading the DB from version 39 to version 40 keeps every 30th balance
+    snapshot in full and only keeps the changed balances of the rest"""
+    msg_aggregator = MessagesAggregator()
+    _use_prepared_db(user_data_dir, 'v39_rotkehlchen.db')
+    db_v39 = _init_db_with_target_version(
+        target_version=39,
+        user_data_dir=user_data_dir,
+        msg_aggregator=msg_aggregator,
+        resume_from_backup=False,
+    )
+    dai = 'eip155:1/erc20:0x6B175474E89094C44Da98b954EedeAC495271d0F'
+    timestamps = [1600000000 + idx * 3600 for idx in range(32)]
+    rows = []
+    for idx, timestamp in enumerate(timestamps):
+        rows.append(('A', timestamp, 'ETH', '1', '10'))
+        if idx < 10:  # BTC changes at the 6th snapshot and is gone from the 11th
+            rows.append(('A', timestamp, 'BTC', '1' if idx < 5 else '2', '20'))
+        if idx == 31:  # DAI appears after the second full snapshot
+            rows.append(('A', timestamp, dai, '5', '5'))
+    with db_v39.user_write() as write_cursor:
+        write_cursor.execute('DELETE FROM timed_balances')
+        write_cursor.executemany(
+            'INSERT INTO timed_balances(category, timestamp, currency, amount, usd_value) '
+            'VALUES (?, ?, ?, ?, ?)',
+            rows,
+        )
+    db_v39.logout()
+
+    db = _init_db_with_target_version(
+        target_version=40,
+        user_data_dir=user_data_dir,
+        msg_aggregator=msg_aggregator,
+        resume_from_backup=False,
+    )
+    with db.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT timestamp FROM delta_balance_snapshots ORDER BY timestamp',
+        ).fetchall() == [(x,) for idx, x in enumerate(timestamps) if idx not in (0, 30)]
+        assert cursor.execute(
+            'SELECT category, timestamp, currency, amount, usd_value FROM timed_balances '
+            'ORDER BY timestamp, currency',
+        ).fetchall() == [
+            ('A', timestamps[0], 'BTC', '1', '20'),
+            ('A', timestamps[0], 'ETH', '1', '10'),
+            ('A', timestamps[5], 'BTC', '2', '20'),
+            ('A', timestamps[10], 'BTC', None, None),
+            ('A', timestamps[30], 'ETH', '1', '10'),
+            ('A', timestamps[31], dai, '5', '5'),
+        ]
+        # the full balances of each snapshot are the same as before the upgrade
+        for timestamp in timestamps:
+            assert sorted(db.get_snapshot_balance_rows(cursor, timestamp)) == sorted(
+                x for x in rows if x[1] == timestamp
+            )
+
+
 def test_latest_upgrade_correctness(user_data_dir):
     """
     This is a test that we can only do for the last upgrade.
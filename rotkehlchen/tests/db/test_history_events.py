@@ -8,7 +8,7 @@ from rotkehlchen.constants import ONE
 from rotkehlchen.constants.assets import A_ETH
 from rotkehlchen.db.constants import HISTORY_MAPPING_KEY_STATE, HISTORY_MAPPING_STATE_CUSTOMIZED
 from rotkehlchen.db.filtering import EvmEventFilterQuery, HistoryEventFilterQuery
-from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.history_events import DBHistoryEvents, materialize_history_event_rows
 from rotkehlchen.tests.utils.factories import (
     make_ethereum_event,
     make_evm_address,
@@ -179,6 +179,41 @@ def test_read_write_events_from_db(database):
                 assert event == expected_event
 
 
+def test_history_event_rows_match_events(database):
+    """Test that the lightweight row views read the same data as the full events"""
+    db = DBHistoryEvents(database)
+    add_history_events_to_db(db, {
+        1: ('TEST1', TimestampMS(1000), 1),
+        2: ('TEST2', TimestampMS(2000), 2),
+    })
+    add_evm_events_to_db(db, {
+        3: (make_evm_tx_hash(), TimestampMS(3000), 3, 'gas', EvmProduct.POOL, '0x95222290DD7278Aa3Ddd389Cc1E1d165CC4BAfe5'),  # noqa: E501
+    })
+    # add a row that can't be deserialized. It should only be skipped once materialized
+    with db.db.user_write() as write_cursor:
+        write_cursor.execute('UPDATE history_events SET amount=? WHERE identifier=?', ('foo', 2))
+
+    filter_query = HistoryEventFilterQuery.make()
+    with db.db.conn.read_ctx() as cursor:
+        rows = db.get_history_event_rows(cursor, filter_query)
+        events = db.get_history_events(cursor, filter_query, True, False)
+
+    assert len(rows) == 3
+    assert len(events) == 2
+    for row in rows:
+        assert row.get_timestamp() == row.timestamp // 1000
+        assert row.sequence_index == 1
+        assert row.location == Location.ETHEREUM
+        assert row.event_type == HistoryEventType.TRADE
+        assert row.event_subtype == HistoryEventSubType.NONE
+
+    skipped = []
+    assert {
+        x.identifier: x for x in materialize_history_event_rows(iter(rows), on_skip=skipped.append)
+    } == {x.identifier: x for x in events}
+    assert len(skipped) == 1 and skipped[0].identifier not in {x.identifier for x in events}
+
+
 def test_delete_last_event(database):
     """
     Test that if last event in a group is being deleted and it's not an EVM event,
@@ -157,7 +157,7 @@ def patch_and_enter_before_unlock(
     )
 
     ksm_rpcconnect_patch = patch(
-        'rotkehlchen.rotkehlchen.KUSAMA_NODES_TO_CONNECT_AT_START',
+        'rotkehlchen.chain.substrate.utils.KUSAMA_NODES_TO_CONNECT_AT_START',
         new=kusama_manager_connect_at_start,
     )
     # patch the constants to make sure that the periodic query for icons
@@ -1,4 +1,5 @@
 import json
+import os
 from base64 import b64decode
 from http import HTTPStatus
 from pathlib import Path
@@ -15,6 +16,7 @@ from rotkehlchen.errors.api import (
     PremiumAuthenticationError,
     RotkehlchenPermissionError,
 )
+from rotkehlchen.premium.chunks import LocalChunkStore, read_db_chunks
 from rotkehlchen.premium.premium import Premium, PremiumCredentials
 from rotkehlchen.tests.utils.constants import A_GBP, DEFAULT_TESTS_MAIN_CURRENCY
 from rotkehlchen.tests.utils.mock import MockResponse
@@ -198,6 +200,62 @@ def test_upload_data_to_server_smaller_db(rotkehlchen_instance):
         assert not put_mock.called
 
 
+@pytest.mark.parametrize('start_with_valid_premium', [True])
+def test_sync_db_chunks(rotkehlchen_instance: 'Rotkehlchen', tmp_path: Path) -> None:
+    """Test that with a chunk store only the changed chunks of the DB are uploaded
+    and that the DB can be restored from the chunks"""
+    sync_manager = rotkehlchen_instance.premium_sync_manager
+    db = rotkehlchen_instance.data.db
+    store = LocalChunkStore(tmp_path / 'chunks')
+    sync_manager.chunk_store = store
+    with (
+        patch('rotkehlchen.premium.chunks.DB_CHUNK_MIN_PAGES', 1),
+        patch('rotkehlchen.premium.chunks.DB_CHUNK_AVG_PAGES', 2),
+        patch.object(store, 'put_chunk', wraps=store.put_chunk) as put_chunk,
+    ):
+        with db.user_write() as write_cursor:
+            db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_EUR))
+        assert sync_manager.maybe_upload_data_to_server() == (True, None)
+        all_chunks = put_chunk.call_count
+        assert all_chunks > 1
+
+        # nothing changed so nothing should be uploaded
+        assert sync_manager.maybe_upload_data_to_server()[0] is False
+        assert put_chunk.call_count == all_chunks
+
+        # changing a setting changes only a few pages of the DB
+        with db.user_write() as write_cursor:
+            db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_GBP.resolve_to_fiat_asset()))  # noqa: E501
+        assert sync_manager.maybe_upload_data_to_server(force_upload=True) == (True, None)
+        changed_chunks = put_chunk.call_count - all_chunks
+        assert 0 < changed_chunks < all_chunks / 2
+        # the chunks of the previous upload that are no longer used got pruned
+        assert len(list(store.chunks_directory.iterdir())) == len(set(sync_manager._query_chunks_manifest().chunk_ids))  # type: ignore[union-attr]  # noqa: E501
+
+        with db.user_write() as write_cursor:
+            db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_EUR))
+        assert sync_manager._sync_data_from_server_and_replace_local(perform_migrations=False) == (True, '')  # noqa: E501
+
+    with db.conn.read_ctx() as cursor:
+        assert db.get_settings(cursor).main_currency == A_GBP
+
+
+def test_db_chunks_survive_shifted_pages(tmp_path: Path) -> None:
+    """Test that pages inserted in the middle of the DB only change the chunks
+    around them and not all the chunks after them"""
+    header = b'SQLite format 3\x00' + (4096).to_bytes(2, byteorder='big')
+    pages = [header + os.urandom(4096 - len(header))] + [os.urandom(4096) for _ in range(2000)]
+    path, key = tmp_path / 'db', os.urandom(32)
+    path.write_bytes(b''.join(pages))
+    chunk_ids, _, size = read_db_chunks(path=path, key=key)
+    assert size == 2001 * 4096
+    assert len(chunk_ids) > 10
+
+    path.write_bytes(b''.join(pages[:500] + [os.urandom(4096) for _ in range(3)] + pages[500:]))
+    new_chunk_ids, _, _ = read_db_chunks(path=path, key=key)
+    assert len(set(new_chunk_ids) - set(chunk_ids)) <= 3
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 @pytest.mark.parametrize('start_with_valid_premium', [True])
 def test_try_premium_at_start_new_account_can_pull_data(
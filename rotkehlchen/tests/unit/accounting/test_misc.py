@@ -1,14 +1,20 @@
 from typing import TYPE_CHECKING
+from unittest.mock import patch
 
 import pytest
 
 from rotkehlchen.accounting.mixins.event import AccountingEventMixin, AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
 from rotkehlchen.accounting.structures.balance import Balance
-from rotkehlchen.accounting.structures.base import HistoryEvent
+from rotkehlchen.accounting.structures.base import HistoryBaseEntryType, HistoryEvent
 from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.chain.evm.accounting.structures import BaseEventSettings
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_ETH, A_ETH2, A_EUR, A_KFEE, A_USD, A_USDT
+from rotkehlchen.db.accounting_rules import DBAccountingRules
+from rotkehlchen.db.history_events import HistoryEventRow
+from rotkehlchen.errors.asset import UnknownAsset
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.accounting import accounting_history_process, check_pnls_and_csv
@@ -226,3 +232,83 @@ def test_main_currency_is_respected(
     assert len(warnings) == len(errors) == 0
     # Check that the price is correctly computed in GBP
     assert accountant.pots[0].processed_events[0].price == trade_rate * mocked_price_queries['USD']['GBP'][1609537953]  # noqa: E501
+
+
+def test_accounting_rules_compiled_lookup(accountant: 'Accountant') -> None:
+    """Test that accounting rules are compiled once, kept across resets until the rules
+    change in the DB and that lookups are counted per rule"""
+    pot = accountant.pots[0]
+    rules_manager = pot.events_accountant.rules_manager
+    rules_manager.reset()
+    event_settings = rules_manager.event_settings
+    event = HistoryEvent(
+        event_identifier='1',
+        sequence_index=0,
+        timestamp=TimestampMS(1539713238000),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.RECEIVE,
+        event_subtype=HistoryEventSubType.AIRDROP,
+        asset=A_ETH,
+        balance=Balance(amount=ONE),
+    )
+    rule = rules_manager.get_event_settings(event)
+    assert rule is not None and rule.taxable is False
+    assert rules_manager.get_event_settings(event) is rule
+    assert rules_manager.get_lookup_stats() == {('receive', 'airdrop', None): 2}
+
+    rules_manager.reset()  # nothing changed so the compiled rules are reused
+    assert rules_manager.event_settings is event_settings
+    rules_manager.clean_rules()
+    assert rules_manager.get_lookup_stats() == {}
+
+    DBAccountingRules(pot.database).add_accounting_rule(
+        event_type=HistoryEventType.RECEIVE,
+        event_subtype=HistoryEventSubType.AIRDROP,
+        counterparty=None,
+        rule=BaseEventSettings(
+            taxable=True,
+            count_entire_amount_spend=False,
+            count_cost_basis_pnl=False,
+            method='acquisition',
+        ),
+    )
+    rules_manager.reset()
+    assert rules_manager.event_settings is not event_settings
+    new_rule = rules_manager.get_event_settings(event)
+    assert new_rule is not None and new_rule.taxable is True
+
+
+def test_skipped_event_is_reported(accountant: 'Accountant') -> None:
+    """Test that an event that fails processing is the one reported, even after rows
+    that could not be deserialized were dropped before it"""
+    events = [HistoryEvent(
+        event_identifier=name,
+        sequence_index=0,
+        timestamp=TimestampMS(1539713238000 + idx),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.RECEIVE,
+        event_subtype=HistoryEventSubType.NONE,
+        asset=A_ETH,
+        balance=Balance(amount=ONE),
+        identifier=idx + 1,
+    ) for idx, name in enumerate(('good', 'failing'))]
+    bad_row = HistoryEventRow(entry=(HistoryBaseEntryType.HISTORY_EVENT.value, 42), type_idx=0)
+
+    def mock_process(self, accounting, events_iterator):  # pylint: disable=unused-argument
+        if self.event_identifier == 'failing':
+            raise RemoteError('boom')
+        return 1
+
+    with (
+        patch.object(HistoryEventRow, 'to_event', side_effect=UnknownAsset('XYZ')),
+        patch.object(HistoryEvent, 'process', autospec=True, side_effect=mock_process),
+    ):
+        accountant.process_history(
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1640493374),
+            events=[events[0], bad_row, events[1]],
+        )
+
+    errors = accountant.msg_aggregator.consume_errors()
+    assert len(errors) == 1
+    assert errors[0].startswith('Skipping event with id 2 at')
@@ -131,3 +131,30 @@ def test_get_historical_price(globaldb, historical_price_test_data):  # pylint:
         max_seconds_distance=3600,
     )
     assert price_entry is None
+
+
+def test_historical_price_coverage(globaldb):
+    """Test that the ranges fetched in bulk are merged and that only the gaps are returned"""
+    source = HistoricalPriceOracle.COINGECKO
+    assert globaldb.get_historical_price_gaps(A_ETH, A_USD, source, Timestamp(100), Timestamp(200)) == [(100, 200)]  # noqa: E501
+    globaldb.add_historical_price_coverage(A_ETH, A_USD, source, Timestamp(120), Timestamp(140))
+    globaldb.add_historical_price_coverage(A_ETH, A_USD, source, Timestamp(160), Timestamp(170))
+    assert globaldb.get_historical_price_gaps(A_ETH, A_USD, source, Timestamp(100), Timestamp(200)) == [  # noqa: E501
+        (100, 119), (141, 159), (171, 200),
+    ]
+    assert globaldb.is_historical_price_covered(A_ETH, A_USD, source, Timestamp(130)) is True
+    assert globaldb.is_historical_price_covered(A_ETH, A_USD, source, Timestamp(150)) is False
+    # coverage is kept per pair and source
+    assert globaldb.is_historical_price_covered(A_ETH, A_EUR, source, Timestamp(130)) is False
+    assert globaldb.is_historical_price_covered(A_ETH, A_USD, HistoricalPriceOracle.DEFILLAMA, Timestamp(130)) is False  # noqa: E501
+
+    # adjacent and overlapping ranges are merged
+    globaldb.add_historical_price_coverage(A_ETH, A_USD, source, Timestamp(141), Timestamp(165))
+    assert globaldb.get_historical_price_gaps(A_ETH, A_USD, source, Timestamp(100), Timestamp(200)) == [  # noqa: E501
+        (100, 119), (171, 200),
+    ]
+    assert globaldb.get_historical_price_gaps(A_ETH, A_USD, source, Timestamp(125), Timestamp(170)) == []  # noqa: E501
+
+    # deleting the prices of the source also forgets what was fetched
+    globaldb.delete_historical_prices(from_asset=A_ETH, to_asset=A_USD, source=source)
+    assert globaldb.is_historical_price_covered(A_ETH, A_USD, source, Timestamp(130)) is False
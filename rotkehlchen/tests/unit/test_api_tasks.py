@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock, patch
+
+import gevent
+
+from rotkehlchen.api.tasks import APITaskRegistry
+from rotkehlchen.api.websockets.typedefs import WSMessageType
+
+
+def _add_tasks(registry: APITaskRegistry, number: int) -> list[int]:
+    task_ids = []
+    for _ in range(number):
+        task_id = registry.new_task_id()
+        registry.add(task_id=task_id, greenlet=gevent.spawn(gevent.sleep, 100), command='foo')
+        task_ids.append(task_id)
+    return task_ids
+
+
+def test_task_completion():
+    """Test that completed tasks are indexed, notified and removed when their result is read"""
+    greenlets, msg_aggregator = [], MagicMock()
+    registry = APITaskRegistry(greenlets=greenlets, msg_aggregator=msg_aggregator)
+    task_ids = _add_tasks(registry, 3)
+    assert len(greenlets) == 3
+    assert registry.pending_and_completed() == (task_ids, [])
+
+    registry.complete(task_ids[1], {'result': True, 'message': ''})
+    assert registry.pending_and_completed() == ([task_ids[0], task_ids[2]], [task_ids[1]])
+    assert msg_aggregator.add_message.call_count == 1
+    assert msg_aggregator.add_message.call_args.kwargs['message_type'] == WSMessageType.ASYNC_TASK_COMPLETED  # noqa: E501
+    assert msg_aggregator.add_message.call_args.kwargs['data']['task_id'] == task_ids[1]
+
+    assert registry.pop_result(task_ids[0]) is None  # still pending
+    assert registry.pop_result(task_ids[1]) == {'result': True, 'message': ''}
+    assert registry.pop_result(task_ids[1]) is None  # already read
+    assert registry.get(task_ids[1]) is None
+    assert len(greenlets) == 2
+
+    assert registry.cancel(task_ids[0]) is True
+    assert registry.cancel(task_ids[0]) is False
+    registry.complete(task_ids[0], {'result': True, 'message': ''})  # cancelled, so ignored
+    assert registry.pending_and_completed() == ([task_ids[2]], [])
+    registry.clear()
+    assert greenlets == []
+
+
+def test_completed_tasks_are_bounded_and_expire():
+    """Test that only a bounded number of unqueried results are kept and that they expire"""
+    registry = APITaskRegistry(greenlets=[], msg_aggregator=MagicMock())
+    task_ids = _add_tasks(registry, 4)
+    with patch('rotkehlchen.api.tasks.MAX_COMPLETED_API_TASKS', new=2):
+        for task_id in task_ids[:3]:
+            registry.complete(task_id, {'result': task_id, 'message': ''})
+
+    assert registry.pending_and_completed() == ([task_ids[3]], task_ids[1:3])
+    with patch('rotkehlchen.api.tasks.API_TASK_RESULT_TTL', new=-1):
+        assert registry.pop_result(task_ids[1]) is None
+
+    assert registry.pending_and_completed() == ([task_ids[3]], [])
+    registry.clear()
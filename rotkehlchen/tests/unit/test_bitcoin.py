@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances
+from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances, have_bitcoin_transactions
 from rotkehlchen.chain.bitcoin.hdkey import HDKey, XpubType
 from rotkehlchen.chain.bitcoin.utils import (
     WitnessVersion,
@@ -16,8 +16,13 @@ from rotkehlchen.chain.bitcoin.utils import (
     scriptpubkey_to_p2pkh_address,
     scriptpubkey_to_p2sh_address,
 )
-from rotkehlchen.chain.bitcoin.xpub import XpubData
+from rotkehlchen.chain.bitcoin.xpub import (
+    DERIVED_ADDRESSES_CACHE,
+    XpubData,
+    _derive_addresses_from_xpub_data,
+)
 from rotkehlchen.chain.constants import NON_BITCOIN_CHAINS, SupportedBlockchain
+from rotkehlchen.constants import ZERO
 from rotkehlchen.errors.misc import RemoteError, XPUBError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.ens import ENS_BRUNO_BTC_ADDR, ENS_BRUNO_BTC_BYTES
@@ -280,6 +285,46 @@ def test_zpub_to_addresses():
         assert child.address() == expected_addresses[i]
 
 
+def test_derive_xpub_addresses_uses_cache():
+    """Test that both the receiving and change chains of an xpub get scanned
+    and that rescanning it reuses the already derived addresses"""
+    DERIVED_ADDRESSES_CACHE.clear()
+    xpub = 'xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk'  # noqa: E501
+    xpub_data = XpubData(
+        xpub=HDKey.from_xpub(xpub=xpub, path='m'),
+        blockchain=SupportedBlockchain.BITCOIN,
+    )
+    used_address = '1L5ic1V3bTJahEdwjufGJ28PjRcMcHWGka'  # m/0/1
+    queried_batches = []
+
+    def mock_have_transactions(accounts):
+        queried_batches.append(accounts)
+        return {x: (x == used_address, FVal(1) if x == used_address else ZERO) for x in accounts}  # noqa: E501
+
+    derive_child = HDKey.derive_child
+    with (
+        patch('rotkehlchen.chain.bitcoin.xpub.have_bitcoin_transactions', side_effect=mock_have_transactions),  # noqa: E501
+        patch.object(HDKey, 'derive_child', autospec=True, side_effect=derive_child) as derive_mock,  # noqa: E501
+    ):
+        addresses = _derive_addresses_from_xpub_data(
+            xpub_data=xpub_data,
+            start_receiving_index=0,
+            start_change_index=0,
+            gap_limit=3,
+        )
+        assert len(queried_batches) == 3  # 2 receiving batches and 1 change batch
+        assert {(x.account_index, x.derived_index) for x in addresses if x.balance == FVal(1)} == {(0, 1)}  # noqa: E501
+        derive_mock.reset_mock()
+
+        assert _derive_addresses_from_xpub_data(
+            xpub_data=xpub_data,
+            start_receiving_index=0,
+            start_change_index=0,
+            gap_limit=3,
+        ) == addresses
+        assert derive_mock.call_count == 2  # only the receiving and change chain roots
+
+
 def test_from_bad_xpub():
     with pytest.raises(XPUBError):
         HDKey.from_xpub('ddodod')
@@ -535,3 +580,37 @@ def test_bitcoin_balance_api_resolver(network_mocking):
             # Third source fails - FATALITY!!!
             with patch('rotkehlchen.chain.bitcoin._query_mempool_space', MagicMock(side_effect=RemoteError('Fatality'))), pytest.raises(RemoteError):  # noqa: E501
                 get_bitcoin_addresses_balances(addresses)
+
+
+def test_bitcoin_balances_bc1_accounts_split():
+    """Test that having bc1 accounts only makes those get queried one by one and
+    that the rest are still queried in a batch from blockchain.info"""
+    legacy_addresses = [
+        BTCAddress('3FZbgi29cpjq2GjdwV8eyHuJJnkLtktZc5'),
+        BTCAddress('34SjMcbLquZ7HmFmQiAHqEHY4mBEbvGeVL'),
+        BTCAddress('33k4CdyQJFwXQD9giSKyo36mTvE9Y6C9cP'),
+    ]
+    bc1_addresses = [
+        BTCAddress('bc1qhkje0xfvhmgk6mvanxwy09n45df03tj3h3jtnf'),
+        BTCAddress('bc1qs0qf2m05zxtvz6mm5lnvmjsw4nsw8cl2qpwfes'),
+    ]
+    queried_urls = []
+
+    def mock_request_get_dict(url, **kwargs):  # pylint: disable=unused-argument
+        queried_urls.append(url)
+        if 'blockchain.info' in url:
+            return {'addresses': [
+                {'address': x, 'final_balance': 100000000, 'n_tx': 1} for x in legacy_addresses
+            ]}
+        assert url.split('/')[-1] in bc1_addresses
+        return {'chain_stats': {'funded_txo_sum': 300000000, 'spent_txo_sum': 100000000, 'tx_count': 2}}  # noqa: E501
+
+    with patch('rotkehlchen.chain.bitcoin.request_get_dict', side_effect=mock_request_get_dict):
+        balances = get_bitcoin_addresses_balances(bc1_addresses + legacy_addresses)
+        assert len(queried_urls) == 1 + len(bc1_addresses)
+        assert balances == {x: FVal(1) for x in legacy_addresses} | {x: FVal(2) for x in bc1_addresses}  # noqa: E501
+
+        queried_urls.clear()
+        have_transactions = have_bitcoin_transactions(bc1_addresses + legacy_addresses)
+        assert len(queried_urls) == 1 + len(bc1_addresses)
+        assert have_transactions == {x: (True, FVal(1)) for x in legacy_addresses} | {x: (True, FVal(2)) for x in bc1_addresses}  # noqa: E501
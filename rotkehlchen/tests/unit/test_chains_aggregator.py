@@ -1,18 +1,29 @@
+import dataclasses
+import datetime
 from contextlib import ExitStack
 from typing import TYPE_CHECKING
+from unittest.mock import patch
 
 import pytest
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.utils import get_or_create_evm_token
 from rotkehlchen.chain.accounts import BlockchainAccountData
-from rotkehlchen.chain.aggregator import ChainsAggregator, _module_name_to_class
+from rotkehlchen.chain.aggregator import (
+    PINNED_BALANCES_MAX_AGE,
+    ChainsAggregator,
+    _module_name_to_class,
+)
 from rotkehlchen.chain.evm.types import NodeName, WeightedNode, string_to_evm_address
 from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_DAI, A_USDC
+from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.blockchain import setup_evm_addresses_activity_mock
-from rotkehlchen.tests.utils.factories import make_evm_address
+from rotkehlchen.tests.utils.factories import make_ethereum_transaction, make_evm_address
 from rotkehlchen.tests.utils.polygon_pos import ALCHEMY_RPC_ENDPOINT
 from rotkehlchen.types import AVAILABLE_MODULES_MAP, SPAM_PROTOCOL, ChainID, SupportedBlockchain
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.polygon_pos.manager import PolygonPOSManager
@@ -252,3 +263,75 @@ def test_detect_evm_accounts_spam_tx(polygon_pos_manager: 'PolygonPOSManager') -
             db.add_to_ignored_assets(write_cursor=write_cursor, asset=asset)
 
     assert polygon_pos_manager.transactions.address_has_been_spammed(evm_address) is True
+
+
+@pytest.mark.parametrize('ethereum_accounts', [[]])
+def test_pinned_token_balances(blockchain: 'ChainsAggregator', freezer) -> None:
+    """Test that the token balances of accounts that did not change since the block they
+    were queried at are reused and the rest are queried at the new block"""
+    dai, usdc = A_DAI.resolve_to_evm_token(), A_USDC.resolve_to_evm_token()
+    account1, account2 = make_evm_address(), make_evm_address()
+    saved_tokens = {account1: [dai], account2: [dai, usdc]}
+    queried = []
+
+    def mock_query_token_balances(addresses_to_tokens, block_identifier):
+        queried.append((set(addresses_to_tokens), block_identifier))
+        return {
+            address: {token: FVal(block_identifier) for token in tokens}
+            for address, tokens in addresses_to_tokens.items()
+        }
+
+    manager = blockchain.get_chain_manager(SupportedBlockchain.ETHEREUM)
+
+    def query(block_number, native_balances):
+        return blockchain._query_pinned_token_balances(
+            manager=manager,
+            accounts=[account1, account2],
+            block_number=block_number,
+            native_balances=native_balances,
+        )
+
+    with (
+        patch.object(manager.tokens, 'get_saved_tokens', side_effect=lambda _: saved_tokens),
+        patch.object(manager.tokens, 'query_token_balances', side_effect=mock_query_token_balances),  # noqa: E501
+    ):
+        assert query(10, {account1: ONE, account2: ONE}) == {
+            account1: {dai: FVal(10)},
+            account2: {dai: FVal(10), usdc: FVal(10)},
+        }
+        assert queried.pop() == ({account1, account2}, 10)
+
+        # nothing changed so nothing is queried and the balances at block 10 are kept
+        assert query(20, {account1: ONE, account2: ONE})[account2] == {dai: FVal(10), usdc: FVal(10)}  # noqa: E501
+        assert queried.pop() == (set(), 20)
+
+        # a changed native balance, a new transaction and new tokens mean a requery
+        assert query(30, {account1: FVal(2), account2: ONE})[account1] == {dai: FVal(30)}
+        assert queried.pop() == ({account1}, 30)
+        with blockchain.database.user_write() as write_cursor:
+            DBEvmTx(blockchain.database).add_evm_transactions(
+                write_cursor=write_cursor,
+                evm_transactions=[dataclasses.replace(make_ethereum_transaction(), block_number=35)],
+                relevant_address=account2,
+            )
+        query(40, {account1: FVal(2), account2: ONE})
+        assert queried.pop() == ({account2}, 40)
+        saved_tokens[account1] = [dai, usdc]
+        query(50, {account1: FVal(2), account2: ONE})
+        assert queried.pop() == ({account1}, 50)
+
+        # and old balances are not reused
+        freezer.move_to(datetime.datetime.fromtimestamp(ts_now() + PINNED_BALANCES_MAX_AGE + 1, tz=datetime.timezone.utc))  # noqa: E501
+        query(60, {account1: FVal(2), account2: ONE})
+        assert queried.pop() == ({account1, account2}, 60)
+
+        # flushing the cached balances or ignoring the cache forgets the pinned balances
+        query(70, {account1: FVal(2), account2: ONE})
+        assert queried.pop() == (set(), 70)
+        blockchain.flush_cache('query_ethereum_balances')
+        query(80, {account1: FVal(2), account2: ONE})
+        assert queried.pop() == ({account1, account2}, 80)
+        with patch.object(blockchain, 'query_ethereum_balances'):
+            blockchain.query_balances(blockchain=SupportedBlockchain.ETHEREUM, ignore_cache=True)
+        query(90, {account1: FVal(2), account2: ONE})
+        assert queried.pop() == ({account1, account2}, 90)
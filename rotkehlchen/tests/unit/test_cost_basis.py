@@ -3,11 +3,18 @@ import tempfile
 from itertools import zip_longest
 from pathlib import Path
 from typing import TYPE_CHECKING
+from zipfile import ZipFile
 
 import pytest
 
 from rotkehlchen.accounting.accountant import Accountant
 from rotkehlchen.accounting.cost_basis import AssetAcquisitionEvent
+from rotkehlchen.accounting.cost_basis.base import (
+    AverageCostBasisMethod,
+    FIFOCostBasisMethod,
+    HIFOCostBasisMethod,
+    LIFOCostBasisMethod,
+)
 from rotkehlchen.accounting.export.csv import FILENAME_ALL_CSV, CSVExporter
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
@@ -977,6 +984,13 @@ def test_accounting_average_cost_basis(accountant):
 
                     assert value == event.cost_basis.taxable_bought_cost
 
+        # the zip export streams the same CSV directly inside the archive
+        success, zip_path = accountant.csvexporter.create_zip(events=pot.processed_events, pnls=pot.pnls)  # noqa: E501
+        assert success is True
+        with ZipFile(zip_path) as csv_zip:
+            assert csv_zip.namelist() == [FILENAME_ALL_CSV]
+            assert csv_zip.read(FILENAME_ALL_CSV) == (path_dir / FILENAME_ALL_CSV).read_bytes()
+
 
 @pytest.mark.parametrize('mocked_price_queries', [{
     A_ETH: {A_EUR: {1469020840: ONE}},
@@ -1164,3 +1178,46 @@ def test_csv_exporter_settings(database: 'DBHandler') -> None:
     csv_exporter = CSVExporter(database)
     assert csv_exporter.transaction_explorers[SupportedBlockchain.ETHEREUM] == 'myexplorer.eth'
     assert csv_exporter.transaction_explorers[SupportedBlockchain.POLYGON_POS] == 'myexplorer.polygon'  # noqa: E501
+
+
+@pytest.mark.parametrize(('method_class', 'expected_order'), [
+    (FIFOCostBasisMethod, [1, 2, 3, 4]),
+    (LIFOCostBasisMethod, [4, 3, 2, 1]),
+    (HIFOCostBasisMethod, [3, 1, 4, 2]),
+    (AverageCostBasisMethod, [1, 2, 3, 4]),
+])
+def test_acquisitions_batch_consumption_and_snapshot(method_class, expected_order):
+    """Test that a spend consumes many acquisitions in a single call in the order of the
+    cost basis method and that a snapshot restores both the order and remaining amounts"""
+    manager = method_class()
+    for index, rate in ((1, 10), (2, 5), (3, 30), (4, 7)):
+        manager.add_acquisition(AssetAcquisitionEvent(
+            amount=FVal(2),
+            timestamp=Timestamp(EXAMPLE_TIMESTAMP + index),
+            rate=Price(FVal(rate)),
+            index=index,
+        ))
+
+    assert [x.index for x in manager.get_acquisitions()] == expected_order
+    snapshot = manager.snapshot()
+    consumed, remaining = manager.consume_amount(FVal(5))
+    assert remaining == ZERO
+    assert [(x.index, amount) for x, amount in consumed] == [
+        (expected_order[0], FVal(2)),
+        (expected_order[1], FVal(2)),
+        (expected_order[2], ONE),
+    ]
+    assert [x.index for x in manager.get_acquisitions()] == expected_order[2:]
+    assert manager.get_remaining_amount() == FVal(3)
+
+    consumed, remaining = manager.consume_amount(FVal(4))
+    assert remaining == ONE
+    assert len(consumed) == 2 and len(manager) == 0
+
+    manager.restore(snapshot)
+    assert [x.index for x in manager.get_acquisitions()] == expected_order
+    assert all(x.remaining_amount == FVal(2) for x in manager.get_acquisitions())
+    assert manager.get_remaining_amount() == FVal(8)
+    if method_class == AverageCostBasisMethod:
+        assert manager.current_amount == FVal(8)
+        assert manager.current_total_acb == FVal(104)
@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+from rotkehlchen.crypto import StreamEncryptor, decrypt, encrypt
+
+
+@pytest.mark.parametrize('size', [0, 1, 15, 16, 17, 100000])
+def test_stream_encryptor(size):
+    """Test that encrypting in chunks of any size can be decrypted like encrypting at once"""
+    key, data = b'123', os.urandom(size)
+    encryptor = StreamEncryptor(key)
+    encrypted = b''.join(encryptor.update(data[idx:idx + 7777]) for idx in range(0, size, 7777))
+    encrypted += encryptor.finalize()
+
+    assert len(encrypted) == len(encrypt(key, data))
+    assert decrypt(key, encrypted) == data
@@ -1,3 +1,4 @@
+import datetime
 from typing import TYPE_CHECKING
 from unittest.mock import patch
 
@@ -5,6 +6,7 @@ import pytest
 
 from rotkehlchen.assets.asset import Asset, EvmToken
 from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.chain.ethereum.oracles.uniswap import UNISWAP_POOLS_CACHE_TTL
 from rotkehlchen.chain.evm.types import string_to_evm_address
 from rotkehlchen.constants import ONE
 from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DOGE, A_ETH, A_LINK, A_USDC, A_WETH
@@ -14,8 +16,10 @@ from rotkehlchen.errors.price import PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import CurrentPriceOracle
+from rotkehlchen.tests.utils.factories import make_evm_address
 from rotkehlchen.tests.utils.mock import MockResponse
-from rotkehlchen.types import ChainID, EvmTokenKind, Price
+from rotkehlchen.types import ChainID, ChecksumEvmAddress, EvmTokenKind, Price
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.inquirer import Inquirer
@@ -137,6 +141,48 @@ def test_pool_with_no_liquidity(inquirer_defi: 'Inquirer'):
     assert path == []
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_uniswap_pools_graph_cache(inquirer_defi: 'Inquirer', freezer):
+    """Test that the pools needed to find a route are queried from the chain in one batch,
+    that they are stored in the global DB and reused, and that they are queried again
+    once the cache entries expire"""
+    oracle = inquirer_defi._uniswapv2
+    assert oracle is not None
+    weth, inch, link = (x.resolve_to_evm_token() for x in (A_WETH, A_1INCH, A_LINK))
+    weth_pools: dict[EvmToken, ChecksumEvmAddress] = {}
+
+    def mock_query_pools(pairs):
+        """Only pairs with WETH have a pool"""
+        pools = []
+        for token_0, token_1 in pairs:
+            if weth in (token_0, token_1):
+                other = token_1 if token_0 == weth else token_0
+                pools.append(weth_pools.setdefault(other, make_evm_address()))
+            else:
+                pools.append(None)
+        return pools
+
+    with patch.object(oracle, 'query_pools', side_effect=mock_query_pools) as query_pools:
+        route = oracle.find_route(inch, link)
+        assert route == [weth_pools[inch], weth_pools[link]]
+        assert query_pools.call_count == 1
+        assert len(query_pools.call_args.args[0]) == 9  # both tokens and all routing assets
+
+        # the pools are now read from the global DB, also by a new oracle instance
+        assert oracle.find_route(link, inch) == [weth_pools[link], weth_pools[inch]]
+        assert oracle.get_pool(inch, weth) == [weth_pools[inch]]
+        assert oracle.get_pool(inch, link) == []
+        assert query_pools.call_count == 2  # only the direct 1inch/link pair was new
+
+        freezer.move_to(datetime.datetime.fromtimestamp(
+            ts_now() + UNISWAP_POOLS_CACHE_TTL + 1,
+            tz=datetime.timezone.utc,
+        ))
+        assert oracle.find_route(inch, link) == route
+        assert query_pools.call_count == 3
+        assert len(query_pools.call_args.args[0]) == 9
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 def test_invalid_token_kind_price_query(inquirer_defi: 'Inquirer'):
     """
@@ -10,7 +10,7 @@ from freezegun import freeze_time
 from rotkehlchen.assets.asset import Asset, CustomAsset, EvmToken, UnderlyingToken
 from rotkehlchen.assets.utils import get_or_create_evm_token
 from rotkehlchen.chain.evm.types import string_to_evm_address
-from rotkehlchen.constants import ZERO
+from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import (
     A_1INCH,
     A_AAVE,
@@ -30,6 +30,7 @@ from rotkehlchen.db.custom_assets import DBCustomAssets
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.cache import (
+    globaldb_get_unique_cache_like,
     globaldb_set_general_cache_values,
     globaldb_set_unique_cache_value,
 )
@@ -37,6 +38,7 @@ from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.inquirer import (
     CURRENT_PRICE_CACHE_SECS,
+    CURRENT_PRICE_REFRESH_AHEAD_SECS,
     DEFAULT_RATE_LIMIT_WAITING_TIME,
     CurrentPriceOracle,
     _query_currency_converterapi,
@@ -309,6 +311,93 @@ def test_find_usd_price_via_second_oracle(inquirer):
         assert oracle_instance.query_current_price.call_count == 1
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_usd_prices(inquirer):
+    """Test that the prices of many assets are queried in one batch per oracle, that only
+    the assets an oracle missed are passed to the next one and that all prices are cached.
+    """
+    inquirer._oracle_instances = [MagicMock() for _ in inquirer._oracles]
+    for oracle_instance in inquirer._oracle_instances:
+        oracle_instance.query_multiple_current_prices.return_value = {}
+
+    btc_price, eth_price = Price(FVal('30000')), Price(FVal('2000'))
+    inquirer._oracle_instances[0].query_multiple_current_prices.return_value = {A_BTC: btc_price}
+    inquirer._oracle_instances[1].query_multiple_current_prices.return_value = {A_ETH: eth_price}
+
+    prices = inquirer.find_usd_prices([A_BTC, A_ETH, A_LINK, A_USD, A_BTC])
+
+    assert prices == {A_BTC: btc_price, A_ETH: eth_price, A_LINK: ZERO_PRICE, A_USD: ONE}
+    assert inquirer._oracle_instances[0].query_multiple_current_prices.call_args.kwargs['from_assets'] == [A_BTC, A_ETH, A_LINK]  # noqa: E501
+    assert inquirer._oracle_instances[1].query_multiple_current_prices.call_args.kwargs['from_assets'] == [A_ETH, A_LINK]  # noqa: E501
+    for oracle_instance in inquirer._oracle_instances:
+        assert oracle_instance.query_multiple_current_prices.call_count == 1
+        assert oracle_instance.query_current_price.call_count == 0
+
+    assert inquirer.find_usd_price(A_ETH) == eth_price
+    assert inquirer.find_usd_prices([A_BTC, A_LINK]) == {A_BTC: btc_price, A_LINK: ZERO_PRICE}
+    for oracle_instance in inquirer._oracle_instances:
+        assert oracle_instance.query_multiple_current_prices.call_count == 1
+        assert oracle_instance.query_current_price.call_count == 0
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_current_price_cache_persistence(inquirer, globaldb, freezer):
+    """Test that the current price cache is saved in the global DB and loaded from it,
+    that invalidation and expiry also apply to the DB and that only the prices in use
+    that are about to expire are picked for a background refresh"""
+    inquirer._oracle_instances = [MagicMock() for _ in inquirer._oracles]
+    for oracle_instance in inquirer._oracle_instances:
+        oracle_instance.query_multiple_current_prices.return_value = {}
+    btc_price, eth_price = Price(FVal('30000')), Price(FVal('2000'))
+    coingecko = inquirer._oracle_instances[inquirer._oracles.index(CurrentPriceOracle.COINGECKO)]
+    coingecko.query_multiple_current_prices.return_value = {A_BTC: btc_price, A_ETH: eth_price}
+    inquirer.find_usd_prices([A_BTC, A_ETH])
+    expected_entries = {
+        key: inquirer._cached_current_price[key]
+        for key in ((A_BTC, A_USD), (A_ETH, A_USD))
+    }
+
+    inquirer.save_current_price_cache()
+    inquirer._cached_current_price.clear()
+    inquirer.load_current_price_cache()
+    assert inquirer._cached_current_price == expected_entries
+    assert inquirer.find_usd_prices([A_BTC, A_ETH]) == {A_BTC: btc_price, A_ETH: eth_price}
+    assert coingecko.query_multiple_current_prices.call_count == 1
+
+    inquirer.remove_cached_current_price_entry((A_BTC, A_USD))
+    inquirer._cached_current_price.clear()
+    inquirer.load_current_price_cache()
+    assert inquirer._cached_current_price == {(A_ETH, A_USD): expected_entries[(A_ETH, A_USD)]}  # noqa: E501
+
+    # only ETH was used and is about to expire
+    assert inquirer.get_current_prices_to_refresh() == []
+    freezer.move_to(datetime.datetime.fromtimestamp(
+        ts_now() + CURRENT_PRICE_CACHE_SECS - CURRENT_PRICE_REFRESH_AHEAD_SECS,
+        tz=datetime.timezone.utc,
+    ))
+    assert inquirer.get_current_prices_to_refresh() == [A_ETH]
+
+    # expired entries are not loaded and are deleted from the DB
+    freezer.move_to(datetime.datetime.fromtimestamp(
+        ts_now() + CURRENT_PRICE_REFRESH_AHEAD_SECS + 1,
+        tz=datetime.timezone.utc,
+    ))
+    inquirer._cached_current_price.clear()
+    inquirer.load_current_price_cache()
+    assert inquirer._cached_current_price == {}
+    with globaldb.conn.read_ctx() as cursor:
+        assert globaldb_get_unique_cache_like(cursor, (CacheType.CURRENT_PRICE,)) == []
+
+    # invalid entries are deleted when invalidating prices instead of failing
+    with globaldb.conn.write_ctx() as write_cursor:
+        globaldb_set_unique_cache_value(write_cursor, (CacheType.CURRENT_PRICE, 'bad'), '{not json')  # noqa: E501
+    inquirer.remove_cache_prices_for_asset([(A_BTC, A_USD)])
+    with globaldb.conn.read_ctx() as cursor:
+        assert globaldb_get_unique_cache_like(cursor, (CacheType.CURRENT_PRICE,)) == []
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 @pytest.mark.parametrize('should_mock_current_price_queries', [True])
 @pytest.mark.parametrize('mocked_current_prices', [UNDERLYING_ASSET_PRICES])
@@ -575,6 +664,37 @@ def test_find_yearn_vaults_v2_price(inquirer_defi, globaldb):
             assert result and result[0].address == underlying_token.resolve_to_evm_token().evm_address  # noqa: E501
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_lp_and_vault_prices(inquirer_defi):
+    """Test that the prices of many protocol tokens are calculated with one aggregated
+    multicall, that they match the prices calculated one token at a time and that
+    tokens of other protocols get no price"""
+    yvusdc = EvmToken('eip155:1/erc20:0x5f18C75AbDAe578b483E5F43f12a39cF75b973a9')
+    yvdai = EvmToken('eip155:1/erc20:0xdA816459F1AB5631232FE5e97a05BBBb94970c95')
+    dai = A_DAI.resolve_to_evm_token()
+    node_inquirer = inquirer_defi.get_evm_manager(ChainID.ETHEREUM).node_inquirer
+    with patch.object(node_inquirer, 'multicall_2', wraps=node_inquirer.multicall_2) as multicall:  # noqa: E501
+        prices = inquirer_defi.find_lp_and_vault_prices([yvusdc, yvdai, dai, yvusdc])
+
+    assert multicall.call_count == 1
+    assert len(multicall.call_args.kwargs['calls']) == 2
+    assert prices.keys() == {yvusdc, yvdai, dai}
+    assert prices[dai] is None
+    for token in (yvusdc, yvdai):
+        assert prices[token] is not None
+        assert prices[token].is_close(inquirer_defi.find_yearn_price(token))
+
+    # the batched usd prices use the on-chain calculation and cache it
+    usd_prices = inquirer_defi.find_usd_prices([yvusdc, yvdai])
+    for token in (yvusdc, yvdai):
+        assert usd_prices[token].is_close(prices[token])
+        assert inquirer_defi.get_cached_current_price_entry(
+            cache_key=(token, A_USD),
+            match_main_currency=False,
+        ).oracle == CurrentPriceOracle.BLOCKCHAIN
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 @pytest.mark.parametrize('should_mock_current_price_queries', [False])
 def test_find_protocol_price_falllback_to_oracle(inquirer_defi):
@@ -1,9 +1,14 @@
+import json
+from unittest.mock import patch
+
 import pytest
 
 from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.api.rest import api_response_stream
 from rotkehlchen.balances.manual import ManuallyTrackedBalance, add_manually_tracked_balances
 from rotkehlchen.constants import ONE
 from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.db.utils import SingleDBAssetBalance
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.externalapis.utils import read_hash
 from rotkehlchen.fval import FVal
@@ -12,6 +17,7 @@ from rotkehlchen.serialization.deserialize import (
     deserialize_evm_transaction,
     deserialize_int_from_hex_or_int,
 )
+from rotkehlchen.serialization.serialize import jsonify_result, process_result
 from rotkehlchen.types import (
     ChainID,
     EvmTransaction,
@@ -41,6 +47,55 @@ def test_rlk_jsondumps():
     )
 
 
+def test_jsonify_result():
+    """Test that serializing via the encoder hook gives the same result as
+    processing the whole result first, including for dicts with asset keys"""
+    data = {
+        'result': [
+            SingleDBAssetBalance(
+                category=BalanceType.ASSET,
+                time=Timestamp(1),
+                amount=FVal('1.5'),
+                usd_value=FVal('3000'),
+            ),
+            {'location': Location.KRAKEN, 'trade_type': TradeType.BUY, 'amount': ONE},
+        ],
+        'message': '',
+    }
+    assert jsonify_result(data) == json.dumps(process_result(data))
+    assert jsonify_result(TEST_DATA) == json.dumps(process_result(TEST_DATA))
+
+
+@pytest.mark.parametrize('entries_num', [0, 1, 2, 5])
+def test_api_response_stream(entries_num):
+    """Test that a streamed response is valid json for any number of chunks"""
+    entries = [{'amount': FVal(idx), 'location': Location.KRAKEN} for idx in range(entries_num)]
+    with patch('rotkehlchen.api.rest.STREAMED_ENTRIES_CHUNK_SIZE', new=2):
+        response = api_response_stream(result={'entries_found': 42}, entries=iter(entries))
+        body = b''.join(response.iter_encoded())
+
+    assert json.loads(body) == {
+        'result': {
+            'entries_found': 42,
+            'entries': [{'amount': str(idx), 'location': 'kraken'} for idx in range(entries_num)],
+        },
+        'message': '',
+    }
+
+
+def test_api_response_stream_error():
+    """Test that a streamed response whose entries fail midway is still valid json"""
+    def entries():
+        yield {'amount': FVal(1)}
+        raise DeserializationError('Failed to read an entry')
+
+    response = api_response_stream(result={'entries_found': 2}, entries=entries())
+    assert json.loads(b''.join(response.iter_encoded())) == {
+        'result': {'entries_found': 2, 'entries': [{'amount': '1'}]},
+        'message': 'Not all entries could be returned due to Failed to read an entry',
+    }
+
+
 def test_pretty_json_dumps():
     """Simply test that pretty json dumps also works. That means that sorting
     of all serializable assets is enabled"""
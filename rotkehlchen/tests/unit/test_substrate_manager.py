@@ -97,9 +97,51 @@ def test_get_account_balance_calculation(kusama_manager):
     assert balance == FVal(111.004701754251)  # (free + reserved)/10**12
 
 
+def test_get_accounts_balance_query_multi(kusama_manager):
+    """Test `_get_accounts_balance()` queries all accounts with one request, maps
+    the results to the accounts regardless of their order and caches them per block.
+    """
+    account_data = {
+        SUBSTRATE_ACC1_KSM_ADDR: {'free': 1000000000000, 'reserved': 0},
+        SUBSTRATE_ACC2_KSM_ADDR: {'free': 2000000000000, 'reserved': 1000000000000},
+    }
+
+    def create_storage_key(pallet, storage_function, params):  # pylint: disable=unused-argument
+        storage_key = MagicMock()
+        storage_key.to_hex.return_value = f'0x{params[0]}'
+        return storage_key
+
+    def query_multi(storage_keys, block_hash):  # pylint: disable=unused-argument
+        return [  # the node returns the results in any order
+            (x, AccountInfo(value={'data': account_data[x.to_hex()[2:]]}))
+            for x in reversed(storage_keys)
+        ]
+
+    mock_node_interface = MagicMock()
+    mock_node_interface.get_chain_head.return_value = '0xblock1'
+    mock_node_interface.create_storage_key.side_effect = create_storage_key
+    mock_node_interface.query_multi.side_effect = query_multi
+    expected_balances = {SUBSTRATE_ACC1_KSM_ADDR: FVal(1), SUBSTRATE_ACC2_KSM_ADDR: FVal(3)}
+    kusama_manager.balances_block_hash = None
+    for _ in range(2):
+        assert kusama_manager._get_accounts_balance(
+            accounts=list(expected_balances),
+            node_interface=mock_node_interface,
+        ) == expected_balances
+    assert mock_node_interface.query_multi.call_count == 1  # same block so cached
+
+    mock_node_interface.get_chain_head.return_value = '0xblock2'
+    assert kusama_manager._get_accounts_balance(
+        accounts=[SUBSTRATE_ACC2_KSM_ADDR],
+        node_interface=mock_node_interface,
+    ) == {SUBSTRATE_ACC2_KSM_ADDR: FVal(3)}
+    assert mock_node_interface.query_multi.call_count == 2
+
+
 def test_set_available_nodes_call_order(kusama_manager):
     """Test `_set_available_nodes_call_order()` sets the available nodes sorted
-    by preference; currently own node first and then by the highest 'weight_block'.
+    by preference; currently own node first, then the synced nodes by latency and
+    then the rest by the highest 'weight_block'.
     """
     # Due to `available_node_attributes_map` is a dict we must fake a key for
     # testing purposes as currently KusamaNodeName only has PARITY
@@ -136,6 +178,20 @@ def test_set_available_nodes_call_order(kusama_manager):
         node_attrs_item_2,
     ]
 
+    # synced nodes are ordered by latency
+    node_attrs_item_4 = (
+        fake_kusama_node_name,
+        NodeNameAttributes(
+            node_interface=object(),
+            weight_block=995,
+            latency=0.1,
+        ),
+    )
+    node_attrs_item_3 = (node_attrs_item_3[0], node_attrs_item_3[1]._replace(latency=0.5))
+    kusama_manager.available_node_attributes_map = dict([node_attrs_item_3, node_attrs_item_4])
+    kusama_manager._set_available_nodes_call_order()
+    assert kusama_manager.available_nodes_call_order == [node_attrs_item_4, node_attrs_item_3]
+
 
 @pytest.mark.parametrize(('endpoint', 'formatted_endpoint'), [
     ('', 'http://'),
@@ -6,7 +6,9 @@ import pytest
 
 from rotkehlchen.chain.bitcoin.hdkey import HDKey
 from rotkehlchen.chain.bitcoin.xpub import XpubData
-from rotkehlchen.constants.timing import DATA_UPDATES_REFRESH
+from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_BTC, A_ETH
+from rotkehlchen.constants.timing import DATA_UPDATES_REFRESH, DAY_IN_SECONDS
 from rotkehlchen.db.constants import LAST_DATA_UPDATES_KEY
 from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.settings import ModifiableDBSettings
@@ -14,7 +16,11 @@ from rotkehlchen.db.updates import RotkiDataUpdater
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, SubscriptionStatus
 from rotkehlchen.tasks.manager import PREMIUM_STATUS_CHECK, TaskManager
-from rotkehlchen.tasks.utils import should_run_periodic_task
+from rotkehlchen.tasks.utils import (
+    MISSING_PRICES_RANGE_WINDOW,
+    group_entries_missing_prices,
+    should_run_periodic_task,
+)
 from rotkehlchen.tests.utils.ethereum import (
     TEST_ADDR1,
     TEST_ADDR2,
@@ -23,7 +29,7 @@ from rotkehlchen.tests.utils.ethereum import (
 from rotkehlchen.tests.utils.factories import make_evm_address
 from rotkehlchen.tests.utils.mock import mock_evm_chains_with_transactions
 from rotkehlchen.tests.utils.premium import VALID_PREMIUM_KEY, VALID_PREMIUM_SECRET
-from rotkehlchen.types import ChainID, Location, SupportedBlockchain
+from rotkehlchen.types import ChainID, Location, SupportedBlockchain, Timestamp
 from rotkehlchen.utils.hexbytes import hexstring_to_bytes
 from rotkehlchen.utils.misc import ts_now
 
@@ -411,6 +417,25 @@ def test_should_run_periodic_task(database: 'DBHandler') -> None:
     ) is True
 
 
+def test_group_entries_missing_prices() -> None:
+    """Check that the entries missing prices are grouped by asset and time window"""
+    day = DAY_IN_SECONDS
+    entries = [
+        ('1', ONE, A_ETH, Timestamp(5 * day)),
+        ('2', ONE, A_BTC, Timestamp(day)),
+        ('3', ONE, A_ETH, Timestamp(day)),
+        ('4', ONE, A_ETH, Timestamp(40 * day)),
+        ('5', ONE, A_ETH, Timestamp(3 * day)),
+    ]
+    groups = group_entries_missing_prices(entries, window=MISSING_PRICES_RANGE_WINDOW)
+    assert [(asset, from_ts, to_ts, [x[0] for x in group]) for asset, from_ts, to_ts, group in groups] == [  # noqa: E501
+        (A_ETH, day, 5 * day, ['3', '5', '1']),
+        (A_ETH, 40 * day, 40 * day, ['4']),
+        (A_BTC, day, day, ['2']),
+    ]
+    assert group_entries_missing_prices([]) == []
+
+
 @pytest.mark.parametrize('ethereum_accounts', [[make_evm_address()]])
 def test_maybe_kill_running_tx_query_tasks(rotkehlchen_api_server, ethereum_accounts):
     """Test that using maybe_kill_running_tx_query_tasks deletes greenlet from the running tasks
@@ -1,3 +1,4 @@
+import dataclasses
 import datetime
 from unittest.mock import MagicMock, patch
 
@@ -6,15 +7,25 @@ import pytest
 
 from rotkehlchen.assets.utils import _query_or_get_given_token_info
 from rotkehlchen.chain.ethereum.tokens import EthereumTokens
-from rotkehlchen.chain.evm.tokens import generate_multicall_chunks
-from rotkehlchen.chain.evm.types import string_to_evm_address
+from rotkehlchen.chain.evm.decoding.constants import ERC20_OR_ERC721_TRANSFER
+from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
+from rotkehlchen.chain.evm.tokens import (
+    PURE_TOKENS_BALANCE_ARGUMENTS,
+    TOKEN_CHUNK_MIN_LENGTH,
+    NodeChunkStats,
+    generate_multicall_chunks,
+)
+from rotkehlchen.chain.evm.types import NodeName, WeightedNode, string_to_evm_address
 from rotkehlchen.constants import ONE
-from rotkehlchen.constants.assets import A_OMG, A_WETH
+from rotkehlchen.constants.assets import A_DAI, A_OMG, A_USDC, A_WETH
+from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.constants import A_LPT
-from rotkehlchen.tests.utils.factories import make_evm_address
+from rotkehlchen.tests.utils.ethereum import txreceipt_to_data
+from rotkehlchen.tests.utils.factories import make_ethereum_transaction, make_evm_address
 from rotkehlchen.types import ChainID, EvmTokenKind, SupportedBlockchain
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.misc import address_to_bytes32, ts_now
 
 ERC20_INFO_RESPONSE = ((True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x06'), (True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x04USDT\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'), (True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\nTether USD\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'))  # noqa: E501
 ERC721_INFO_RESPONSE = ((True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x06BLOCKS\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'), (True, b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00 \x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\nArt Blocks\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'))  # noqa: E501
@@ -253,3 +264,186 @@ def test_flaky_binding_parameter_zero(database, ethereum_accounts):
     with database.conn.read_ctx() as cursor:
         for address in ethereum_accounts:
             database.get_tokens_for_address(cursor, address, SupportedBlockchain.ETHEREUM)
+
+
+def test_adaptive_token_chunks(tokens):
+    """Test that token balances are split among the connected nodes in chunks adapted
+    to each node, that failed chunks are retried and that the tuned lengths are kept"""
+    big_node = NodeName('big', 'https://big.node', False, SupportedBlockchain.ETHEREUM)
+    small_node = NodeName('small', 'https://small.node', False, SupportedBlockchain.ETHEREUM)
+    call_order = [WeightedNode(node_info=x, active=True, weight=ONE) for x in (big_node, small_node)]  # noqa: E501
+    max_arguments = {big_node: 1000, small_node: 100}
+    addresses_to_tokens = {
+        make_evm_address(): [MagicMock(name=f'token{idx}') for idx in range(700)]
+        for _ in range(3)
+    }
+    queried_chunks = []
+
+    def mock_multicall_token_balances(chunk, call_order):
+        node = call_order[0].node_info
+        length = sum(len(tokens) + PURE_TOKENS_BALANCE_ARGUMENTS for _, tokens in chunk)
+        if length > max_arguments[node]:
+            raise RemoteError('out of gas')
+        queried_chunks.append((node, length))
+        gevent.sleep(0)  # let the other node work too
+        return {address: {token: ONE for token in tokens} for address, tokens in chunk}
+
+    with (
+        patch.object(tokens.evm_inquirer, 'web3_mapping', new={big_node: None, small_node: None}),  # noqa: E501
+        patch.object(tokens, '_get_multicall_token_balances', new=mock_multicall_token_balances),  # noqa: E501
+    ):
+        result = tokens._query_adaptive_chunks(
+            addresses_to_tokens=addresses_to_tokens,
+            address_arguments=PURE_TOKENS_BALANCE_ARGUMENTS,
+            query_chunk=lambda chunk, order: tokens._get_multicall_token_balances(chunk, order),  # noqa: E501
+            call_order=call_order,
+        )
+
+    assert {address: set(balances) for address, balances in result.items()} == {
+        address: set(address_tokens) for address, address_tokens in addresses_to_tokens.items()
+    }
+    assert all(balance == ONE for balances in result.values() for balance in balances.values())
+    assert {node for node, _ in queried_chunks} == {big_node, small_node}
+    assert all(length <= max_arguments[node] for node, length in queried_chunks)
+    assert tokens.nodes_chunk_stats[small_node].chunk_length <= 100
+    assert tokens.nodes_chunk_stats[small_node].failures >= 1
+
+    # a new instance starts from the lengths tuned for the nodes by successful calls
+    new_tokens = type(tokens)(tokens.db, tokens.evm_inquirer)
+    assert [x.chunk_length for x in new_tokens._get_nodes_chunk_stats([big_node, small_node])] == [  # noqa: E501
+        tokens.nodes_chunk_stats[big_node].learned_length,
+        tokens.nodes_chunk_stats[small_node].learned_length,
+    ]
+
+
+
+def test_adaptive_token_chunks_own_node(tokens):
+    """Test that when an own node is connected the token balances are only queried
+    at it and the addresses are not sent to the public nodes"""
+    own_node = NodeName('own', 'http://localhost:8545', True, SupportedBlockchain.ETHEREUM)
+    public_node = NodeName('public', 'https://public.node', False, SupportedBlockchain.ETHEREUM)  # noqa: E501
+    call_order = [WeightedNode(node_info=x, active=True, weight=ONE) for x in (own_node, public_node)]  # noqa: E501
+    addresses_to_tokens = {
+        make_evm_address(): [MagicMock(name=f'token{idx}') for idx in range(700)]
+        for _ in range(3)
+    }
+    queried_nodes = set()
+
+    def mock_multicall_token_balances(chunk, call_order):
+        queried_nodes.update(x.node_info for x in call_order)
+        gevent.sleep(0)  # let any other node work too
+        return {address: {token: ONE for token in tokens} for address, tokens in chunk}
+
+    with (
+        patch.object(tokens.evm_inquirer, 'web3_mapping', new={own_node: None, public_node: None}),  # noqa: E501
+        patch.object(tokens, '_get_multicall_token_balances', new=mock_multicall_token_balances),  # noqa: E501
+    ):
+        result = tokens._query_adaptive_chunks(
+            addresses_to_tokens=addresses_to_tokens,
+            address_arguments=PURE_TOKENS_BALANCE_ARGUMENTS,
+            query_chunk=lambda chunk, order: tokens._get_multicall_token_balances(chunk, order),  # noqa: E501
+            call_order=call_order,
+        )
+
+    assert {address: set(balances) for address, balances in result.items()} == {
+        address: set(address_tokens) for address, address_tokens in addresses_to_tokens.items()
+    }
+    assert queried_nodes == {own_node}
+
+def test_node_chunk_stats():
+    stats = NodeChunkStats(chunk_length=100)
+    stats.record_success(length=50, secs=0.5)
+    assert stats.chunk_length == 100, 'partial chunks should not grow the length'
+    stats.record_success(length=100 - PURE_TOKENS_BALANCE_ARGUMENTS, secs=0.5)
+    assert stats.chunk_length == 125, 'a multicall chunk within the margin is full'
+    stats.record_success(length=125, secs=10)
+    assert stats.chunk_length == 93, 'slow calls should shrink the length'
+    stats.record_failure(length=80)
+    assert stats.chunk_length == 40
+    for _ in range(5):
+        stats.record_failure(length=stats.chunk_length)
+    assert stats.chunk_length == TOKEN_CHUNK_MIN_LENGTH
+    assert (stats.successes, stats.failures) == (3, 6)
+    assert NodeChunkStats.deserialize(stats.serialize()) == NodeChunkStats(
+        chunk_length=93,  # the failures are not saved
+        avg_secs=stats.avg_secs,
+        successes=3,
+        failures=6,
+    )
+
+
+def test_incremental_token_detection(tokens):
+    """Test that after the first detection only the detected tokens and the tokens
+    transferred since then are checked, unless a full detection is asked for"""
+    address = make_evm_address()
+    dbevmtx = DBEvmTx(tokens.db)
+
+    def add_transfer(token, block_number, with_receipt=True):
+        transaction = dataclasses.replace(make_ethereum_transaction(), block_number=block_number)
+        with tokens.db.user_write() as write_cursor:
+            dbevmtx.add_evm_transactions(write_cursor, [transaction], relevant_address=address)
+            if with_receipt is False:
+                return
+            dbevmtx.add_receipt_data(write_cursor, ChainID.ETHEREUM, txreceipt_to_data(EvmTxReceipt(  # noqa: E501
+                tx_hash=transaction.tx_hash,
+                chain_id=ChainID.ETHEREUM,
+                contract_address=None,
+                status=True,
+                type=0,
+                logs=[EvmTxReceiptLog(
+                    log_index=0,
+                    data=b'',
+                    address=token.resolve_to_evm_token().evm_address,
+                    removed=False,
+                    topics=[
+                        ERC20_OR_ERC721_TRANSFER,
+                        bytes.fromhex(address_to_bytes32(make_evm_address())[2:]),
+                        bytes.fromhex(address_to_bytes32(address)[2:]),
+                    ],
+                )],
+            )))
+
+    def detect(full_detection=False):
+        checked_tokens = []
+
+        def mock_detect_tokens(addresses_to_tokens):
+            assert list(addresses_to_tokens) == [address]
+            tokens_to_check = addresses_to_tokens[address]
+            checked_tokens.append(set(tokens_to_check))
+            with tokens.db.user_write() as write_cursor:
+                for detected_address in addresses_to_tokens:
+                    tokens.db.save_tokens_for_address(
+                        write_cursor=write_cursor,
+                        address=detected_address,
+                        blockchain=SupportedBlockchain.ETHEREUM,
+                        tokens=[x for x in tokens_to_check if x in (A_DAI, A_USDC)],
+                    )
+
+        with patch.object(tokens, '_detect_tokens', new=mock_detect_tokens):
+            tokens.detect_tokens(only_cache=False, addresses=[address], full_detection=full_detection)  # noqa: E501
+        assert len(checked_tokens) == 1
+        return checked_tokens[0]
+
+    def detection_block():
+        with tokens.db.conn.read_ctx() as cursor:
+            return tokens.db.get_token_detection_block(cursor, address, SupportedBlockchain.ETHEREUM)  # noqa: E501
+
+    add_transfer(A_DAI, block_number=10)
+    assert len(detect()) > 100, 'first detection should check all tokens'
+    assert detection_block() == 10
+
+    assert detect() == {A_DAI}, 'only the detected token is checked'
+    add_transfer(A_USDC, block_number=20)
+    add_transfer(A_OMG, block_number=30)
+    assert detect() == {A_DAI, A_USDC, A_OMG}
+    assert detection_block() == 30
+    assert detect() == {A_DAI, A_USDC}, 'OMG had no balance and no new transfers'
+
+    # a transaction whose receipt is not yet stored may still have transfers
+    add_transfer(A_WETH, block_number=40, with_receipt=False)
+    add_transfer(A_OMG, block_number=50)
+    assert detect() == {A_DAI, A_USDC, A_OMG}
+    assert detection_block() == 30
+
+    assert len(detect(full_detection=True)) > 100
+    assert detection_block() == 30
@@ -0,0 +1,104 @@
+import json
+from unittest.mock import patch
+
+import gevent
+
+from rotkehlchen.api.websockets.notifier import RotkiNotifier
+from rotkehlchen.api.websockets.typedefs import TransactionStatusStep, WSMessageType
+
+
+class MockWebsocket:
+
+    def __init__(self, send_delay: float = 0) -> None:
+        self.closed = False
+        self.send_delay = send_delay
+        self.messages: list[dict] = []
+
+    def send(self, message: str) -> None:
+        gevent.sleep(self.send_delay)
+        self.messages.append(json.loads(message))
+
+
+def _tx_status(notifier: RotkiNotifier, step: TransactionStatusStep, address: str = '0x1') -> None:
+    notifier.broadcast(
+        message_type=WSMessageType.EVM_TRANSACTION_STATUS,
+        to_send_data={'address': address, 'evm_chain': 'ethereum', 'status': str(step)},
+    )
+
+
+def test_progress_messages_are_coalesced():
+    """Test that queued progress messages are superseded by later ones of the same
+    key while start/finish messages and messages of other keys are all sent in order"""
+    notifier, websocket = RotkiNotifier(), MockWebsocket(send_delay=0.05)
+    notifier.subscribe(websocket)
+    _tx_status(notifier, TransactionStatusStep.QUERYING_TRANSACTIONS_STARTED)
+    gevent.sleep(0.01)  # the first message is being sent so the next ones are queued
+    for step in (
+            TransactionStatusStep.QUERYING_TRANSACTIONS,
+            TransactionStatusStep.QUERYING_INTERNAL_TRANSACTIONS,
+    ):
+        _tx_status(notifier, step)
+    _tx_status(notifier, TransactionStatusStep.QUERYING_TRANSACTIONS, address='0x2')
+    _tx_status(notifier, TransactionStatusStep.QUERYING_EVM_TOKENS_TRANSACTIONS)
+    _tx_status(notifier, TransactionStatusStep.QUERYING_TRANSACTIONS_FINISHED)
+    gevent.sleep(0.5)
+
+    assert [(x['data']['address'], x['data']['status']) for x in websocket.messages] == [
+        ('0x1', 'querying_transactions_started'),
+        ('0x2', 'querying_transactions'),
+        ('0x1', 'querying_evm_tokens_transactions'),
+        ('0x1', 'querying_transactions_finished'),
+    ]
+    stats = notifier.stats()[0]
+    assert stats['sent'] == 4
+    assert stats['coalesced'] == 2
+    assert stats['max_latency'] >= 0.05
+    notifier.unsubscribe(websocket)
+
+
+def test_migration_steps_are_not_coalesced():
+    """Test that all DB upgrade and data migration steps are sent, even when queued"""
+    notifier, websocket = RotkiNotifier(), MockWebsocket(send_delay=0.05)
+    notifier.subscribe(websocket)
+    for step in range(4):
+        notifier.broadcast(
+            message_type=WSMessageType.DATA_MIGRATION_STATUS,
+            to_send_data={
+                'start_version': 1,
+                'target_version': 2,
+                'current_migration': {'version': 2, 'total_steps': 3, 'current_step': step},
+            },
+        )
+    gevent.sleep(0.5)
+
+    assert [x['data']['current_migration']['current_step'] for x in websocket.messages] == [0, 1, 2, 3]  # noqa: E501
+    assert notifier.stats()[0]['coalesced'] == 0
+    notifier.unsubscribe(websocket)
+
+
+def test_slow_subscriber_drops_oldest_messages():
+    """Test that producers don't block on a slow subscriber and that messages
+    dropped due to backpressure count as failed"""
+    notifier, websocket = RotkiNotifier(), MockWebsocket(send_delay=10)
+    notifier.subscribe(websocket)
+    failed = []
+
+    def on_failure(idx: int) -> None:
+        failed.append(idx)
+
+    with patch('rotkehlchen.api.websockets.notifier.MAX_QUEUED_WS_MESSAGES', new=3):
+        with gevent.Timeout(1):  # broadcasting never waits on the socket
+            for idx in range(6):
+                notifier.broadcast(
+                    message_type=WSMessageType.LEGACY,
+                    to_send_data={'verbosity': 'error', 'value': str(idx)},
+                    failure_callback=on_failure,
+                    failure_callback_args={'idx': idx},
+                )
+                gevent.sleep(0.01)
+
+    # the first message is being sent and the next two were dropped
+    assert failed == [1, 2]
+    assert notifier.stats()[0]['dropped'] == 2
+    notifier.unsubscribe(websocket)  # the still queued messages fail
+    assert failed == [1, 2, 3, 4, 5]
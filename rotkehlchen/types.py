@@ -980,6 +980,11 @@ class CacheType(Enum):
     VELODROME_GAUGE_ADDRESS = auto()  # get gauge address by pool address
     ENS_NAMEHASH = auto()  # map ENS namehash -> ens name
     ENS_LABELHASH = auto()  # map ENS labelhash -> ens name
+    UNISWAP_V2_POOL = auto()  # get uniswap v2 pool by pair of token addresses
+    UNISWAP_V3_POOL = auto()  # get most liquid uniswap v3 pool by pair of token addresses
+    CURRENT_PRICE = auto()  # cached current price of a pair of assets
+    PRICE_HISTORY_COVERAGE = auto()  # ranges of a pair's historical prices stored per source
+    EVM_NODE_CHUNK_STATS = auto()  # tuned token balances chunk length of an evm node
 
     def serialize(self) -> str:
         # Using custom serialize method instead of SerializableEnumMixin since mixin replaces
@@ -998,6 +1003,11 @@ UniqueCacheType = Literal[
     CacheType.YEARN_VAULTS,
     CacheType.ENS_NAMEHASH,
     CacheType.ENS_LABELHASH,
+    CacheType.UNISWAP_V2_POOL,
+    CacheType.UNISWAP_V3_POOL,
+    CacheType.CURRENT_PRICE,
+    CacheType.PRICE_HISTORY_COVERAGE,
+    CacheType.EVM_NODE_CHUNK_STATS,
 ]
 
 UNIQUE_CACHE_KEYS: tuple[UniqueCacheType, ...] = typing.get_args(UniqueCacheType)
@@ -3,6 +3,7 @@ from collections import OrderedDict
 from typing import Generic, Optional, TypeVar
 
 RT = TypeVar('RT')
+KT = TypeVar('KT')
 
 
 class LRUCacheWithRemove(Generic[RT]):
@@ -35,6 +36,30 @@ class LRUCacheWithRemove(Generic[RT]):
         self.cache.clear()
 
 
+class LRUCache(Generic[KT, RT]):
+    """LRU cache mapping keys to values. Unlike LRUCacheWithRemove keys are used as given"""
+
+    def __init__(self, maxsize: int = 512):
+        self.cache: OrderedDict[KT, RT] = collections.OrderedDict()
+        self.maxsize: int = maxsize
+
+    def get(self, key: KT) -> Optional[RT]:
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        return None
+
+    def add(self, key: KT, value: RT) -> None:
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """Delete all entries in the cache"""
+        self.cache.clear()
+
+
 class LRUSetCache(Generic[RT]):
     """
     LRU cache that works like a set.
@@ -0,0 +1,22 @@
+"""
+Micro-benchmarks of performance sensitive parts of the backend.
+
+Each module can be run on its own from the root of the repository, for example:
+
+    python -m tools.profiling.benchmarks.cost_basis
+"""
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+def measure(name: str, function: Callable[[], Any], repeat: int = 3) -> float:
+    """Runs `function` `repeat` times, prints and returns the best run time in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    print(f'{name:<60} {best * 1000:>12.3f} ms')
+    return best
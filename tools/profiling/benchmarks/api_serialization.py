@@ -0,0 +1,50 @@
+"""
+Benchmarks serializing a large statistics response the way the API used to do it,
+processing the result, dumping it and parsing it back for the log, against a single
+pass through the API encoder.
+
+    python -m tools.profiling.benchmarks.api_serialization --entries 200000
+"""
+import argparse
+import json
+import random
+
+from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.db.utils import SingleDBAssetBalance
+from rotkehlchen.fval import FVal
+from rotkehlchen.serialization.serialize import jsonify_result, process_result_list
+from rotkehlchen.types import Timestamp
+
+from . import measure
+
+
+def make_balances(count: int) -> list[SingleDBAssetBalance]:
+    return [SingleDBAssetBalance(
+        category=BalanceType.ASSET,
+        time=Timestamp(1600000000 + idx * 3600),
+        amount=FVal(random.randint(1, 10000) / 100),
+        usd_value=FVal(random.randint(1, 1000000) / 100),
+    ) for idx in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark API response serialization')
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    balances = make_balances(args.entries)
+
+    def process_dump_and_parse() -> None:
+        data = json.dumps({'result': process_result_list(balances), 'message': ''})
+        json.loads(data)
+
+    def encode() -> None:
+        jsonify_result({'result': balances, 'message': ''})
+
+    measure(f'Process, dump and parse back {args.entries} balances', process_dump_and_parse)
+    measure(f'Encode {args.entries} balances in one pass', encode)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmarks the cost basis methods against many small acquisitions, which is
+what DCA bots and staking rewards produce.
+
+    python -m tools.profiling.benchmarks.cost_basis --acquisitions 50000
+"""
+import argparse
+import random
+
+from rotkehlchen.accounting.cost_basis.base import (
+    AssetAcquisitionEvent,
+    AverageCostBasisMethod,
+    BaseCostBasisMethod,
+    FIFOCostBasisMethod,
+    HIFOCostBasisMethod,
+    LIFOCostBasisMethod,
+)
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import Price, Timestamp
+
+from . import measure
+
+METHODS: tuple[type[BaseCostBasisMethod], ...] = (
+    FIFOCostBasisMethod,
+    LIFOCostBasisMethod,
+    HIFOCostBasisMethod,
+    AverageCostBasisMethod,
+)
+
+
+def make_acquisitions(count: int) -> list[AssetAcquisitionEvent]:
+    return [AssetAcquisitionEvent(
+        amount=FVal(f'0.00{random.randint(1, 99999)}'),
+        timestamp=Timestamp(1600000000 + idx * 3600),
+        rate=Price(FVal(random.randint(1000, 60000))),
+        index=idx,
+    ) for idx in range(count)]
+
+
+def benchmark_method(method_class: type[BaseCostBasisMethod], count: int, spends: int) -> None:
+    acquisitions = make_acquisitions(count)
+    total = sum((x.amount for x in acquisitions), start=FVal(0))
+    spend_amount = total / spends
+    name = method_class.__name__
+
+    def add_all() -> BaseCostBasisMethod:
+        for acquisition in acquisitions:
+            acquisition.remaining_amount = acquisition.amount
+        method = method_class()
+        for acquisition in acquisitions:
+            method.add_acquisition(acquisition)
+        return method
+
+    def spend_all() -> None:
+        method = add_all()
+        for _ in range(spends):
+            method.consume_amount(spend_amount)
+
+    def snapshot_and_restore() -> None:
+        method = add_all()
+        snapshot = method.snapshot()
+        method.consume_amount(total / 2)
+        method.restore(snapshot)
+
+    measure(f'{name}: add {count} acquisitions', add_all)
+    measure(f'{name}: add and consume in {spends} spends', spend_all)
+    measure(f'{name}: add, snapshot, consume half and restore', snapshot_and_restore)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the cost basis methods')
+    parser.add_argument('--acquisitions', type=int, default=20000)
+    parser.add_argument('--spends', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    for method_class in METHODS:
+        benchmark_method(method_class, count=args.acquisitions, spends=args.spends)
+
+
+if __name__ == '__main__':
+    main()
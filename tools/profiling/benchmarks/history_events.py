@@ -0,0 +1,96 @@
+"""
+Benchmarks loading history events for accounting as lightweight row views against
+building the full event objects up front. Synthetic rows are shaped like the ones
+returned by the history events query.
+
+    python -m tools.profiling.benchmarks.history_events --events 1000000
+"""
+import argparse
+import random
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.accounting.structures.base import HistoryBaseEntryType, HistoryEvent
+from rotkehlchen.accounting.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.db.history_events import HistoryEventRow
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import Location, TimestampMS
+
+from . import measure
+
+
+def make_rows(count: int) -> list[tuple]:
+    return [(
+        HistoryBaseEntryType.HISTORY_EVENT.value,
+        idx,
+        f'event_{idx // 3}',
+        idx % 3,
+        1600000000000 + random.randint(0, 100000000000),
+        Location.KRAKEN.serialize_for_db(),
+        None,
+        'ETH',
+        str(random.randint(1, 10000) / 100),
+        '0',
+        None,
+        HistoryEventType.TRADE.serialize(),
+        HistoryEventSubType.SPEND.serialize(),
+        None, None, None, None, None, None, None,
+    ) for idx in range(count)]
+
+
+def make_event(row: tuple) -> HistoryEvent:
+    """Mirrors what deserializing a row costs, minus the asset existence check
+    which would need a global DB"""
+    return HistoryEvent(
+        identifier=row[1],
+        event_identifier=row[2],
+        sequence_index=row[3],
+        timestamp=TimestampMS(row[4]),
+        location=Location.deserialize_from_db(row[5]),
+        location_label=row[6],
+        asset=Asset(row[7]),
+        balance=Balance(amount=FVal(row[8]), usd_value=FVal(row[9])),
+        notes=row[10],
+        event_type=HistoryEventType.deserialize(row[11]),
+        event_subtype=HistoryEventSubType.deserialize(row[12]),
+    )
+
+
+def peak_memory(function: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    result = function()  # keep the result alive until the peak is read
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark history events loading')
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    rows = make_rows(args.events)
+
+    def load_rows() -> list[HistoryEventRow]:
+        events = [HistoryEventRow(row, 0) for row in rows]
+        events.sort(key=lambda x: (x.get_timestamp(), x.sequence_index))
+        return events
+
+    def load_events() -> list[HistoryEvent]:
+        events = [make_event(row) for row in rows]
+        events.sort(key=lambda x: (x.get_timestamp(), x.sequence_index))
+        return events
+
+    measure(f'Create and sort {args.events} row views', load_rows)
+    measure(f'Create and sort {args.events} full events', load_events)
+    print(f'{"Peak memory of row views":<60} {peak_memory(load_rows) / 2**20:>12.3f} MB')
+    print(f'{"Peak memory of full events":<60} {peak_memory(load_events) / 2**20:>12.3f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmarks the statistics graph queries against a synthetic user DB with years of
+hourly balance snapshots, with and without downsampling them to a resolution.
+
+    python -m tools.profiling.benchmarks.statistics --years 5
+"""
+import argparse
+import random
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from rotkehlchen.accounting.structures.balance import BalanceType
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS, WEEK_IN_SECONDS
+from rotkehlchen.data_handler import DataHandler
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.settings import ModifiableDBSettings
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.user_messages import MessagesAggregator
+
+from . import measure
+
+ASSETS = ('ETH', 'BTC', 'EUR', 'USD', 'XMR', 'DOGE', 'ADA', 'DOT', 'ETH2', 'KSM')
+
+
+def populate(db: DBHandler, snapshots: int) -> None:
+    """Adds hourly snapshots. Every asset has balances in most snapshots
+    with some random gaps so that zero balances need to be inferred"""
+    start = 1600000000
+    with db.user_write() as write_cursor:
+        db.set_settings(write_cursor, ModifiableDBSettings(infer_zero_timed_balances=True))
+        for idx in range(snapshots):
+            timestamp = start + idx * HOUR_IN_SECONDS
+            write_cursor.executemany(
+                'INSERT INTO timed_balances(category, timestamp, currency, amount, usd_value) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(
+                    BalanceType.ASSET.serialize_for_db(),
+                    timestamp,
+                    identifier,
+                    str(random.randint(1, 10000) / 100),
+                    str(random.randint(1, 1000000) / 100),
+                ) for identifier in ASSETS if random.random() > 0.05],
+            )
+            write_cursor.execute(
+                'INSERT INTO timed_location_data(timestamp, location, usd_value) VALUES (?, ?, ?)',  # noqa: E501
+                (timestamp, 'H', str(random.randint(1, 10000000) / 100)),
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the statistics graph queries')
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+    snapshots = args.years * 365 * 24
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        GlobalDBHandler(data_dir=Path(data_dir), sql_vm_instructions_cb=0)
+        data = DataHandler(Path(data_dir), MessagesAggregator(), sql_vm_instructions_cb=0)
+        data.unlock('benchmark', '123', create_new=True, resume_from_backup=False)
+        populate(data.db, snapshots=snapshots)
+        print(f'Created {snapshots} snapshots of {len(ASSETS)} assets')
+
+        for resolution in (None, DAY_IN_SECONDS, WEEK_IN_SECONDS):
+            def netvalue(resolution: Optional[int] = resolution) -> None:
+                data.db.get_netvalue_data(from_ts=0, include_nfts=False, resolution=resolution)
+
+            def timed_balances(resolution: Optional[int] = resolution) -> None:
+                with data.db.conn.read_ctx() as cursor:
+                    data.db.query_timed_balances(
+                        cursor=cursor,
+                        asset=Asset('BTC'),
+                        balance_type=BalanceType.ASSET,
+                        resolution=resolution,
+                    )
+
+            measure(f'Net value with resolution {resolution}', netvalue)
+            measure(f'Timed balances with resolution {resolution}', timed_balances)
+
+        data.logout()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Benchmarks the derivation of xpub addresses for each xpub type, both computing
+them from scratch and getting them from the derived addresses cache.
+
+    python -m tools.profiling.benchmarks.xpub_derivation --addresses 2000
+"""
+import argparse
+
+from rotkehlchen.chain.bitcoin.hdkey import HDKey, XpubType
+from rotkehlchen.chain.bitcoin.xpub import DERIVED_ADDRESSES_CACHE, _derive_addresses_batch
+
+from . import measure
+
+XPUB = 'xpub6BgBgsespWvERF3LHQu6CnqdvfEvtMcQjYrcRzx53QJjSxarj2afYWcLteoGVky7D3UKDP9QyrLprQ3VCECoY49yfdDEHGCtMMj92pReUsQ'  # noqa: E501
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark xpub address derivation')
+    parser.add_argument('--addresses', type=int, default=1000)
+    args = parser.parse_args()
+
+    for xpub_type in XpubType:
+        root = HDKey.from_xpub(xpub=XPUB, xpub_type=xpub_type, path='m').derive_child(0)
+
+        def derive(root: HDKey = root) -> None:
+            DERIVED_ADDRESSES_CACHE.clear()
+            _derive_addresses_batch(root=root, start_index=0, count=args.addresses)
+
+        def derive_cached(root: HDKey = root) -> None:
+            _derive_addresses_batch(root=root, start_index=0, count=args.addresses)
+
+        seconds = measure(f'{xpub_type.name}: derive {args.addresses} addresses', derive)
+        print(f'{xpub_type.name + " addresses per second":<60} {args.addresses / seconds:>12.0f}')
+        _derive_addresses_batch(root=root, start_index=0, count=args.addresses)  # fill cache
+        measure(f'{xpub_type.name}: get {args.addresses} cached addresses', derive_cached)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Profiles the time it takes to import the backend at startup, using python's own
+``-X importtime`` in a fresh interpreter, and shows which modules are the slowest
+to import. Run from the root of the repository:
+
+    python -m tools.profiling.import_time --top 30
+
+Modules that only need to be imported once a user logs in, such as the chain
+managers or the exchanges, should not show up here.
+"""
+import argparse
+import subprocess
+import sys
+from typing import NamedTuple
+
+STARTUP_IMPORTS = 'from gevent import monkey; monkey.patch_all(); import rotkehlchen.server'
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def profile_imports(code: str = STARTUP_IMPORTS) -> list[ImportTime]:
+    """Imports in a new interpreter and returns the import time of each module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        self_us, cumulative_us, module = line.removeprefix('import time:').split('|')
+        times.append(ImportTime(
+            module=module.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+        ))
+
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Profile the import time of the backend')
+    parser.add_argument('--top', type=int, default=20, help='How many modules to show')
+    parser.add_argument(
+        '--package',
+        default='rotkehlchen',
+        help='Only show modules of this package. Empty string for all modules',
+    )
+    args = parser.parse_args()
+
+    times = profile_imports()
+    total = sum(x.self_us for x in times)
+    own = [x for x in times if x.module.split('.')[0] == args.package or args.package == '']
+    print(f'Imported {len(times)} modules in {total / 1000:.1f} ms, {len(own)} of them from {args.package or "any package"}')  # noqa: E501
+
+    for title, key in (('cumulative', 'cumulative_us'), ('self', 'self_us')):
+        print(f'\nTop {args.top} modules by {title} import time:')
+        for entry in sorted(own, key=lambda x: getattr(x, key), reverse=True)[:args.top]:
+            print(f'{entry.module:<80} {getattr(entry, key) / 1000:>10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()